@@ -1,11 +1,38 @@
-from fastapi import FastAPI, HTTPException
+import os
+from typing import Any, Callable, Dict, List
+from fastapi import Body, FastAPI, Header, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from pathlib import Path
+from uuid import uuid4
+from ..exceptions import InvalidCursorError, QueueFullError
+from ..generator.jobs import ScaffoldJobs
 from ..generator.renderer import TemplateRenderer
-from ..utils.store import InMemoryStore
+from ..hosting.utils.validators import deployment_validator
+from ..packager.export_bundle import stream_bundle
+from ..storage.local import BlobStore
+from .responses import CachedJSON, FastJSONResponse
+from .uploads import router as uploads_router
+from ..utils.archiver import FORMATS, MEDIA_TYPES
+from ..utils.store import make_store
 
-app = FastAPI(title="Autobuilder API", version="0.1.0")
-db = InMemoryStore()
+app = FastAPI(title="Autobuilder API", version="0.1.0", default_response_class=FastJSONResponse)
+app.include_router(uploads_router)
+db = make_store()
+catalog_cache = CachedJSON()
+# Content-addressed copies of bundle sources; off unless AUTOBUILDER_BLOBS names a directory
+blobs = BlobStore(Path(os.environ["AUTOBUILDER_BLOBS"])) if os.environ.get("AUTOBUILDER_BLOBS") else None
+# Bundle sources (meta.path) must live under this directory; it bounds what clients can export
+PROJECTS_ROOT = Path(os.environ.get("AUTOBUILDER_PROJECTS") or os.getcwd()).resolve()
+
+# One renderer (and compiled-template cache) per process, shared by all scaffold jobs
+TEMPLATES_ROOT = Path(__file__).resolve().parents[1] / "templates"
+renderer = TemplateRenderer(TEMPLATES_ROOT)
+scaffold_jobs = ScaffoldJobs(
+    renderer,
+    workers=int(os.environ.get("AUTOBUILDER_SCAFFOLD_WORKERS", "4")),
+    max_pending=int(os.environ.get("AUTOBUILDER_SCAFFOLD_QUEUE", "64")),
+)
 
 class BundleReq(BaseModel):
     name: str
@@ -20,34 +47,146 @@ class ScaffoldReq(BaseModel):
     out: str
     name: str
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_DEPLOY_BATCH = 10_000
+
+def _paginate(fetch: Callable[..., List[Dict[str, Any]]], limit: int, fields: str | None) -> FastJSONResponse:
+    """Fetch one keyset page (limit + 1 rows to detect more) and build the response."""
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    # The id is always fetched because the next cursor is the last row's id
+    columns = list(dict.fromkeys(["id", *wanted])) if wanted else None
+    try:
+        rows = fetch(limit=limit + 1, fields=columns)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    rows = rows[:limit]
+    if wanted and "id" not in wanted:
+        rows = [{k: v for k, v in r.items() if k != "id"} for r in rows]
+    # Returning the response directly skips FastAPI's jsonable_encoder pass over every row
+    return FastJSONResponse({"items": rows, "next": next_cursor})
+
 @app.get("/catalog")
-def catalog():
-    return {"items": db.list_catalog()}
+def catalog(if_none_match: str | None = Header(None)):
+    version = (db.catalog_version, len(db.catalog))
+    return catalog_cache.response(version, lambda: {"items": db.list_catalog()}, if_none_match)
 
 @app.get("/bundles")
-def list_bundles():
-    return {"items": db.list_bundles()}
+def list_bundles(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    fields: str | None = None,
+):
+    return _paginate(lambda **kw: db.list_bundles(after=after, **kw), limit, fields)
+
+def _bundle_source(meta: dict | None, status_code: int) -> Path | None:
+    """Resolve ``meta.path``, refusing anything outside PROJECTS_ROOT (symlinks and ``..`` included)."""
+    src = (meta or {}).get("path")
+    if not src:
+        return None
+    path = Path(src).resolve()
+    if not path.is_relative_to(PROJECTS_ROOT):
+        raise HTTPException(status_code=status_code, detail="meta.path is outside the projects root")
+    return path
 
 @app.post("/bundles")
 def create_bundle(req: BundleReq):
-    return db.create_bundle(req.name, req.meta)
+    src = _bundle_source(req.meta, 400)
+    if blobs is not None and src and not src.is_dir():
+        raise HTTPException(status_code=400, detail="meta.path is not a directory")
+    if blobs is None or src is None:
+        return db.create_bundle(req.name, req.meta)
+    # Ingest first so a failed copy leaves no record behind, and drop the manifest if the insert fails
+    bundle_id = str(uuid4())
+    blobs.put_bundle(bundle_id, src)
+    try:
+        return db.create_bundle(req.name, req.meta, bundle_id=bundle_id)
+    except BaseException:
+        blobs.delete_manifest(bundle_id)
+        raise
+
+@app.get("/bundles/{bundle_id}/export")
+def export_bundle(bundle_id: str, format: str = Query("tar.gz")):
+    """Serve the bundle as a reproducible archive.
+
+    Bundles ingested into the blob store are archived from their manifest once and served from
+    the export cache after that; others are streamed from their source tree (``meta.path``).
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    bundle = db.get_bundle(bundle_id)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="bundle not found")
+    filename = f"{bundle['name'] or bundle_id}.{format}".replace('"', "")
+    if blobs is not None and blobs.has_manifest(bundle_id):
+        return FileResponse(blobs.export(bundle_id, format), media_type=MEDIA_TYPES[format], filename=filename)
+    # checked again here: the tree may have been swapped for a symlink since the bundle was created
+    src = _bundle_source(bundle.get("meta"), 403)
+    if src is None or not src.is_dir():
+        raise HTTPException(status_code=409, detail="bundle has no source directory to export")
+    return StreamingResponse(
+        stream_bundle(src, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @app.get("/deployments")
-def list_deployments():
-    return {"items": db.list_deployments()}
+def list_deployments(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    target: str | None = None,
+    status: str | None = None,
+    fields: str | None = None,
+):
+    return _paginate(
+        lambda **kw: db.list_deployments(after=after, target=target, status=status, **kw), limit, fields
+    )
 
 @app.post("/deployments")
 def create_deployment(req: DeployReq):
-    if req.bundle_id not in {b["id"] for b in db.list_bundles()}:
+    errors = deployment_validator().errors(req.model_dump())
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    if db.get_bundle(req.bundle_id) is None:
         raise HTTPException(status_code=404, detail="bundle not found")
     return db.create_deployment(req.bundle_id, req.target)
 
-@app.post("/scaffold")
+@app.post("/deployments/batch")
+def create_deployments(records: List[Any] = Body(...)):
+    """Create many deployments at once; nothing is created unless every record is valid.
+
+    Records are checked in one pass by the compiled deployments schema, and a 422 lists the
+    errors of each failing record by index.
+    """
+    if len(records) > MAX_DEPLOY_BATCH:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_DEPLOY_BATCH} records per batch")
+    failed = deployment_validator().validate_many(records)
+    if failed:
+        raise HTTPException(status_code=422, detail=[{"index": i, "errors": e} for i, e in failed.items()])
+    missing = sorted(b for b in {r["bundle_id"] for r in records} if db.get_bundle(b) is None)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"bundle(s) not found: {', '.join(missing)}")
+    return {"items": [db.create_deployment(r["bundle_id"], r["target"]) for r in records]}
+
+@app.post("/scaffold", status_code=202)
 def scaffold(req: ScaffoldReq):
-    templates_root = Path(__file__).resolve().parents[1] / "templates"
-    r = TemplateRenderer(templates_root)
+    if not (TEMPLATES_ROOT / req.template).is_dir():
+        raise HTTPException(status_code=404, detail="template not found")
     out_dir = Path(req.out).resolve()
     safe = req.name.replace("-", "_").replace(" ", "_")
     context = {"project_name": safe, "package_name": safe}
-    r.scaffold(req.template, out_dir, context)
-    return {"status": "ok", "out": str(out_dir)}
+    try:
+        job = scaffold_jobs.submit(req.template, out_dir, context)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return job
+
+@app.get("/scaffold/{job_id}")
+def scaffold_status(job_id: str):
+    job = scaffold_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Hashable, Optional, Tuple
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+    FastJSONResponse = JSONResponse
+
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison per RFC 9110 for If-None-Match
+    tags = (t.strip() for t in if_none_match.split(","))
+    return any(t.removeprefix("W/") == etag for t in tags)
+
+
+class CachedJSON:
+    """Serialized JSON body plus strong ETag, rebuilt only when ``version`` changes."""
+
+    def __init__(self) -> None:
+        self._version: Optional[Hashable] = None
+        self._body = b""
+        self._etag = ""
+        self._lock = threading.Lock()
+
+    def get(self, version: Hashable, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        with self._lock:
+            if self._version != version or not self._etag:
+                self._body = dumps(build())
+                self._etag = '"' + hashlib.sha256(self._body).hexdigest()[:32] + '"'
+                self._version = version
+            return self._body, self._etag
+
+    def response(self, version: Hashable, build: Callable[[], Any], if_none_match: Optional[str]) -> Response:
+        body, etag = self.get(version, build)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,172 @@
+import base64
+import binascii
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from ..exceptions import ChecksumMismatchError, DuplicateUploadError, UploadConflictError, UploadTooLargeError
+from ..project.uploads import CHUNK_ALGORITHMS, UploadManager, default_root
+
+# Resumable uploads following the tus 1.0.0 core protocol with the creation, checksum and
+# termination extensions: POST creates, HEAD reports the offset, PATCH appends from it.
+TUS_VERSION = "1.0.0"
+TUS_EXTENSIONS = "creation,checksum,termination"
+OFFSET_CONTENT_TYPE = "application/offset+octet-stream"
+# tus "460 Checksum Mismatch"
+CHECKSUM_MISMATCH = 460
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+_manager: Optional[UploadManager] = None
+
+
+def get_manager() -> UploadManager:
+    global _manager
+    if _manager is None:
+        _manager = UploadManager(default_root())
+    return _manager
+
+
+def _tus(**headers: str) -> Dict[str, str]:
+    return {"Tus-Resumable": TUS_VERSION, **headers}
+
+
+def parse_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Decode an Upload-Metadata header: comma-separated ``key base64value`` pairs."""
+    out: Dict[str, str] = {}
+    for pair in (header or "").split(","):
+        if not pair.strip():
+            continue
+        key, _, value = pair.strip().partition(" ")
+        try:
+            out[key] = base64.b64decode(value, validate=True).decode("utf-8") if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail=f"invalid Upload-Metadata value for {key!r}")
+    return out
+
+
+def _status(up) -> Dict[str, object]:
+    return {
+        "id": up.id, "length": up.length, "offset": up.offset, "filename": up.filename,
+        "complete": up.complete, "sha256": up.digest,
+    }
+
+
+def _duplicate(e: DuplicateUploadError) -> HTTPException:
+    return HTTPException(
+        status_code=409, detail=str(e),
+        headers=_tus(Location=f"{router.prefix}/{e.existing_id}"),
+    )
+
+
+@router.options("")
+def upload_options():
+    manager = get_manager()
+    return Response(status_code=204, headers=_tus(**{
+        "Tus-Version": TUS_VERSION, "Tus-Extension": TUS_EXTENSIONS,
+        "Tus-Max-Size": str(manager.max_size), "Tus-Checksum-Algorithm": ",".join(CHUNK_ALGORITHMS),
+    }))
+
+
+@router.post("", status_code=201)
+def create_upload(
+    upload_length: int = Header(...),
+    upload_metadata: Optional[str] = Header(None),
+    manager: UploadManager = Depends(get_manager),
+):
+    """Create an upload. A ``checksum`` metadata entry (sha256 hex) lets the server reject
+    content it already has before any of it is sent."""
+    meta = parse_metadata(upload_metadata)
+    checksum = meta.pop("checksum", None)
+    if checksum is not None:
+        checksum = checksum.removeprefix("sha256:").removeprefix("sha256 ")
+    try:
+        up = manager.create(upload_length, checksum=checksum, filename=meta.pop("filename", None), metadata=meta)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=_tus())
+    except DuplicateUploadError as e:
+        raise _duplicate(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e), headers=_tus())
+    return Response(status_code=201, headers=_tus(Location=f"{router.prefix}/{up.id}", **{"Upload-Offset": str(up.offset)}))
+
+
+@router.head("/{upload_id}")
+def upload_offset(upload_id: str, manager: UploadManager = Depends(get_manager)):
+    up = manager.get(upload_id)
+    if up is None:
+        raise HTTPException(status_code=404, headers=_tus(**{"Cache-Control": "no-store"}))
+    return Response(status_code=200, headers=_tus(**{
+        "Upload-Offset": str(up.offset), "Upload-Length": str(up.length), "Cache-Control": "no-store",
+    }))
+
+
+@router.get("/{upload_id}")
+def upload_status(upload_id: str, manager: UploadManager = Depends(get_manager)):
+    up = manager.get(upload_id)
+    if up is None:
+        raise HTTPException(status_code=404, detail="upload not found")
+    return _status(up)
+
+
+@router.patch("/{upload_id}")
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    content_type: Optional[str] = Header(None),
+    content_length: Optional[int] = Header(None),
+    upload_checksum: Optional[str] = Header(None),
+    manager: UploadManager = Depends(get_manager),
+):
+    """Append the request body at ``Upload-Offset``.
+
+    The body is read in pieces and written every ``manager.chunk_size`` bytes, so memory per
+    request stays near one chunk however large the body is. If the client disconnects, the
+    bytes written so far are kept and HEAD reports where to resume.
+    """
+    if content_type != OFFSET_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {OFFSET_CONTENT_TYPE}", headers=_tus())
+    try:
+        # resuming after a restart rehashes the .part file, so keep it off the event loop
+        writer = await run_in_threadpool(manager.open, upload_id, upload_offset, upload_checksum)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="upload not found", headers=_tus())
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers=_tus())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e), headers=_tus())
+
+    try:
+        if content_length is not None and upload_offset + content_length > writer.upload.length:
+            raise UploadTooLargeError("body extends past Upload-Length")
+        buf = bytearray()
+        async for piece in request.stream():
+            buf += piece
+            if len(buf) >= manager.chunk_size:
+                data, buf = buf, bytearray()
+                await run_in_threadpool(writer.write, data)
+        if buf:
+            await run_in_threadpool(writer.write, buf)
+        up = await run_in_threadpool(writer.commit)
+    except ClientDisconnect:
+        return Response(status_code=400)  # nobody is listening; the written bytes are kept
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e), headers=_tus())
+    except ChecksumMismatchError as e:
+        raise HTTPException(status_code=CHECKSUM_MISMATCH, detail=str(e), headers=_tus())
+    except DuplicateUploadError as e:
+        raise _duplicate(e)
+    finally:
+        await run_in_threadpool(writer.abort)
+    return Response(status_code=204, headers=_tus(**{"Upload-Offset": str(up.offset)}))
+
+
+@router.delete("/{upload_id}")
+def delete_upload(upload_id: str, manager: UploadManager = Depends(get_manager)):
+    try:
+        manager.delete(upload_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="upload not found", headers=_tus())
+    except UploadConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers=_tus())
+    return Response(status_code=204, headers=_tus())
@@ -0,0 +1,98 @@
+"""Drop stale bundle manifests and garbage-collect the blob store.
+
+    python -m autoappbuilder.automation.scheduler.cleanup_bundles --root var/blobs --db sqlite:///autobuilder.db
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from ...storage.local import GC_GRACE_SECONDS, BlobStore, GCStats
+from ...utils.store import Store, make_store
+
+
+@dataclass
+class CleanupReport:
+    dropped: List[str] = field(default_factory=list)
+    gc: GCStats = field(default_factory=GCStats)
+
+    def summary(self) -> str:
+        g = self.gc
+        return (
+            f"dropped {len(self.dropped)} manifest(s); {g.manifests} live bundle(s) reference {g.live} blob(s); "
+            f"removed {g.removed} blob(s), freed {g.bytes_freed / 2**20:.1f} MiB; "
+            f"kept {g.kept_young} recent unreferenced blob(s); cleared {g.stale_tmp} stale staging file(s)"
+        )
+
+
+def cleanup_bundles(
+    blobs: BlobStore,
+    store: Optional[Store] = None,
+    max_age_days: Optional[float] = None,
+    grace: float = GC_GRACE_SECONDS,
+    dry_run: bool = False,
+) -> CleanupReport:
+    """Mark-and-sweep pass over the blob store.
+
+    A manifest is dropped when ``store`` no longer knows its bundle, or when it has not been
+    written for ``max_age_days``. Blobs that no remaining manifest references are then swept.
+    """
+    report = CleanupReport()
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+    for bundle_id in list(blobs.bundle_ids()):
+        orphaned = store is not None and store.get_bundle(bundle_id) is None
+        try:
+            expired = cutoff is not None and os.stat(blobs.manifests / f"{bundle_id}.json").st_mtime < cutoff
+        except FileNotFoundError:  # deleted since it was listed
+            continue
+        if orphaned or expired:
+            report.dropped.append(bundle_id)
+            if not dry_run:
+                blobs.delete_manifest(bundle_id)
+    report.gc = blobs.gc(grace=grace, dry_run=dry_run)
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="cleanup_bundles", description=__doc__.splitlines()[0])
+    p.add_argument("--root", default=os.environ.get("AUTOBUILDER_BLOBS"), help="Blob store directory")
+    p.add_argument("--db", default=None, help="Store URL; manifests of bundles it does not know are dropped")
+    p.add_argument("--max-age-days", type=float, default=None, help="Also drop manifests older than this")
+    p.add_argument("--grace", type=float, default=GC_GRACE_SECONDS,
+                   help="Keep unreferenced blobs younger than this many seconds")
+    p.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+    p.add_argument("--force", action="store_true",
+                   help="Run even when --db is missing or empty (which would drop every manifest)")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.root:
+        print("no blob store: pass --root or set AUTOBUILDER_BLOBS")
+        return 2
+    # Against a missing or empty database every manifest looks orphaned; opening a missing
+    # SQLite file would also create it, so check before connecting.
+    db_path = args.db[len("sqlite:///"):] if args.db and args.db.startswith("sqlite:///") else None
+    if db_path and not os.path.exists(db_path) and not args.force:
+        print(f"database {db_path} does not exist; pass --force to drop every manifest")
+        return 2
+    blobs = BlobStore(Path(args.root))
+    store = make_store(args.db) if args.db else None
+    try:
+        if store is not None and not args.force and not store.list_bundles(limit=1, fields=["id"]) \
+                and next(blobs.bundle_ids(), None) is not None:
+            print("the store has no bundles; pass --force to drop every manifest")
+            return 2
+        report = cleanup_bundles(blobs, store, args.max_age_days, args.grace, args.dry_run)
+    finally:
+        if store is not None:
+            store.close()
+    print(("[dry run] " if args.dry_run else "") + report.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+"""Delete resumable uploads that were abandoned before completing.
+
+    python -m autoappbuilder.automation.scheduler.cleanup_uploads --root var/uploads --max-age-hours 24
+"""
+import argparse
+
+from ...project.uploads import UPLOAD_EXPIRY, UploadManager, default_root
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="cleanup_uploads", description=__doc__.splitlines()[0])
+    p.add_argument("--root", default=None, help="Upload directory (default: AUTOBUILDER_UPLOADS, else a temp dir)")
+    p.add_argument("--max-age-hours", type=float, default=UPLOAD_EXPIRY / 3600,
+                   help="Delete incomplete uploads that received no bytes for this long")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    manager = UploadManager(args.root or default_root())
+    print(f"expired {manager.expire(args.max_age_hours * 3600)} incomplete upload(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+"""Check stored deployment records against the deployments schema.
+
+    python -m autoappbuilder.automation.scheduler.hosting_jobs --db sqlite:///autobuilder.db
+"""
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ...hosting.utils.validators import deployment_validator
+from ...utils.store import Store, make_store
+
+AUDIT_PAGE = 5000
+
+
+@dataclass
+class AuditReport:
+    checked: int = 0
+    invalid: Dict[str, List[str]] = field(default_factory=dict)  # deployment id -> errors
+
+    def summary(self) -> str:
+        return f"checked {self.checked} deployment(s); {len(self.invalid)} invalid"
+
+
+def audit_deployments(store: Store, page_size: int = AUDIT_PAGE) -> AuditReport:
+    """Validate every deployment in ``store``, one keyset page per validate_many call."""
+    validator = deployment_validator()
+    report = AuditReport()
+    after = None
+    while True:
+        rows = store.list_deployments(limit=page_size, after=after)
+        if not rows:
+            return report
+        for i, errors in validator.validate_many(rows).items():
+            report.invalid[rows[i]["id"]] = errors
+        report.checked += len(rows)
+        after = rows[-1]["id"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="hosting_jobs", description=__doc__.splitlines()[0])
+    p.add_argument("--db", default=None, help="Store URL (default: AUTOBUILDER_DB or in-memory)")
+    p.add_argument("--page-size", type=int, default=AUDIT_PAGE, help="Records validated per batch")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    store = make_store(args.db)
+    try:
+        report = audit_deployments(store, args.page_size)
+    finally:
+        store.close()
+    for dep_id, errors in report.invalid.items():
+        for error in errors:
+            print(f"{dep_id} {error}")
+    print(report.summary())
+    return 1 if report.invalid else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
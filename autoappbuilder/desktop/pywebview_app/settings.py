@@ -0,0 +1,40 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ...parser.validator import load_validator
+
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "config"
+DEFAULTS_PATH = CONFIG_DIR / "defaults.json"
+SETTINGS_PATH = CONFIG_DIR / "settings.json"
+SCHEMA_PATH = CONFIG_DIR / "settings.schema.json"
+
+
+def _read(path: Path) -> Dict[str, Any]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return {}
+    return json.loads(text) if text.strip() else {}
+
+
+def load_settings(path: Optional[Path] = None) -> Dict[str, Any]:
+    """defaults.json overlaid with the user's settings file, checked against settings.schema.json.
+
+    Raises SchemaValidationError naming every invalid key.
+    """
+    settings = {**_read(DEFAULTS_PATH), **_read(Path(path) if path else SETTINGS_PATH)}
+    load_validator(SCHEMA_PATH).validate(settings)
+    return settings
+
+
+def save_settings(settings: Dict[str, Any], path: Optional[Path] = None) -> None:
+    """Validate and write ``settings``; keys equal to their default are left out of the file."""
+    load_validator(SCHEMA_PATH).validate(settings)
+    defaults = _read(DEFAULTS_PATH)
+    changed = {k: v for k, v in settings.items() if defaults.get(k, object()) != v}
+    path = Path(path) if path else SETTINGS_PATH
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(changed, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
@@ -0,0 +1,69 @@
+class AutobuilderError(Exception):
+    """Base class for errors raised by autoappbuilder."""
+
+
+class QueueFullError(AutobuilderError):
+    """A bounded work queue cannot accept more jobs right now."""
+
+
+class InvalidCursorError(AutobuilderError):
+    """A pagination cursor does not refer to a known row."""
+
+
+class UploadError(AutobuilderError):
+    """An upload request cannot be applied to the upload's current state."""
+
+
+class UploadTooLargeError(UploadError):
+    """An upload is, or would grow, larger than its declared or permitted size."""
+
+
+class UploadConflictError(UploadError):
+    """A chunk was sent for the wrong offset, or the upload is busy with another request."""
+
+
+class DuplicateUploadError(UploadError):
+    """Content with the same checksum has already been uploaded (or is being uploaded)."""
+
+    def __init__(self, existing_id: str) -> None:
+        super().__init__(f"duplicate of upload {existing_id}")
+        self.existing_id = existing_id
+
+
+class ChecksumMismatchError(UploadError):
+    """Received bytes do not match the checksum the client declared for them."""
+
+
+class ConverterUnavailableError(AutobuilderError):
+    """No converter handles a document type, or the converter's optional dependency is missing."""
+
+
+class SchemaError(AutobuilderError):
+    """A JSON schema is malformed or uses a keyword the validator does not implement."""
+
+
+class SchemaValidationError(AutobuilderError):
+    """A payload does not match its JSON schema; ``errors`` holds one "path: message" per problem."""
+
+    def __init__(self, schema: str, errors) -> None:
+        more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+        super().__init__(f"{schema or 'payload'}: {errors[0]}{more}")
+        self.schema = schema
+        self.errors = list(errors)
+
+
+class ModelNotFoundError(AutobuilderError):
+    """No model spec matches a requested name, alias or role."""
+
+
+class BackendUnavailableError(AutobuilderError):
+    """A model backend is unknown, or its optional dependency or model files are missing."""
+
+
+class BackendRequestError(AutobuilderError):
+    """A model server answered a request with an error."""
+
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"server returned {status}: {detail}")
+        self.status = status
+        self.detail = detail
@@ -1,6 +1,7 @@
 import argparse
 from pathlib import Path
 from .renderer import TemplateRenderer
+from .incremental import incremental_scaffold
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
@@ -10,16 +11,33 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--template", "-t", default="python_basic", help="Template name")
     p.add_argument("--out", "-o", default="./out", help="Output directory")
     p.add_argument("--name", "-n", required=True, help="Project/package name (e.g., my_app)")
+    p.add_argument("--incremental", "-i", action="store_true",
+                   help="Only rewrite outputs that changed (tracked in .autobuilder-manifest.json)")
+    p.add_argument("--prune", action="store_true",
+                   help="With --incremental, delete outputs the template no longer produces")
     return p
 
 def main(argv=None) -> int:
-    args = build_parser().parse_args(argv)
+    p = build_parser()
+    args = p.parse_args(argv)
+    if args.prune and not args.incremental:
+        p.error("--prune requires --incremental")
     out_dir = Path(args.out).resolve()
     templates_root = Path(__file__).resolve().parents[1] / "templates"
     r = TemplateRenderer(templates_root)
 
     safe = args.name.replace("-", "_").replace(" ", "_")
     context = {"project_name": safe, "package_name": safe}
-    r.scaffold(args.template, out_dir, context)
-    print(f"✅ Scaffolding complete: {out_dir}")
+    if not args.incremental:
+        r.scaffold(args.template, out_dir, context)
+        print(f"✅ Scaffolding complete: {out_dir}")
+        return 0
+
+    report = incremental_scaffold(r, args.template, out_dir, context, prune=args.prune)
+    for line in report.lines():
+        print(line)
+    print(
+        f"✅ Incremental scaffold: {len(report.added)} added, {len(report.changed)} changed, "
+        f"{len(report.removed)} removed, {len(report.unchanged)} unchanged: {out_dir}"
+    )
     return 0
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from .renderer import TemplateRenderer
+
+MANIFEST_NAME = ".autobuilder-manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ScaffoldReport:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    pruned: bool = False
+    skipped_render: bool = False
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.added or self.changed or (self.removed and self.pruned))
+
+    def lines(self) -> List[str]:
+        out = [f"+ {p}" for p in self.added] + [f"~ {p}" for p in self.changed]
+        mark = "-" if self.pruned else "? (stale)"
+        out += [f"{mark} {p}" for p in self.removed]
+        return out
+
+
+def context_digest(context: Dict[str, Any]) -> str:
+    blob = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_manifest(out_dir: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads((Path(out_dir) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def _write_manifest(out_dir: Path, data: Dict[str, Any]) -> None:
+    path = out_dir / MANIFEST_NAME
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _outputs_intact(out_dir: Path, files: Dict[str, Dict[str, Any]]) -> bool:
+    # size alone misses a same-length edit; an edit also moves the mtime
+    for rel, rec in files.items():
+        try:
+            st = (out_dir / rel).stat()
+        except OSError:
+            return False
+        if st.st_size != rec["size"] or st.st_mtime_ns != rec.get("mtime_ns"):
+            return False
+    return True
+
+
+def _remove_empty_parents(out_dir: Path, rel: str, keep: set) -> None:
+    """Remove the directories above a pruned file that it leaves empty, up to out_dir."""
+    parent = Path(rel).parent
+    while parent.parts and parent.as_posix() not in keep:
+        try:
+            (out_dir / parent).rmdir()
+        except OSError:  # not empty (or already gone)
+            return
+        parent = parent.parent
+
+
+def incremental_scaffold(
+    renderer: TemplateRenderer,
+    template_name: str,
+    out_dir: Path,
+    context: Dict[str, Any],
+    prune: bool = False,
+    workers: Optional[int] = None,
+) -> ScaffoldReport:
+    """Scaffold into out_dir, writing only outputs whose content differs from what is on disk.
+
+    A manifest of output hashes plus the template and context digests is kept in
+    out_dir; when both digests match and the recorded outputs are intact, rendering
+    is skipped altogether.
+    """
+    out_dir = Path(out_dir)
+    compiled = renderer.compile(template_name)
+    ctx_digest = context_digest(context)
+    old = load_manifest(out_dir)
+    old_files: Dict[str, Dict[str, Any]] = old.get("files", {})
+    stale = sorted(k for k, rec in old_files.items() if rec.get("stale"))
+
+    if (
+        old.get("template") == template_name
+        and old.get("template_digest") == compiled.digest
+        and old.get("context_digest") == ctx_digest
+        and not (prune and stale)
+        and _outputs_intact(out_dir, old_files)
+    ):
+        live = sorted(k for k in old_files if k not in stale)
+        return ScaffoldReport(unchanged=live, removed=stale, skipped_render=True)
+
+    report = ScaffoldReport(pruned=prune)
+    template_dirs = set()
+    for entry in compiled.dirs:
+        rel_dir = renderer.render_path(entry, context)
+        template_dirs.add(Path(rel_dir).as_posix())
+        (out_dir / rel_dir).mkdir(parents=True, exist_ok=True)
+
+    new_files: Dict[str, Dict[str, Any]] = {}
+    for rel, content in renderer.render(template_name, context, workers=workers):
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        key = rel.as_posix()
+        dst = out_dir / rel
+        try:
+            current = dst.read_bytes() if dst.stat().st_size == len(data) else None
+            exists = True
+        except OSError:
+            current, exists = None, False
+
+        if current is not None and hashlib.sha256(current).hexdigest() == digest:
+            report.unchanged.append(key)
+        else:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            dst.write_bytes(data)
+            (report.changed if exists else report.added).append(key)
+        new_files[key] = {"sha256": digest, "size": len(data), "mtime_ns": dst.stat().st_mtime_ns}
+
+    for key in sorted(set(old_files) - set(new_files)):
+        report.removed.append(key)
+        if prune:
+            (out_dir / key).unlink(missing_ok=True)
+            _remove_empty_parents(out_dir, key, template_dirs)
+
+    manifest_files = dict(new_files)
+    if not prune:
+        # Keep tracking stale outputs so a later --prune can still remove them
+        for key in report.removed:
+            if (out_dir / key).exists():
+                manifest_files[key] = {**old_files[key], "stale": True}
+
+    _write_manifest(out_dir, {
+        "version": MANIFEST_VERSION,
+        "template": template_name,
+        "template_digest": compiled.digest,
+        "context_digest": ctx_digest,
+        "files": manifest_files,
+    })
+    for lst in (report.added, report.changed, report.unchanged):
+        lst.sort()
+    return report
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional
+from uuid import uuid4
+from ..exceptions import QueueFullError
+from .renderer import TemplateRenderer
+
+
+class ScaffoldJobs:
+    """Runs scaffolds on a bounded worker pool and tracks their progress.
+
+    At most ``max_pending`` jobs may be queued or running at once; submit() raises
+    QueueFullError beyond that so callers can apply backpressure. Finished jobs are
+    kept for status polling, oldest evicted first once ``keep_finished`` is exceeded.
+    """
+
+    def __init__(
+        self,
+        renderer: TemplateRenderer,
+        workers: int = 4,
+        max_pending: int = 64,
+        keep_finished: int = 1000,
+    ) -> None:
+        self.renderer = renderer
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scaffold")
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, template_name: str, out_dir: Path, context: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"scaffold queue is full ({self.max_pending} pending)")
+            self._pending += 1
+            jid = str(uuid4())
+            job = {
+                "id": jid, "status": "queued", "template": template_name, "out": str(out_dir),
+                "files_done": 0, "files_total": None, "error": None,
+                "created_at": time.time(), "started_at": None, "finished_at": None,
+            }
+            self._jobs[jid] = job
+            snapshot = dict(job)
+        try:
+            self._pool.submit(self._run, jid, template_name, Path(out_dir), context)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+                del self._jobs[jid]
+            raise
+        return snapshot
+
+    def get(self, jid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(jid)
+            return dict(job) if job is not None else None
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def _update(self, jid: str, **fields: Any) -> None:
+        with self._lock:
+            self._jobs[jid].update(fields)
+
+    def _run(self, jid: str, template_name: str, out_dir: Path, context: Dict[str, Any]) -> None:
+        self._update(jid, status="running", started_at=time.time())
+        try:
+            self.renderer.scaffold(
+                template_name, out_dir, context,
+                on_progress=lambda done, total: self._update(jid, files_done=done, files_total=total),
+            )
+        except Exception as e:
+            self._update(jid, status="failed", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+        else:
+            self._update(jid, status="done", finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        finished = [k for k, j in self._jobs.items() if j["status"] in ("done", "failed")]
+        for k in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[k]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
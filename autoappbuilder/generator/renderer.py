@@ -1,10 +1,35 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
-from jinja2 import Environment, FileSystemLoader, StrictUndefined
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+
+# A path part is either a literal string or a compiled Jinja template
+PathPart = Union[str, Template]
+
+
+@dataclass(frozen=True)
+class CompiledEntry:
+    parts: Tuple[PathPart, ...]
+    is_dir: bool
+    template: Optional[Template] = None
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    name: str
+    key: Tuple[Any, ...]
+    dirs: Tuple[CompiledEntry, ...]
+    files: Tuple[CompiledEntry, ...]
+    digest: str = ""
 
 
 class TemplateRenderer:
-    def __init__(self, templates_root: Path) -> None:
+    def __init__(self, templates_root: Path, cache_size: int = 32, workers: int = 0) -> None:
         self.templates_root = Path(templates_root)
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_root)),
@@ -12,34 +37,131 @@ class TemplateRenderer:
             keep_trailing_newline=True,
             autoescape=False,
         )
+        self.cache_size = cache_size
+        self.workers = workers
+        self._cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
 
-    def scaffold(self, template_name: str, out_dir: Path, context: Dict[str, Any]) -> None:
-        src_root = self.templates_root / template_name
-        out_dir = Path(out_dir)
+    def _source_key(self, src_root: Path) -> Tuple[Any, ...]:
+        # Cheap stat-only walk; any added/removed/modified source changes the key
+        stamps = []
+        for dirpath, dirnames, filenames in os.walk(src_root):
+            dirnames.sort()
+            for fn in sorted(filenames):
+                st = os.stat(os.path.join(dirpath, fn))
+                stamps.append((os.path.relpath(os.path.join(dirpath, fn), src_root), st.st_mtime_ns, st.st_size))
+            for dn in dirnames:
+                stamps.append((os.path.relpath(os.path.join(dirpath, dn), src_root), None, None))
+        return tuple(stamps)
+
+    def _compile_part(self, part: str) -> PathPart:
+        if "{{" in part or "{%" in part:
+            return self.env.from_string(part)
+        return part
 
+    def compile(self, template_name: str) -> CompiledTemplate:
+        """Return the compiled manifest for a template, reusing the LRU entry while sources are unchanged."""
+        src_root = self.templates_root / template_name
         if not src_root.is_dir():
             raise FileNotFoundError(f"Template '{template_name}' not found at {src_root}")
 
-        for src_path in src_root.rglob("*"):
+        key = self._source_key(src_root)
+        with self._lock:
+            hit = self._cache.get(template_name)
+            if hit is not None and hit.key == key:
+                self._cache.move_to_end(template_name)
+                return hit
+
+        dirs: List[CompiledEntry] = []
+        files: List[CompiledEntry] = []
+        h = hashlib.sha256()
+        for src_path in sorted(src_root.rglob("*")):
             rel = src_path.relative_to(src_root)
+            parts = tuple(self._compile_part(p) for p in rel.parts)
+            h.update(rel.as_posix().encode("utf-8") + b"\0")
+            if src_path.is_dir():
+                dirs.append(CompiledEntry(parts, True))
+            else:
+                h.update(src_path.read_bytes() + b"\0")
+                template = self.env.get_template(Path(template_name, rel).as_posix())
+                files.append(CompiledEntry(parts, False, template))
 
-            # Render path parts so folder/file names can use Jinja vars
-            rendered_parts = []
-            for part in rel.parts:
-                rendered_parts.append(self.env.from_string(part).render(**context))
-            rendered_rel = Path(*rendered_parts)
-            dst_path = out_dir / rendered_rel
+        compiled = CompiledTemplate(template_name, key, tuple(dirs), tuple(files), h.hexdigest())
+        with self._lock:
+            self._cache[template_name] = compiled
+            self._cache.move_to_end(template_name)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compiled
 
-            if src_path.is_dir():
-                dst_path.mkdir(parents=True, exist_ok=True)
-                continue
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
 
-            # Render file contents
-            template = self.env.get_template(str(Path(template_name) / rel))
-            dst_path.parent.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def render_path(entry: CompiledEntry, context: Dict[str, Any]) -> Path:
+        # Render path parts so folder/file names can use Jinja vars
+        rendered = [p if isinstance(p, str) else p.render(**context) for p in entry.parts]
+        path = Path(*rendered)
+        # Strip .j2 from output filename
+        if not entry.is_dir and path.suffix == ".j2":
+            path = path.with_suffix("")
+        return path
+
+    def render_file(self, entry: CompiledEntry, context: Dict[str, Any]) -> Tuple[Path, str]:
+        return self.render_path(entry, context), entry.template.render(**context)
+
+    def render(
+        self, template_name: str, context: Dict[str, Any], workers: Optional[int] = None
+    ) -> List[Tuple[Path, str]]:
+        """Render every file of a template in memory, returning (relative path, content) pairs."""
+        compiled = self.compile(template_name)
+        workers = self.workers if workers is None else workers
+        if workers and workers > 1 and len(compiled.files) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(lambda e: self.render_file(e, context), compiled.files))
+        return [self.render_file(e, context) for e in compiled.files]
 
-            # Strip .j2 from output filename
-            if dst_path.suffix == ".j2":
-                dst_path = dst_path.with_suffix("")
+    def scaffold(
+        self,
+        template_name: str,
+        out_dir: Path,
+        context: Dict[str, Any],
+        workers: Optional[int] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Render template_name into out_dir and return the number of files written.
+
+        on_progress, if given, is called with (files_done, files_total) after each file.
+        """
+        compiled = self.compile(template_name)
+        out_dir = Path(out_dir)
+        workers = self.workers if workers is None else workers
+        total = len(compiled.files)
+        done = 0
+        progress_lock = threading.Lock()
+
+        for entry in compiled.dirs:
+            (out_dir / self.render_path(entry, context)).mkdir(parents=True, exist_ok=True)
+
+        def write(entry: CompiledEntry) -> None:
+            nonlocal done
+            rel, content = self.render_file(entry, context)
+            dst_path = out_dir / rel
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            dst_path.write_text(content, encoding="utf-8")
+            if on_progress is not None:
+                with progress_lock:
+                    done += 1
+                    on_progress(done, total)
 
-            dst_path.write_text(template.render(**context), encoding="utf-8")
+        if on_progress is not None:
+            on_progress(0, total)
+        if workers and workers > 1 and len(compiled.files) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # list() re-raises the first render/write error
+                list(pool.map(write, compiled.files))
+        else:
+            for entry in compiled.files:
+                write(entry)
+        return total
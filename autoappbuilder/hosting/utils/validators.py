@@ -0,0 +1,22 @@
+from typing import Any, Dict, Iterable, List
+
+from ...parser.validator import Validator, load_validator
+
+DEPLOYMENTS_SCHEMA = "deployments"
+HOSTING_SETTINGS_SCHEMA = "hosting_settings"
+
+
+def deployment_validator() -> Validator:
+    return load_validator(DEPLOYMENTS_SCHEMA)
+
+
+def validate_deployments(records: Iterable[Dict[str, Any]]) -> Dict[int, List[str]]:
+    """Errors of each invalid deployment record by index; empty when the batch is valid."""
+    return load_validator(DEPLOYMENTS_SCHEMA).validate_many(records)
+
+
+def check_hosting_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """``settings`` with schema defaults filled in; raises SchemaValidationError if invalid."""
+    validator = load_validator(HOSTING_SETTINGS_SCHEMA)
+    validator.validate(settings)
+    return {**validator.defaults(), **settings}
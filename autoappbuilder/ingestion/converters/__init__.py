@@ -0,0 +1,36 @@
+"""Document to text converters.
+
+Every converter module exposes ``EXTENSIONS``, ``available()``, ``page_count(path)`` (None when
+pages are only known after a full parse) and ``convert(path, start, stop, timings)``, which
+yields the raw text of pages ``start`` to ``stop``. Modules are imported on first use so that
+optional dependencies are only needed for the formats actually ingested.
+"""
+from importlib import import_module
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+from ...exceptions import ConverterUnavailableError
+
+CONVERTERS = ("pdf", "docx", "pptx", "markdown")
+_BY_EXTENSION: Dict[str, str] = {}
+
+
+def load(name: str) -> ModuleType:
+    if name not in CONVERTERS:
+        raise ConverterUnavailableError(f"unknown converter: {name!r}")
+    return import_module(f".{name}", __name__)
+
+
+def converter_for(path: Path) -> str:
+    """Name of the converter for path's extension; raises ConverterUnavailableError if none can run."""
+    if not _BY_EXTENSION:
+        for name in CONVERTERS:
+            for ext in load(name).EXTENSIONS:
+                _BY_EXTENSION[ext] = name
+    name = _BY_EXTENSION.get(Path(path).suffix.lower())
+    if name is None:
+        raise ConverterUnavailableError(f"no converter for {Path(path).name!r}")
+    if not load(name).available():
+        raise ConverterUnavailableError(f"the {name} converter needs an optional dependency: pip install autobuilder[ingest]")
+    return name
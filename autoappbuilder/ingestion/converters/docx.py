@@ -0,0 +1,53 @@
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from xml.etree.ElementTree import iterparse
+
+EXTENSIONS = (".docx",)
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT = "word/document.xml"
+
+
+def available() -> bool:
+    return True  # the format is zipped XML; no third-party parser needed
+
+
+def page_count(path: Path) -> Optional[int]:
+    return None  # page breaks are only known after parsing the whole body
+
+
+def _pages(path: Path) -> Iterator[str]:
+    # iterparse streams the body, so memory follows the page being built, not the document.
+    # Explicit page breaks and Word's last-rendered breaks both start a new page.
+    with zipfile.ZipFile(path) as zf, zf.open(DOCUMENT) as f:
+        page: List[str] = []
+        for event, el in iterparse(f, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if tag == W + "lastRenderedPageBreak" or (tag == W + "br" and el.get(W + "type") == "page"):
+                    if page:
+                        yield "".join(page)
+                        page = []
+                continue
+            if tag == W + "t":
+                page.append(el.text or "")
+            elif tag == W + "tab":
+                page.append("\t")
+            elif tag == W + "br" and el.get(W + "type") != "page":
+                page.append("\n")
+            elif tag == W + "tc":
+                page.append("\t")
+            elif tag in (W + "p", W + "tr"):
+                page.append("\n")
+                el.clear()
+        if page:
+            yield "".join(page)
+
+
+def convert(path: Path, start: int = 0, stop: Optional[int] = None, timings: Optional[Dict[str, float]] = None) -> Iterator[str]:
+    for i, page in enumerate(_pages(path)):
+        if stop is not None and i >= stop:
+            return
+        if i >= start:
+            yield page
@@ -0,0 +1,62 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+EXTENSIONS = (".md", ".markdown", ".txt")
+
+# Markup is stripped line by line; fenced code keeps its content verbatim
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+_REF_DEF = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+")
+_EMPHASIS = re.compile(r"(\*\*|__|\*|_|~~)(?=\S)(.+?)(?<=\S)\1")
+_CODE = re.compile(r"`([^`]*)`")
+_HTML = re.compile(r"<[^>\n]+>")
+_QUOTE = re.compile(r"^\s{0,3}>\s?")
+_TABLE_RULE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_HR = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+
+
+def available() -> bool:
+    return True
+
+
+def page_count(path: Path) -> Optional[int]:
+    return None
+
+
+def to_text(markdown: str) -> str:
+    out = []
+    in_code = False
+    for line in markdown.splitlines():
+        if _FENCE.match(line):
+            in_code = not in_code
+            continue
+        if in_code:
+            out.append(line)
+            continue
+        if _REF_DEF.match(line) or _TABLE_RULE.match(line) or _HR.match(line):
+            continue
+        m = _HEADING.match(line)
+        if m:
+            line = m.group(1)
+        line = _QUOTE.sub("", line)
+        line = _IMAGE.sub(r"\1", line)
+        line = _LINK.sub(r"\1", line)
+        line = _CODE.sub(r"\1", line)
+        line = _EMPHASIS.sub(r"\2", line)
+        line = _HTML.sub("", line)
+        if "|" in line and line.strip().startswith("|"):
+            line = "\t".join(c.strip() for c in line.strip().strip("|").split("|"))
+        out.append(line)
+    return "\n".join(out)
+
+
+def convert(path: Path, start: int = 0, stop: Optional[int] = None, timings: Optional[Dict[str, float]] = None) -> Iterator[str]:
+    """Pages are separated by form feeds; a file without any is a single page."""
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    pages = text.split("\f")
+    plain = Path(path).suffix.lower() == ".txt"
+    for page in pages[start:stop]:
+        yield page if plain else to_text(page)
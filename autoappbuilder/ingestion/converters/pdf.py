@@ -0,0 +1,37 @@
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from ..utils import ocr
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional (autobuilder[ingest])
+    PdfReader = None
+
+EXTENSIONS = (".pdf",)
+# Pages with less extractable text than this are treated as scans and sent to OCR
+OCR_MIN_CHARS = 16
+
+
+def available() -> bool:
+    return PdfReader is not None
+
+
+def page_count(path: Path) -> Optional[int]:
+    return len(PdfReader(str(path)).pages)
+
+
+def convert(path: Path, start: int = 0, stop: Optional[int] = None, timings: Optional[Dict[str, float]] = None) -> Iterator[str]:
+    reader = PdfReader(str(path))
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for i in range(start, stop):
+        page = reader.pages[i]
+        text = page.extract_text() or ""
+        if len(text.strip()) < OCR_MIN_CHARS and ocr.available():
+            t0 = time.perf_counter()
+            scanned = "\n".join(ocr.image_text(img.data) for img in page.images)
+            if timings is not None:
+                timings["ocr"] = timings.get("ocr", 0.0) + time.perf_counter() - t0
+            text = scanned or text
+        yield text
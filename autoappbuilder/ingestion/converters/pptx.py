@@ -0,0 +1,45 @@
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from xml.etree.ElementTree import fromstring
+
+EXTENSIONS = (".pptx",)
+
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def available() -> bool:
+    return True
+
+
+def _slides(zf: zipfile.ZipFile) -> List[str]:
+    """Slide part names in presentation order (sldIdLst), not archive order."""
+    rels = fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {r.get("Id"): posixpath.normpath(posixpath.join("ppt", r.get("Target"))) for r in rels.iter(REL + "Relationship")}
+    pres = fromstring(zf.read("ppt/presentation.xml"))
+    return [targets[s.get(R + "id")] for s in pres.iter(P + "sldId") if s.get(R + "id") in targets]
+
+
+def page_count(path: Path) -> Optional[int]:
+    with zipfile.ZipFile(path) as zf:
+        return len(_slides(zf))
+
+
+def _slide_text(xml: bytes) -> str:
+    lines = []
+    for para in fromstring(xml).iter(A + "p"):
+        text = "".join(t.text or "" for t in para.iter(A + "t"))
+        if text:
+            lines.append(text)
+    return "\n".join(lines)
+
+
+def convert(path: Path, start: int = 0, stop: Optional[int] = None, timings: Optional[Dict[str, float]] = None) -> Iterator[str]:
+    """One page per slide."""
+    with zipfile.ZipFile(path) as zf:
+        for name in _slides(zf)[start:stop]:
+            yield _slide_text(zf.read(name))
@@ -0,0 +1,111 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from ...parser.nl_parser import Section, sentences
+
+NAME = "constraints"
+PREFIX = "C"
+VERSION = 2
+
+_OPS = {
+    "under": "<", "below": "<", "less than": "<", "fewer than": "<", "within": "<=", "at most": "<=",
+    "no more than": "<=", "not exceed": "<=", "up to": "<=", "maximum of": "<=", "max": "<=", "max.": "<=",
+    "maximum": "<=", "<": "<", "<=": "<=", "≤": "<=",
+    "at least": ">=", "minimum of": ">=", "min": ">=", "minimum": ">=", "more than": ">", "over": ">",
+    "above": ">", ">": ">", ">=": ">=", "≥": ">=",
+}
+# Comparison words are looked up just before a matched quantity rather than matched as a
+# leading optional group, which would make the regex try every operator at every position
+_OP_BEFORE = re.compile(
+    r"(?:^|(?<=\W))(?P<op>" + "|".join(re.escape(k) for k in sorted(_OPS, key=len, reverse=True)) + r")\s*$", re.IGNORECASE
+)
+_NUM = r"(?P<num>\d[\d,]*(?:\.\d+)?)\s*"
+
+_DURATION_UNITS = {
+    "ms": 0.001, "millisecond": 0.001, "milliseconds": 0.001, "s": 1, "sec": 1, "secs": 1, "second": 1,
+    "seconds": 1, "min": 60, "mins": 60, "minute": 60, "minutes": 60, "h": 3600, "hr": 3600, "hrs": 3600,
+    "hour": 3600, "hours": 3600, "day": 86400, "days": 86400,
+}
+_SIZE_UNITS = {
+    "kb": 10**3, "mb": 10**6, "gb": 10**9, "tb": 10**12, "kib": 2**10, "mib": 2**20, "gib": 2**30, "tib": 2**40,
+}
+_MONEY_SCALE = {"k": 10**3, "thousand": 10**3, "m": 10**6, "million": 10**6}
+
+_DURATION = re.compile(_NUM + r"(?P<unit>" + "|".join(sorted(_DURATION_UNITS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+_SIZE = re.compile(_NUM + r"(?P<unit>" + "|".join(_SIZE_UNITS) + r")\b", re.IGNORECASE)
+_PERCENT = re.compile(r"(?P<num>\d{1,3}(?:\.\d+)?)\s*%\s*(?P<what>uptime|availability|coverage|of requests|error rate)?", re.IGNORECASE)
+_COUNT = re.compile(
+    _NUM + r"(?P<unit>concurrent users|users|requests per second|requests/s|rps|qps|transactions per second|tps|requests)\b",
+    re.IGNORECASE,
+)
+_MONEY = re.compile(
+    r"(?P<cur>[$€£])\s?(?P<num>\d[\d,]*(?:\.\d+)?)\s?(?P<scale>k|m|thousand|million)?\b", re.IGNORECASE
+)
+_MONTHS = "january|february|march|april|may|june|july|august|september|october|november|december"
+_DEADLINE = re.compile(
+    r"\b(?P<op>by|before|no later than|until|deadline(?: of| is)?:?)\s+(?P<date>\d{4}-\d{2}-\d{2}|"
+    rf"(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}|\d{{1,2}}\s+(?:{_MONTHS})\s+\d{{4}}|Q[1-4]\s+\d{{4}}|end of\s+\d{{4}}|"
+    r"(?:19|20)\d{2}(?=\s*(?:$|[.,;:!?)]|(?:and|or|but|at|in|with|so|when|if)\b)))\b",
+    re.IGNORECASE,
+)
+_STANDARDS = {
+    "GDPR": r"GDPR", "HIPAA": r"HIPAA", "SOC 2": r"SOC\s?2", "PCI DSS": r"PCI[- ]?DSS", "ISO 27001": r"ISO[/ ]?(?:IEC )?27001",
+    "CCPA": r"CCPA", "WCAG": r"WCAG(?:\s?2(?:\.\d)?)?(?:\s?AA?A?)?", "FedRAMP": r"FedRAMP",
+}
+_STANDARD = re.compile(r"\b(?:" + "|".join(f"(?P<s{i}>{p})" for i, p in enumerate(_STANDARDS.values())) + r")")
+_TECH = re.compile(
+    r"\b(?P<lead>must|shall|should|will|is to|has to|needs? to|and)\s+(?:be\s+)?(?P<verb>use|using|built (?:with|on|in)|written in|"
+    r"run on|hosted on|deployed (?:to|on)|implemented in|based on|integrate with)\s+"
+    r"(?P<what>(?:the\s+)?[A-Z][\w.+#-]*(?:\s+[A-Z0-9][\w.+#-]*){0,3})"
+)
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _item(kind: str, m: re.Match, sentence: str, value: Any, unit: Optional[str], default_op: str = "=") -> Dict[str, Any]:
+    start, op = m.start(), default_op
+    before = _OP_BEFORE.search(sentence, max(0, start - 24), start)
+    if before is not None:
+        start, op = before.start("op"), _OPS[before.group("op").lower()]
+    return {"kind": kind, "op": op, "value": value, "unit": unit, "match": sentence[start:m.end()].strip(), "text": sentence}
+
+
+def extract(section: Section) -> List[Dict[str, Any]]:
+    """Measurable and fixed constraints in a section: limits on time, size, load, availability
+    and cost, deadlines, required standards and mandated technology. Values are converted to
+    base units (seconds, bytes, currency units)."""
+    out: List[Dict[str, Any]] = []
+    for sentence in sentences(section.text):
+        money_spans = []
+        for m in _MONEY.finditer(sentence):
+            scale = _MONEY_SCALE.get((m.group("scale") or "").lower(), 1)
+            out.append(_item("budget", m, sentence, _number(m.group("num")) * scale, m.group("cur")))
+            money_spans.append(m.span())
+        for m in _DURATION.finditer(sentence):
+            if any(a <= m.start("num") < b for a, b in money_spans):
+                continue  # "$5m" is money, not five minutes
+            unit = m.group("unit").lower()
+            out.append(_item("duration", m, sentence, _number(m.group("num")) * _DURATION_UNITS[unit], "s", "<="))
+        for m in _SIZE.finditer(sentence):
+            out.append(_item("size", m, sentence, _number(m.group("num")) * _SIZE_UNITS[m.group("unit").lower()], "B", "<="))
+        for m in _PERCENT.finditer(sentence):
+            what = (m.group("what") or "").lower()
+            kind = "availability" if what in ("uptime", "availability") or "uptime" in sentence.lower() else "percentage"
+            out.append(_item(kind, m, sentence, round(_number(m.group("num")) / 100, 6), what or None, ">=" if kind == "availability" else "="))
+        for m in _COUNT.finditer(sentence):
+            out.append(_item("load", m, sentence, _number(m.group("num")), m.group("unit").lower(), ">="))
+        for m in _DEADLINE.finditer(sentence):
+            out.append(_item("deadline", m, sentence, m.group("date"), None, "<="))
+        for m in _STANDARD.finditer(sentence):
+            name = list(_STANDARDS)[int(m.lastgroup[1:])]
+            out.append(_item("compliance", m, sentence, name, None))
+        tech = 0
+        for m in _TECH.finditer(sentence):
+            if m.group("lead") == "and" and not tech:
+                continue  # "and deployed to X" only continues an earlier "must be built with Y"
+            tech += 1
+            what = m.group("what").removeprefix("the ").strip().rstrip(".")
+            out.append(_item("technology", m, sentence, what, m.group("verb")))
+    return out
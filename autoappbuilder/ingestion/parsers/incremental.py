@@ -0,0 +1,130 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ...parser.nl_parser import Document, Section, parse_document
+from . import constraints_extractor, requirements_extractor
+
+# Extractor modules expose NAME, PREFIX, VERSION and extract(section) -> list of dicts
+EXTRACTORS: Sequence[ModuleType] = (requirements_extractor, constraints_extractor)
+_SQL_BATCH = 500  # stays under SQLite's bound-parameter limit
+
+
+class SectionCache:
+    """Extractor output memoized by (extractor, version, section digest) in SQLite.
+
+    Keys depend only on section content, so an unchanged section is never re-extracted,
+    wherever it moves and whichever document it appears in.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sections (extractor TEXT, version INTEGER, digest TEXT, result TEXT,"
+            " PRIMARY KEY (extractor, version, digest))"
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, extractor: str, version: int, digests: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        digests = list(digests)
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for i in range(0, len(digests), _SQL_BATCH):
+                batch = digests[i:i + _SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT digest, result FROM sections WHERE extractor = ? AND version = ? "
+                    f"AND digest IN ({', '.join('?' * len(batch))})",
+                    (extractor, version, *batch),
+                )
+                found.update((d, json.loads(r)) for d, r in rows)
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, extractor: str, version: int, results: Dict[str, List[Dict[str, Any]]]) -> None:
+        rows = [(extractor, version, d, json.dumps(r, separators=(",", ":"))) for d, r in results.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?)", rows)
+
+    def prune(self, extractors: Sequence[ModuleType] = EXTRACTORS) -> int:
+        """Drop results written by older extractor versions."""
+        with self._lock, self._conn:
+            removed = 0
+            for ex in extractors:
+                removed += self._conn.execute(
+                    "DELETE FROM sections WHERE extractor = ? AND version != ?", (ex.NAME, ex.VERSION)
+                ).rowcount
+            return removed
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SectionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class Extraction:
+    document: str  # digest of the document's section digests
+    results: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    sections: int = 0
+    extracted: List[str] = field(default_factory=list)  # ids of sections that were (re)processed
+    reused: int = 0
+    seconds: float = 0.0
+
+
+def _merge(section: Section, prefix: str, items: List[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    # Section placement is attached here, not cached, so memoized items survive a move
+    for n, item in enumerate(items, 1):
+        yield {
+            **item,
+            "id": item.get("ref") or f"{section.id}-{prefix}{n}",
+            "section": section.id,
+            "section_title": section.title,
+            "page": section.page,
+        }
+
+
+def extract_document(
+    doc: Document, cache: Optional[SectionCache] = None, extractors: Sequence[ModuleType] = EXTRACTORS,
+) -> Extraction:
+    """Run every extractor over the document's sections, reusing memoized results.
+
+    Only sections whose digest is not in ``cache`` are processed (identical sections once);
+    the merged results list items in document order with ids and section placement attached.
+    """
+    t0 = time.perf_counter()
+    out = Extraction(doc.digest, sections=len(doc.sections))
+    unique: Dict[str, Section] = {}
+    for s in doc.sections:
+        unique.setdefault(s.digest, s)
+    changed = set()
+    for ex in extractors:
+        known = cache.get_many(ex.NAME, ex.VERSION, unique) if cache is not None else {}
+        fresh = {d: ex.extract(s) for d, s in unique.items() if d not in known}
+        if cache is not None and fresh:
+            cache.put_many(ex.NAME, ex.VERSION, fresh)
+        changed.update(fresh)
+        known.update(fresh)
+        out.results[ex.NAME] = [item for s in doc.sections for item in _merge(s, ex.PREFIX, known[s.digest])]
+    out.extracted = [s.id for s in doc.sections if s.digest in changed]
+    out.reused = len(doc.sections) - len(out.extracted)
+    out.seconds = time.perf_counter() - t0
+    return out
+
+
+def extract_text(text: str, cache: Optional[SectionCache] = None) -> Extraction:
+    return extract_document(parse_document(text), cache)
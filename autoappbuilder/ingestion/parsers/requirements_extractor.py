@@ -0,0 +1,68 @@
+import re
+from typing import Any, Dict, List
+
+from ...parser.nl_parser import Section, sentences
+
+NAME = "requirements"
+PREFIX = "R"
+# Bump whenever extraction output changes, to invalidate memoized sections
+VERSION = 2
+
+# RFC 2119-style keywords mapped to a priority; longer phrases first so "should not" wins over "should"
+_MODALS = [
+    (r"(?:shall|must|is required to|are required to|has to|have to|needs? to)\s+not", "must", True),
+    (r"(?:should|ought to)\s+not", "should", True),
+    (r"shall|must|is required to|are required to|has to|have to|needs? to|is mandatory", "must", False),
+    (r"should|is recommended|ought to", "should", False),
+    (r"may(?!\s+\d)|is optional|can optionally", "may", False),  # not the month in "May 1" or "May 2026"
+]
+_MODAL = re.compile("|".join(f"(?P<m{i}>\\b(?:{p})\\b)" for i, (p, _, _) in enumerate(_MODALS)), re.IGNORECASE)
+# "will" only states a requirement when the subject is the thing being built
+_WILL = re.compile(r"\b(?:the\s+)?(?:system|application|app|service|platform|api|solution|product|server|tool)\s+will\b", re.IGNORECASE)
+_EXPLICIT_ID = re.compile(r"^\[?([A-Z]{1,6}[-_]?\d+(?:\.\d+)*)\]?\s*[:.)\-]\s*")
+
+CATEGORIES = {
+    "performance": ("latency", "response time", "throughput", "per second", "fast", "performance", "load time", "ms "),
+    "security": ("encrypt", "authenticat", "authoriz", "password", "security", "secure", "tls", "sso", "mfa", "audit"),
+    "availability": ("uptime", "availability", "failover", "backup", "disaster recovery", "redundan", "99."),
+    "scalability": ("scale", "concurrent", "scalab", "horizontal"),
+    "compliance": ("gdpr", "hipaa", "pci", "soc 2", "iso 27001", "ccpa", "wcag", "regulat", "complian"),
+    "usability": ("user-friendly", "intuitive", "accessib", "usability", "responsive", "mobile"),
+    "data": ("database", "retention", "migrat", "import", "export", "schema", "store "),
+    "integration": ("integrat", "webhook", "third-party", "rest api", "graphql", "sdk"),
+}
+
+
+def classify(text: str) -> str:
+    lower = text.lower() + " "
+    for category, keywords in CATEGORIES.items():
+        if any(k in lower for k in keywords):
+            return category
+    return "functional"
+
+
+def extract(section: Section) -> List[Dict[str, Any]]:
+    """Requirement statements in a section, in reading order.
+
+    Items carry no section information, so memoized results stay valid when the section moves.
+    """
+    out = []
+    for sentence in sentences(section.text):
+        m = _MODAL.search(sentence)
+        if m is not None:
+            i = int(m.lastgroup[1:])
+            _, priority, negated = _MODALS[i]
+        elif _WILL.search(sentence):
+            priority, negated = "must", " not " in sentence.lower()
+        else:
+            continue
+        ref = _EXPLICIT_ID.match(sentence)
+        text = sentence[ref.end():] if ref else sentence
+        out.append({
+            "ref": ref.group(1) if ref else None,
+            "text": text,
+            "priority": priority,
+            "negated": negated,
+            "category": classify(text),
+        })
+    return out
@@ -0,0 +1,300 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ...utils.checksums import HashCache, hash_file
+from ..converters import CONVERTERS, converter_for, load
+from ..utils.normalizer import normalize
+
+# Bump when a converter or the normalizer changes its output, to invalidate cached pages
+CACHE_VERSION = 1
+PAGE_BATCH = 8
+# Cheap converters run in the calling process; a process hop would cost more than the work
+INLINE_CONVERTERS = ("markdown",)
+
+
+@dataclass
+class Page:
+    document: str
+    number: int  # 1-based within the document
+    text: str
+    checksum: str  # sha256 of the source document
+    cached: bool = False
+
+
+class StageTimings:
+    """Accumulated seconds and call counts per pipeline stage.
+
+    Worker-side stages (convert, ocr, normalize) are summed across processes, so with N
+    workers they can add up to N times the wall time.
+    """
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            rec = self._totals.setdefault(stage, [0, 0.0])
+            rec[0] += count
+            rec[1] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {stage: {"calls": int(n), "seconds": round(s, 6)} for stage, (n, s) in self._totals.items()}
+
+
+def _convert_batch(name: str, path: str, start: int, stop: Optional[int]) -> Tuple[List[str], Dict[str, float]]:
+    """Worker entry point: convert and normalize pages [start, stop) of one document."""
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    raw = list(load(name).convert(Path(path), start, stop, timings=timings))
+    timings["convert"] = time.perf_counter() - t0 - timings.get("ocr", 0.0)
+    t1 = time.perf_counter()
+    pages = [normalize(p) for p in raw]
+    timings["normalize"] = time.perf_counter() - t1
+    return pages, timings
+
+
+@dataclass
+class _Doc:
+    path: str
+    checksum: str
+    converter: str
+    n_batches: int
+    batches: Dict[int, List[str]] = field(default_factory=dict)
+    emitted: int = 0  # batches already yielded
+    next_page: int = 1
+    cached: bool = False
+    error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.error is not None or self.emitted >= self.n_batches
+
+
+class IntakePipeline:
+    """Converts documents to normalized text on one process pool per converter, page by page.
+
+    Large documents are split into batches of ``batch_pages`` pages, so one long PDF spreads
+    across the pool instead of pinning a single worker. Pages are yielded as their batches
+    finish. Results are cached under ``cache_dir`` by document sha256, so re-ingesting
+    an unchanged document costs a hash and a file read. Per-stage time is in ``timings``.
+
+    ``workers`` is a pool size for every converter or a mapping of converter name to pool
+    size; 0 runs that converter in the calling process.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        workers: Union[int, Dict[str, int], None] = None,
+        batch_pages: int = PAGE_BATCH,
+        hash_cache: Optional[HashCache] = None,
+        mp_context=None,
+    ) -> None:
+        default = os.cpu_count() or 1
+        if isinstance(workers, dict):
+            self.workers = {n: workers.get(n, 0 if n in INLINE_CONVERTERS else default) for n in CONVERTERS}
+        else:
+            count = default if workers is None else workers
+            self.workers = {n: 0 if n in INLINE_CONVERTERS else count for n in CONVERTERS}
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.batch_pages = batch_pages
+        self.hash_cache = hash_cache
+        if mp_context is None:
+            methods = multiprocessing.get_all_start_methods()
+            # never fork: the API process has threads, and a forked child can inherit held locks
+            mp_context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.mp_context = mp_context
+        self.timings = StageTimings()
+        self.errors: List[Tuple[str, str]] = []
+        self._pools: Dict[str, ProcessPoolExecutor] = {}
+
+    def _pool(self, name: str) -> Optional[ProcessPoolExecutor]:
+        if self.workers.get(name, 0) <= 0:
+            return None
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = self._pools[name] = ProcessPoolExecutor(self.workers[name], mp_context=self.mp_context)
+        return pool
+
+    def close(self) -> None:
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "IntakePipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # cache
+
+    def _cache_path(self, doc: _Doc) -> Optional[Path]:
+        # Same bytes can convert differently: keyed by converter and extension too (.txt is plain, .md markup)
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / doc.checksum[:2] / f"{doc.checksum}.{doc.converter}{Path(doc.path).suffix.lower()}.json"
+
+    def _cache_get(self, doc: _Doc) -> Optional[List[str]]:
+        path = self._cache_path(doc)
+        if path is None:
+            return None
+        t0 = time.perf_counter()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        finally:
+            self.timings.add("cache_read", time.perf_counter() - t0)
+        return data["pages"] if data.get("version") == CACHE_VERSION else None
+
+    def _cache_put(self, doc: _Doc, pages: List[str]) -> None:
+        path = self._cache_path(doc)
+        if path is None:
+            return
+        t0 = time.perf_counter()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "converter": doc.converter, "pages": pages}), encoding="utf-8")
+        os.replace(tmp, path)
+        self.timings.add("cache_write", time.perf_counter() - t0)
+
+    # run
+
+    def _checksum(self, path: str) -> str:
+        t0 = time.perf_counter()
+        if self.hash_cache is not None:
+            st = os.stat(path)
+            digest = self.hash_cache.get(path, st, "sha256")
+            if digest is None:
+                digest = hash_file(Path(path))
+                self.hash_cache.put(path, st, "sha256", digest)
+        else:
+            digest = hash_file(Path(path))
+        self.timings.add("hash", time.perf_counter() - t0)
+        return digest
+
+    def _plan(self, name: str, path: str) -> List[Tuple[int, Optional[int]]]:
+        t0 = time.perf_counter()
+        count = load(name).page_count(Path(path)) if self.workers.get(name, 0) > 0 else None
+        self.timings.add("plan", time.perf_counter() - t0)
+        if count is None:
+            return [(0, None)]
+        return [(s, min(s + self.batch_pages, count)) for s in range(0, count, self.batch_pages)] or [(0, 0)]
+
+    def _record(self, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.timings.add(stage, seconds)
+
+    def _admit(self, path: str, pending: Dict[Future, Tuple[_Doc, int]]) -> _Doc:
+        """Hash a document and serve it from the cache, or plan its batches and submit them."""
+        doc = _Doc(path, self._checksum(path), converter_for(Path(path)), 1)
+        cached = self._cache_get(doc)
+        if cached is not None:
+            doc.batches, doc.cached = {0: cached}, True
+            self.timings.add("cached_documents", 0.0)
+            return doc
+        plan = self._plan(doc.converter, path)
+        doc.n_batches = len(plan)
+        pool = self._pool(doc.converter)
+        for i, (start, stop) in enumerate(plan):
+            if pool is None:
+                doc.batches[i], timings = _convert_batch(doc.converter, path, start, stop)
+                self._record(timings)
+            else:
+                pending[pool.submit(_convert_batch, doc.converter, path, start, stop)] = (doc, i)
+        return doc
+
+    def run(self, paths: Iterable[Union[str, Path]], ordered: bool = True, on_error: str = "raise") -> Iterator[Page]:
+        """Yield the normalized pages of every document in ``paths``.
+
+        Pages of one document always come out in page order. With ``ordered`` documents also
+        follow input order; otherwise a short document that finishes first is yielded first.
+        ``on_error="skip"`` records failures in ``errors`` and carries on with the rest.
+        """
+        if on_error not in ("raise", "skip"):
+            raise ValueError("on_error must be 'raise' or 'skip'")
+        # Bounds on batches in flight and on documents held for ordering keep memory flat
+        max_inflight = 2 * max(1, sum(self.workers.values()))
+        max_docs = 4 * max_inflight
+        pending: Dict[Future, Tuple[_Doc, int]] = {}
+        docs: Deque[_Doc] = deque()
+        source = iter(paths)
+        t_start = time.perf_counter()
+
+        def fail(doc: _Doc, error: Exception) -> None:
+            if on_error == "raise":
+                raise error
+            doc.error = error
+            self.errors.append((doc.path, f"{type(error).__name__}: {error}"))
+
+        def emit(doc: _Doc) -> Iterator[Page]:
+            if doc.error is not None:
+                return
+            while doc.emitted in doc.batches:
+                for text in doc.batches[doc.emitted]:
+                    yield Page(doc.path, doc.next_page, text, doc.checksum, doc.cached)
+                    doc.next_page += 1
+                doc.emitted += 1
+            if doc.emitted == doc.n_batches and not doc.cached:
+                self._cache_put(doc, [t for i in range(doc.n_batches) for t in doc.batches[i]])
+
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_inflight and len(docs) < max_docs:
+                    try:
+                        path = str(next(source))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    try:
+                        docs.append(self._admit(path, pending))
+                    except Exception as e:
+                        doc = _Doc(path, "", "", 0)
+                        fail(doc, e)
+                        docs.append(doc)
+
+                if pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        doc, i = pending.pop(fut)
+                        try:
+                            pages, timings = fut.result()
+                        except Exception as e:
+                            if doc.error is None:
+                                fail(doc, e)
+                            continue
+                        doc.batches[i] = pages
+                        self._record(timings)
+
+                if ordered:
+                    while docs:
+                        yield from emit(docs[0])
+                        if not docs[0].done:
+                            break
+                        docs.popleft()
+                else:
+                    for doc in list(docs):
+                        yield from emit(doc)
+                        if doc.done:
+                            docs.remove(doc)
+
+                if exhausted and not pending and not docs:
+                    break
+        finally:
+            for fut in pending:
+                fut.cancel()
+            self.timings.add("wall", time.perf_counter() - t_start)
+            if self.hash_cache is not None:
+                self.hash_cache.save()
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..pipelines.intake_pipeline import PAGE_BATCH
+
+# Body of an intake request: documents to convert and how to run the pipeline over them
+INTAKE_REQUEST_SCHEMA = {
+    "title": "intake_request",
+    "type": "object",
+    "required": ["paths"],
+    "additionalProperties": False,
+    "properties": {
+        "paths": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": 10000,
+            "items": {"type": "string", "minLength": 1, "maxLength": 4096},
+        },
+        "ordered": {"type": "boolean", "default": True},
+        "on_error": {"enum": ["raise", "skip"], "default": "raise"},
+        "workers": {"type": ["integer", "null"], "minimum": 0, "maximum": 64, "default": None},
+        "batch_pages": {"type": "integer", "minimum": 1, "maximum": 1000, "default": PAGE_BATCH},
+        "bundle_id": {"type": "string", "minLength": 1},
+    },
+}
+
+
+@dataclass
+class IntakeRequest:
+    paths: List[str]
+    ordered: bool = True
+    on_error: str = "raise"
+    workers: Optional[int] = None
+    batch_pages: int = PAGE_BATCH
+    bundle_id: Optional[str] = None
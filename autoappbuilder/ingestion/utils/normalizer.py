@@ -0,0 +1,40 @@
+import re
+import unicodedata
+
+# Typographic characters converters commonly produce, mapped to plain equivalents
+_PLAIN = {
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u2212": "-", "\u00ad": "",
+    "\u2022": "-", "\u25aa": "-", "\u25cf": "-", "\uf0b7": "-",
+    "\u00a0": " ", "\u200b": "", "\ufeff": "",
+}
+_CONTROL = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+_HYPHEN_BREAK = re.compile(r"(?<=\w)-\n(?=\w)")
+_SPACES = re.compile(r"[ \t]{2,}|\t")
+_TRAILING = re.compile(r" +(?=\n)")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize(text: str) -> str:
+    """Canonical page text: NFKC, plain punctuation, words rejoined across hyphenated line
+    breaks, runs of spaces collapsed and at most one blank line in a row."""
+    # Regex scans are slow on non-ASCII text even when nothing matches, so each substitution
+    # is guarded by a substring test and the character mapping uses str.replace (as does
+    # str.translate, which is slower still)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+        for char, plain in _PLAIN.items():
+            if char in text:
+                text = text.replace(char, plain)
+    text = _CONTROL.sub("", text)
+    if "-\n" in text:
+        text = _HYPHEN_BREAK.sub("", text)
+    if "  " in text or "\t" in text:
+        text = _SPACES.sub(" ", text)
+    if " \n" in text:
+        text = _TRAILING.sub("\n", text)
+    if "\n\n\n" in text:
+        text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
@@ -0,0 +1,25 @@
+import io
+import os
+import shutil
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:  # OCR is optional (autobuilder[ingest] plus the tesseract binary)
+    pytesseract = None
+    Image = None
+
+OCR_LANG = os.environ.get("AUTOBUILDER_OCR_LANG", "eng")
+_available = None
+
+
+def available() -> bool:
+    global _available
+    if _available is None:
+        _available = pytesseract is not None and shutil.which("tesseract") is not None
+    return _available
+
+
+def image_text(data: bytes, lang: str = OCR_LANG) -> str:
+    with Image.open(io.BytesIO(data)) as img:
+        return pytesseract.image_to_string(img, lang=lang)
@@ -0,0 +1,17 @@
+from typing import Any, Dict, Iterable, List
+
+from ...parser.validator import compile_schema
+from ..schemas.intake_request import INTAKE_REQUEST_SCHEMA, IntakeRequest
+
+intake_request_validator = compile_schema(INTAKE_REQUEST_SCHEMA, "intake_request")
+
+
+def validate_intake_requests(payloads: Iterable[Dict[str, Any]]) -> Dict[int, List[str]]:
+    """Errors of each invalid intake request by index; empty when the batch is valid."""
+    return intake_request_validator.validate_many(payloads)
+
+
+def parse_intake_request(payload: Dict[str, Any]) -> IntakeRequest:
+    """Validate ``payload`` and build the request; raises SchemaValidationError if invalid."""
+    intake_request_validator.validate(payload)
+    return IntakeRequest(**payload)
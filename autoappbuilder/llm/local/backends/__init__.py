@@ -0,0 +1,34 @@
+"""Local model runtimes.
+
+Every backend package has a ``runtime`` module exposing ``RUNTIME`` (a ``base.Runtime``
+subclass) and ``available(spec)``, which tells whether its optional dependency and model
+files are present. Modules are imported on first use so that only the backends actually
+configured need their dependencies installed.
+"""
+from importlib import import_module
+from types import ModuleType
+
+from ....exceptions import BackendUnavailableError
+
+BACKENDS = ("fake", "llama_cpp", "ollama", "transformers")
+
+
+def load(name: str) -> ModuleType:
+    if name not in BACKENDS:
+        raise BackendUnavailableError(f"unknown backend: {name!r}")
+    return import_module(f".{name}.runtime", __name__)
+
+
+def available(spec) -> bool:
+    return spec.backend in BACKENDS and load(spec.backend).available(spec)
+
+
+def create_runtime(spec):
+    """A new, not yet loaded runtime for ``spec``; raises BackendUnavailableError if it cannot run."""
+    module = load(spec.backend)
+    if not module.available(spec):
+        raise BackendUnavailableError(
+            f"the {spec.backend} backend cannot run {spec.name!r}: pip install autobuilder[llm] "
+            "and check the model path"
+        )
+    return module.RUNTIME(spec)
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+Prompt = Union[str, List[Dict[str, Any]]]
+
+
+@dataclass
+class Generation:
+    """Decoding state of one request, owned by the engine running it.
+
+    ``state`` is private to the runtime; the engine counts tokens, applies ``max_tokens`` and
+    stop strings, and sets ``finish_reason``. A runtime that hits an error in one generation
+    of a batch sets ``error`` and returns None for it; the engine fails just that request.
+    """
+
+    id: str
+    prompt: Prompt
+    params: Dict[str, Any] = field(default_factory=dict)
+    max_tokens: int = 256
+    tokens: int = 0
+    pieces: List[str] = field(default_factory=list)
+    state: Any = None
+    finish_reason: Optional[str] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.pieces)
+
+
+class Runtime:
+    """A loaded model that decodes a batch of generations one token per step.
+
+    A runtime that can decode several sequences in one forward pass sets ``max_batch`` above
+    one, and the engine keeps that many generations in flight, admitting new requests between
+    steps as others finish. Runtimes without batching keep ``max_batch = 1``.
+    """
+
+    name = ""
+    max_batch = 1  # the most the backend can run; a spec's max_batch may lower it
+
+    def __init__(self, spec) -> None:
+        self.spec = spec
+        if spec.max_batch is not None:
+            self.max_batch = max(1, min(spec.max_batch, type(self).max_batch))
+
+    def load(self) -> None:
+        """Load weights (or connect); called once on the engine's thread before any step."""
+
+    def unload(self) -> None:
+        """Release the model; the runtime is not used again."""
+
+    def start(self, gen: Generation) -> None:
+        """Prepare ``gen`` to decode (tokenize, prefill, open a stream)."""
+        raise NotImplementedError
+
+    def step(self, batch: List[Generation]) -> List[Optional[str]]:
+        """Decode one token for each generation: its text, or None once the model has ended it."""
+        raise NotImplementedError
+
+    def release(self, gen: Generation) -> None:
+        """Free per-generation state once ``gen`` is finished or failed."""
+        gen.state = None
+
+
+def prompt_text(prompt: Prompt) -> str:
+    """Plain-text rendering of chat messages for backends without a chat template."""
+    if isinstance(prompt, str):
+        return prompt
+    lines = [f"{m.get('role', 'user')}: {m.get('content', '')}" for m in prompt]
+    return "\n".join(lines) + "\nassistant:"
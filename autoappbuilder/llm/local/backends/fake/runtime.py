@@ -0,0 +1,56 @@
+import time
+from typing import List, Optional
+
+from ..base import Generation, Runtime, prompt_text
+
+
+def available(spec) -> bool:
+    return True
+
+
+class FakeRuntime(Runtime):
+    """Deterministic stand-in model for tests and benchmarks.
+
+    Each token is the next word of the prompt, cycling. Spec options: ``step_ms`` is the
+    cost of one decode step whatever the batch size (a batched forward pass), ``token_ms``
+    an extra cost per sequence in the step, ``load_ms`` the load time, and ``eos_after``
+    ends every generation after that many tokens.
+    """
+
+    name = "fake"
+    max_batch = 64
+
+    def __init__(self, spec) -> None:
+        super().__init__(spec)
+        opts = spec.options
+        self.step_s = opts.get("step_ms", 0) / 1000
+        self.token_s = opts.get("token_ms", 0) / 1000
+        self.load_s = opts.get("load_ms", 0) / 1000
+        self.eos_after = opts.get("eos_after")
+        self.loaded = False
+
+    def load(self) -> None:
+        time.sleep(self.load_s)
+        self.loaded = True
+
+    def unload(self) -> None:
+        self.loaded = False
+
+    def start(self, gen: Generation) -> None:
+        if not self.loaded:
+            raise RuntimeError("model is not loaded")
+        gen.state = prompt_text(gen.prompt).split() or ["_"]
+
+    def step(self, batch: List[Generation]) -> List[Optional[str]]:
+        time.sleep(self.step_s + self.token_s * len(batch))
+        out: List[Optional[str]] = []
+        for gen in batch:
+            if self.eos_after is not None and gen.tokens >= self.eos_after:
+                out.append(None)
+            else:
+                words = gen.state
+                out.append(" " + words[gen.tokens % len(words)])
+        return out
+
+
+RUNTIME = FakeRuntime
@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from ..base import Generation, Runtime
+
+try:
+    from llama_cpp import Llama
+except ImportError:  # llama-cpp-python is optional (autobuilder[llm])
+    Llama = None
+
+# create_completion keywords taken from a request's params as they are
+PASSTHROUGH = ("temperature", "top_p", "top_k", "min_p", "repeat_penalty", "seed", "presence_penalty", "frequency_penalty")
+
+
+def model_path(spec) -> Path:
+    return Path(os.path.expanduser(spec.model))
+
+
+def available(spec) -> bool:
+    return Llama is not None and model_path(spec).is_file()
+
+
+class LlamaCppRuntime(Runtime):
+    """A GGUF model through llama-cpp-python.
+
+    One llama context holds one KV cache, so generations run one at a time
+    (``max_batch = 1``) and the engine queues the rest. Each generation is a streaming
+    completion advanced one chunk per step.
+    """
+
+    name = "llama_cpp"
+    max_batch = 1
+
+    def load(self) -> None:
+        opts = self.spec.options
+        self.llm = Llama(
+            model_path=str(model_path(self.spec)),
+            n_ctx=self.spec.context_length,
+            n_threads=opts.get("n_threads"),
+            n_gpu_layers=opts.get("n_gpu_layers", 0),
+            n_batch=opts.get("n_batch", 512),
+            verbose=False,
+        )
+
+    def unload(self) -> None:
+        llm, self.llm = getattr(self, "llm", None), None
+        if llm is not None and hasattr(llm, "close"):
+            llm.close()
+
+    def start(self, gen: Generation) -> None:
+        kwargs = {k: gen.params[k] for k in PASSTHROUGH if gen.params.get(k) is not None}
+        kwargs.update(max_tokens=gen.max_tokens, stream=True)
+        if isinstance(gen.prompt, str):
+            gen.state = ("text", self.llm.create_completion(gen.prompt, **kwargs))
+        else:
+            gen.state = ("chat", self.llm.create_chat_completion(messages=gen.prompt, **kwargs))
+
+    def step(self, batch: List[Generation]) -> List[Optional[str]]:
+        out: List[Optional[str]] = []
+        for gen in batch:
+            kind, stream = gen.state
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    out.append(None)
+                    break
+                choice = chunk["choices"][0]
+                text = choice.get("text") if kind == "text" else choice.get("delta", {}).get("content")
+                if text:
+                    out.append(text)
+                    break
+                if choice.get("finish_reason"):
+                    out.append(None)
+                    break
+        return out
+
+    def release(self, gen: Generation) -> None:
+        if gen.state is not None:
+            gen.state[1].close()
+        gen.state = None
+
+
+RUNTIME = LlamaCppRuntime
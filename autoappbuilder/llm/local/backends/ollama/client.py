@@ -0,0 +1,408 @@
+"""Async HTTP client for an Ollama, or Ollama-compatible, server.
+
+Plain asyncio streams speaking HTTP/1.1, so it needs no extra dependency:
+
+- a keep-alive connection pool per host, with at most ``max_per_host`` requests in flight;
+- responses streamed as NDJSON objects, parsed as the bytes arrive;
+- connect and read timeouts, plus an optional deadline per request;
+- retries with jittered exponential backoff on connection errors, timeouts and 429/5xx.
+  A request is retried only before its response starts, never halfway through a stream.
+
+Use one client per event loop.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from .....exceptions import BackendRequestError, BackendUnavailableError
+from .config import resolve_host
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_WINDOW = 1024  # recent requests kept for latency percentiles
+
+# Called with each piece of generated text as it arrives
+TokenCallback = Callable[[str], None]
+
+
+class ClientMetrics:
+    def __init__(self) -> None:
+        self.requests = self.retries = self.failures = self.timeouts = 0
+        self.connections_opened = self.connections_reused = 0
+        self.in_flight = 0
+        self.ttfts: Deque[float] = deque(maxlen=_WINDOW)
+
+    @property
+    def reuse_rate(self) -> float:
+        total = self.connections_opened + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        s = sorted(self.ttfts)
+        ttft = {"avg": 0.0, "p50": 0.0, "p95": 0.0}
+        if s:
+            ttft = {
+                "avg": round(sum(s) / len(s) * 1000, 3),
+                "p50": round(s[len(s) // 2] * 1000, 3),
+                "p95": round(s[min(len(s) - 1, int(len(s) * 0.95))] * 1000, 3),
+            }
+        return {
+            "requests": self.requests, "retries": self.retries, "failures": self.failures,
+            "timeouts": self.timeouts, "in_flight": self.in_flight,
+            "connections_opened": self.connections_opened, "connections_reused": self.connections_reused,
+            "reuse_rate": round(self.reuse_rate, 4), "ttft_ms": ttft,
+        }
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "idle_since")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+
+    def usable(self, now: float, expiry: float) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof() and now - self.idle_since < expiry
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _HostPool:
+    def __init__(self, host: str, port: int, limit: int) -> None:
+        self.host = host
+        self.port = port
+        self.slots = asyncio.Semaphore(limit)
+        self.idle: Deque[_Connection] = deque()
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("server closed the connection")
+    parts = line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+        raise ConnectionError(f"malformed status line: {line[:80]!r}")
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if parts[0] == b"HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+    return int(parts[1]), headers
+
+
+class Response:
+    """A response whose head has been read; the body is read through ``chunks``,
+    ``read`` or ``objects``. The connection goes back to the pool once the body is consumed."""
+
+    def __init__(self, client: "OllamaClient", conn: _Connection, status: int, headers: Dict[str, str],
+                 deadline: Optional[float]) -> None:
+        self.client = client
+        self.conn = conn
+        self.status = status
+        self.headers = headers
+        self.deadline = deadline
+        self.chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        length = headers.get("content-length")
+        self.length = 0 if status in (204, 304) else int(length) if length is not None else None
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+        self.complete = False
+
+    async def _read(self, aw):
+        timeout = self.client.read_timeout
+        if self.deadline is not None:
+            timeout = min(timeout, self.deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError()
+        return await asyncio.wait_for(aw, timeout)
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        reader = self.conn.reader
+        if self.chunked:
+            while True:
+                size = int((await self._read(reader.readline())).split(b";")[0].strip(), 16)
+                if size == 0:
+                    while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    break
+                data = await self._read(reader.readexactly(size + 2))
+                yield data[:-2]
+        elif self.length is not None:
+            remaining = self.length
+            while remaining:
+                data = await self._read(reader.read(min(remaining, 65536)))
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(data)
+                yield data
+        else:
+            self.keep_alive = False  # body runs to end of stream
+            while data := await self._read(reader.read(65536)):
+                yield data
+        self.complete = True
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.chunks()])
+
+    async def objects(self) -> AsyncIterator[Any]:
+        """The body as NDJSON, one object per line, parsed as soon as each line is complete."""
+        buf = b""
+        async for chunk in self.chunks():
+            buf += chunk
+            if b"\n" not in chunk:
+                continue
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _loads(line)
+        if buf.strip():
+            yield _loads(buf)
+
+    async def raise_for_status(self) -> None:
+        if self.status < 400:
+            return
+        body = (await self.read())[:2000]
+        try:
+            detail = _loads(body).get("error") or body.decode("utf-8", "replace")
+        except (ValueError, AttributeError):
+            detail = body.decode("utf-8", "replace")
+        raise BackendRequestError(self.status, detail)
+
+
+class OllamaClient:
+    """Pooled async client for the Ollama HTTP API.
+
+    ``host`` takes what OLLAMA_HOST does (and defaults to it). ``path`` arguments may also be
+    full URLs, so one client can serve several hosts, each with its own pool and limit.
+    """
+
+    def __init__(
+        self, host: Optional[str] = None, max_per_host: int = 8, max_idle: Optional[int] = None,
+        connect_timeout: float = 5.0, read_timeout: float = 120.0, retries: int = 2,
+        backoff: float = 0.25, max_backoff: float = 5.0, keepalive_expiry: float = 30.0,
+    ) -> None:
+        self.host, self.port = resolve_host(host)
+        self.max_per_host = max_per_host
+        self.max_idle = max_per_host if max_idle is None else max_idle
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.keepalive_expiry = keepalive_expiry
+        self.metrics = ClientMetrics()
+        self._pools: Dict[Tuple[str, int], _HostPool] = {}
+        self._closed = False
+
+    def _target(self, path: str) -> Tuple[_HostPool, str]:
+        host, port = self.host, self.port
+        if "://" in path:
+            scheme, _, rest = path.partition("://")
+            netloc, _, path = rest.partition("/")
+            host, port = resolve_host(f"{scheme}://{netloc}")
+            path = "/" + path
+        pool = self._pools.get((host, port))
+        if pool is None:
+            pool = self._pools[(host, port)] = _HostPool(host, port, self.max_per_host)
+        return pool, path
+
+    async def _connect(self, pool: _HostPool) -> Tuple[_Connection, bool]:
+        now = time.monotonic()
+        while pool.idle:
+            conn = pool.idle.pop()  # most recently used first
+            if conn.usable(now, self.keepalive_expiry):
+                self.metrics.connections_reused += 1
+                return conn, True
+            conn.close()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(pool.host, pool.port), self.connect_timeout)
+        self.metrics.connections_opened += 1
+        return _Connection(reader, writer), False
+
+    def _release(self, pool: _HostPool, resp: Response) -> None:
+        conn = resp.conn
+        if resp.complete and resp.keep_alive and not self._closed and len(pool.idle) < self.max_idle:
+            conn.idle_since = time.monotonic()
+            pool.idle.append(conn)
+        else:
+            conn.close()
+
+    def _delay(self, attempt: int, headers: Optional[Dict[str, str]] = None) -> float:
+        retry_after = (headers or {}).get("retry-after", "")
+        if retry_after.replace(".", "", 1).isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # full jitter: spreads retries from many callers instead of synchronising them
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    async def _open(self, pool: _HostPool, request: bytes, deadline: Optional[float]) -> Response:
+        attempt = 0
+        while True:
+            conn, reused, headers = None, False, None
+            try:
+                conn, reused = await self._connect(pool)
+                conn.writer.write(request)
+                await asyncio.wait_for(conn.writer.drain(), self.read_timeout)
+                timeout = self.read_timeout if deadline is None else min(self.read_timeout, deadline - time.monotonic())
+                status, headers = await asyncio.wait_for(_read_head(conn.reader), max(timeout, 0))
+            except asyncio.TimeoutError as e:
+                if conn is not None:
+                    conn.close()
+                self.metrics.timeouts += 1
+                error: Exception = e
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                if conn is not None:
+                    conn.close()
+                if reused:
+                    continue  # the server dropped an idle keep-alive connection; try another at once
+                error = BackendUnavailableError(f"ollama at {pool.host}:{pool.port} is not reachable: {e}")
+            else:
+                resp = Response(self, conn, status, headers, deadline)
+                if status not in RETRY_STATUSES:
+                    return resp
+                if attempt >= self.retries:
+                    self.metrics.failures += 1
+                    return resp
+                try:
+                    await resp.raise_for_status()
+                except BackendRequestError as e:
+                    error = e
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                    error = BackendRequestError(status, str(e))
+                self._release(pool, resp)
+            attempt += 1
+            delay = self._delay(attempt, headers)
+            if attempt > self.retries or (deadline is not None and time.monotonic() + delay >= deadline):
+                self.metrics.failures += 1
+                raise error
+            self.metrics.retries += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def request(self, method: str, path: str, body: Any = None,
+                      timeout: Optional[float] = None) -> AsyncIterator[Response]:
+        """Send a request and yield the response once its head arrives.
+
+        ``timeout`` bounds the whole exchange, retries and body included.
+        """
+        if self._closed:
+            raise RuntimeError("client is closed")
+        pool, path = self._target(path)
+        payload = _dumps(body) if body is not None else b""
+        request = (
+            f"{method} {path} HTTP/1.1\r\nHost: {pool.host}:{pool.port}\r\nUser-Agent: autobuilder\r\n"
+            f"Accept: application/x-ndjson, application/json\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        ).encode("latin-1") + payload
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self.metrics.requests += 1
+        async with pool.slots:
+            self.metrics.in_flight += 1
+            try:
+                resp = await self._open(pool, request, deadline)
+                try:
+                    yield resp
+                finally:
+                    self._release(pool, resp)
+            finally:
+                self.metrics.in_flight -= 1
+
+    async def request_json(self, method: str, path: str, body: Any = None, timeout: Optional[float] = None) -> Any:
+        async with self.request(method, path, body, timeout) as resp:
+            await resp.raise_for_status()
+            data = await resp.read()
+        return _loads(data) if data.strip() else None
+
+    async def stream(self, path: str, body: Any, timeout: Optional[float] = None,
+                     on_token: Optional[TokenCallback] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the NDJSON objects of a streaming endpoint (/api/generate, /api/chat) as they arrive.
+
+        Close the iterator (``contextlib.aclosing``) when stopping early, so that its
+        connection slot is freed at once.
+        """
+        start = time.monotonic()
+        first = True
+        async with self.request("POST", path, dict(body, stream=True), timeout) as resp:
+            await resp.raise_for_status()
+            async for obj in resp.objects():
+                if "error" in obj:
+                    raise BackendRequestError(resp.status, obj["error"])
+                text = obj["message"].get("content") if "message" in obj else obj.get("response")
+                if text:
+                    if first:
+                        self.metrics.ttfts.append(time.monotonic() - start)
+                        first = False
+                    if on_token is not None:
+                        on_token(text)
+                yield obj
+
+    async def _collect(self, path: str, body: Dict[str, Any], timeout: Optional[float],
+                       on_token: Optional[TokenCallback]) -> Dict[str, Any]:
+        pieces: List[str] = []
+        last: Dict[str, Any] = {}
+        async for obj in self.stream(path, body, timeout, on_token):
+            text = obj["message"].get("content") if "message" in obj else obj.get("response")
+            if text:
+                pieces.append(text)
+            last = obj
+        result = dict(last)
+        if path.endswith("/api/chat"):
+            result["message"] = {**last.get("message", {}), "role": "assistant", "content": "".join(pieces)}
+        else:
+            result["response"] = "".join(pieces)
+        return result
+
+    async def generate(self, model: str, prompt: str, options: Optional[Dict[str, Any]] = None,
+                       on_token: Optional[TokenCallback] = None, timeout: Optional[float] = None,
+                       **extra: Any) -> Dict[str, Any]:
+        """Stream a completion; returns the final response object with the full ``response`` text."""
+        body = {"model": model, "prompt": prompt, "options": options or {}, **extra}
+        return await self._collect("/api/generate", body, timeout, on_token)
+
+    async def chat(self, model: str, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None,
+                   on_token: Optional[TokenCallback] = None, timeout: Optional[float] = None,
+                   **extra: Any) -> Dict[str, Any]:
+        body = {"model": model, "messages": messages, "options": options or {}, **extra}
+        return await self._collect("/api/chat", body, timeout, on_token)
+
+    async def tags(self) -> List[Dict[str, Any]]:
+        return (await self.request_json("GET", "/api/tags") or {}).get("models", [])
+
+    async def load(self, model: str, keep_alive: Union[str, int] = "10m") -> None:
+        await self.request_json("POST", "/api/generate", {"model": model, "keep_alive": keep_alive, "stream": False})
+
+    async def unload(self, model: str) -> None:
+        await self.request_json("POST", "/api/generate", {"model": model, "keep_alive": 0, "stream": False})
+
+    async def aclose(self) -> None:
+        self._closed = True
+        closing = []
+        for pool in self._pools.values():
+            while pool.idle:
+                conn = pool.idle.pop()
+                conn.close()
+                closing.append(conn.writer.wait_closed())
+        await asyncio.gather(*closing, return_exceptions=True)
+
+    async def __aenter__(self) -> "OllamaClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
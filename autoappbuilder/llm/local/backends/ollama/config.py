@@ -0,0 +1,17 @@
+import os
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+DEFAULT_PORT = 11434
+
+
+def resolve_host(value: Optional[str] = None) -> Tuple[str, int]:
+    """Host and port from ``value``, else OLLAMA_HOST, else the local default.
+
+    Accepts what OLLAMA_HOST does: a URL, ``host:port`` or a bare host.
+    """
+    url = urlsplit(value or os.environ.get("OLLAMA_HOST") or DEFAULT_HOST)
+    if not url.scheme or not url.netloc:
+        url = urlsplit(f"http://{value or os.environ.get('OLLAMA_HOST')}")
+    return url.hostname or "127.0.0.1", url.port or DEFAULT_PORT
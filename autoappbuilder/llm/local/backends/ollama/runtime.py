@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .....exceptions import BackendRequestError, BackendUnavailableError
+from ..base import Generation, Runtime
+from .client import OllamaClient
+
+# request params that map onto Ollama's "options"; max_tokens becomes num_predict
+OPTIONS = ("temperature", "top_p", "top_k", "min_p", "repeat_penalty", "seed", "stop", "num_ctx")
+# how long a released stream may take to finish before its connection is closed instead
+DRAIN_TIMEOUT = 1.0
+
+
+def available(spec) -> bool:
+    return True  # checked against the server when the model loads
+
+
+async def _drain(objects: AsyncIterator[Dict[str, Any]], timeout: Optional[float] = None) -> None:
+    """Read a stream to the end of its body, so the client can put the connection back in its
+    pool; after ``timeout`` seconds, or on an error, close it instead."""
+    async def rest():
+        async for _ in objects:
+            pass
+    try:
+        await asyncio.wait_for(rest(), timeout)
+    except (BackendRequestError, BackendUnavailableError, OSError, EOFError, asyncio.TimeoutError, ValueError):
+        await objects.aclose()
+
+
+class _Stream:
+    def __init__(self, objects: AsyncIterator[Dict[str, Any]]) -> None:
+        self.objects = objects
+        self.done = False  # the server said done, or the stream ended
+
+
+class OllamaRuntime(Runtime):
+    """A model served by a local Ollama server.
+
+    The server batches concurrent requests itself (OLLAMA_NUM_PARALLEL), so the engine keeps
+    up to ``max_batch`` streams open and reads one chunk from each per step; set the spec's
+    ``max_batch`` to the server's parallelism. Requests go through an OllamaClient (pooled
+    keep-alive connections, retries before a stream starts) on an event loop thread owned by
+    the runtime; a step reads from every stream in the batch concurrently. Unloading asks the
+    server to drop the model.
+    """
+
+    name = "ollama"
+    max_batch = 32
+
+    def __init__(self, spec) -> None:
+        super().__init__(spec)
+        self.timeout = spec.options.get("timeout", 300)
+        self.client: Optional[OllamaClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def load(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name=f"ollama-{self.spec.name}", daemon=True)
+        self._thread.start()
+        self.client = OllamaClient(self.spec.options.get("host"), max_per_host=self.max_batch, read_timeout=self.timeout)
+        try:
+            # an empty generate request loads the model and returns once it is resident
+            self._call(self.client.load(self.spec.model, self.spec.options.get("keep_alive", "10m")))
+        except BaseException:
+            self._stop()
+            raise
+
+    def unload(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._call(self.client.unload(self.spec.model))
+        except (BackendUnavailableError, BackendRequestError):
+            pass
+        finally:
+            self._stop()
+
+    def _stop(self) -> None:
+        try:
+            self._call(self.client.aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
+
+    def start(self, gen: Generation) -> None:
+        options = {k: gen.params[k] for k in OPTIONS if gen.params.get(k) is not None}
+        options["num_predict"] = gen.max_tokens
+        body: Dict[str, Any] = {"model": self.spec.model, "options": options}
+        if isinstance(gen.prompt, str):
+            body["prompt"] = gen.prompt
+            path = "/api/generate"
+        else:
+            body["messages"] = gen.prompt
+            path = "/api/chat"
+        # opened on the first step, together with the rest of the batch
+        gen.state = _Stream(self.client.stream(path, body))
+
+    async def _next(self, gen: Generation) -> Optional[str]:
+        stream = gen.state
+        while not stream.done:
+            try:
+                chunk = await stream.objects.__anext__()
+            except StopAsyncIteration:
+                stream.done = True
+                break
+            except (BackendRequestError, BackendUnavailableError, OSError, EOFError, asyncio.TimeoutError, ValueError) as e:
+                # an error chunk, a bad line or a dropped stream ends this generation only
+                stream.done = True
+                gen.error = e
+                break
+            piece = chunk["message"].get("content") if "message" in chunk else chunk.get("response")
+            if chunk.get("done"):
+                stream.done = True
+                await _drain(stream.objects)
+            if piece:
+                return piece
+        return None
+
+    async def _step(self, batch: List[Generation]) -> List[Optional[str]]:
+        return list(await asyncio.gather(*(self._next(gen) for gen in batch)))
+
+    def step(self, batch: List[Generation]) -> List[Optional[str]]:
+        return self._call(self._step(batch))
+
+    def release(self, gen: Generation) -> None:
+        if gen.state is not None and self._loop is not None:
+            # frees the stream's connection slot; no need to wait for it. A generation cut
+            # at max_tokens is usually one done chunk from the end, so read that first and
+            # keep the connection for the next request
+            stream = gen.state
+            end = stream.objects.aclose() if stream.done else _drain(stream.objects, DRAIN_TIMEOUT)
+            asyncio.run_coroutine_threadsafe(end, self._loop)
+        gen.state = None
+
+
+RUNTIME = OllamaRuntime
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from ..base import Generation, Runtime, prompt_text
+
+try:
+    import numpy as np
+    import torch
+    import torch.nn.functional as F
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    from ...sampling.decoding import PENALTY_WINDOW
+    from ...sampling.sampling import Sampler, SamplingParams
+except ImportError:  # torch and transformers are optional (autobuilder[llm])
+    torch = None
+
+try:
+    from transformers import DynamicCache
+except ImportError:
+    DynamicCache = None
+
+
+def available(spec) -> bool:
+    return torch is not None
+
+
+@dataclass
+class _Seq:
+    cache: Any  # legacy per-layer (key, value) tuples, batch dimension 1
+    length: int  # tokens in the cache
+    logits: Any  # next-token logits
+    ids: List[int]  # generated token ids
+    emitted: int  # characters of the decoded text already returned
+    params: "SamplingParams"
+    rng: Any  # numpy Generator; its own when the request is seeded
+
+
+def _legacy(cache):
+    return cache.to_legacy_cache() if hasattr(cache, "to_legacy_cache") else cache
+
+
+def _wrap(legacy):
+    return DynamicCache.from_legacy_cache(legacy) if DynamicCache is not None else legacy
+
+
+class TransformersRuntime(Runtime):
+    """A Hugging Face causal LM with continuous batching.
+
+    Each generation is prefilled on its own when admitted; every step then runs one forward
+    pass over all active generations, their KV caches left-padded to a common length and
+    masked, so generations of different lengths join and leave the batch between steps.
+    The batch's next-token logits are sampled together by one ``Sampler``.
+    """
+
+    name = "transformers"
+    max_batch = 64
+
+    def load(self) -> None:
+        opts = self.spec.options
+        self.device = opts.get("device") or ("cuda" if torch.cuda.is_available() else "cpu")
+        dtype = getattr(torch, opts["dtype"]) if opts.get("dtype") else (torch.float16 if self.device == "cuda" else torch.float32)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.spec.model)
+        self.model = AutoModelForCausalLM.from_pretrained(self.spec.model, torch_dtype=dtype).to(self.device)
+        self.model.eval()
+        self.eos = self.tokenizer.eos_token_id
+        self.rng = np.random.default_rng(opts.get("seed"))
+
+    def unload(self) -> None:
+        self.model = self.tokenizer = None
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _encode(self, gen: Generation):
+        if not isinstance(gen.prompt, str) and getattr(self.tokenizer, "chat_template", None):
+            text = self.tokenizer.apply_chat_template(gen.prompt, tokenize=False, add_generation_prompt=True)
+        else:
+            text = prompt_text(gen.prompt)
+        return self.tokenizer(text, return_tensors="pt").input_ids.to(self.device)
+
+    def start(self, gen: Generation) -> None:
+        ids = self._encode(gen)
+        with torch.no_grad():
+            out = self.model(input_ids=ids, use_cache=True)
+        given = {k: v for k, v in gen.params.items() if v is not None}
+        params = SamplingParams.from_dict({"temperature": 0, **given})  # greedy unless asked
+        rng = np.random.default_rng(int(params.seed)) if params.seed is not None else self.rng
+        gen.state = _Seq(_legacy(out.past_key_values), ids.shape[1], out.logits[0, -1], [], 0, params, rng)
+
+    def _pick(self, batch: List[Generation]) -> List[int]:
+        seqs = [g.state for g in batch]
+        logits = torch.stack([s.logits for s in seqs]).float().cpu().numpy()
+        history = None
+        if any(s.params.repetition_penalty != 1 for s in seqs):
+            history = np.full((len(seqs), PENALTY_WINDOW), -1, dtype=np.int64)
+            for row, s in enumerate(seqs):
+                recent = s.ids[-PENALTY_WINDOW:]
+                history[row, :len(recent)] = recent
+        return Sampler([s.params for s in seqs], [s.rng for s in seqs])(logits, history).tolist()
+
+    def _piece(self, seq: _Seq) -> str:
+        text = self.tokenizer.decode(seq.ids, skip_special_tokens=True)
+        if text.endswith("�"):
+            return ""  # partial multi-byte character; wait for the rest
+        piece, seq.emitted = text[seq.emitted:], len(text)
+        return piece
+
+    def step(self, batch: List[Generation]) -> List[Optional[str]]:
+        out: List[Optional[str]] = []
+        live: List[Generation] = []
+        tokens: List[int] = []
+        for gen, token in zip(batch, self._pick(batch)):
+            if token == self.eos:
+                out.append(None)
+                continue
+            gen.state.ids.append(token)
+            out.append(self._piece(gen.state))
+            live.append(gen)
+            tokens.append(token)
+        if live:
+            self._forward(live, tokens)
+        return out
+
+    def _forward(self, live: List[Generation], tokens: List[int]) -> None:
+        seqs = [g.state for g in live]
+        longest = max(s.length for s in seqs)
+        layers = []
+        for layer in range(len(seqs[0].cache)):
+            keys = [F.pad(s.cache[layer][0], (0, 0, longest - s.length, 0)) for s in seqs]
+            values = [F.pad(s.cache[layer][1], (0, 0, longest - s.length, 0)) for s in seqs]
+            layers.append((torch.cat(keys), torch.cat(values)))
+        mask = torch.zeros(len(seqs), longest + 1, dtype=torch.long, device=self.device)
+        for i, s in enumerate(seqs):
+            mask[i, longest - s.length:] = 1
+        with torch.no_grad():
+            result = self.model(
+                input_ids=torch.tensor([[t] for t in tokens], device=self.device),
+                past_key_values=_wrap(tuple(layers)),
+                attention_mask=mask,
+                position_ids=torch.tensor([[s.length] for s in seqs], device=self.device),
+                use_cache=True,
+            )
+        cache = _legacy(result.past_key_values)
+        for i, s in enumerate(seqs):
+            start = longest - s.length  # drop this sequence's padding
+            s.cache = tuple((k[i:i + 1, :, start:], v[i:i + 1, :, start:]) for k, v in cache)
+            s.length += 1
+            s.logits = result.logits[i, -1]
+
+
+RUNTIME = TransformersRuntime
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_SQL_BATCH = 500  # stays under SQLite's bound-parameter limit
+# Access times are written back at most this often per entry, so hot keys do not turn every
+# read into a write
+TOUCH_INTERVAL = 60.0
+
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class DiskCache:
+    """JSON values in SQLite keyed by a string, with per-entry expiry and a size budget.
+
+    ``max_bytes`` bounds the stored values; ``put`` trims the least recently read entries
+    once it is exceeded. Expired entries read as misses and are removed by ``purge()``.
+    """
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, size INTEGER,"
+            " created_at REAL, expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed_at)")
+        self._lock = threading.Lock()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """(value, expires_at) for a live entry, else None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        keys = list(keys)
+        now = time.time()
+        found: Dict[str, Tuple[Any, Optional[float]]] = {}
+        stale = []
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at, accessed_at FROM entries WHERE key IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                for key, value, expires_at, accessed_at in rows:
+                    if expires_at is not None and expires_at <= now:
+                        continue
+                    found[key] = (json.loads(value), expires_at)
+                    if accessed_at < now - TOUCH_INTERVAL:
+                        stale.append((now, key))
+            if stale:
+                with self._conn:
+                    self._conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", stale)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.put_many({key: value}, ttl)
+
+    def put_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        rows = []
+        for key, value in items.items():
+            data = encode(value)
+            rows.append((key, data, len(data), now, expires_at, now))
+        with self._lock:
+            with self._conn:
+                for i in range(0, len(rows), _SQL_BATCH):
+                    batch = rows[i:i + _SQL_BATCH]
+                    keys = [r[0] for r in batch]
+                    replaced = self._conn.execute(
+                        f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({', '.join('?' * len(keys))})", keys
+                    ).fetchone()[0]
+                    self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    self._bytes += sum(r[2] for r in batch) - replaced
+            if self.max_bytes is not None and self._bytes > self.max_bytes:
+                self._trim(self.max_bytes)
+
+    def _trim(self, budget: int) -> int:
+        # caller holds the lock; drops least recently read entries until under budget
+        removed = 0
+        with self._conn:
+            while self._bytes > budget:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?", (_SQL_BATCH,)
+                ).fetchall()
+                if not rows:
+                    self._bytes = 0
+                    break
+                drop = []
+                for key, size in rows:
+                    if self._bytes <= budget:
+                        break
+                    drop.append((key,))
+                    self._bytes -= size
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", drop)
+                removed += len(drop)
+        return removed
+
+    def delete(self, key: str) -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._bytes -= row[0]
+            return True
+
+    def purge(self) -> int:
+        """Delete expired entries; returns how many."""
+        with self._lock, self._conn:
+            now = time.time()
+            freed = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)
+            ).fetchone()[0]
+            removed = self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            self._bytes -= freed
+            return removed
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DiskCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .disk_cache import DiskCache, encode
+
+MEMORY_BYTES = int(os.environ.get("AUTOBUILDER_PROMPT_CACHE_MB", "64")) * 1024 * 1024
+# Request options that change how a response is delivered, not what it says
+NON_SEMANTIC_PARAMS = frozenset(("stream", "timeout", "keep_alive", "request_id", "user", "priority"))
+KEY_VERSION = 1
+
+Messages = Union[str, Sequence[Dict[str, Any]]]
+
+
+def canonical_messages(messages: Messages) -> List[Dict[str, Any]]:
+    """A bare prompt string is one user message; None-valued message fields are dropped."""
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return [{k: v for k, v in m.items() if v is not None} for m in messages]
+
+
+def prompt_key(model: str, messages: Messages, params: Optional[Dict[str, Any]] = None) -> str:
+    """sha256 over canonical JSON of (model, sampling params, messages).
+
+    Params that are None or only affect delivery (``stream``, ``timeout``...) are left out,
+    and ints equal to floats hash alike, so the same request always lands on the same key.
+    """
+    sampling = {
+        k: float(v) if isinstance(v, int) and not isinstance(v, bool) else v
+        for k, v in sorted((params or {}).items())
+        if v is not None and k not in NON_SEMANTIC_PARAMS
+    }
+    payload = [KEY_VERSION, model, sampling, canonical_messages(messages)]
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0  # served from memory
+    disk_hits: int = 0  # served from disk, then kept in memory
+    misses: int = 0  # generated
+    coalesced: int = 0  # waited on an identical generation already running
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.disk_hits + self.misses + self.coalesced
+        return (self.hits + self.disk_hits + self.coalesced) / total if total else 0.0
+
+
+class _Abandoned(Exception):
+    """The task leading an async generation was cancelled; its waiters retry."""
+
+
+class _Flight:
+    """One generation in progress; identical requests wait on it instead of starting another."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class PromptCache:
+    """Responses keyed by prompt_key, in a byte-bounded memory LRU over an optional DiskCache.
+
+    Memory misses fall through to disk, and disk hits are promoted to memory. Entries expire
+    after ``ttl`` seconds (None keeps them until evicted). ``get_or_generate`` runs a
+    generation once for any number of concurrent identical requests. Caching a sampled
+    (temperature > 0) response pins that sample for its key; pass a ``seed`` in the params,
+    or skip the cache, where variety matters.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_BYTES, ttl: Optional[float] = None, disk: Optional[DiskCache] = None) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[Tuple[int, str], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    # memory tier
+
+    def _remember(self, key: str, value: Any, size: int, expires_at: Optional[float]) -> None:
+        # caller holds the lock
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, expires_at)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, dropped, _) = self._entries.popitem(last=False)
+            self._bytes -= dropped
+            self._stats.evictions += 1
+
+    def _memory_lookup(self, key: str) -> Tuple[bool, Any]:
+        now = time.time()
+        with self._lock:
+            rec = self._entries.get(key)
+            if rec is not None:
+                if rec[2] is None or rec[2] > now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return True, rec[0]
+                del self._entries[key]
+                self._bytes -= rec[1]
+                self._stats.expirations += 1
+        return False, None
+
+    def _disk_lookup(self, key: str) -> Tuple[bool, Any]:
+        hit = self.disk.get(key)
+        if hit is None:
+            return False, None
+        value, expires_at = hit
+        with self._lock:
+            self._remember(key, value, len(encode(value)), expires_at)
+            self._stats.disk_hits += 1
+        return True, value
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        found, value = self._memory_lookup(key)
+        if not found and self.disk is not None:
+            found, value = self._disk_lookup(key)
+        return found, value
+
+    async def _alookup(self, key: str) -> Tuple[bool, Any]:
+        # the disk tier is SQLite; keep its reads off the event loop
+        found, value = self._memory_lookup(key)
+        if not found and self.disk is not None:
+            found, value = await asyncio.to_thread(self._disk_lookup, key)
+        return found, value
+
+    def get(self, key: str) -> Optional[Any]:
+        found, value = self._lookup(key)
+        return value if found else None
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        data = encode(value)
+        with self._lock:
+            self._remember(key, value, len(data), time.time() + ttl if ttl is not None else None)
+        if self.disk is not None:
+            self.disk.put(key, value, ttl)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            rec = self._entries.pop(key, None)
+            if rec is not None:
+                self._bytes -= rec[1]
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**asdict(self._stats), "entries": len(self._entries), "bytes": self._bytes})
+
+    # generation
+
+    def get_or_generate(
+        self, model: str, messages: Messages, params: Optional[Dict[str, Any]],
+        generate: Callable[[], Any], ttl: Optional[float] = None,
+    ) -> Any:
+        """The cached response for this request, or ``generate()``'s result, cached.
+
+        While a generation for a key is running, other threads asking for the same key wait
+        for it and share its result (or its exception). Failures are not cached.
+        """
+        key = prompt_key(model, messages, params)
+        found, value = self._lookup(key)
+        if found:
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            found, value = self._lookup(key)  # a flight that just finished may have filled it
+            if not found:
+                with self._lock:
+                    self._stats.misses += 1
+                value = generate()
+                self.put(key, value, ttl)
+            flight.value = value
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    async def aget_or_generate(
+        self, model: str, messages: Messages, params: Optional[Dict[str, Any]],
+        generate: Callable[[], Awaitable[Any]], ttl: Optional[float] = None,
+    ) -> Any:
+        """get_or_generate for coroutines; identical requests on one event loop share a generation.
+
+        If the task running the generation is cancelled, the generation stops. Its waiters
+        are not cancelled: one of them starts the generation again.
+        """
+        key = prompt_key(model, messages, params)
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        while True:
+            found, value = await self._alookup(key)
+            if found:
+                return value
+            pending = self._async_flights.get(slot)
+            if pending is None:
+                break
+            with self._lock:
+                self._stats.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except _Abandoned:
+                with self._lock:
+                    self._stats.coalesced -= 1
+        future = self._async_flights[slot] = loop.create_future()
+        try:
+            with self._lock:
+                self._stats.misses += 1
+            value = await generate()
+            await asyncio.to_thread(self.put, key, value, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; waiters re-raise it themselves
+            raise
+        finally:
+            del self._async_flights[slot]
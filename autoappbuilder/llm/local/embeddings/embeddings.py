@@ -0,0 +1,345 @@
+"""Text embeddings for workspace indexing.
+
+``EmbeddingService.embed`` takes any iterable of texts and returns one contiguous float32
+array, one row per text in input order. Texts not yet cached are deduplicated, sorted by
+length and embedded in batches of similar lengths, so a model pads little. An
+``EmbeddingCache`` keeps vectors in a memory-mapped file keyed by content hash, so
+re-indexing an unchanged workspace only does lookups.
+
+``HashingEmbedder`` needs nothing beyond NumPy and works offline, so it is the fallback
+whenever sentence-transformers or its model is unavailable.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from hashlib import blake2b
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # sentence-transformers is optional (autobuilder[llm])
+    SentenceTransformer = None
+
+KEY_BYTES = 16
+# an acronym ends where a capitalised word begins: HTTPServer -> HTTP Server, parseURL -> parse URL
+_WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z][a-z0-9]*|[A-Z]+|\d+|[^\sA-Za-z0-9]")
+
+
+class Embedder:
+    """Maps a batch of texts to a ``[n, dim]`` float32 array of unit vectors."""
+
+    name = "embedder"
+    dim = 0
+
+    def length(self, text: str) -> int:
+        """Cost of a text for batching, roughly its token count."""
+        return len(text) // 4 + 1
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+def _signed_hash(feature: str, dim: int) -> int:
+    """Column + 1, negated for half the features, so collisions cancel on average."""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim + 1 if h & 0x80000000 else -(h % dim + 1)
+
+
+class HashingEmbedder(Embedder):
+    """Feature hashing over words, word bigrams and character n-grams; deterministic across
+    runs and machines.
+
+    Identifiers are split on camelCase and snake_case, so ``parseConfig`` and
+    ``parse_config`` share features. Counts are log-scaled and rows L2-normalised, so dot
+    products are cosines. Hashed features are memoized per word, since code repeats the
+    same identifiers constantly.
+    """
+
+    name = "hashing"
+    MEMO_WORDS = 1 << 17
+
+    def __init__(self, dim: int = 384, ngrams: Tuple[int, ...] = (3, 4)) -> None:
+        self.dim = dim
+        self.ngrams = ngrams
+        self._words: Dict[str, List[int]] = {}
+        self._pairs: Dict[Tuple[str, str], int] = {}
+
+    def _word(self, word: str) -> List[int]:
+        padded = f"<{word}>"
+        feats = ["w:" + word] + [
+            "c:" + padded[i:i + n] for n in self.ngrams for i in range(max(1, len(padded) - n + 1))
+        ]
+        if len(self._words) >= self.MEMO_WORDS:
+            self._words.clear()
+        ids = self._words[word] = [_signed_hash(f, self.dim) for f in feats]
+        return ids
+
+    def _pair(self, pair: Tuple[str, str]) -> int:
+        if len(self._pairs) >= self.MEMO_WORDS:
+            self._pairs.clear()
+        h = self._pairs[pair] = _signed_hash("b:" + pair[0] + " " + pair[1], self.dim)
+        return h
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        words_memo, pairs_memo = self._words, self._pairs
+        dim = self.dim
+        ids: List[int] = []
+        bounds = [0]
+        for text in texts:
+            words = [w.lower() for w in _WORD.findall(text)]
+            for w in words:
+                ids += words_memo.get(w) or self._word(w)
+            ids += [pairs_memo.get(p) or self._pair(p) for p in zip(words, words[1:])]
+            bounds.append(len(ids))
+        signed = np.asarray(ids, dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), np.diff(bounds))
+        counts = np.bincount(rows * dim + np.abs(signed) - 1, weights=np.sign(signed),
+                             minlength=len(texts) * dim).reshape(len(texts), dim)
+        out = (np.sign(counts) * np.log1p(np.abs(counts))).astype(np.float32)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return np.divide(out, norms, out=out, where=norms > 0)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """A sentence-transformers model; batches arrive pre-sorted by length, so padding stays small."""
+
+    def __init__(self, model: str, device: Optional[str] = None) -> None:
+        self.model = SentenceTransformer(model, device=device)
+        self.name = model
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.tokenizer = getattr(self.model, "tokenizer", None)
+
+    def length(self, text: str) -> int:
+        if self.tokenizer is None:
+            return super().length(text)
+        tokens = len(self.tokenizer(text, add_special_tokens=False, verbose=False)["input_ids"]) + 2
+        return min(tokens, self.model.max_seq_length or tokens)  # the model truncates the rest
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def default_embedder(model: Optional[str] = None) -> Embedder:
+    """``model`` (default: AUTOBUILDER_EMBED_MODEL) through sentence-transformers when it can
+    load, else the hashing embedder."""
+    model = model or os.environ.get("AUTOBUILDER_EMBED_MODEL")
+    if model and model != HashingEmbedder.name and SentenceTransformer is not None:
+        try:
+            return SentenceTransformerEmbedder(model)
+        except (OSError, ValueError):  # model not downloaded and no network
+            pass
+    return HashingEmbedder()
+
+
+def content_key(text: str) -> bytes:
+    return blake2b(text.encode("utf-8", "surrogatepass"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """Vectors for one embedder, memory-mapped and keyed by content hash.
+
+    ``vectors.f32`` holds rows of ``dim`` float32s and grows by doubling; ``keys.bin``
+    holds the 16-byte key of each row, appended once the rows are flushed, so a key never
+    points at a vector that was not written. One writing process per directory.
+    """
+
+    def __init__(self, root: Path, embedder: Embedder, initial_rows: int = 1024) -> None:
+        self.dir = Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{embedder.name}-{embedder.dim}")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.dim = embedder.dim
+        self._lock = threading.Lock()
+        meta_path = self.dir / "meta.json"
+        meta = {"name": embedder.name, "dim": self.dim, "dtype": "float32"}
+        if meta_path.exists():
+            found = json.loads(meta_path.read_text())
+            if found != meta:
+                raise ValueError(f"embedding cache {self.dir} was written for {found}, not {meta}")
+        else:
+            meta_path.write_text(json.dumps(meta))
+        keys = (self.dir / "keys.bin").read_bytes() if (self.dir / "keys.bin").exists() else b""
+        self._vectors_path = self.dir / "vectors.f32"
+        stored = self._vectors_path.stat().st_size // (4 * self.dim) if self._vectors_path.exists() else 0
+        count = min(len(keys) // KEY_BYTES, stored)
+        self._index: Dict[bytes, int] = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(count)}
+        self._count = count
+        self._keys = open(self.dir / "keys.bin", "r+b" if keys else "wb")
+        self._keys.truncate(count * KEY_BYTES)
+        self._keys.seek(count * KEY_BYTES)
+        self._map: Optional[np.memmap] = None
+        self._open(max(stored, initial_rows))
+
+    def _open(self, rows: int) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < rows * 4 * self.dim:
+                f.truncate(rows * 4 * self.dim)
+        self._map = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def lookup(self, keys: Sequence[bytes]) -> np.ndarray:
+        """Row of each key in the store, or -1."""
+        index = self._index
+        return np.fromiter((index.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def rows(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self._map[rows])  # fancy indexing copies out of the map
+
+    def get_many(self, keys: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectors for the keys found, and a mask of which keys were found."""
+        rows = self.lookup(keys)
+        found = rows >= 0
+        return self.rows(rows[found]), found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        with self._lock:
+            fresh = [i for i, k in enumerate(keys) if k not in self._index]
+            fresh = list({keys[i]: i for i in fresh}.values())  # a key repeated in one call is stored once
+            if not fresh:
+                return
+            start = self._count
+            end = start + len(fresh)
+            if end > self._map.shape[0]:
+                self._open(max(end, self._map.shape[0] * 2))
+            self._map[start:end] = vectors[fresh]
+            self._map.flush()
+            self._keys.write(b"".join(keys[i] for i in fresh))
+            self._keys.flush()
+            for offset, i in enumerate(fresh):
+                self._index[keys[i]] = start + offset
+            self._count = end
+
+    def flush(self) -> None:
+        with self._lock:
+            self._map.flush()
+            self._keys.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map = None
+            self._keys.close()
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@dataclass
+class EmbeddingStats:
+    texts: int = 0
+    cache_hits: int = 0
+    embedded: int = 0
+    batches: int = 0
+    length_sum: int = 0  # summed lengths of embedded texts
+    padded_sum: int = 0  # what they cost padded to the longest text of their batch
+
+    @property
+    def hit_rate(self) -> float:
+        return self.cache_hits / self.texts if self.texts else 0.0
+
+    @property
+    def padding_efficiency(self) -> float:
+        return self.length_sum / self.padded_sum if self.padded_sum else 1.0
+
+
+class EmbeddingService:
+    """Embeds iterables of texts through an embedder, with an optional cache.
+
+    Batches hold at most ``batch_size`` texts and ``max_batch_tokens`` padded tokens
+    (the longest text times the batch size), so long texts go in smaller batches.
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 64, max_batch_tokens: int = 16384) -> None:
+        self.embedder = embedder or default_embedder()
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.stats = EmbeddingStats()
+
+    @property
+    def dim(self) -> int:
+        return self.embedder.dim
+
+    def batches(self, texts: Sequence[str]) -> Iterator[List[int]]:
+        """Indexes into ``texts``, grouped by length, shortest first."""
+        return self._batches([self.embedder.length(t) for t in texts])
+
+    def _batches(self, lengths: List[int]) -> Iterator[List[int]]:
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batch: List[int] = []
+        for i in order:
+            # sorted ascending, so the new text is the longest in the batch
+            if batch and (len(batch) >= self.batch_size or lengths[i] * (len(batch) + 1) > self.max_batch_tokens):
+                yield batch
+                batch = []
+            batch.append(i)
+        if batch:
+            yield batch
+
+    def _embed_new(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        lengths = [self.embedder.length(t) for t in texts]
+        for batch in self._batches(lengths):
+            out[batch] = self.embedder.embed_batch([texts[i] for i in batch])
+            self.stats.batches += 1
+            self.stats.length_sum += sum(lengths[i] for i in batch)
+            self.stats.padded_sum += lengths[batch[-1]] * len(batch)
+        return out
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """A C-contiguous ``[n, dim]`` float32 array, one row per text in input order."""
+        texts = texts if isinstance(texts, list) else list(texts)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return out
+        keys = [content_key(t) for t in texts]
+        todo = np.arange(len(texts))
+        if self.cache is not None:
+            rows = self.cache.lookup(keys)
+            found = rows >= 0
+            if found.any():
+                out[found] = self.cache.rows(rows[found])
+            todo = np.flatnonzero(~found)
+        self.stats.texts += len(texts)
+        self.stats.cache_hits += len(texts) - len(todo)
+        if len(todo):
+            # embed each distinct text once
+            first: Dict[bytes, int] = {}
+            for i in todo.tolist():
+                first.setdefault(keys[i], i)
+            unique = list(first.values())
+            vectors = self._embed_new([texts[i] for i in unique])
+            self.stats.embedded += len(unique)
+            slot = {keys[i]: n for n, i in enumerate(unique)}
+            out[todo] = vectors[[slot[keys[i]] for i in todo.tolist()]]
+            if self.cache is not None:
+                self.cache.put_many([keys[i] for i in unique], vectors)
+        return out
+
+    def embed_iter(self, texts: Iterable[str], window: int = 4096) -> Iterator[np.ndarray]:
+        """Embed a long or unbounded iterable ``window`` texts at a time, yielding one array per window."""
+        it = iter(texts)
+        while chunk := list(islice(it, window)):
+            yield self.embed(chunk)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
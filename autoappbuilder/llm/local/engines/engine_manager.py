@@ -0,0 +1,469 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from ....exceptions import QueueFullError
+from ..backends import create_runtime
+from ..backends.base import Generation, Prompt, Runtime
+from ..sampling.stopping import StopMatcher, StopStream
+from .model_registry import ModelSpec, read_yaml
+from .model_resolver import ModelResolver
+
+DEFAULTS_PATH = Path(__file__).resolve().parents[1] / "config" / "defaults.yaml"
+MEMORY_BUDGET_MB = 8192.0
+IDLE_TIMEOUT = 600.0
+MAX_QUEUE = 256
+MAX_TOKENS = 512
+_WINDOW = 1024  # recent requests kept for latency percentiles
+
+# Called on the engine thread with each new piece of text; returning False stops the generation
+TokenCallback = Callable[[str], Optional[bool]]
+
+
+@dataclass
+class Completion:
+    id: str
+    model: str
+    text: str
+    tokens: int
+    finish_reason: str  # "eos", "length", "stop" or "cancelled"
+    queue_wait: float  # seconds from submit to admission into a batch
+    ttft: Optional[float]  # seconds from submit to the first token
+    duration: float  # seconds from submit to completion
+
+
+class EngineMetrics:
+    """Throughput and latency of one model, kept across unloads and reloads."""
+
+    def __init__(self) -> None:
+        self.requests = self.completed = self.failed = 0
+        self.tokens = self.steps = self.batched = 0
+        self.decode_seconds = 0.0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.queue_waits: Deque[float] = deque(maxlen=_WINDOW)
+        self.ttfts: Deque[float] = deque(maxlen=_WINDOW)
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict[str, float]:
+        if not samples:
+            return {"avg": 0.0, "p50": 0.0, "p95": 0.0}
+        s = sorted(samples)
+        return {
+            "avg": round(sum(s) / len(s) * 1000, 3),
+            "p50": round(s[len(s) // 2] * 1000, 3),
+            "p95": round(s[min(len(s) - 1, int(len(s) * 0.95))] * 1000, 3),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests, "completed": self.completed, "failed": self.failed,
+            "tokens": self.tokens, "steps": self.steps,
+            "tokens_per_s": round(self.tokens / self.decode_seconds, 1) if self.decode_seconds else 0.0,
+            "avg_batch": round(self.batched / self.steps, 2) if self.steps else 0.0,
+            "loads": self.loads, "load_seconds": round(self.load_seconds, 3),
+            "queue_wait_ms": self._summary(self.queue_waits), "ttft_ms": self._summary(self.ttfts),
+        }
+
+
+@dataclass
+class _Request:
+    gen: Generation
+    future: Future
+    on_token: Optional[TokenCallback]
+    stop: Optional[StopStream]
+    submitted: float
+    admitted: float = 0.0
+    first_token: Optional[float] = None
+
+
+@lru_cache(maxsize=256)
+def _stop_matcher(stops: Tuple[str, ...]) -> StopMatcher:
+    return StopMatcher(stops)
+
+
+class _Engine:
+    def __init__(self, spec: ModelSpec, runtime: Runtime, metrics: EngineMetrics) -> None:
+        self.spec = spec
+        self.runtime = runtime
+        self.metrics = metrics
+        self.waiting: Deque[_Request] = deque()
+        self.active: List[_Request] = []
+        self.state = "loading"  # loading -> ready <-> evicting -> closed
+        self.reserved = False
+        self.last_used = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        return not self.waiting and not self.active
+
+
+class EngineManager:
+    """One loaded model per resolved spec, each serving a request queue with continuous batching.
+
+    Each model runs on its own thread. Requests queue per model and join the running batch
+    between decode steps, up to the runtime's ``max_batch``, so a long generation never holds
+    up a short one. Text streams to each request's ``on_token`` callback.
+
+    Loaded models count their spec's ``memory_mb`` against ``memory_budget_mb``. A model that
+    does not fit evicts idle models, least recently used first; while every other model is busy
+    it waits for one to go idle. Models idle for ``idle_timeout`` seconds are unloaded too.
+    """
+
+    def __init__(
+        self, resolver: ModelResolver, memory_budget_mb: float = MEMORY_BUDGET_MB,
+        idle_timeout: Optional[float] = IDLE_TIMEOUT, max_queue: int = MAX_QUEUE, max_tokens: int = MAX_TOKENS,
+        runtime_factory: Callable[[ModelSpec], Runtime] = create_runtime,
+    ) -> None:
+        self.resolver = resolver
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout = idle_timeout
+        self.max_queue = max_queue
+        self.max_tokens = max_tokens
+        self.runtime_factory = runtime_factory
+        self._cond = threading.Condition()
+        self._engines: "OrderedDict[str, _Engine]" = OrderedDict()  # least recently used first
+        self._metrics: Dict[str, EngineMetrics] = {}
+        self._threads: List[threading.Thread] = []
+        self._resident_mb = 0.0
+        self.evictions = 0
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, resolver: Optional[ModelResolver] = None, path: Path = DEFAULTS_PATH) -> "EngineManager":
+        """Settings from config/defaults.yaml, overridden by AUTOBUILDER_LLM_MEMORY_MB,
+        AUTOBUILDER_LLM_IDLE_S and AUTOBUILDER_LLM_MAX_QUEUE."""
+        config = read_yaml(path) or {}
+        cfg = config.get("engine") or {}
+        env = os.environ.get
+        idle = env("AUTOBUILDER_LLM_IDLE_S", cfg.get("idle_timeout_s", IDLE_TIMEOUT))
+        return cls(
+            resolver or ModelResolver.load(),
+            memory_budget_mb=float(env("AUTOBUILDER_LLM_MEMORY_MB", cfg.get("memory_budget_mb", MEMORY_BUDGET_MB))),
+            idle_timeout=float(idle) if idle not in (None, "", "none") else None,
+            max_queue=int(env("AUTOBUILDER_LLM_MAX_QUEUE", cfg.get("max_queue", MAX_QUEUE))),
+            max_tokens=int((config.get("generation") or {}).get("max_tokens", MAX_TOKENS)),
+        )
+
+    # requests
+
+    def submit(
+        self, model: Union[str, ModelSpec], prompt: Prompt, params: Optional[Dict[str, Any]] = None,
+        on_token: Optional[TokenCallback] = None,
+    ) -> "Future[Completion]":
+        """Queue a generation; the future resolves to a Completion.
+
+        ``model`` is a spec, or a model name, alias or role for the resolver. ``params`` holds
+        sampling options for the backend plus ``max_tokens`` and ``stop`` (a string or list),
+        which the engine applies itself. Raises QueueFullError when the model's queue is full.
+        """
+        spec = model if isinstance(model, ModelSpec) else self.resolver.resolve(model)
+        params = dict(params or {})
+        stop = params.get("stop") or ()
+        matcher = _stop_matcher((stop,) if isinstance(stop, str) else tuple(stop))
+        req = _Request(
+            Generation(uuid4().hex, prompt, params, int(params.get("max_tokens") or self.max_tokens)),
+            Future(), on_token, matcher.stream() if matcher else None, time.monotonic(),
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("engine manager is closed")
+            eng = self._engines.get(spec.name)
+            if eng is None:
+                eng = self._start_engine(spec)
+            if len(eng.waiting) >= self.max_queue:
+                raise QueueFullError(f"{len(eng.waiting)} requests already queued for {spec.name}")
+            if eng.state == "evicting":
+                eng.state = "ready"  # wanted again before it unloaded
+            eng.waiting.append(req)
+            eng.metrics.requests += 1
+            eng.last_used = req.submitted
+            self._engines.move_to_end(spec.name)
+            self._cond.notify_all()
+        return req.future
+
+    def generate(self, model: Union[str, ModelSpec], prompt: Prompt, params: Optional[Dict[str, Any]] = None,
+                 on_token: Optional[TokenCallback] = None, timeout: Optional[float] = None) -> Completion:
+        return self.submit(model, prompt, params, on_token).result(timeout)
+
+    async def agenerate(self, model: Union[str, ModelSpec], prompt: Prompt, params: Optional[Dict[str, Any]] = None,
+                        on_token: Optional[TokenCallback] = None) -> Completion:
+        return await asyncio.wrap_future(self.submit(model, prompt, params, on_token))
+
+    async def astream(self, model: Union[str, ModelSpec], prompt: Prompt, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Yield text pieces as they are decoded."""
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        future = self.submit(model, prompt, params, lambda piece: loop.call_soon_threadsafe(queue.put_nowait, piece))
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(queue.put_nowait, None))
+        while (piece := await queue.get()) is not None:
+            yield piece
+        future.result()  # raise the generation's error, if any
+
+    # engines
+
+    def _start_engine(self, spec: ModelSpec) -> _Engine:
+        # caller holds the lock
+        metrics = self._metrics.setdefault(spec.name, EngineMetrics())
+        eng = self._engines[spec.name] = _Engine(spec, self.runtime_factory(spec), metrics)
+        thread = threading.Thread(target=self._run, args=(eng,), name=f"engine-{spec.name}", daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+        return eng
+
+    def _reserve(self, eng: _Engine) -> None:
+        """Wait until eng's memory fits the budget, evicting idle models to make room."""
+        need = eng.spec.memory_mb
+        with self._cond:
+            while self._resident_mb > 0 and self._resident_mb + need > self.memory_budget_mb:
+                if self._closed:
+                    raise RuntimeError("engine manager is closed")
+                victim = next((e for e in self._engines.values()
+                               if e is not eng and e.state == "ready" and e.idle), None)
+                if victim is not None:
+                    victim.state = "evicting"
+                    self.evictions += 1
+                    self._cond.notify_all()
+                self._cond.wait(1.0)  # for the victim to unload, or for a busy model to go idle
+            self._resident_mb += need
+            eng.reserved = True
+
+    def _run(self, eng: _Engine) -> None:
+        try:
+            self._reserve(eng)
+            t0 = time.perf_counter()
+            eng.runtime.load()
+        except BaseException as e:
+            self._shutdown(eng, e, unload=False)
+            return
+        with self._cond:
+            eng.metrics.loads += 1
+            eng.metrics.load_seconds += time.perf_counter() - t0
+            if eng.state == "loading":
+                # close() only flags loaded engines; one that finished loading after it must not wait for work
+                eng.state = "evicting" if self._closed else "ready"
+            self._cond.notify_all()
+        error: Optional[BaseException] = None
+        try:
+            self._serve(eng)
+        except BaseException as e:  # a bug in the loop itself; fail what is left rather than hang
+            error = e
+        self._shutdown(eng, error or RuntimeError("engine stopped"), unload=True, handoff=error is None)
+
+    def _shutdown(self, eng: _Engine, error: BaseException, unload: bool, handoff: bool = False) -> None:
+        """Stop eng, failing its requests; with ``handoff``, queued requests move to a new engine.
+
+        Requests can be queued between the serve loop giving up and this point; when the engine
+        stopped normally (evicted or timed out) they are not its fault, so they are kept.
+        """
+        with self._cond:
+            eng.state = "closed"
+            if self._engines.get(eng.spec.name) is eng:
+                del self._engines[eng.spec.name]
+            moved = list(eng.waiting) if handoff and not self._closed else []
+            leftover = list(eng.active) + ([] if moved else list(eng.waiting))
+            eng.active.clear()
+            eng.waiting.clear()
+        for req in leftover:
+            self._fail(eng, req, error)
+        if unload:
+            try:
+                eng.runtime.unload()
+            except Exception:
+                pass
+        with self._cond:
+            if eng.reserved:
+                self._resident_mb -= eng.spec.memory_mb
+                eng.reserved = False
+            if moved and not self._closed:
+                # after releasing memory, so the new engine's reservation does not evict others for it
+                successor = self._engines.get(eng.spec.name) or self._start_engine(eng.spec)
+                successor.waiting.extendleft(reversed(moved))
+                moved = []
+            self._cond.notify_all()
+        for req in moved:  # the manager closed meanwhile
+            self._fail(eng, req, error)
+
+    def _serve(self, eng: _Engine) -> None:
+        runtime, m = eng.runtime, eng.metrics
+        while True:
+            with self._cond:
+                while eng.idle and eng.state == "ready" and not self._closed:
+                    if self.idle_timeout is None:
+                        self._cond.wait()
+                        continue
+                    remaining = eng.last_used + self.idle_timeout - time.monotonic()
+                    if remaining <= 0:
+                        eng.state = "evicting"
+                        self.evictions += 1
+                        break
+                    self._cond.wait(remaining)
+                if eng.idle:  # evicting or closing with nothing left to do
+                    return
+                admitted = []
+                while eng.waiting and len(eng.active) < runtime.max_batch:
+                    req = eng.waiting.popleft()
+                    if req.future.set_running_or_notify_cancel():
+                        eng.active.append(req)
+                        admitted.append(req)
+            now = time.monotonic()
+            failed = []
+            for req in admitted:
+                req.admitted = now
+                m.queue_waits.append(now - req.submitted)
+                try:
+                    runtime.start(req.gen)
+                except Exception as e:
+                    self._fail(eng, req, e)
+                    failed.append(req)
+            batch = [r for r in eng.active if r not in failed]
+            finished: List[_Request] = list(failed)
+            if batch:
+                finished += self._step(eng, batch)
+            with self._cond:
+                for req in finished:
+                    eng.active.remove(req)
+                eng.last_used = time.monotonic()
+                if eng.idle:
+                    self._cond.notify_all()
+
+    def _step(self, eng: _Engine, batch: List[_Request]) -> List[_Request]:
+        """Decode one token for every request in the batch; returns the requests that finished."""
+        m = eng.metrics
+        t0 = time.perf_counter()
+        try:
+            pieces = eng.runtime.step([r.gen for r in batch])
+        except Exception as e:
+            for req in batch:
+                self._fail(eng, req, e)
+            return batch
+        m.decode_seconds += time.perf_counter() - t0
+        m.steps += 1
+        m.batched += len(batch)
+        now = time.monotonic()
+        finished = []
+        for req, piece in zip(batch, pieces):
+            gen = req.gen
+            reason = None
+            if piece is None and gen.error is not None:
+                self._fail(eng, req, gen.error)
+                finished.append(req)
+                continue
+            if piece is None:
+                reason = "eos"
+            else:
+                gen.tokens += 1
+                m.tokens += 1
+                if req.first_token is None:
+                    req.first_token = now
+                    m.ttfts.append(now - req.submitted)
+                try:
+                    reason = self._emit(req, piece)
+                except Exception as e:  # the caller's callback failed
+                    self._fail(eng, req, e)
+                    finished.append(req)
+                    continue
+                if reason is None and gen.tokens >= gen.max_tokens:
+                    reason = "length"
+            if reason is not None:
+                self._complete(eng, req, reason)
+                finished.append(req)
+        return finished
+
+    def _emit(self, req: _Request, piece: str) -> Optional[str]:
+        """Pass on text that cannot be part of a stop string; returns a finish reason or None."""
+        reason = None
+        if req.stop is not None:
+            piece, stopped = req.stop.feed(piece)
+            reason = "stop" if stopped else None
+        if piece:
+            req.gen.pieces.append(piece)
+            if req.on_token is not None and req.on_token(piece) is False:
+                reason = reason or "cancelled"
+        return reason
+
+    def _complete(self, eng: _Engine, req: _Request, reason: str) -> None:
+        text = req.stop.flush() if req.stop is not None else ""
+        if text:
+            # the held-back tail; a callback error no longer matters at this point
+            req.gen.pieces.append(text)
+            if req.on_token is not None:
+                try:
+                    req.on_token(text)
+                except Exception:
+                    pass
+        self._release(eng, req)
+        gen, now = req.gen, time.monotonic()
+        gen.finish_reason = reason
+        eng.metrics.completed += 1
+        req.future.set_result(Completion(
+            gen.id, eng.spec.name, gen.text, gen.tokens, reason, req.admitted - req.submitted,
+            req.first_token - req.submitted if req.first_token is not None else None, now - req.submitted,
+        ))
+
+    def _fail(self, eng: _Engine, req: _Request, error: BaseException) -> None:
+        self._release(eng, req)
+        eng.metrics.failed += 1
+        if req.future.done():
+            return
+        if not req.future.running() and not req.future.set_running_or_notify_cancel():
+            return
+        req.future.set_exception(error)
+
+    @staticmethod
+    def _release(eng: _Engine, req: _Request) -> None:
+        try:
+            eng.runtime.release(req.gen)
+        except Exception:
+            pass
+
+    # introspection and shutdown
+
+    def loaded(self) -> List[str]:
+        with self._cond:
+            return [name for name, e in self._engines.items() if e.state in ("ready", "evicting")]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            models = {name: m.snapshot() for name, m in self._metrics.items()}
+            for name, eng in self._engines.items():
+                models[name].update(state=eng.state, queued=len(eng.waiting), active=len(eng.active))
+            return {
+                "memory_budget_mb": self.memory_budget_mb, "resident_mb": self._resident_mb,
+                "evictions": self.evictions, "models": models,
+            }
+
+    def unload(self, model: Union[str, ModelSpec]) -> None:
+        """Unload a model once its queued requests are done."""
+        spec = model if isinstance(model, ModelSpec) else self.resolver.resolve(model)
+        with self._cond:
+            eng = self._engines.get(spec.name)
+            if eng is not None and eng.state == "ready":
+                eng.state = "evicting"
+                self._cond.notify_all()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish queued requests, then unload every model."""
+        with self._cond:
+            self._closed = True
+            for eng in self._engines.values():
+                if eng.state == "ready":
+                    eng.state = "evicting"
+            self._cond.notify_all()
+            threads = list(self._threads)
+        for t in threads:
+            t.join(timeout)
+
+    def __enter__(self) -> "EngineManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,77 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ....exceptions import BackendUnavailableError
+from ....parser.validator import load_validator
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional (autobuilder[llm])
+    yaml = None
+
+SPECS_PATH = Path(__file__).with_name("model_specs.yaml")
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "config" / "schema.json"
+
+
+@dataclass
+class ModelSpec:
+    name: str
+    backend: str
+    model: str  # GGUF path, Ollama tag or Hugging Face id, depending on the backend
+    memory_mb: float = 0
+    max_batch: Optional[int] = None
+    context_length: int = 4096
+    aliases: Tuple[str, ...] = ()
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def read_yaml(path: Path) -> Any:
+    if yaml is None:
+        raise BackendUnavailableError(f"reading {path.name} needs PyYAML: pip install autobuilder[llm]")
+    return yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+
+
+class ModelRegistry:
+    """Model specs by name and alias."""
+
+    def __init__(self, specs: Iterable[ModelSpec] = ()) -> None:
+        self._specs: Dict[str, ModelSpec] = {}
+        self._names: Dict[str, str] = {}  # name or alias -> name
+        for spec in specs:
+            self.add(spec)
+
+    def add(self, spec: ModelSpec) -> None:
+        for key in (spec.name, *spec.aliases):
+            owner = self._names.get(key)
+            if owner is not None and owner != spec.name:
+                raise ValueError(f"{key!r} already names model {owner!r}")
+        self._specs[spec.name] = spec
+        for key in (spec.name, *spec.aliases):
+            self._names[key] = spec.name
+
+    def get(self, name: str) -> Optional[ModelSpec]:
+        key = self._names.get(name)
+        return self._specs[key] if key is not None else None
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def __iter__(self) -> Iterator[ModelSpec]:
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelRegistry":
+        """Build from parsed model_specs.yaml content; raises SchemaValidationError if malformed."""
+        load_validator(SCHEMA_PATH).validate(data)
+        return cls(
+            ModelSpec(name=name, **{**entry, "aliases": tuple(entry.get("aliases") or ())})
+            for name, entry in data["models"].items()
+        )
+
+    @classmethod
+    def load(cls, path: Path = SPECS_PATH) -> "ModelRegistry":
+        return cls.from_dict(read_yaml(path))
@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ....exceptions import ModelNotFoundError
+from .. import backends
+from .model_registry import ModelRegistry, ModelSpec, read_yaml
+
+SELECTION_PATH = Path(__file__).resolve().parents[1] / "config" / "selection.yaml"
+
+
+class ModelResolver:
+    """Maps a model name, alias or pipeline role to a spec.
+
+    A name or alias resolves to its spec as is. A role resolves to the first of its
+    preferred models whose backend can run here (see config/selection.yaml); roles without
+    their own list use ``default``.
+    """
+
+    def __init__(
+        self, registry: ModelRegistry, roles: Optional[Dict[str, Sequence[str]]] = None,
+        default: Sequence[str] = (), is_available: Callable[[ModelSpec], bool] = backends.available,
+    ) -> None:
+        self.registry = registry
+        self.roles = {role: list(models) for role, models in (roles or {}).items()}
+        self.default = list(default)
+        self.is_available = is_available
+
+    @classmethod
+    def load(cls, registry: Optional[ModelRegistry] = None, path: Path = SELECTION_PATH) -> "ModelResolver":
+        data = read_yaml(path) or {}
+        return cls(registry or ModelRegistry.load(), data.get("roles"), data.get("default") or ())
+
+    def candidates(self, role: str) -> List[str]:
+        return self.roles.get(role, self.default)
+
+    def for_role(self, role: str) -> ModelSpec:
+        tried = self.candidates(role)
+        for name in tried:
+            spec = self.registry.get(name)
+            if spec is not None and self.is_available(spec):
+                return spec
+        raise ModelNotFoundError(f"no model for role {role!r} can run here (tried: {', '.join(tried) or 'none'})")
+
+    def resolve(self, name: str) -> ModelSpec:
+        spec = self.registry.get(name)
+        if spec is not None:
+            return spec
+        if name in self.roles or self.default:
+            return self.for_role(name)  # a role without its own list falls back to default
+        raise ModelNotFoundError(f"unknown model or role: {name!r}")
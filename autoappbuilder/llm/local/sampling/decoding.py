@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .sampling import Sampler, SamplingParams
+from .stopping import StopMatcher, StopStream
+
+PENALTY_WINDOW = 64  # recent tokens the repetition penalty looks at, as llama.cpp's repeat_last_n
+
+
+class TokenHistory:
+    """The last ``window`` tokens of each row, as a ``[batch, window]`` ring padded with -1."""
+
+    def __init__(self, batch: int, window: int = PENALTY_WINDOW) -> None:
+        self.tokens = np.full((batch, max(window, 1)), -1, dtype=np.int64)
+        self.count = np.zeros(batch, dtype=np.int64)
+
+    def extend(self, row: int, tokens: Iterable[int]) -> None:
+        for token in tokens:
+            self.tokens[row, self.count[row] % self.tokens.shape[1]] = token
+            self.count[row] += 1
+
+    def append(self, tokens: np.ndarray) -> None:
+        """Add one token to every row."""
+        rows = np.arange(len(tokens))
+        self.tokens[rows, self.count % self.tokens.shape[1]] = tokens
+        self.count += 1
+
+
+@dataclass
+class DecodeStep:
+    token: int
+    text: str  # new text safe to stream; held back while it may begin a stop string
+    finish_reason: Optional[str] = None  # "eos", "stop" or "length" once the row is done
+
+
+class BatchDecoder:
+    """Turns batched logits into tokens and streamed text for a fixed set of generations.
+
+    Applies each row's sampling settings, the repetition penalty over recent tokens, eos
+    ids, stop strings and ``max_tokens``. Rows that have finished are skipped; their
+    logits are ignored.
+    """
+
+    def __init__(
+        self, params: Sequence[SamplingParams], detokenize: Callable[[int], str],
+        eos_ids: Iterable[int] = (), stops: Optional[Sequence[Sequence[str]]] = None,
+        max_tokens: Optional[Sequence[int]] = None, penalty_window: int = PENALTY_WINDOW,
+        rng: Optional[np.random.Generator] = None,
+    ) -> None:
+        batch = len(params)
+        self.sampler = Sampler(params, rng)
+        self.detokenize = detokenize
+        self.eos_ids = np.fromiter(eos_ids, dtype=np.int64)
+        self.max_tokens = np.asarray(max_tokens if max_tokens is not None else [np.iinfo(np.int64).max] * batch)
+        self.history = TokenHistory(batch, penalty_window)
+        matchers: Dict[Tuple[str, ...], StopMatcher] = {}  # rows with the same stops share one automaton
+        self.stops: List[Optional[StopStream]] = []
+        for row_stops in stops or [()] * batch:
+            key = tuple(row_stops)
+            if key not in matchers:
+                matchers[key] = StopMatcher(key)
+            self.stops.append(matchers[key].stream() if matchers[key] else None)
+        self.generated = np.zeros(batch, dtype=np.int64)
+        self.finished: List[Optional[str]] = [None] * batch
+
+    def step(self, logits: np.ndarray) -> List[Optional[DecodeStep]]:
+        """One token for each unfinished row; None for rows already finished."""
+        tokens = self.sampler(logits, self.history.tokens)
+        self.history.append(tokens)
+        self.generated += 1
+        eos = np.isin(tokens, self.eos_ids) if self.eos_ids.size else np.zeros(len(tokens), dtype=bool)
+        out: List[Optional[DecodeStep]] = []
+        for row, token in enumerate(tokens.tolist()):
+            if self.finished[row]:
+                out.append(None)
+                continue
+            stream = self.stops[row]
+            if eos[row]:
+                step = DecodeStep(token, stream.flush() if stream else "", "eos")
+            else:
+                text = self.detokenize(token)
+                stopped = False
+                if stream is not None:
+                    text, stopped = stream.feed(text)
+                step = DecodeStep(token, text, "stop" if stopped else None)
+                if not stopped and self.generated[row] >= self.max_tokens[row]:
+                    step.text += stream.flush() if stream else ""
+                    step.finish_reason = "length"
+            self.finished[row] = step.finish_reason
+            out.append(step)
+        return out
+
+    @property
+    def done(self) -> bool:
+        return all(self.finished)
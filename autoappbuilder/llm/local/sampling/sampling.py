@@ -0,0 +1,220 @@
+"""Batched logit processors and samplers.
+
+Everything works on float logits shaped ``[batch, vocab]``, one row per generation, with the
+settings given per row, so one call serves a whole continuous batch. Masked tokens are set
+to -inf. No step loops over the vocabulary in Python, and no step sorts a full row unless
+top-p needs more than the top ``TOP_P_CANDIDATES`` tokens.
+
+``Sampler`` goes further when every row is truncated by top-k or top-p: it partitions each
+row once down to its candidates and runs the remaining steps on those alone, so a 256k
+vocabulary costs a few passes over the row instead of one per processor.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+# top-p first looks for its nucleus among this many highest logits; rows whose nucleus is
+# larger (nearly flat distributions) fall back to a full sort
+TOP_P_CANDIDATES = 1024
+
+Rows = Union[float, Sequence[float], np.ndarray]
+# one generator for the whole batch, or one per row
+RNG = Union[np.random.Generator, Sequence[np.random.Generator]]
+
+
+@dataclass
+class SamplingParams:
+    temperature: float = 1.0  # 0 picks the most likely token
+    top_k: int = 0  # 0 disables
+    top_p: float = 1.0
+    min_p: float = 0.0
+    repetition_penalty: float = 1.0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, params: dict) -> "SamplingParams":
+        """From request params, ignoring keys that are not sampling settings."""
+        fields = cls.__dataclass_fields__
+        alias = {"repeat_penalty": "repetition_penalty"}
+        return cls(**{alias.get(k, k): v for k, v in params.items() if alias.get(k, k) in fields and v is not None})
+
+
+def _column(value: Rows, batch: int, dtype=np.float32) -> np.ndarray:
+    """A per-row setting as a ``[batch, 1]`` column."""
+    return np.broadcast_to(np.asarray(value, dtype=dtype).reshape(-1, 1), (batch, 1))
+
+
+def log_softmax(logits: np.ndarray) -> np.ndarray:
+    top = logits.max(axis=-1, keepdims=True)
+    shifted = logits - np.where(np.isfinite(top), top, 0)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+
+def logsumexp(logits: np.ndarray) -> np.ndarray:
+    """Per-row log normalizer, shaped ``[batch, 1]``."""
+    top = logits.max(axis=-1, keepdims=True)
+    return np.log(np.exp(logits - top).sum(axis=-1, keepdims=True)) + top
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    e = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def apply_repetition_penalty(logits: np.ndarray, history: np.ndarray, penalty: Rows) -> np.ndarray:
+    """Make tokens already in ``history`` less likely (CTRL-style), in place.
+
+    ``history`` is ``[batch, n]`` token ids padded with -1. Positive logits are divided by the
+    penalty and negative ones multiplied, so a penalty above 1 always lowers them.
+    """
+    penalty = _column(penalty, logits.shape[0])
+    if history.size == 0 or np.all(penalty == 1):
+        return logits
+    rows, cols = np.nonzero(history >= 0)
+    tokens = history[rows, cols]
+    seen = logits[rows, tokens]
+    p = penalty[rows, 0]
+    # repeated ids write the same value, computed once from the original logit
+    logits[rows, tokens] = np.where(seen > 0, seen / p, seen * p)
+    return logits
+
+
+def apply_temperature(logits: np.ndarray, temperature: Rows) -> np.ndarray:
+    """Divide each row by its temperature, in place; rows at 0 are left for greedy picking."""
+    t = _column(temperature, logits.shape[0])
+    np.divide(logits, np.where(t > 0, t, 1), out=logits)
+    return logits
+
+
+def apply_top_k(logits: np.ndarray, k: Union[int, Sequence[int], np.ndarray]) -> np.ndarray:
+    """Keep each row's ``k`` highest logits (ties at the cut are kept); 0 disables, in place."""
+    batch, vocab = logits.shape
+    k = np.broadcast_to(np.asarray(k, dtype=np.int64).reshape(-1), (batch,))
+    active = (k > 0) & (k < vocab)
+    if not active.any():
+        return logits
+    kmax = int(k[active].max())
+    # partition once at the largest k, then sort only those kmax values per row
+    top = -np.sort(-np.partition(logits, vocab - kmax, axis=-1)[:, vocab - kmax:], axis=-1)
+    cut = top[np.arange(batch), np.clip(k, 1, kmax) - 1]
+    cut[~active] = -np.inf
+    logits[logits < cut[:, None]] = -np.inf
+    return logits
+
+
+def apply_top_p(logits: np.ndarray, p: Rows, log_norm: Optional[np.ndarray] = None) -> np.ndarray:
+    """Keep the smallest set of highest logits whose probability reaches ``p`` per row, in place.
+
+    ``log_norm`` (``[batch, 1]``) gives the rows' normalizers when ``logits`` holds only part
+    of each row, as when ``Sampler`` has narrowed it to candidates.
+    """
+    batch, vocab = logits.shape
+    p = np.broadcast_to(np.asarray(p, dtype=np.float64).reshape(-1), (batch,))
+    rows = np.flatnonzero(p < 1)
+    if rows.size == 0:
+        return logits
+    sub = logits[rows]
+    m = min(vocab, TOP_P_CANDIDATES)
+    top = -np.sort(-np.partition(sub, vocab - m, axis=-1)[:, vocab - m:], axis=-1)
+    norm = logsumexp(sub) if log_norm is None else log_norm[rows]
+    cum = np.exp(top - norm).cumsum(axis=-1)
+    reached = cum[:, -1] >= p[rows]
+    if not reached.all():  # nucleus larger than the candidates: sort those rows in full
+        full = -np.sort(-sub[~reached], axis=-1)
+        full_cum = np.exp(full - norm[~reached]).cumsum(axis=-1)
+        count = np.minimum((full_cum < p[rows][~reached, None]).sum(axis=-1) + 1, vocab)
+        cut_full = full[np.arange(len(full)), count - 1]
+    count = np.minimum((cum < p[rows][:, None]).sum(axis=-1) + 1, m)
+    cut = top[np.arange(len(rows)), count - 1]
+    if not reached.all():
+        cut[~reached] = cut_full
+    sub[sub < cut[:, None]] = -np.inf
+    logits[rows] = sub
+    return logits
+
+
+def apply_min_p(logits: np.ndarray, min_p: Rows) -> np.ndarray:
+    """Drop tokens less likely than ``min_p`` times the row's most likely token, in place."""
+    mp = _column(min_p, logits.shape[0]).astype(np.float64)
+    if not (mp > 0).any():
+        return logits
+    with np.errstate(divide="ignore"):
+        floor = logits.max(axis=-1, keepdims=True) + np.log(np.where(mp > 0, mp, 0))
+    logits[logits < floor] = -np.inf
+    return logits
+
+
+def sample_from_logits(logits: np.ndarray, rng: RNG, greedy: Optional[np.ndarray] = None) -> np.ndarray:
+    """Draw one token per row; rows flagged in ``greedy`` take their argmax."""
+    batch = logits.shape[0]
+    probs = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    cum = probs.cumsum(axis=-1)
+    draws = rng.random(batch) if isinstance(rng, np.random.Generator) else np.array([r.random() for r in rng])
+    # inverse CDF with a target in (0, total], so a zero-probability token is never chosen
+    target = (1.0 - draws) * cum[:, -1]
+    tokens = (cum < target[:, None]).sum(axis=-1)
+    if greedy is not None and greedy.any():
+        tokens[greedy] = logits[greedy].argmax(axis=-1)
+    return tokens
+
+
+class Sampler:
+    """Samples one token per row with per-row settings, in the usual order: repetition
+    penalty, temperature, top-k, top-p, min-p.
+
+    With one generator per row in ``rng``, a seeded row draws the same tokens whatever else
+    shares its batch.
+    """
+
+    def __init__(self, params: Sequence[SamplingParams], rng: Optional[RNG] = None) -> None:
+        self.params = list(params)
+        seeds = [p.seed for p in self.params if p.seed is not None]
+        self.rng = rng or np.random.default_rng(seeds[0] if seeds else None)
+        self.temperature = np.array([p.temperature for p in self.params], dtype=np.float32)
+        self.top_k = np.array([p.top_k or 0 for p in self.params], dtype=np.int64)
+        self.top_p = np.array([p.top_p for p in self.params], dtype=np.float64)
+        self.min_p = np.array([p.min_p for p in self.params], dtype=np.float64)
+        self.penalty = np.array([p.repetition_penalty for p in self.params], dtype=np.float32)
+
+    def _width(self, vocab: int) -> int:
+        """How many candidates per row cover every row's top-k or top-p, or 0 to use full rows."""
+        has_k = (self.top_k > 0) & (self.top_k < vocab)
+        if not (has_k | (self.top_p < 1)).all():
+            return 0
+        width = int(self.top_k[has_k].max()) if has_k.any() else 0
+        if not has_k.all():
+            width = max(width, TOP_P_CANDIDATES)
+        return width if width < vocab else 0
+
+    def __call__(self, logits: np.ndarray, history: Optional[np.ndarray] = None) -> np.ndarray:
+        logits = np.array(logits, dtype=np.float32)  # copy; processors work in place
+        if history is not None:
+            apply_repetition_penalty(logits, history, self.penalty)
+        greedy = self.temperature <= 0
+        if greedy.all():
+            return logits.argmax(axis=-1)
+        apply_temperature(logits, self.temperature)
+        vocab = logits.shape[1]
+        width = self._width(vocab)
+        if width:
+            index = np.argpartition(logits, vocab - width, axis=-1)[:, vocab - width:]
+            cand = np.take_along_axis(logits, index, axis=-1)
+            apply_top_k(cand, self.top_k)
+            # top-k renormalizes over what it keeps; rows without it need the full row's mass
+            norm = logsumexp(cand)
+            plain = (self.top_k <= 0) | (self.top_k >= vocab)
+            if plain.any():
+                norm[plain] = logsumexp(logits[plain])
+                mass = np.exp(logsumexp(cand[plain]) - norm[plain])[:, 0]
+                if (mass < self.top_p[plain]).any():
+                    width = 0  # a nucleus wider than the candidates: use full rows
+        if width:
+            apply_top_p(cand, self.top_p, norm)
+            apply_min_p(cand, self.min_p)
+            picked = sample_from_logits(cand, self.rng, greedy)
+            return index[np.arange(len(index)), picked]
+        apply_top_k(logits, self.top_k)
+        apply_top_p(logits, self.top_p)
+        apply_min_p(logits, self.min_p)
+        return sample_from_logits(logits, self.rng, greedy)
@@ -0,0 +1,103 @@
+"""Stop-sequence matching over streamed text.
+
+``StopMatcher`` compiles the stop strings into an Aho-Corasick automaton once. Each
+generation then runs a ``StopStream`` that feeds only the new characters, so matching costs
+O(1) amortized per character however long the output grows. The automaton state also tells
+how much trailing text could still turn into a stop string; that much is held back from
+the caller until it is resolved.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class StopMatcher:
+    def __init__(self, stops: Iterable[str]) -> None:
+        self.stops = tuple(dict.fromkeys(s for s in stops if s))
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.depth: List[int] = [0]
+        self.match: List[int] = [0]  # length of the longest stop string ending in this state, or 0
+        for stop in self.stops:
+            state = 0
+            for ch in stop:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = self.goto[state][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.depth.append(self.depth[state] + 1)
+                    self.match.append(0)
+                state = nxt
+            self.match[state] = len(stop)
+        # breadth-first, so every fail link points at a shallower, finished state
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                # a longer stop ending here starts earlier; prefer it
+                self.match[nxt] = self.match[nxt] or self.match[self.fail[nxt]]
+                queue.append(nxt)
+
+    def __bool__(self) -> bool:
+        return bool(self.stops)
+
+    def scan(self, state: int, text: str) -> Tuple[int, int, int]:
+        """Advance from ``state`` over ``text``.
+
+        Returns the new state, the index in ``text`` just past the first stop string found
+        (or -1), and that stop string's length.
+        """
+        goto, fail, match = self.goto, self.fail, self.match
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if match[state]:
+                return state, i + 1, match[state]
+        return state, -1, 0
+
+    def stream(self) -> "StopStream":
+        return StopStream(self)
+
+
+class StopStream:
+    """Streaming stop detection for one generation."""
+
+    def __init__(self, matcher: StopMatcher) -> None:
+        self.matcher = matcher
+        self.state = 0
+        self.pending = ""  # text held back because it may begin a stop string
+        self.stopped = False
+
+    def feed(self, piece: str) -> Tuple[str, bool]:
+        """Text that is now safe to pass on, and whether a stop string has been found.
+
+        Once stopped, the stop string and anything after it are dropped.
+        """
+        if self.stopped:
+            return "", True
+        self.state, end, length = self.matcher.scan(self.state, piece)
+        text = self.pending + piece
+        if end >= 0:
+            # the held-back text covers any part of the stop string from earlier pieces
+            start = len(self.pending) + end - length
+            self.stopped = True
+            self.pending = ""
+            return text[:start], True
+        keep = self.matcher.depth[self.state]
+        self.pending = text[len(text) - keep:] if keep else ""
+        return text[:len(text) - keep], False
+
+    def flush(self) -> str:
+        """The held-back text, once the generation has ended some other way."""
+        text, self.pending = self.pending, ""
+        return text
+
+
+def find_stop(text: str, stops: Iterable[str]) -> Optional[int]:
+    """Index where the first stop string in ``text`` begins, or None."""
+    matcher = StopMatcher(stops)
+    _, end, length = matcher.scan(0, text)
+    return end - length if end >= 0 else None
@@ -0,0 +1,128 @@
+"""Pre-populate the prompt cache from a corpus of prompts.
+
+    python -m autoappbuilder.llm.local.scripts.warm_cache corpus.jsonl --cache var/prompt-cache.db \\
+        --generator mypkg.llm:generate --concurrency 4
+
+Each corpus line is a JSON object with ``model``, ``messages`` (or a ``prompt`` string),
+optional sampling ``params`` and an optional recorded ``response``. Recorded responses are
+stored as they are; the rest are generated with ``--generator``, a ``module:function``
+called as ``function(model, messages, params)``. Prompts already cached are skipped.
+"""
+import argparse
+import importlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..cache.disk_cache import DiskCache
+from ..cache.prompt_cache import PromptCache, prompt_key
+
+Generator = Callable[[str, Any, Dict[str, Any]], Any]
+
+
+@dataclass
+class WarmReport:
+    stored: int = 0  # recorded responses written
+    generated: int = 0
+    cached: int = 0  # already present
+    skipped: int = 0  # no response and no generator
+    failed: List[Tuple[int, str]] = field(default_factory=list)  # (line number, error)
+
+    def summary(self) -> str:
+        return (
+            f"stored {self.stored}, generated {self.generated}, already cached {self.cached}, "
+            f"skipped {self.skipped}, failed {len(self.failed)}"
+        )
+
+
+def read_corpus(paths: Iterable[Path], default_model: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, normalized entry) for every non-blank line of the JSONL files."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                model = entry.get("model") or default_model
+                messages = entry.get("messages", entry.get("prompt"))
+                if not model or messages is None:
+                    raise ValueError(f"{path}:{lineno}: entry needs a model and messages or prompt")
+                yield lineno, {"model": model, "messages": messages, "params": entry.get("params") or {},
+                               "response": entry.get("response"), "ttl": entry.get("ttl")}
+
+
+def load_generator(spec: str) -> Generator:
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError("--generator must look like module:function")
+    return getattr(importlib.import_module(module), name)
+
+
+def warm(
+    cache: PromptCache, entries: Iterable[Tuple[int, Dict[str, Any]]],
+    generate: Optional[Generator] = None, concurrency: int = 1, ttl: Optional[float] = None,
+) -> WarmReport:
+    report = WarmReport()
+    todo: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for lineno, e in entries:
+        key = prompt_key(e["model"], e["messages"], e["params"])
+        if key in todo or cache.get(key) is not None:
+            report.cached += 1  # repeats in the corpus are generated once
+        elif e["response"] is not None:
+            cache.put(key, e["response"], e["ttl"] if e["ttl"] is not None else ttl)
+            report.stored += 1
+        elif generate is None:
+            report.skipped += 1
+        else:
+            todo[key] = (lineno, e)
+    lock = threading.Lock()
+
+    def run(item: Tuple[int, Dict[str, Any]]) -> None:
+        lineno, e = item
+        try:
+            cache.get_or_generate(
+                e["model"], e["messages"], e["params"],
+                lambda: generate(e["model"], e["messages"], e["params"]),
+                e["ttl"] if e["ttl"] is not None else ttl,
+            )
+        except Exception as ex:
+            with lock:
+                report.failed.append((lineno, f"{type(ex).__name__}: {ex}"))
+        else:
+            with lock:
+                report.generated += 1
+
+    with ThreadPoolExecutor(max(1, concurrency)) as pool:
+        list(pool.map(run, todo.values()))
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="warm_cache", description=__doc__.splitlines()[0])
+    p.add_argument("corpus", nargs="+", type=Path, help="JSONL prompt corpus file(s)")
+    p.add_argument("--cache", required=True, type=Path, help="Disk cache (SQLite) to fill")
+    p.add_argument("--generator", default=None, help="module:function producing missing responses")
+    p.add_argument("--model", default=None, help="Model for entries that do not name one")
+    p.add_argument("--concurrency", type=int, default=1, help="Generations run at once")
+    p.add_argument("--ttl", type=float, default=None, help="Seconds entries stay valid (default: forever)")
+    p.add_argument("--max-mb", type=float, default=None, help="Size budget of the disk cache")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    generate = load_generator(args.generator) if args.generator else None
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+    with DiskCache(args.cache, max_bytes=max_bytes) as disk:
+        report = warm(PromptCache(disk=disk), read_corpus(args.corpus, args.model), generate, args.concurrency, args.ttl)
+    for lineno, error in report.failed:
+        print(f"line {lineno}: {error}")
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from ..utils import archiver
+from ..utils.checksums import new_hasher
+
+
+@dataclass
+class ExportResult:
+    path: Path
+    format: str
+    sha256: str
+    size: int
+    entries: int
+    bytes_in: int
+
+
+def export_bundle(
+    src_dir: Path,
+    out_path: Path,
+    fmt: Optional[str] = None,
+    level: int = 6,
+    workers: Optional[int] = None,
+    ignore: Optional[Callable[[str], bool]] = None,
+) -> ExportResult:
+    """Archive a bundle's source tree to ``out_path`` and return the archive's sha256.
+
+    The archive is reproducible, so the digest identifies the bundle's content. It is written
+    next to ``out_path`` under a temporary name and renamed into place once complete.
+    """
+    src_dir, out_path = Path(src_dir), Path(out_path)
+    if not src_dir.is_dir():
+        raise FileNotFoundError(f"bundle source not found: {src_dir}")
+    fmt = fmt or archiver.format_for(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f".{out_path.name}.part")
+    hasher = new_hasher("sha256")
+    try:
+        with open(tmp, "wb") as f:
+            stats = archiver.write_archive(src_dir, f, fmt, level=level, workers=workers, ignore=ignore, hasher=hasher)
+        os.replace(tmp, out_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return ExportResult(out_path, fmt, hasher.hexdigest(), stats.bytes_out, stats.entries, stats.bytes_in)
+
+
+def stream_bundle(src_dir: Path, fmt: str = "tar.gz", **kwargs) -> Iterator[bytes]:
+    """Archive chunks for an HTTP response; memory stays bounded however large the bundle is."""
+    if fmt not in archiver.FORMATS:
+        raise ValueError(f"unsupported archive format: {fmt!r}")
+    if not Path(src_dir).is_dir():
+        raise FileNotFoundError(f"bundle source not found: {src_dir}")
+    return archiver.iter_archive(Path(src_dir), fmt, **kwargs)
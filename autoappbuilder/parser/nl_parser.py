@@ -0,0 +1,164 @@
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..utils.checksums import hash_bytes
+
+# Heading forms recognised at the start of a line, most specific first
+_MD_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_NUMBERED = re.compile(r"^(\d+(?:\.\d+){0,5})\.?\s+([A-Z][^\n]{0,100})$")
+_NAMED = re.compile(r"^(?:section|chapter|appendix|part)\s+([A-Z0-9]+(?:\.\d+)*)\s*[:.\-]?\s*(.*)$", re.IGNORECASE)
+_CAPS = re.compile(r"^[A-Z][A-Z0-9 &/,'()\-]{2,60}$")
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+_BULLET = re.compile(r"^\s*(?:[-*+]|\(?[a-z0-9]{1,3}[.)])\s+", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_ABBREVIATIONS = ("e.g.", "i.e.", "etc.", "vs.", "approx.", "incl.", "fig.", "no.", "dr.", "mr.", "ms.", "sec.")
+
+
+@dataclass
+class Section:
+    """A heading and the body text up to the next heading.
+
+    ``id`` is the heading number when there is one ("3.2.1") and otherwise a slug path of the
+    titles above it; ``digest`` covers only the title and body, so a section that moves keeps
+    its digest while an edited one gets a new one.
+    """
+
+    id: str
+    title: str
+    level: int
+    text: str
+    page: Optional[int] = None
+
+    @cached_property
+    def digest(self) -> str:
+        return hash_bytes(f"{self.title}\0{self.text}".encode("utf-8"))
+
+
+@dataclass
+class Document:
+    sections: List[Section] = field(default_factory=list)
+
+    @property
+    def digest(self) -> str:
+        return hash_bytes("\n".join(s.digest for s in self.sections).encode("ascii"))
+
+    def by_id(self) -> Dict[str, Section]:
+        return {s.id: s for s in self.sections}
+
+
+def _heading(line: str) -> Optional[tuple]:
+    """(number or None, title, level) when line is a heading."""
+    m = _MD_HEADING.match(line)
+    if m:
+        return None, m.group(2), len(m.group(1))
+    m = _NUMBERED.match(line)
+    # a numbered list item reads as a sentence; a heading is short and unpunctuated
+    if m and not line.endswith((".", ":", ";", ",")) and len(m.group(2).split()) <= 12:
+        return m.group(1), m.group(2).strip(), m.group(1).count(".") + 1
+    m = _NAMED.match(line)
+    if m and len(line.split()) <= 14 and not line.endswith("."):
+        number = m.group(1)
+        return number, m.group(2).strip() or line, number.count(".") + 1
+    if _CAPS.match(line) and len(line.split()) <= 8 and any(c.isalpha() for c in line):
+        return None, line.title(), 1
+    return None
+
+
+def parse_document(text: str, page_starts: Optional[List[int]] = None) -> Document:
+    """Split text into sections at recognised headings.
+
+    Text before the first heading becomes a level-0 ``_preamble`` section. ``page_starts``
+    holds the character offset where each page begins, and sets ``Section.page``.
+    """
+    doc = Document()
+    stack: List[tuple] = []  # (level, slug) of the open ancestors
+    seen: Dict[str, int] = {}
+    current: Optional[Section] = Section("_preamble", "", 0, "", 1 if page_starts else None)
+    body: List[str] = []
+    offset = 0
+
+    def page_at(pos: int) -> Optional[int]:
+        if not page_starts:
+            return None
+        lo, hi = 0, len(page_starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if page_starts[mid] <= pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        return max(lo, 1)
+
+    def close() -> None:
+        current.text = "\n".join(body).strip()
+        if current.text or current.level > 0:
+            doc.sections.append(current)
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        head = _heading(stripped) if stripped else None
+        if head is None:
+            body.append(line)
+            offset += len(line) + 1
+            continue
+        close()
+        number, title, level = head
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        slug = _SLUG.sub("-", title.lower()).strip("-") or "section"
+        stack.append((level, slug))
+        sid = number or "/".join(s for _, s in stack)
+        seen[sid] = seen.get(sid, 0) + 1
+        if seen[sid] > 1:
+            sid = f"{sid}~{seen[sid]}"
+        current = Section(sid, title, level, "", page_at(offset))
+        body = []
+        offset += len(line) + 1
+    close()
+    return doc
+
+
+def parse_pages(pages: Iterable[str]) -> Document:
+    """parse_document over pages joined in order, tracking the page each section starts on."""
+    starts, parts, pos = [], [], 0
+    for page in pages:
+        starts.append(pos)
+        parts.append(page)
+        pos += len(page) + 1
+    return parse_document("\n".join(parts), starts)
+
+
+def _items(text: str) -> Iterator[str]:
+    # Paragraphs are separated by blank lines; each bullet or numbered item starts a new one
+    para: List[str] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or _BULLET.match(line):
+            if para:
+                yield " ".join(para)
+            para = [_BULLET.sub("", line).strip()] if stripped else []
+        else:
+            para.append(stripped)
+    if para:
+        yield " ".join(para)
+
+
+def sentences(text: str) -> Iterator[str]:
+    """Sentences of a section body, with list items treated as sentences of their own."""
+    for item in _items(text):
+        start = 0
+        for m in _SENTENCE_END.finditer(item):
+            candidate = item[start:m.start()].rstrip("\"')]")
+            last = candidate.rsplit(None, 1)[-1].lower() if candidate else ""
+            if last in _ABBREVIATIONS or (len(last) == 2 and last[0].isalpha() and last[1] == "."):
+                continue  # "e.g." or an initial, not the end of a sentence
+            sentence = item[start:m.start()].strip()
+            if sentence:
+                yield sentence
+            start = m.end()
+        tail = item[start:].strip()
+        if tail:
+            yield tail
@@ -0,0 +1,506 @@
+import copy
+import ipaddress
+import json
+import math
+import re
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..exceptions import SchemaError, SchemaValidationError
+
+# JSON-schema validation compiled to Python closures. A schema is walked once, each keyword
+# turned into a small check specialised for its arguments, so validating a payload is a few
+# function calls per value rather than a walk over the schema dict. Error paths and messages
+# are only built for values that fail.
+#
+# Covers the draft 2020-12 keywords the bundled schemas use: type, enum, const, properties,
+# required, additionalProperties, patternProperties, propertyNames, min/maxProperties, items,
+# prefixItems, min/maxItems, uniqueItems, min/maxLength, pattern, format, minimum, maximum,
+# exclusiveMinimum/Maximum, multipleOf, allOf, anyOf, oneOf, not and local $ref into $defs.
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+# Searched in order by load_validator("<name>") for "<name>.schema.json"
+SCHEMA_DIRS = (PACKAGE_ROOT / "config" / "schemas", PACKAGE_ROOT / "desktop" / "config")
+
+Errors = Sequence[Tuple[Tuple[Union[str, int], ...], str]]  # (path inside the value, message)
+Check = Callable[[Any], Errors]
+_OK: Errors = ()
+
+# Keywords with validation meaning that are not implemented; a schema using one is rejected
+# rather than half-checked
+UNSUPPORTED = frozenset((
+    "if", "then", "else", "contains", "minContains", "maxContains", "dependentRequired",
+    "dependentSchemas", "dependencies", "unevaluatedProperties", "unevaluatedItems",
+    "$dynamicRef", "$recursiveRef",
+))
+
+_TYPE_TESTS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, (list, tuple)),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: v is True or v is False,
+    "null": lambda v: v is None,
+    "number": lambda v: isinstance(v, (int, float)) and v is not True and v is not False,
+    "integer": lambda v: (isinstance(v, int) and v is not True and v is not False)
+    or (isinstance(v, float) and v.is_integer()),
+}
+
+
+def _match(pattern: str) -> Callable[[str], bool]:
+    rx = re.compile(pattern)
+    return lambda s: rx.match(s) is not None
+
+
+def _is_date(s: str) -> bool:
+    try:
+        date.fromisoformat(s)
+    except ValueError:
+        return False
+    return len(s) == 10
+
+
+def _is_ip(version: int) -> Callable[[str], bool]:
+    def test(s: str) -> bool:
+        try:
+            return ipaddress.ip_address(s).version == version
+        except ValueError:
+            return False
+    return test
+
+
+# Formats are assertions here; one not listed is an annotation and always passes
+FORMATS: Dict[str, Callable[[str], bool]] = {
+    "date-time": _match(r"(?i)\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])t([01]\d|2[0-3]):[0-5]\d:([0-5]\d|60)(\.\d+)?(z|[+-]([01]\d|2[0-3]):[0-5]\d)\Z"),
+    "date": _is_date,
+    "uuid": _match(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z"),
+    "email": _match(r"[^@\s]+@[^@\s]+\.[^@\s]+\Z"),
+    "hostname": _match(r"(?=.{1,253}\Z)[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*\Z"),
+    "uri": _match(r"[A-Za-z][A-Za-z0-9+.\-]*:\S*\Z"),
+    "ipv4": _is_ip(4),
+    "ipv6": _is_ip(6),
+}
+
+
+def _show(value: Any) -> str:
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    # JSON keeps booleans and numbers apart, Python does not (True == 1)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    return a == b
+
+
+def _join(errors: Optional[List], path: Union[str, int], found: Errors) -> List:
+    prefixed = [((path, *p), m) for p, m in found]
+    if errors is None:
+        return prefixed
+    errors.extend(prefixed)
+    return errors
+
+
+def _mismatch(kind: str) -> Check:
+    return lambda v: [((), f"{_show(v)} is not of type '{kind}'")]
+
+
+def _all_of(checks: List[Check]) -> Check:
+    if not checks:
+        return lambda v: _OK
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        first, second = checks
+
+        def check_pair(v):
+            a, b = first(v), second(v)
+            if not a:
+                return b
+            return list(a) + list(b) if b else a
+        return check_pair
+
+    def check(v):
+        errors = None
+        for c in checks:
+            found = c(v)
+            if found:
+                errors = list(found) if errors is None else errors + list(found)
+        return errors or _OK
+    return check
+
+
+class _Compiler:
+    def __init__(self, root: Any) -> None:
+        self.root = root
+        self.refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Any) -> Check:
+        if schema is True or schema == {}:
+            return lambda v: _OK
+        if schema is False:
+            return lambda v: [((), "no value is allowed here")]
+        if not isinstance(schema, dict):
+            raise SchemaError(f"a schema must be an object or a boolean, not {_show(schema)}")
+        bad = UNSUPPORTED.intersection(schema)
+        if bad:
+            raise SchemaError(f"unsupported keyword(s): {', '.join(sorted(bad))}")
+        checks: List[Check] = []
+        # a lone string, object or array type is checked by that type's keyword group
+        single = schema.get("type") if schema.get("type") in ("string", "object", "array") else None
+        groups = [(self._string, "string"), (self._number, None), (self._object, "object"), (self._array, "array")]
+        typed = [group(schema, _mismatch(kind) if kind == single else None) for group, kind in groups]
+        if "type" in schema and (single is None or typed[[k for _, k in groups].index(single)] is None):
+            checks.append(self._type(schema["type"]))
+        if "enum" in schema:
+            checks.append(self._enum(schema["enum"]))
+        if "const" in schema:
+            const = schema["const"]
+            checks.append(lambda v: _OK if _json_equal(v, const) else [((), f"{_show(v)} is not {_show(const)}")])
+        if "$ref" in schema:
+            checks.append(self._ref(schema["$ref"]))
+        for key, combine in (("allOf", self._all), ("anyOf", self._any), ("oneOf", self._one)):
+            if key in schema:
+                subs = schema[key]
+                if not isinstance(subs, list) or not subs:
+                    raise SchemaError(f"{key} must be a non-empty array of schemas")
+                checks.append(combine([self.compile(s) for s in subs]))
+        if "not" in schema:
+            inner = self.compile(schema["not"])
+            checks.append(lambda v: [((), f"{_show(v)} should not be valid under the 'not' schema")] if not inner(v) else _OK)
+        checks.extend(c for c in typed if c is not None)
+        return _all_of(checks)
+
+    # generic keywords
+
+    def _type(self, types: Union[str, List[str]]) -> Check:
+        names = [types] if isinstance(types, str) else list(types)
+        unknown = [n for n in names if n not in _TYPE_TESTS]
+        if unknown or not names:
+            raise SchemaError(f"unknown type(s): {', '.join(map(str, unknown)) or '(none)'}")
+        label = names[0] if len(names) == 1 else ", ".join(names)
+        if len(names) == 1:
+            test = _TYPE_TESTS[names[0]]
+        else:
+            tests = [_TYPE_TESTS[n] for n in names]
+            test = lambda v: any(t(v) for t in tests)  # noqa: E731
+        return lambda v: _OK if test(v) else [((), f"{_show(v)} is not of type '{label}'")]
+
+    def _enum(self, options: List[Any]) -> Check:
+        if not isinstance(options, list) or not options:
+            raise SchemaError("enum must be a non-empty array")
+        message = f"is not one of {options!r}"
+        if all(isinstance(o, str) for o in options):
+            allowed = frozenset(options)
+            return lambda v: _OK if isinstance(v, str) and v in allowed else [((), f"{_show(v)} {message}")]
+        return lambda v: _OK if any(_json_equal(v, o) for o in options) else [((), f"{_show(v)} {message}")]
+
+    def _ref(self, ref: str) -> Check:
+        if not isinstance(ref, str) or not ref.startswith("#"):
+            raise SchemaError(f"only local $refs are supported, not {_show(ref)}")
+        check = self.refs.get(ref)
+        if check is None:
+            # compiled once per pointer; the indirection lets a definition refer to itself
+            slot: List[Check] = []
+            self.refs[ref] = lambda v: slot[0](v)
+            slot.append(self.compile(self._resolve(ref)))
+            check = self.refs[ref] = slot[0]
+        return check
+
+    def _resolve(self, ref: str) -> Any:
+        node = self.root
+        for part in ref[1:].lstrip("/").split("/") if ref not in ("#", "#/") else ():
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(part)] if isinstance(node, list) else node[part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                raise SchemaError(f"unresolvable $ref {ref!r}")
+        return node
+
+    def _all(self, subs: List[Check]) -> Check:
+        return _all_of(subs)
+
+    def _any(self, subs: List[Check]) -> Check:
+        def check(v):
+            for c in subs:
+                if not c(v):
+                    return _OK
+            return [((), f"{_show(v)} is not valid under any of the given schemas")]
+        return check
+
+    def _one(self, subs: List[Check]) -> Check:
+        def check(v):
+            matched = sum(1 for c in subs if not c(v))
+            if matched == 1:
+                return _OK
+            if matched == 0:
+                return [((), f"{_show(v)} is not valid under any of the given schemas")]
+            return [((), f"{_show(v)} is valid under {matched} of the given schemas, not exactly one")]
+        return check
+
+    # keywords that apply to one JSON type each; other types pass them untouched
+
+    def _string(self, schema: Dict[str, Any], other: Optional[Check] = None) -> Optional[Check]:
+        tests: List[Tuple[Callable[[str], bool], Callable[[str], str]]] = []
+        if "minLength" in schema:
+            n = schema["minLength"]
+            tests.append((lambda s: len(s) >= n, lambda s: f"{_show(s)} is shorter than {n} character(s)"))
+        if "maxLength" in schema:
+            n_max = schema["maxLength"]
+            tests.append((lambda s: len(s) <= n_max, lambda s: f"{_show(s)} is longer than {n_max} character(s)"))
+        if "pattern" in schema:
+            try:
+                rx = re.compile(schema["pattern"])
+            except re.error as e:
+                raise SchemaError(f"invalid pattern {schema['pattern']!r}: {e}")
+            tests.append((lambda s: rx.search(s) is not None, lambda s: f"{_show(s)} does not match {rx.pattern!r}"))
+        fmt = schema.get("format")
+        if fmt in FORMATS:
+            test_format = FORMATS[fmt]
+            tests.append((test_format, lambda s: f"{_show(s)} is not a valid '{fmt}'"))
+        if not tests:
+            return None
+        if len(tests) == 1:
+            (test, message), = tests
+            if other is None:
+                return lambda v: _OK if not isinstance(v, str) or test(v) else [((), message(v))]
+            return lambda v: other(v) if not isinstance(v, str) else _OK if test(v) else [((), message(v))]
+
+        def check(v):
+            if not isinstance(v, str):
+                return _OK if other is None else other(v)
+            for test, _ in tests:
+                if not test(v):
+                    return [((), message(v)) for test, message in tests if not test(v)]
+            return _OK
+        return check
+
+    def _number(self, schema: Dict[str, Any], other: Optional[Check] = None) -> Optional[Check]:
+        tests: List[Tuple[Callable[[Any], bool], str]] = []
+        for key, test, text in (
+            ("minimum", lambda v, b: v >= b, "less than the minimum of"),
+            ("maximum", lambda v, b: v <= b, "greater than the maximum of"),
+            ("exclusiveMinimum", lambda v, b: v > b, "less than or equal to the exclusive minimum of"),
+            ("exclusiveMaximum", lambda v, b: v < b, "greater than or equal to the exclusive maximum of"),
+        ):
+            if key in schema:
+                bound = schema[key]
+                if isinstance(bound, bool) or not isinstance(bound, (int, float)):
+                    raise SchemaError(f"{key} must be a number")
+                tests.append(((lambda t, b: lambda v: t(v, b))(test, bound), f"{text} {bound}"))
+        if "multipleOf" in schema:
+            step = schema["multipleOf"]
+
+            def multiple(v, step=step):
+                q = v / step
+                return math.isfinite(q) and abs(q - round(q)) < 1e-9
+            tests.append((multiple, f"not a multiple of {step}"))
+        if not tests:
+            return None
+
+        def check(v):
+            if not isinstance(v, (int, float)) or v is True or v is False:
+                return _OK
+            failed = [((), f"{_show(v)} is {text}") for test, text in tests if not test(v)]
+            return failed or _OK
+        return check
+
+    def _object(self, schema: Dict[str, Any], other: Optional[Check] = None) -> Optional[Check]:
+        keys = ("properties", "required", "additionalProperties", "patternProperties",
+                "propertyNames", "minProperties", "maxProperties")
+        if not any(k in schema for k in keys):
+            return None
+        props = {name: self.compile(sub) for name, sub in (schema.get("properties") or {}).items()}
+        patterns = [(re.compile(p), self.compile(sub)) for p, sub in (schema.get("patternProperties") or {}).items()]
+        required = frozenset(schema.get("required") or ())
+        additional = schema.get("additionalProperties", True)
+        extra = None if additional is True else self.compile(additional)
+        names = self.compile(schema["propertyNames"]) if "propertyNames" in schema else None
+        min_props, max_props = schema.get("minProperties"), schema.get("maxProperties")
+        strict = extra is not None or patterns or names is not None
+
+        def check(v):
+            if not isinstance(v, dict):
+                return _OK if other is None else other(v)
+            errors = None
+            if required and not required.issubset(v.keys()):
+                missing = sorted(required.difference(v.keys()))
+                errors = [((), f"'{name}' is a required property") for name in missing]
+            for key, value in v.items():
+                fn = props.get(key)
+                if fn is not None:
+                    found = fn(value)
+                    if found:
+                        errors = _join(errors, key, found)
+                    if not patterns and names is None:
+                        continue
+                elif not strict:
+                    continue
+                if names is not None and names(key):
+                    errors = (errors or []) + [((), f"property name {_show(key)} is not allowed")]
+                matched = False
+                for rx, sub in patterns:
+                    if rx.search(key):
+                        matched = True
+                        found = sub(value)
+                        if found:
+                            errors = _join(errors, key, found)
+                if fn is None and not matched and extra is not None:
+                    if additional is False:
+                        errors = (errors or []) + [((), f"additional property {_show(key)} is not allowed")]
+                    else:
+                        found = extra(value)
+                        if found:
+                            errors = _join(errors, key, found)
+            if min_props is not None and len(v) < min_props:
+                errors = (errors or []) + [((), f"has fewer than {min_props} properties")]
+            if max_props is not None and len(v) > max_props:
+                errors = (errors or []) + [((), f"has more than {max_props} properties")]
+            return errors or _OK
+        return check
+
+    def _array(self, schema: Dict[str, Any], other: Optional[Check] = None) -> Optional[Check]:
+        keys = ("items", "prefixItems", "minItems", "maxItems", "uniqueItems")
+        if not any(k in schema for k in keys):
+            return None
+        if isinstance(schema.get("items"), list):
+            raise SchemaError("array-form items is draft-07 syntax; use prefixItems")
+        prefix = [self.compile(s) for s in schema.get("prefixItems") or ()]
+        items = self.compile(schema["items"]) if "items" in schema else None
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+        unique = schema.get("uniqueItems", False)
+
+        def check(v):
+            if not isinstance(v, (list, tuple)):
+                return _OK if other is None else other(v)
+            errors = None
+            if min_items is not None and len(v) < min_items:
+                errors = [((), f"has fewer than {min_items} item(s)")]
+            if max_items is not None and len(v) > max_items:
+                errors = (errors or []) + [((), f"has more than {max_items} item(s)")]
+            for i, fn in enumerate(prefix[:len(v)]):
+                found = fn(v[i])
+                if found:
+                    errors = _join(errors, i, found)
+            if items is not None:
+                for i in range(len(prefix), len(v)):
+                    found = items(v[i])
+                    if found:
+                        errors = _join(errors, i, found)
+            if unique and len(v) > 1:
+                seen = set()
+                for item in v:
+                    key = json.dumps(item, sort_keys=True, default=str)
+                    if key in seen:
+                        errors = (errors or []) + [((), f"has non-unique item {_show(item)}")]
+                        break
+                    seen.add(key)
+            return errors or _OK
+        return check
+
+
+def _format(path: Tuple[Union[str, int], ...], message: str) -> str:
+    where = "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path)
+    return f"{where}: {message}"
+
+
+class Validator:
+    """A compiled schema; build with compile_schema() or load_validator().
+
+    Errors come back as "path: message" strings, the path written ``$.field[0].name``.
+    """
+
+    def __init__(self, schema: Any, name: str = "") -> None:
+        self.schema = schema
+        self.name = name or (schema.get("title", "") if isinstance(schema, dict) else "")
+        self._check = _Compiler(schema).compile(schema)
+
+    def is_valid(self, data: Any) -> bool:
+        return not self._check(data)
+
+    def errors(self, data: Any) -> List[str]:
+        return [_format(p, m) for p, m in self._check(data)]
+
+    def validate(self, data: Any) -> None:
+        """Raise SchemaValidationError listing every problem with ``data``."""
+        found = self._check(data)
+        if found:
+            raise SchemaValidationError(self.name, [_format(p, m) for p, m in found])
+
+    def validate_many(self, records: Iterable[Any]) -> Dict[int, List[str]]:
+        """Errors of each failing record, keyed by its index; empty when all are valid."""
+        check = self._check
+        failed: Dict[int, List[str]] = {}
+        for i, record in enumerate(records):
+            found = check(record)
+            if found:
+                failed[i] = [_format(p, m) for p, m in found]
+        return failed
+
+    def defaults(self) -> Dict[str, Any]:
+        """The ``default`` of each top-level property that declares one."""
+        props = self.schema.get("properties", {}) if isinstance(self.schema, dict) else {}
+        return {k: copy.deepcopy(s["default"]) for k, s in props.items() if isinstance(s, dict) and "default" in s}
+
+
+def compile_schema(schema: Any, name: str = "") -> Validator:
+    return Validator(schema, name)
+
+
+def schema_path(name: Union[str, Path]) -> Path:
+    """A schema file: an existing path as given, else ``<name>.schema.json`` in SCHEMA_DIRS."""
+    path = Path(name)
+    if path.suffix == ".json" or path.is_file():
+        return path
+    for folder in SCHEMA_DIRS:
+        candidate = folder / f"{name}.schema.json"
+        if candidate.is_file():
+            return candidate
+    raise SchemaError(f"no schema named {str(name)!r} in {', '.join(str(d) for d in SCHEMA_DIRS)}")
+
+
+def _stat_sig(p: Path):
+    try:
+        st = p.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+_cache: Dict[Path, Tuple[tuple, Validator]] = {}
+_lock = threading.Lock()
+
+
+def load_validator(name: Union[str, Path]) -> Validator:
+    """Compiled validator for a schema file, shared by every caller in the process.
+
+    The file is read and compiled on first use and again only after its stat signature
+    (inode, mtime, size) changes.
+    """
+    path = schema_path(name).resolve()
+    sig = _stat_sig(path)
+    with _lock:
+        hit = _cache.get(path)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+    try:
+        schema = json.loads(path.read_text(encoding="utf-8"))
+    except OSError as e:
+        raise SchemaError(f"{path}: {e.strerror}") from e
+    except ValueError as e:
+        raise SchemaError(f"{path}: invalid JSON: {e}") from e
+    validator = Validator(schema, path.name.split(".")[0])
+    with _lock:
+        _cache[path] = (sig, validator)
+    return validator
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
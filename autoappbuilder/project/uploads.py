@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Set
+from uuid import uuid4
+
+from ..exceptions import ChecksumMismatchError, DuplicateUploadError, UploadConflictError, UploadTooLargeError
+from ..utils.checksums import BUF_SIZE
+
+CHUNK_SIZE = int(os.environ.get("AUTOBUILDER_UPLOAD_CHUNK_KB", "1024")) * 1024
+MAX_UPLOAD_SIZE = int(os.environ.get("AUTOBUILDER_UPLOAD_MAX_MB", str(10 * 1024))) * 1024 * 1024
+# Incomplete uploads idle for this long are expired, and give up their declared checksum
+UPLOAD_EXPIRY = float(os.environ.get("AUTOBUILDER_UPLOAD_EXPIRY_H", "24")) * 3600
+# Algorithms accepted for per-request checksums (tus checksum extension)
+CHUNK_ALGORITHMS = ("sha1", "sha256")
+
+
+@dataclass
+class Upload:
+    id: str
+    length: int
+    offset: int = 0
+    filename: Optional[str] = None
+    checksum: Optional[str] = None  # sha256 hex the client declared for the whole file
+    digest: Optional[str] = None  # sha256 hex of the received file, once complete
+    metadata: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    completed_at: Optional[float] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.completed_at is not None
+
+
+def default_root() -> Path:
+    return Path(os.environ.get("AUTOBUILDER_UPLOADS") or os.path.join(tempfile.gettempdir(), "autobuilder-uploads"))
+
+
+class UploadManager:
+    """Resumable uploads written straight to disk under ``root``.
+
+    Each upload is a ``<id>.part`` data file (``<id>.bin`` once complete) plus ``<id>.json``
+    metadata. The data file's size is the upload's offset, so an interrupted request keeps
+    every byte it wrote and the client resumes from there. Content is hashed as it arrives;
+    the running sha256 lives in memory and is rebuilt from the data file after a restart.
+    """
+
+    def __init__(
+        self, root: Path, max_size: int = MAX_UPLOAD_SIZE, chunk_size: int = CHUNK_SIZE, expiry: float = UPLOAD_EXPIRY,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.expiry = expiry
+        self._uploads: Dict[str, Upload] = {}
+        # sha256 -> upload id, for completed digests and checksums declared by uploads in flight
+        self._by_checksum: Dict[str, str] = {}
+        self._hashers: Dict[str, "hashlib._Hash"] = {}
+        self._busy: Set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        for meta in self.root.glob("*.json"):
+            try:
+                up = Upload(**json.loads(meta.read_text(encoding="utf-8")))
+            except (OSError, ValueError, TypeError):
+                continue
+            if not up.complete:
+                part = self._part(up.id)
+                size = part.stat().st_size if part.exists() else 0
+                up.offset = min(size, up.length)
+                if size > up.offset:
+                    os.truncate(part, up.offset)
+            self._uploads[up.id] = up
+            key = up.digest or up.checksum
+            if key:
+                self._by_checksum.setdefault(key, up.id)
+
+    def _part(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+
+    def path(self, upload_id: str) -> Path:
+        """The received file; only meaningful once the upload is complete."""
+        return self.root / f"{upload_id}.bin"
+
+    def _save(self, up: Upload) -> None:
+        meta = self.root / f"{up.id}.json"
+        tmp = meta.with_name(meta.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(up)), encoding="utf-8")
+        os.replace(tmp, meta)
+
+    def create(
+        self, length: int, checksum: Optional[str] = None, filename: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Upload:
+        """Register an upload of ``length`` bytes.
+
+        A declared ``checksum`` (sha256 hex) that matches a completed upload, or one still in
+        flight, raises DuplicateUploadError before any data is sent. An in-flight upload that
+        has been idle for ``expiry`` seconds is expired instead, freeing its checksum.
+        """
+        if length < 0:
+            raise ValueError("upload length must not be negative")
+        if length > self.max_size:
+            raise UploadTooLargeError(f"upload of {length} bytes exceeds the {self.max_size} byte limit")
+        if checksum is not None:
+            checksum = checksum.lower()
+            if len(checksum) != 64 or not all(c in "0123456789abcdef" for c in checksum):
+                raise ValueError("checksum must be a sha256 hex digest")
+        up = Upload(str(uuid4()), length, filename=filename, checksum=checksum, metadata=dict(metadata or {}))
+        with self._lock:
+            if checksum is not None and checksum in self._by_checksum:
+                holder = self._uploads.get(self._by_checksum[checksum])
+                if holder is None or not self._stale(holder, time.time() - self.expiry):
+                    raise DuplicateUploadError(self._by_checksum[checksum])
+                self._drop(holder)
+            self._part(up.id).touch()
+            self._save(up)
+            self._uploads[up.id] = up
+            self._hashers[up.id] = hashlib.sha256()
+            if checksum is not None:
+                self._by_checksum[checksum] = up.id
+        if length == 0:
+            UploadWriter(self, up, 0, None).commit()
+        return up
+
+    def get(self, upload_id: str) -> Optional[Upload]:
+        with self._lock:
+            return self._uploads.get(upload_id)
+
+    def open(self, upload_id: str, offset: int, chunk_checksum: Optional[str] = None) -> "UploadWriter":
+        """Start appending at ``offset``, which must equal the upload's current offset.
+
+        Only one writer per upload may be open at a time. ``chunk_checksum`` is a tus
+        ``Upload-Checksum`` value ("<algorithm> <base64 digest>") covering this request's bytes.
+        """
+        expected = None
+        if chunk_checksum is not None:
+            algo, _, b64 = chunk_checksum.strip().partition(" ")
+            if algo not in CHUNK_ALGORITHMS:
+                raise ValueError(f"unsupported checksum algorithm: {algo!r}")
+            try:
+                expected = (algo, base64.b64decode(b64, validate=True))
+            except ValueError:
+                raise ValueError("Upload-Checksum digest is not valid base64")
+        with self._lock:
+            up = self._uploads.get(upload_id)
+            if up is None:
+                raise KeyError(upload_id)
+            if up.complete:
+                raise UploadConflictError("upload is already complete")
+            if upload_id in self._busy:
+                raise UploadConflictError("upload is locked by another request")
+            if offset != up.offset:
+                raise UploadConflictError(f"offset {offset} does not match upload offset {up.offset}")
+            self._busy.add(upload_id)
+        return UploadWriter(self, up, offset, expected)
+
+    def _hasher(self, up: Upload):
+        h = self._hashers.get(up.id)
+        if h is None:
+            # restarted since the last chunk: rehash what is already on disk
+            h = hashlib.sha256()
+            with open(self._part(up.id), "rb") as f:
+                while block := f.read(BUF_SIZE):
+                    h.update(block)
+            self._hashers[up.id] = h
+        return h
+
+    def _release(self, upload_id: str) -> None:
+        with self._lock:
+            self._busy.discard(upload_id)
+
+    def _finish(self, up: Upload) -> None:
+        digest = self._hashers.pop(up.id).hexdigest()
+        with self._lock:
+            if up.checksum is not None and up.checksum != digest:
+                self._drop(up)
+                raise ChecksumMismatchError(f"received content has sha256 {digest}, not {up.checksum}")
+            existing = self._by_checksum.get(digest)
+            if existing is not None and existing != up.id:
+                self._drop(up)
+                raise DuplicateUploadError(existing)
+            os.replace(self._part(up.id), self.path(up.id))
+            up.digest, up.completed_at = digest, time.time()
+            self._by_checksum[digest] = up.id
+            self._save(up)
+
+    def _drop(self, up: Upload) -> None:
+        # caller holds the lock
+        self._uploads.pop(up.id, None)
+        self._hashers.pop(up.id, None)
+        for key in (up.digest, up.checksum):
+            if key is not None and self._by_checksum.get(key) == up.id:
+                del self._by_checksum[key]
+        for p in (self._part(up.id), self.path(up.id), self.root / f"{up.id}.json"):
+            p.unlink(missing_ok=True)
+
+    def delete(self, upload_id: str) -> None:
+        with self._lock:
+            up = self._uploads.get(upload_id)
+            if up is None:
+                raise KeyError(upload_id)
+            if upload_id in self._busy:
+                raise UploadConflictError("upload is locked by another request")
+            self._drop(up)
+
+    def _stale(self, up: Upload, cutoff: float) -> bool:
+        # caller holds the lock; activity is the data file's mtime, so a slow upload that is
+        # still receiving bytes is never stale
+        if up.complete or up.id in self._busy:
+            return False
+        try:
+            active = max(up.created_at, self._part(up.id).stat().st_mtime)
+        except FileNotFoundError:
+            active = up.created_at
+        return active < cutoff
+
+    def expire(self, max_age: Optional[float] = None) -> int:
+        """Delete incomplete uploads idle for more than ``max_age`` seconds (default ``expiry``)."""
+        cutoff = time.time() - (self.expiry if max_age is None else max_age)
+        with self._lock:
+            stale = [u for u in self._uploads.values() if self._stale(u, cutoff)]
+            for up in stale:
+                self._drop(up)
+        return len(stale)
+
+
+class UploadWriter:
+    """Appends one request's bytes to an upload; obtained from UploadManager.open()."""
+
+    def __init__(self, manager: UploadManager, up: Upload, offset: int, expected) -> None:
+        self.manager = manager
+        self.upload = up
+        self.start = offset
+        self._expected = expected
+        self._chunk_hasher = hashlib.new(expected[0]) if expected else None
+        self._hasher = manager._hasher(up)
+        # a failed Upload-Checksum rolls the upload back to where this request started
+        self._snapshot = self._hasher.copy() if expected else None
+        self._fd = os.open(manager._part(up.id), os.O_WRONLY)
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        self._closed = False
+
+    def write(self, data) -> None:
+        up = self.upload
+        if up.offset + len(data) > up.length:
+            raise UploadTooLargeError(f"chunk would grow the upload past its declared length of {up.length} bytes")
+        view = memoryview(data)
+        while view:
+            n = os.write(self._fd, view)
+            view = view[n:]
+        self._hasher.update(data)
+        if self._chunk_hasher is not None:
+            self._chunk_hasher.update(data)
+        up.offset += len(data)
+
+    def commit(self) -> Upload:
+        """Verify the request checksum, if any, and complete the upload once all bytes are in."""
+        try:
+            if self._chunk_hasher is not None and self._chunk_hasher.digest() != self._expected[1]:
+                self._rollback()
+                raise ChecksumMismatchError(f"{self._expected[0]} of the request body does not match Upload-Checksum")
+            self._close()
+            if self.upload.offset == self.upload.length:
+                self.manager._finish(self.upload)
+            return self.upload
+        finally:
+            self.abort()
+
+    def abort(self) -> None:
+        """Stop writing. Bytes already written stay, unless they were to be verified by a checksum."""
+        if self._snapshot is not None and not self._closed:
+            self._rollback()
+        self._close()
+        self.manager._release(self.upload.id)
+
+    def _rollback(self) -> None:
+        os.ftruncate(self._fd, self.start)
+        self.upload.offset = self.start
+        self.manager._hashers[self.upload.id] = self._snapshot
+
+    def _close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            os.close(self._fd)
@@ -0,0 +1,143 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from uuid import uuid4
+from ..exceptions import InvalidCursorError
+from ..utils.store import Store, BUNDLE_FIELDS, DEPLOYMENT_FIELDS, check_fields
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bundles (
+    seq  INTEGER PRIMARY KEY AUTOINCREMENT,
+    id   TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS deployments (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    id        TEXT NOT NULL UNIQUE,
+    bundle_id TEXT NOT NULL,
+    target    TEXT NOT NULL,
+    status    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_deployments_bundle_id ON deployments (bundle_id, seq);
+CREATE INDEX IF NOT EXISTS ix_deployments_target ON deployments (target, seq);
+CREATE INDEX IF NOT EXISTS ix_deployments_status ON deployments (status, seq);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement cache reuses them
+INSERT_BUNDLE = "INSERT INTO bundles (id, name, meta) VALUES (?, ?, ?)"
+SELECT_BUNDLE = "SELECT id, name, meta FROM bundles WHERE id = ?"
+INSERT_DEPLOYMENT = "INSERT INTO deployments (id, bundle_id, target, status) VALUES (?, ?, ?, ?)"
+SELECT_SEQ = {
+    "bundles": "SELECT seq FROM bundles WHERE id = ?",
+    "deployments": "SELECT seq FROM deployments WHERE id = ?",
+}
+
+
+def _row(row: sqlite3.Row) -> Dict[str, Any]:
+    out = {k: row[k] for k in row.keys()}
+    if "meta" in out:
+        out["meta"] = json.loads(out["meta"])
+    return out
+
+
+def _select(
+    table: str, columns: Sequence[str], seq: Optional[int], limit: Optional[int], **filters: Any
+) -> Tuple[str, List[Any]]:
+    # Column and filter names come from fixed tuples, never from user input
+    where, args = [], []
+    if seq is not None:
+        where.append("seq > ?")
+        args.append(seq)
+    for col, value in filters.items():
+        if value is not None:
+            where.append(f"{col} = ?")
+            args.append(value)
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY seq"
+    if limit is not None:
+        sql += " LIMIT ?"
+        args.append(limit)
+    return sql, args
+
+
+class SQLiteStore(Store):
+    """SQLite-backed store in WAL mode with one pooled connection per worker thread."""
+
+    def __init__(self, path: str = "autobuilder.db") -> None:
+        super().__init__()
+        if path == ":memory:":
+            # Named shared-cache database so every thread's connection sees the same data
+            self.dsn = f"file:autobuilder-{uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self.dsn = f"file:{path}"
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        # Held open for the lifetime of the store; also keeps a shared in-memory DB alive
+        self._keepalive = self._connect()
+        self._keepalive.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.dsn, uri=True, check_same_thread=False, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        with self._conns_lock:
+            self._conns.append(conn)
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def create_bundle(self, name: str, meta: Dict[str, Any] | None = None, bundle_id: str | None = None) -> Dict[str, Any]:
+        bundle = {"id": bundle_id or str(uuid4()), "name": name, "meta": meta or {}}
+        with self.conn as c:
+            c.execute(INSERT_BUNDLE, (bundle["id"], name, json.dumps(bundle["meta"])))
+        return bundle
+
+    def get_bundle(self, bundle_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(SELECT_BUNDLE, (bundle_id,)).fetchone()
+        return _row(row) if row is not None else None
+
+    def _seq(self, table: str, after: Optional[str]) -> Optional[int]:
+        if after is None:
+            return None
+        row = self.conn.execute(SELECT_SEQ[table], (after,)).fetchone()
+        if row is None:
+            raise InvalidCursorError(after)
+        return row[0]
+
+    def list_bundles(self, limit=None, after=None, fields=None) -> List[Dict[str, Any]]:
+        check_fields(fields, BUNDLE_FIELDS)
+        sql, args = _select("bundles", fields or BUNDLE_FIELDS, self._seq("bundles", after), limit)
+        return [_row(r) for r in self.conn.execute(sql, args)]
+
+    def create_deployment(self, bundle_id: str, target: str) -> Dict[str, Any]:
+        dep = {"id": str(uuid4()), "bundle_id": bundle_id, "target": target, "status": "created"}
+        with self.conn as c:
+            c.execute(INSERT_DEPLOYMENT, (dep["id"], bundle_id, target, dep["status"]))
+        return dep
+
+    def list_deployments(self, limit=None, after=None, fields=None, target=None, status=None) -> List[Dict[str, Any]]:
+        check_fields(fields, DEPLOYMENT_FIELDS)
+        sql, args = _select(
+            "deployments", fields or DEPLOYMENT_FIELDS, self._seq("deployments", after), limit,
+            target=target, status=status,
+        )
+        return [_row(r) for r in self.conn.execute(sql, args)]
+
+    def close(self) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
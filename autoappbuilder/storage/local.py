@@ -0,0 +1,394 @@
+import errno
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..utils.checksums import HashCache, hash_bytes, hash_file, hash_tree
+
+MANIFEST_VERSION = 1
+# Unreferenced blobs younger than this survive GC: a put_bundle may have written them
+# and not yet committed the manifest that references them
+GC_GRACE_SECONDS = 3600
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+@dataclass
+class Manifest:
+    """A bundle's file tree as content hashes: ``files`` maps relative paths to
+    ``{"digest", "size", "mode"}`` and ``links`` maps symlink paths to their targets."""
+
+    bundle_id: str
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    links: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def digest(self) -> str:
+        blob = json.dumps([self.files, self.links], sort_keys=True, separators=(",", ":"))
+        return hash_bytes(blob.encode("utf-8"))
+
+    @property
+    def size(self) -> int:
+        return sum(rec["size"] for rec in self.files.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": MANIFEST_VERSION, "bundle_id": self.bundle_id, "files": self.files, "links": self.links}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Manifest":
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"unsupported manifest version: {data.get('version')!r}")
+        return cls(data["bundle_id"], data.get("files", {}), data.get("links", {}))
+
+
+@dataclass
+class PutStats:
+    files: int = 0
+    new_blobs: int = 0
+    deduplicated: int = 0
+    bytes_in: int = 0
+    bytes_stored: int = 0
+
+
+@dataclass
+class GCStats:
+    manifests: int = 0
+    live: int = 0
+    removed: int = 0
+    bytes_freed: int = 0
+    kept_young: int = 0
+    stale_tmp: int = 0
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Clone src into a new file at dst sharing its extents (btrfs, XFS, ...); False if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return True
+        except OSError:
+            pass
+    os.unlink(dst)
+    return False
+
+
+class BlobStore:
+    """Content-addressed file store with bundles kept as manifests of blob digests.
+
+    Layout under ``root``::
+
+        objects/ab/cdef...   file contents, named by sha256, read-only
+        manifests/<id>.json  one Manifest per bundle
+        exports/<digest>.*   archives cached by manifest digest
+        tmp/                 staging area; everything lands by os.replace
+
+    Identical files across bundles are stored once. New blobs are reflinked from the source
+    where the filesystem supports it and copied otherwise; checkouts hardlink blobs back out.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifests = self.root / "manifests"
+        self.exports = self.root / "exports"
+        self.tmp = self.root / "tmp"
+        for d in (self.objects, self.manifests, self.exports, self.tmp):
+            d.mkdir(parents=True, exist_ok=True)
+        self._can_reflink = True
+        self._can_hardlink = True
+        self._lock = threading.Lock()
+
+    # blobs
+
+    def blob_path(self, digest: str) -> Path:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"not a sha256 digest: {digest!r}")
+        return self.objects / digest[:2] / digest[2:]
+
+    def has_blob(self, digest: str) -> bool:
+        return self.blob_path(digest).is_file()
+
+    def open_blob(self, digest: str):
+        return open(self.blob_path(digest), "rb")
+
+    def _stage(self, src: str) -> Path:
+        fd, name = _mkstemp(self.tmp)
+        os.close(fd)
+        if self._can_reflink and _reflink(src, name):
+            return Path(name)
+        self._can_reflink = False
+        shutil.copyfile(src, name)
+        return Path(name)
+
+    def put_file(self, path: Path, digest: Optional[str] = None) -> Tuple[str, bool]:
+        """Store one file; returns (digest, stored) where ``stored`` is False if the blob already existed.
+
+        A known ``digest`` only short-cuts the store when that blob exists; a new blob is always
+        named by the hash of the staged copy, since the file may have changed since it was hashed.
+        """
+        path = str(path)
+        if digest is not None and self._freshen(digest):
+            return digest, False
+        staged = self._stage(path)
+        try:
+            digest = hash_file(staged)
+            if self._freshen(digest):
+                return digest, False
+            dest = self.blob_path(digest)
+            dest.parent.mkdir(exist_ok=True)
+            os.chmod(staged, 0o444)
+            os.replace(staged, dest)
+            return digest, True
+        finally:
+            staged.unlink(missing_ok=True)
+
+    def _freshen(self, digest: str) -> bool:
+        # Touching a reused blob keeps a concurrent GC's grace period from sweeping it
+        # before the manifest that now references it is written
+        try:
+            os.utime(self.blob_path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    # manifests
+
+    def _manifest_path(self, bundle_id: str) -> Path:
+        if not bundle_id or "/" in bundle_id or "\\" in bundle_id or bundle_id.startswith("."):
+            raise ValueError(f"invalid bundle id: {bundle_id!r}")
+        return self.manifests / f"{bundle_id}.json"
+
+    def put_bundle(
+        self,
+        bundle_id: str,
+        src_dir: Path,
+        ignore: Optional[Callable[[str], bool]] = None,
+        cache: Optional[HashCache] = None,
+    ) -> Tuple[Manifest, PutStats]:
+        """Ingest src_dir as bundle_id: store missing blobs, then write the manifest.
+
+        Files are hashed first (through ``cache`` when given), so a tree that mostly matches
+        stored content costs one read per changed file and no writes for the rest.
+        """
+        src_dir = Path(src_dir)
+        if not src_dir.is_dir():
+            raise FileNotFoundError(f"bundle source not found: {src_dir}")
+        self._manifest_path(bundle_id)  # validate before doing any work
+        tree = hash_tree(src_dir, "sha256", cache=cache, ignore=ignore)
+        manifest, stats = Manifest(bundle_id), PutStats()
+        for rel, digest in tree.files.items():
+            path = src_dir / rel
+            st = path.lstat()
+            if stat.S_ISLNK(st.st_mode):
+                manifest.links[rel] = os.readlink(path)
+                continue
+            digest, stored = self.put_file(path, digest)
+            size = self.blob_path(digest).stat().st_size  # the stored content, even if the file has since changed
+            manifest.files[rel] = {"digest": digest, "size": size, "mode": 0o755 if st.st_mode & 0o111 else 0o644}
+            stats.files += 1
+            stats.bytes_in += size
+            if stored:
+                stats.new_blobs += 1
+                stats.bytes_stored += size
+            else:
+                stats.deduplicated += 1
+        self.write_manifest(manifest)
+        return manifest, stats
+
+    def write_manifest(self, manifest: Manifest) -> None:
+        missing = [r for r, rec in manifest.files.items() if not self.has_blob(rec["digest"])]
+        if missing:
+            raise ValueError(f"manifest references missing blobs: {', '.join(missing[:5])}")
+        path = self._manifest_path(manifest.bundle_id)
+        fd, tmp = _mkstemp(self.tmp)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest.to_dict(), f, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def get_manifest(self, bundle_id: str) -> Optional[Manifest]:
+        try:
+            data = json.loads(self._manifest_path(bundle_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        return Manifest.from_dict(data)
+
+    def has_manifest(self, bundle_id: str) -> bool:
+        return self._manifest_path(bundle_id).is_file()
+
+    def delete_manifest(self, bundle_id: str) -> bool:
+        """Drop a bundle; its blobs are reclaimed by the next gc() once nothing else uses them."""
+        try:
+            self._manifest_path(bundle_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def bundle_ids(self) -> Iterator[str]:
+        with os.scandir(self.manifests) as it:
+            for e in it:
+                if e.name.endswith(".json"):
+                    yield e.name[: -len(".json")]
+
+    # reading bundles back
+
+    def checkout(self, bundle_id: str, dest: Path, link: str = "auto") -> Manifest:
+        """Materialise a bundle into dest.
+
+        ``auto`` hardlinks blobs (they are read-only, so edits must replace files rather than
+        write in place), falling back to reflink and then to a copy across filesystems.
+        """
+        if link not in LINK_MODES:
+            raise ValueError(f"link must be one of: {', '.join(LINK_MODES)}")
+        manifest = self.get_manifest(bundle_id)
+        if manifest is None:
+            raise KeyError(bundle_id)
+        dest = Path(dest)
+        for rel, rec in manifest.files.items():
+            out = dest / rel
+            out.parent.mkdir(parents=True, exist_ok=True)
+            self._materialise(str(self.blob_path(rec["digest"])), str(out), rec["mode"], link)
+        for rel, target in manifest.links.items():
+            out = dest / rel
+            out.parent.mkdir(parents=True, exist_ok=True)
+            os.symlink(target, out)
+        return manifest
+
+    def _materialise(self, blob: str, out: str, mode: int, link: str) -> None:
+        if link in ("auto", "hardlink") and self._can_hardlink and mode == 0o644:
+            # a hardlink shares the blob's inode and mode, so executables always get their own copy
+            try:
+                os.link(blob, out)
+                return
+            except OSError as e:
+                if link == "hardlink" or e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+                self._can_hardlink = False
+        if link in ("auto", "reflink") and _reflink(blob, out):
+            os.chmod(out, mode)
+            return
+        if link == "reflink":
+            raise OSError(errno.ENOTSUP, "reflink not supported", out)
+        shutil.copyfile(blob, out)
+        os.chmod(out, mode)
+
+    def entries(self, manifest: Manifest) -> List[Tuple[str, str, os.stat_result]]:
+        """Archiver entries (see ``archiver.collect``) that read a bundle's files straight from blobs."""
+        out: List[Tuple[str, str, os.stat_result]] = []
+        dirs: Set[str] = set()
+        for rel in list(manifest.files) + list(manifest.links):
+            parts = rel.split("/")
+            dirs.update("/".join(parts[:i]) for i in range(1, len(parts)))
+        for d in dirs:
+            out.append((d, "", _fake_stat(stat.S_IFDIR | 0o755, 0)))
+        for rel, rec in manifest.files.items():
+            out.append((rel, str(self.blob_path(rec["digest"])), _fake_stat(stat.S_IFREG | rec["mode"], rec["size"])))
+        for rel, target in manifest.links.items():
+            out.append((rel, target, _fake_stat(stat.S_IFLNK | 0o777, len(target))))
+        out.sort(key=lambda x: x[0])
+        return out
+
+    def export(self, bundle_id: str, fmt: str = "tar.gz", **kwargs) -> Path:
+        """Path of the bundle's archive, built once per distinct manifest and reused after that."""
+        from ..utils import archiver
+
+        manifest = self.get_manifest(bundle_id)
+        if manifest is None:
+            raise KeyError(bundle_id)
+        if fmt not in archiver.FORMATS:
+            raise ValueError(f"unsupported archive format: {fmt!r}")
+        path = self.exports / f"{manifest.digest}.{fmt}"
+        if path.is_file():
+            os.utime(path)
+            return path
+        fd, tmp = _mkstemp(self.tmp)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                archiver.write_archive(None, f, fmt, entries=self.entries(manifest), **kwargs)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    # space accounting and collection
+
+    def _iter_blobs(self) -> Iterator[Tuple[str, os.DirEntry]]:
+        with os.scandir(self.objects) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as it:
+                    for e in it:
+                        yield shard.name + e.name, e
+
+    def usage(self) -> Dict[str, int]:
+        blobs = total = 0
+        for _, e in self._iter_blobs():
+            blobs += 1
+            total += e.stat().st_size
+        logical = sum(m.size for m in self._manifests())
+        return {"blobs": blobs, "bytes": total, "bundles": sum(1 for _ in self.bundle_ids()), "logical_bytes": logical}
+
+    def _manifests(self) -> Iterable[Manifest]:
+        for bid in self.bundle_ids():
+            m = self.get_manifest(bid)
+            if m is not None:
+                yield m
+
+    def gc(self, grace: float = GC_GRACE_SECONDS, dry_run: bool = False) -> GCStats:
+        """Mark every blob referenced by a manifest, then sweep the rest.
+
+        Blobs and staging files modified within ``grace`` seconds are kept, as are cached exports
+        of live manifests. Safe to run alongside put_bundle in other processes.
+        """
+        with self._lock:
+            stats = GCStats()
+            live: Set[str] = set()
+            live_exports: Set[str] = set()
+            for m in self._manifests():
+                stats.manifests += 1
+                live.update(rec["digest"] for rec in m.files.values())
+                live_exports.add(m.digest)
+            stats.live = len(live)
+            cutoff = time.time() - grace
+            for digest, e in self._iter_blobs():
+                if digest in live:
+                    continue
+                st = e.stat()
+                if st.st_mtime > cutoff:
+                    stats.kept_young += 1
+                    continue
+                stats.removed += 1
+                stats.bytes_freed += st.st_size
+                if not dry_run:
+                    os.unlink(e.path)
+            for e in os.scandir(self.exports):
+                if e.name.split(".", 1)[0] not in live_exports:
+                    stats.bytes_freed += e.stat().st_size
+                    if not dry_run:
+                        os.unlink(e.path)
+            for e in os.scandir(self.tmp):
+                if e.stat().st_mtime <= cutoff:
+                    stats.stale_tmp += 1
+                    if not dry_run:
+                        os.unlink(e.path)
+            return stats
+
+
+def _mkstemp(directory: Path) -> Tuple[int, str]:
+    return tempfile.mkstemp(dir=directory, prefix=".stage-")
+
+
+def _fake_stat(mode: int, size: int) -> os.stat_result:
+    return os.stat_result((mode, 0, 0, 1, 0, 0, size, 0, 0, 0))
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from autoappbuilder.llm.local.embeddings.embeddings import (
+    EmbeddingCache,
+    EmbeddingService,
+    Embedder,
+    HashingEmbedder,
+    default_embedder,
+)
+
+
+class Recording(Embedder):
+    """Records the batches it is given; each vector encodes its text's length."""
+
+    name = "recording"
+    dim = 4
+
+    def __init__(self):
+        self.batches = []
+
+    def length(self, text):
+        return len(text)
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(t), 1, 0, 0] for t in texts], dtype=np.float32)
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    texts = ["def parse_config(path):", "def parseConfig(path):", "SELECT name FROM users", ""]
+    a = HashingEmbedder().embed_batch(texts)
+    b = HashingEmbedder().embed_batch(texts)
+    assert a.dtype == np.float32 and a.shape == (4, 384) and np.array_equal(a, b)
+    assert np.allclose(np.linalg.norm(a[:3], axis=1), 1) and not a[3].any()
+    sims = a @ a.T
+    assert sims[0, 1] > 0.8 and sims[0, 2] < 0.3
+    assert default_embedder("hashing").name == "hashing"
+
+
+def test_hashing_embedder_splits_acronyms():
+    embedder = HashingEmbedder()
+    same = [("HTTPServer", "http server"), ("parseURL", "parse url"), ("XMLHttpRequest", "xml http request")]
+    a = embedder.embed_batch([x for x, _ in same])
+    b = embedder.embed_batch([y for _, y in same])
+    assert np.array_equal(a, b)
+
+
+def test_batches_group_similar_lengths_and_keep_input_order():
+    embedder = Recording()
+    service = EmbeddingService(embedder, batch_size=3, max_batch_tokens=100)
+    texts = ["x" * n for n in (40, 1, 30, 2, 3, 35, 4)] + ["x"]
+    out = service.embed(t for t in texts)  # any iterable
+    assert out.flags.c_contiguous and out.dtype == np.float32
+    assert out[:, 0].tolist() == [len(t) for t in texts]
+    assert [[len(t) for t in b] for b in embedder.batches] == [[1, 2, 3], [4, 30], [35, 40]]  # 35 * 3 > 100 tokens
+    assert service.stats.embedded == 7 and service.stats.texts == 8  # "x" embedded once
+    assert 0 < service.stats.padding_efficiency <= 1
+
+
+def test_cache_round_trip_and_reopen(tmp_path):
+    embedder = Recording()
+    texts = [f"chunk {i} " * (i % 5 + 1) for i in range(50)]
+    with EmbeddingCache(tmp_path, embedder, initial_rows=8) as cache:  # grows several times
+        first = EmbeddingService(embedder, cache).embed(texts)
+        assert len(cache) == 50
+    embedder.batches.clear()
+    with EmbeddingCache(tmp_path, embedder) as cache:
+        service = EmbeddingService(embedder, cache)
+        again = service.embed(texts + ["new text"])
+        assert embedder.batches == [["new text"]]
+        assert service.stats.cache_hits == 50 and service.stats.hit_rate == pytest.approx(50 / 51)
+        vectors, found = cache.get_many([b"\0" * 16])
+    assert np.array_equal(first, again[:50]) and vectors.shape == (0, 4) and not found.any()
+
+
+def test_cache_rejects_another_embedder_shape(tmp_path):
+    with EmbeddingCache(tmp_path, HashingEmbedder(dim=64)):
+        pass
+    other = HashingEmbedder(dim=64)
+    other.name = "hashing-64"
+    with EmbeddingCache(tmp_path, other):  # different name, different directory
+        pass
+    (tmp_path / "hashing-64" / "meta.json").write_text('{"name": "hashing", "dim": 32, "dtype": "float32"}')
+    with pytest.raises(ValueError):
+        EmbeddingCache(tmp_path, HashingEmbedder(dim=64))
+
+
+def test_embed_iter_windows():
+    service = EmbeddingService(HashingEmbedder(dim=32))
+    chunks = list(service.embed_iter((f"t{i}" for i in range(10)), window=4))
+    assert [c.shape for c in chunks] == [(4, 32), (4, 32), (2, 32)]
+    assert np.array_equal(np.concatenate(chunks), service.embed([f"t{i}" for i in range(10)]))
@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pytest
+
+from autoappbuilder.llm.local.sampling import sampling as S
+from autoappbuilder.llm.local.sampling.decoding import BatchDecoder, TokenHistory
+from autoappbuilder.llm.local.sampling.sampling import Sampler, SamplingParams
+from autoappbuilder.llm.local.sampling.stopping import StopMatcher, find_stop
+
+
+def peaked(batch, vocab, seed=0):
+    """Logits shaped like a language model's: a few likely tokens and a long tail."""
+    rng = np.random.default_rng(seed)
+    ranks = np.stack([rng.permutation(vocab) + 1 for _ in range(batch)])
+    return (-1.5 * np.log(ranks) + rng.normal(0, 0.1, (batch, vocab))).astype(np.float32)
+
+
+def nucleus_size(row, p):
+    probs = np.sort(S.softmax(row[None])[0])[::-1]
+    return int(((np.cumsum(probs) - probs) < p).sum())
+
+
+def test_top_k_per_row():
+    logits = np.arange(40, dtype=np.float32).reshape(2, 20)
+    out = S.apply_top_k(logits.copy(), [3, 0])
+    assert np.isfinite(out[0]).sum() == 3 and out[0, -3:].tolist() == [17, 18, 19]
+    assert np.isfinite(out[1]).all()
+
+
+@pytest.mark.parametrize("p", [0.3, 0.9, 0.999])
+def test_top_p_matches_sorted_reference(p):
+    logits = np.concatenate([peaked(2, 5000), np.random.default_rng(1).normal(size=(2, 5000)).astype(np.float32)])
+    out = S.apply_top_p(logits.copy(), p)  # the flat rows overflow the candidates at high p
+    assert [int(np.isfinite(r).sum()) for r in out] == [nucleus_size(r, p) for r in logits]
+
+
+def test_min_p_temperature_and_repetition_penalty():
+    logits = np.log(np.array([[0.5, 0.3, 0.15, 0.05]], dtype=np.float32))
+    assert np.isfinite(S.apply_min_p(logits.copy(), 0.2)).tolist() == [[True, True, True, False]]
+    assert np.allclose(S.apply_temperature(np.array([[2.0, -4.0]]), 2.0), [[1.0, -2.0]])
+    pen = S.apply_repetition_penalty(np.array([[2.0, -2.0, 1.0]], dtype=np.float32), np.array([[0, 1, 1, -1]]), 2.0)
+    assert pen.tolist() == [[1.0, -4.0, 1.0]]  # duplicates penalized once, padding ignored
+
+
+def test_sampler_greedy_seeded_and_narrowed():
+    logits = peaked(4, 50000)
+    assert Sampler([SamplingParams(temperature=0)] * 4)(logits).tolist() == logits.argmax(-1).tolist()
+    params = [SamplingParams(top_k=40), SamplingParams(top_p=0.8), SamplingParams(top_k=20, min_p=0.1), SamplingParams(temperature=0)]
+    first = Sampler(params, np.random.default_rng(7))(logits)
+    assert Sampler(params, np.random.default_rng(7))(logits).tolist() == first.tolist()
+    assert first[3] == logits[3].argmax()
+    # candidate narrowing draws from the same distribution as the full-row path
+    row = np.repeat(peaked(1, 8000), 3000, axis=0)
+    narrowed = Sampler([SamplingParams(top_p=0.8)] * 3000, np.random.default_rng(0))(row)
+    full = S.apply_top_p(row[:1].copy(), 0.8)
+    assert set(narrowed.tolist()) <= set(np.flatnonzero(np.isfinite(full[0])).tolist())
+    probs = S.softmax(full)[0]
+    for token in np.argsort(-probs)[:3]:
+        assert abs((narrowed == token).mean() - probs[token]) < 0.03
+
+
+def test_per_row_generators_do_not_depend_on_batch_mates():
+    logits = peaked(3, 2000)
+    params = [SamplingParams(top_p=0.95)] * 3
+    batched = Sampler(params, [np.random.default_rng(s) for s in (1, 2, 3)])
+    alone = Sampler(params[:1], [np.random.default_rng(2)])
+    for _ in range(5):
+        assert batched(logits)[1] == alone(logits[1:2])[0]
+
+
+def test_sampler_falls_back_when_nucleus_is_wide():
+    flat = np.zeros((1, 4096), dtype=np.float32)
+    tokens = Sampler([SamplingParams(top_p=0.9)] * 2, np.random.default_rng(0))(np.repeat(flat, 2, axis=0))
+    assert tokens.shape == (2,) and (tokens < 4096).all()
+
+
+def test_stop_matcher_streams_like_a_full_scan():
+    for trial in range(300):
+        rng = random.Random(trial)
+        stops = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 3))]
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+        # brute force: the stop string that ends first, the longest of those ending together
+        ends = [(text.find(s) + len(s), -len(s)) for s in stops if s in text]
+        expected = text[:min(ends)[0] + min(ends)[1]] if ends else text
+        stream, out, i, stopped = StopMatcher(stops).stream(), "", 0, False
+        while i < len(text) and not stopped:
+            n = rng.randint(1, 5)
+            piece, stopped = stream.feed(text[i:i + n])
+            out += piece
+            i += n
+        assert out + ("" if stopped else stream.flush()) == expected, (text, stops)
+
+
+def test_stop_stream_holds_back_only_possible_prefixes():
+    stream = StopMatcher(["</end>", "\n\n"]).stream()
+    assert stream.feed("result</e") == ("result", False)
+    assert stream.feed("xtra\n") == ("</extra", False)
+    assert stream.feed("\nmore") == ("", True)
+    assert find_stop("abc</end>", ["</end>", "c<"]) == 2
+
+
+def test_batch_decoder_eos_stop_and_length():
+    vocab = ["<eos>", " a", " b", "STOP", " c"]
+    script = [[1, 2, 1], [2, 3, 4], [4, 4, 0]]  # row 0 runs out, row 1 hits STOP, row 2 ends with eos
+
+    def onehot(step):
+        logits = np.full((3, len(vocab)), -10.0, dtype=np.float32)
+        logits[np.arange(3), [row[step] for row in script]] = 10.0
+        return logits
+
+    decoder = BatchDecoder([SamplingParams(temperature=0)] * 3, vocab.__getitem__, eos_ids=[0],
+                           stops=[[], ["STOP"], []], max_tokens=[3, 10, 10])
+    steps = [decoder.step(onehot(i)) for i in range(3)]
+    text = ["".join(s[r].text for s in steps if s[r] is not None) for r in range(3)]
+    assert text == [" a b a", " b", " c c"]
+    assert [decoder.finished[r] for r in range(3)] == ["length", "stop", "eos"] and decoder.done
+    assert steps[2][1] is None
+
+
+def test_token_history_is_a_ring():
+    history = TokenHistory(2, window=3)
+    history.extend(0, [5, 6, 7, 8])
+    history.append(np.array([1, 2]))
+    assert sorted(history.tokens[0].tolist()) == [1, 7, 8] and sorted(history.tokens[1].tolist()) == [-1, -1, 2]
@@ -0,0 +1,315 @@
+import os
+import queue
+import stat
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Deque, Iterator, List, Optional, Tuple
+
+FORMATS = ("tar.gz", "zip")
+MEDIA_TYPES = {"tar.gz": "application/gzip", "zip": "application/zip"}
+# Every entry gets this mtime so identical trees produce byte-identical archives.
+# SOURCE_DATE_EPOCH follows the reproducible-builds convention; zip cannot go below 1980.
+FIXED_MTIME = max(int(os.environ.get("SOURCE_DATE_EPOCH", "315532800")), 315532800)
+GZIP_BLOCK = 1 << 20
+COPY_CHUNK = 1 << 20
+WINDOW = 32 * 1024
+
+
+def format_for(path: Path) -> str:
+    name = str(path)
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".zip"):
+        return "zip"
+    raise ValueError(f"cannot tell archive format from {path.name!r} (expected .tar.gz, .tgz or .zip)")
+
+
+class ParallelGzipWriter:
+    """Write-only gzip stream that deflates fixed-size blocks on a thread pool.
+
+    Each block is raw-deflated independently (primed with the previous block's last 32 KiB as
+    dictionary) and ended with Z_SYNC_FLUSH, so the compressed blocks concatenate into one valid
+    deflate stream. The CRC is computed in order on the writing thread. At most ``2 * workers``
+    blocks are in flight, which bounds memory regardless of the input size. The header carries
+    no name or mtime, so output depends only on the input bytes.
+    """
+
+    def __init__(self, fileobj: BinaryIO, level: int = 6, workers: Optional[int] = None, block_size: int = GZIP_BLOCK):
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="gzip") if self.workers > 1 else None
+        self._pending: Deque[Future] = deque()
+        self._buf = bytearray()
+        self._prev_tail = b""
+        self._crc = 0
+        self._size = 0
+        self._closed = False
+        xfl = 2 if level == 9 else 4 if level == 1 else 0
+        fileobj.write(b"\x1f\x8b\x08\x00" + struct.pack("<I", 0) + bytes((xfl, 255)))
+
+    def _deflate(self, block: bytes, zdict: bytes, final: bool) -> bytes:
+        if zdict:
+            c = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+        else:
+            c = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return c.compress(block) + c.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    def _submit(self, block: bytes, final: bool) -> None:
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        zdict = self._prev_tail
+        if block:
+            self._prev_tail = block[-WINDOW:]
+        if self._pool is None:
+            self.fileobj.write(self._deflate(block, zdict, final))
+            return
+        self._pending.append(self._pool.submit(self._deflate, block, zdict, final))
+        while len(self._pending) > 2 * self.workers:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def write(self, data) -> int:
+        if self._closed:
+            raise ValueError("write to closed ParallelGzipWriter")
+        self._buf += data
+        while len(self._buf) >= self.block_size:
+            block = bytes(self._buf[:self.block_size])
+            del self._buf[:self.block_size]
+            self._submit(block, final=False)
+        return len(data)
+
+    def flush(self) -> None:
+        pass  # blocks are only emitted whole; close() writes the rest
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._submit(bytes(self._buf), final=True)
+            self._buf = bytearray()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+            self.fileobj.write(struct.pack("<II", self._crc & 0xFFFFFFFF, self._size & 0xFFFFFFFF))
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "ParallelGzipWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _CountingWriter:
+    """Pass-through that counts bytes and optionally feeds a hasher."""
+
+    def __init__(self, fileobj: BinaryIO, hasher=None):
+        self.fileobj = fileobj
+        self.hasher = hasher
+        self.count = 0
+
+    def write(self, data) -> int:
+        self.fileobj.write(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.count += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if hasattr(self.fileobj, "flush"):
+            self.fileobj.flush()
+
+
+@dataclass
+class ArchiveStats:
+    entries: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+def collect(root: Path, ignore: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, str, os.stat_result]]:
+    """(relative posix path, source, lstat) for every entry under root, sorted by path.
+
+    ``source`` is the filesystem path, except for symlinks where it is the link target.
+    """
+    out = []
+    stack = [("", str(root))]
+    while stack:
+        prefix, d = stack.pop()
+        with os.scandir(d) as it:
+            for e in it:
+                rel = prefix + e.name
+                if ignore is not None and ignore(rel):
+                    continue
+                st = e.stat(follow_symlinks=False)
+                out.append((rel, os.readlink(e.path) if stat.S_ISLNK(st.st_mode) else e.path, st))
+                if stat.S_ISDIR(st.st_mode):
+                    stack.append((rel + "/", e.path))
+    out.sort(key=lambda x: x[0])
+    return out
+
+
+def _mode(st: os.stat_result) -> int:
+    # normalise permissions: only the executable bit survives
+    if stat.S_ISDIR(st.st_mode) or st.st_mode & 0o111:
+        return 0o755
+    return 0o644
+
+
+def _write_tar(entries, out: BinaryIO, stats: ArchiveStats) -> None:
+    with tarfile.open(fileobj=out, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for rel, path, st in entries:
+            info = tarfile.TarInfo(rel)
+            info.mtime = FIXED_MTIME
+            info.mode = _mode(st)
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            if stat.S_ISDIR(st.st_mode):
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            elif stat.S_ISLNK(st.st_mode):
+                info.type = tarfile.SYMTYPE
+                info.linkname = path
+                tar.addfile(info)
+            elif stat.S_ISREG(st.st_mode):
+                info.size = st.st_size
+                with open(path, "rb") as f:
+                    tar.addfile(info, f)
+                stats.bytes_in += st.st_size
+            else:
+                continue
+            stats.entries += 1
+
+
+def _write_zip(entries, out: BinaryIO, stats: ArchiveStats, level: int) -> None:
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+        for rel, path, st in entries:
+            is_dir = stat.S_ISDIR(st.st_mode)
+            if not (is_dir or stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode)):
+                continue
+            info = zipfile.ZipInfo(rel + "/" if is_dir else rel, date_time=time.gmtime(FIXED_MTIME)[:6])
+            info.create_system = 3  # unix, so external_attr carries the mode
+            if stat.S_ISLNK(st.st_mode):
+                info.external_attr = (stat.S_IFLNK | 0o777) << 16
+                zf.writestr(info, path)
+            elif is_dir:
+                info.external_attr = (stat.S_IFDIR | 0o755) << 16 | 0x10
+                zf.writestr(info, b"")
+            else:
+                info.external_attr = (stat.S_IFREG | _mode(st)) << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(info, "w", force_zip64=st.st_size > 0x7FFFFFFF) as dst:
+                    while chunk := src.read(COPY_CHUNK):
+                        dst.write(chunk)
+                stats.bytes_in += st.st_size
+            stats.entries += 1
+
+
+def write_archive(
+    root: Path,
+    out: BinaryIO,
+    fmt: str = "tar.gz",
+    level: int = 6,
+    workers: Optional[int] = None,
+    ignore: Optional[Callable[[str], bool]] = None,
+    hasher=None,
+    entries: Optional[List[Tuple[str, str, os.stat_result]]] = None,
+) -> ArchiveStats:
+    """Stream a reproducible archive of root into ``out`` (any object with ``write``).
+
+    tar.gz is compressed with ParallelGzipWriter; zip entries are deflated in order on the calling
+    thread. ``hasher`` (e.g. hashlib.sha256()) is updated with every output byte. Pre-built
+    ``entries`` in the form returned by ``collect`` replace the walk of root.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported archive format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if entries is None:
+        entries = collect(Path(root), ignore)
+    stats = ArchiveStats()
+    counted = _CountingWriter(out, hasher)
+    if fmt == "zip":
+        _write_zip(entries, counted, stats, level)
+    else:
+        with ParallelGzipWriter(counted, level=level, workers=workers) as gz:
+            _write_tar(entries, gz, stats)
+    stats.bytes_out = counted.count
+    return stats
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _QueueWriter:
+    def __init__(self, q: "queue.Queue[Optional[bytes]]", cancelled: threading.Event):
+        self.q = q
+        self.cancelled = cancelled
+        self.buf = bytearray()
+
+    def write(self, data) -> int:
+        self.buf += data
+        if len(self.buf) >= COPY_CHUNK:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self.buf:
+            chunk, self.buf = bytes(self.buf), bytearray()
+            while True:
+                if self.cancelled.is_set():
+                    raise _Cancelled()
+                try:
+                    self.q.put(chunk, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+
+def iter_archive(root: Path, fmt: str = "tar.gz", max_chunks: int = 8, **kwargs) -> Iterator[bytes]:
+    """Yield the archive in ~1 MiB chunks while it is produced on a background thread.
+
+    At most ``max_chunks`` chunks are buffered, so a slow consumer (e.g. an HTTP client) slows
+    the producer instead of growing memory. Closing the iterator early stops the producer.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+    cancelled = threading.Event()
+    done = object()
+    errors: List[BaseException] = []
+
+    def produce() -> None:
+        writer = _QueueWriter(q, cancelled)
+        try:
+            write_archive(root, writer, fmt, **kwargs)
+            writer.flush()
+        except _Cancelled:
+            return
+        except BaseException as e:
+            errors.append(e)
+        while not cancelled.is_set():
+            try:
+                q.put(done, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    t = threading.Thread(target=produce, name="archiver", daemon=True)
+    t.start()
+    try:
+        while (item := q.get()) is not done:
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+        t.join()
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+ALGORITHMS = ("sha256", "blake2b")
+BUF_SIZE = 1 << 20
+# Files modified this recently may still change within the same mtime tick; never cache them
+RACY_NS = 2_000_000_000
+
+
+def new_hasher(algorithm: str = "sha256"):
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=32)
+    raise ValueError(f"unsupported algorithm: {algorithm!r} (expected one of {', '.join(ALGORITHMS)})")
+
+
+def hash_bytes(data: bytes, algorithm: str = "sha256") -> str:
+    h = new_hasher(algorithm)
+    h.update(data)
+    return h.hexdigest()
+
+
+def hash_stream(stream: BinaryIO, algorithm: str = "sha256", buf_size: int = BUF_SIZE) -> Tuple[str, int]:
+    """Hash a binary stream through one reused buffer; returns (hexdigest, bytes read)."""
+    h = new_hasher(algorithm)
+    buf = bytearray(buf_size)
+    view = memoryview(buf)
+    total = 0
+    while n := stream.readinto(buf):
+        h.update(view[:n])
+        total += n
+    return h.hexdigest(), total
+
+
+def hash_file(path: Path, algorithm: str = "sha256") -> str:
+    with open(path, "rb", buffering=0) as f:
+        return hash_stream(f, algorithm)[0]
+
+
+class HashCache:
+    """Persistent digests keyed by path and (inode, size, mtime_ns), stored in SQLite.
+
+    Entries are loaded into memory on open and written back by ``save()``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests (path TEXT, algorithm TEXT, ino INTEGER, size INTEGER,"
+            " mtime_ns INTEGER, digest TEXT, PRIMARY KEY (path, algorithm))"
+        )
+        self._entries: Dict[Tuple[str, str], Tuple[int, int, int, str]] = {
+            (p, a): (ino, size, mtime, d)
+            for p, a, ino, size, mtime, d in self._conn.execute("SELECT * FROM digests")
+        }
+        self._dirty: Dict[Tuple[str, str], Tuple[int, int, int, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, st: os.stat_result, algorithm: str) -> Optional[str]:
+        with self._lock:
+            rec = self._entries.get((path, algorithm))
+            if rec is not None and rec[:3] == (st.st_ino, st.st_size, st.st_mtime_ns):
+                self.hits += 1
+                return rec[3]
+            self.misses += 1
+            return None
+
+    def put(self, path: str, st: os.stat_result, algorithm: str, digest: str) -> None:
+        if time.time_ns() - st.st_mtime_ns < RACY_NS:
+            return
+        rec = (st.st_ino, st.st_size, st.st_mtime_ns, digest)
+        with self._lock:
+            self._entries[(path, algorithm)] = self._dirty[(path, algorithm)] = rec
+
+    def save(self) -> None:
+        with self._lock:
+            rows = [(p, a, *rec) for (p, a), rec in self._dirty.items()]
+            self._dirty.clear()
+        if rows:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self) -> None:
+        self.save()
+        self._conn.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def merkle_digests(files: Mapping[str, str], algorithm: str = "sha256") -> Dict[str, str]:
+    """Digest of every directory (``""`` is the root) over the sorted names and digests below it.
+
+    ``files`` maps "/"-separated relative paths to content digests. Empty directories do not
+    contribute, so two trees with the same files always have the same root.
+    """
+    children: Dict[str, Dict[str, Tuple[str, str]]] = {"": {}}
+    for rel in files:
+        parts = rel.split("/")
+        for i in range(1, len(parts)):
+            children.setdefault("/".join(parts[:i]), {})
+    for rel, digest in files.items():
+        parent, _, name = rel.rpartition("/")
+        children[parent][name] = ("f", digest)
+    dirs: Dict[str, str] = {}
+    # deepest directories first so every subdirectory digest exists before its parent's
+    for d in sorted(children, key=lambda d: d.count("/") + bool(d), reverse=True):
+        h = new_hasher(algorithm)
+        for name, (kind, digest) in sorted(children[d].items()):
+            h.update(f"{kind} {name}\0{digest}\n".encode("utf-8"))
+        dirs[d] = h.hexdigest()
+        if d:
+            parent, _, name = d.rpartition("/")
+            children[parent][name] = ("d", dirs[d])
+    return dirs
+
+
+@dataclass
+class TreeDigest:
+    root: str
+    algorithm: str
+    files: Dict[str, str] = field(default_factory=dict)
+    dirs: Dict[str, str] = field(default_factory=dict)
+    hashed: int = 0
+    cached: int = 0
+    bytes_hashed: int = 0
+
+    def diff(self, other: "TreeDigest") -> Dict[str, List[str]]:
+        """Paths added, removed and changed going from ``other`` to this tree."""
+        if other.root == self.root:
+            return {"added": [], "removed": [], "changed": []}
+        return {
+            "added": sorted(set(self.files) - set(other.files)),
+            "removed": sorted(set(other.files) - set(self.files)),
+            "changed": sorted(p for p, d in self.files.items() if p in other.files and other.files[p] != d),
+        }
+
+
+def _walk(root: Path, ignore: Optional[Callable[[str], bool]]) -> Iterator[Tuple[str, os.DirEntry]]:
+    stack = [("", str(root))]
+    while stack:
+        prefix, d = stack.pop()
+        with os.scandir(d) as it:
+            for e in it:
+                rel = prefix + e.name
+                if ignore is not None and ignore(rel):
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    stack.append((rel + "/", e.path))
+                else:
+                    yield rel, e
+
+
+def hash_tree(
+    root: Path,
+    algorithm: str = "sha256",
+    workers: Optional[int] = None,
+    cache: Optional[HashCache] = None,
+    ignore: Optional[Callable[[str], bool]] = None,
+) -> TreeDigest:
+    """Hash every file under root on a thread pool and fold the results into a Merkle root.
+
+    Symlinks are not followed; their digest covers the link target. ``ignore`` receives
+    "/"-separated relative paths and can prune files or whole directories.
+    """
+    new_hasher(algorithm)  # validate before walking
+    root = Path(root)
+    files: Dict[str, str] = {}
+    todo: List[Tuple[str, str, os.stat_result]] = []
+    result = TreeDigest(root="", algorithm=algorithm)
+    for rel, entry in _walk(root, ignore):
+        st = entry.stat(follow_symlinks=False)
+        if entry.is_symlink():
+            files[rel] = hash_bytes(b"symlink:" + os.fsencode(os.readlink(entry.path)), algorithm)
+            continue
+        if not entry.is_file(follow_symlinks=False):
+            continue  # sockets, fifos, devices
+        digest = cache.get(entry.path, st, algorithm) if cache is not None else None
+        if digest is not None:
+            files[rel] = digest
+            result.cached += 1
+        else:
+            todo.append((rel, entry.path, st))
+
+    def work(item: Tuple[str, str, os.stat_result]) -> Tuple[str, str, int]:
+        rel, path, st = item
+        with open(path, "rb", buffering=0) as f:
+            digest, n = hash_stream(f, algorithm)
+        if cache is not None:
+            cache.put(path, st, algorithm, digest)
+        return rel, digest, n
+
+    pool = None
+    if workers != 1 and len(todo) > 1:
+        pool = ThreadPoolExecutor(workers or min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="checksums")
+    try:
+        for rel, digest, n in (pool.map(work, todo) if pool else map(work, todo)):
+            files[rel] = digest
+            result.hashed += 1
+            result.bytes_hashed += n
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if cache is not None:
+        cache.save()
+
+    result.files = dict(sorted(files.items()))
+    result.dirs = merkle_digests(result.files, algorithm)
+    result.root = result.dirs[""]
+    return result
@@ -1,31 +1,169 @@
-from typing import Dict, Any, List
+import os
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Sequence
 from uuid import uuid4
+from ..exceptions import InvalidCursorError
 
-class InMemoryStore:
-    def __init__(self):
-        self.catalog: List[Dict[str, Any]] = [
-            {"id": "tmpl-python-basic", "name": "Python Basic", "kind": "template"},
-        ]
-        self.bundles: Dict[str, Dict[str, Any]] = {}
-        self.deployments: Dict[str, Dict[str, Any]] = {}
+DEFAULT_CATALOG: List[Dict[str, Any]] = [
+    {"id": "tmpl-python-basic", "name": "Python Basic", "kind": "template"},
+]
+BUNDLE_FIELDS = ("id", "name", "meta")
+DEPLOYMENT_FIELDS = ("id", "bundle_id", "target", "status")
+
+
+def check_fields(fields: Sequence[str] | None, allowed: Sequence[str]) -> Sequence[str] | None:
+    unknown = [f for f in fields or () if f not in allowed]
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def project(row: Dict[str, Any], fields: Sequence[str] | None) -> Dict[str, Any]:
+    return row if not fields else {f: row[f] for f in fields}
+
+
+class Store(ABC):
+    """Persistence interface used by the API for catalog, bundles and deployments."""
+
+    def __init__(self) -> None:
+        self.catalog: List[Dict[str, Any]] = [dict(item) for item in DEFAULT_CATALOG]
+        # Bumped on every catalog change so callers can cache serialized responses
+        self.catalog_version = 0
 
     def list_catalog(self):
         return self.catalog
 
-    def create_bundle(self, name: str, meta: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        bid = str(uuid4())
+    def set_catalog(self, items: Sequence[Dict[str, Any]]) -> None:
+        self.catalog = [dict(item) for item in items]
+        self.catalog_version += 1
+
+    # bundle_id lets a caller that stored the bundle's content first keep the id it used there
+    @abstractmethod
+    def create_bundle(
+        self, name: str, meta: Dict[str, Any] | None = None, bundle_id: str | None = None,
+    ) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def get_bundle(self, bundle_id: str) -> Optional[Dict[str, Any]]: ...
+
+    # List methods page by keyset: rows come back in creation order, starting after
+    # the row whose id is ``after`` (InvalidCursorError if unknown), at most ``limit``
+    # of them, restricted to ``fields`` when given.
+
+    @abstractmethod
+    def list_bundles(
+        self, limit: int | None = None, after: str | None = None, fields: Sequence[str] | None = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def create_deployment(self, bundle_id: str, target: str) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def list_deployments(
+        self, limit: int | None = None, after: str | None = None, fields: Sequence[str] | None = None,
+        target: str | None = None, status: str | None = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def close(self) -> None:
+        pass
+
+
+class _OrderedTable:
+    """Rows in insertion order with a position map and per-field position indexes.
+
+    A lock serialises writers (two concurrent adds could otherwise claim the same position)
+    and keeps readers from seeing a row before its indexes.
+    """
+
+    def __init__(self, indexed: Sequence[str] = ()) -> None:
+        self.rows: List[Dict[str, Any]] = []
+        self.pos: Dict[str, int] = {}
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {f: {} for f in indexed}
+        self._lock = threading.Lock()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            p = len(self.rows)
+            self.rows.append(row)
+            self.pos[row["id"]] = p
+            for f, index in self.indexes.items():
+                index.setdefault(row[f], []).append(p)
+
+    def page(self, limit: int | None, after: str | None, **filters: Any) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._page(limit, after, filters)
+
+    def _page(self, limit: int | None, after: str | None, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        start = 0
+        if after is not None:
+            if after not in self.pos:
+                raise InvalidCursorError(after)
+            start = self.pos[after] + 1
+        filters = {f: v for f, v in filters.items() if v is not None}
+        if not filters:
+            return self.rows[start:] if limit is None else self.rows[start:start + limit]
+
+        # Walk the most selective index from the cursor position; positions are ascending
+        candidates = min((self.indexes[f].get(v, []) for f, v in filters.items()), key=len)
+        out: List[Dict[str, Any]] = []
+        for p in candidates[bisect_left(candidates, start):]:
+            row = self.rows[p]
+            if all(row[f] == v for f, v in filters.items()):
+                out.append(row)
+                if limit is not None and len(out) >= limit:
+                    break
+        return out
+
+
+class InMemoryStore(Store):
+    def __init__(self):
+        super().__init__()
+        self.bundles: Dict[str, Dict[str, Any]] = {}
+        self.deployments: Dict[str, Dict[str, Any]] = {}
+        self._bundle_table = _OrderedTable()
+        self._deployment_table = _OrderedTable(indexed=("target", "status"))
+
+    def create_bundle(self, name: str, meta: Dict[str, Any] | None = None, bundle_id: str | None = None) -> Dict[str, Any]:
+        bid = bundle_id or str(uuid4())
         bundle = {"id": bid, "name": name, "meta": meta or {}}
         self.bundles[bid] = bundle
+        self._bundle_table.add(bundle)
         return bundle
 
-    def list_bundles(self):
-        return list(self.bundles.values())
+    def get_bundle(self, bundle_id: str) -> Optional[Dict[str, Any]]:
+        return self.bundles.get(bundle_id)
+
+    def list_bundles(self, limit=None, after=None, fields=None):
+        check_fields(fields, BUNDLE_FIELDS)
+        return [project(b, fields) for b in self._bundle_table.page(limit, after)]
 
     def create_deployment(self, bundle_id: str, target: str) -> Dict[str, Any]:
         did = str(uuid4())
         dep = {"id": did, "bundle_id": bundle_id, "target": target, "status": "created"}
         self.deployments[did] = dep
+        self._deployment_table.add(dep)
         return dep
 
-    def list_deployments(self):
-        return list(self.deployments.values())
+    def list_deployments(self, limit=None, after=None, fields=None, target=None, status=None):
+        check_fields(fields, DEPLOYMENT_FIELDS)
+        rows = self._deployment_table.page(limit, after, target=target, status=status)
+        return [project(d, fields) for d in rows]
+
+
+def make_store(url: str | None = None) -> Store:
+    """Build a store from a URL such as ``memory://`` or ``sqlite:///autobuilder.db``.
+
+    SQLite URLs follow the SQLAlchemy form: three slashes for a relative path,
+    four for an absolute one, and a bare ``sqlite://`` for an in-memory database.
+    Defaults to the AUTOBUILDER_DB environment variable, then to the in-memory store.
+    """
+    url = url if url is not None else os.environ.get("AUTOBUILDER_DB", "")
+    if not url or url.startswith("memory:"):
+        return InMemoryStore()
+    if url.startswith("sqlite://"):
+        from ..storage.db import SQLiteStore
+        path = url[len("sqlite://"):]
+        return SQLiteStore(path[1:] if path else ":memory:")
+    raise ValueError(f"unsupported store url: {url}")
@@ -0,0 +1,59 @@
+"""Requests/sec for /catalog and /bundles: default FastAPI encoding vs cached/fast JSON paths.
+
+    python -m benchmarks.bench_api --requests 2000 --bundles 1000
+"""
+from __future__ import annotations
+import argparse, time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from autoappbuilder.api.app import app, db
+
+
+def baseline_app() -> FastAPI:
+    # The handlers as they were before caching: dict return values through jsonable_encoder
+    base = FastAPI()
+
+    @base.get("/catalog")
+    def catalog():
+        return {"items": db.list_catalog()}
+
+    @base.get("/bundles")
+    def bundles():
+        return {"items": db.list_bundles(limit=100)}
+
+    return base
+
+
+def rate(client: TestClient, path: str, n: int, headers: dict | None = None) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        r = client.get(path, headers=headers)
+        assert r.status_code in (200, 304)
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--bundles", type=int, default=1000)
+    ap.add_argument("--catalog", type=int, default=500, help="catalog size")
+    args = ap.parse_args()
+
+    db.set_catalog([{"id": f"tmpl-{i}", "name": f"Template {i}", "kind": "template"} for i in range(args.catalog)])
+    for i in range(args.bundles):
+        db.create_bundle(f"bundle-{i}", {"owner": "bench", "index": i})
+
+    before, after = TestClient(baseline_app()), TestClient(app)
+    etag = after.get("/catalog").headers["etag"]
+    print(f"{args.requests} requests, catalog={args.catalog} items, bundles={args.bundles} (page of 100)")
+    print(f"/catalog  before {rate(before, '/catalog', args.requests):8.0f} req/s"
+          f"   after {rate(after, '/catalog', args.requests):8.0f} req/s"
+          f"   304 {rate(after, '/catalog', args.requests, {'If-None-Match': etag}):8.0f} req/s")
+    print(f"/bundles  before {rate(before, '/bundles', args.requests):8.0f} req/s"
+          f"   after {rate(after, '/bundles?limit=100', args.requests):8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
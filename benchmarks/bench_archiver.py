@@ -0,0 +1,86 @@
+"""Bundle export: tarfile "w:gz" vs the streaming archiver (serial and block-parallel gzip).
+
+    python -m benchmarks.bench_archiver --size 512M --workers 4
+"""
+from __future__ import annotations
+import argparse, os, shutil, tarfile, tempfile, time, tracemalloc
+from pathlib import Path
+
+from autoappbuilder.packager.export_bundle import export_bundle
+from autoappbuilder.utils.archiver import write_archive
+
+UNITS = {"K": 2**10, "M": 2**20, "G": 2**30}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().removesuffix("B")
+    return int(float(text[:-1]) * UNITS[text[-1]]) if text[-1] in UNITS else int(text)
+
+
+def build_tree(root: Path, total: int) -> None:
+    # half compressible text, half random bytes, spread over a few hundred files
+    words = b" ".join(b"token%d" % i for i in range(5000)) + b"\n"
+    rnd = os.urandom(1 << 20)
+    files = 400
+    per_file = max(1, total // files)
+    for i in range(files):
+        d = root / f"pkg{i % 20}"
+        d.mkdir(parents=True, exist_ok=True)
+        src = words if i % 2 else rnd
+        with open(d / f"f{i}.dat", "wb") as f:
+            left = per_file
+            while left > 0:
+                f.write(src[:left])
+                left -= len(src)
+
+
+class Null:
+    def write(self, data) -> int:
+        return len(data)
+
+
+def timed(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", default="512M")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-archiver-"))
+    try:
+        src = tmp / "src"
+        build_tree(src, parse_size(args.size))
+
+        def baseline():
+            with tarfile.open(tmp / "base.tar.gz", "w:gz") as tar:
+                tar.add(src, arcname=".")
+            return (tmp / "base.tar.gz").stat().st_size
+
+        rows = [("tarfile w:gz", *timed(baseline))]
+        for workers in sorted({1, args.workers}):
+            t, peak, res = timed(lambda: export_bundle(src, tmp / f"out{workers}.tar.gz", workers=workers))
+            rows.append((f"archiver tar.gz x{workers}", t, peak, res.size))
+        t, peak, res = timed(lambda: export_bundle(src, tmp / "out.zip"))
+        rows.append(("archiver zip", t, peak, res.size))
+        t, peak, stats = timed(lambda: write_archive(src, Null(), "tar.gz", workers=args.workers))
+        rows.append((f"stream to sink x{args.workers}", t, peak, stats.bytes_out))
+
+        total = sum(p.stat().st_size for p in src.rglob("*.dat"))
+        print(f"input {total / 2**20:,.0f} MiB, {os.cpu_count()} CPUs")
+        for label, t, peak, size in rows:
+            print(f"{label:>24} | {t:6.2f}s {total / 2**20 / t:7.1f} MiB/s | out {size / 2**20:7.1f} MiB | peak {peak / 2**20:6.1f} MiB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Opening a large log: read_text() vs the mmap paged view (index build, first page, random jumps).
+
+    python -m benchmarks.bench_bigfile --mb 200
+"""
+from __future__ import annotations
+import argparse, random, shutil, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import bigfile  # noqa: E402
+
+JUMPS = 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=int, default=200)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-bigfile-"))
+    try:
+        f = tmp / "big.log"
+        line = b"2024-01-01T00:00:00Z INFO worker[42] processed request id=%08d status=200\n"
+        with open(f, "wb") as out:
+            block = b"".join(line % i for i in range(10_000))
+            for _ in range(max(1, args.mb * 2**20 // len(block))):
+                out.write(block)
+        size = f.stat().st_size
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        text = f.read_text(encoding="utf-8")
+        t_read = time.perf_counter() - start
+        _, peak_read = tracemalloc.get_traced_memory()
+        del text
+        tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        view = bigfile.PagedView(bigfile.PagedFile(f), height=60)
+        first = view.text()
+        t_first = time.perf_counter() - start
+        view.file.index.ready.wait()
+        t_index = time.perf_counter() - start
+        total = view.total
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(JUMPS):
+            view.goto(rng.randrange(1, total))
+            view.text()
+        t_jump = (time.perf_counter() - start) / JUMPS
+        _, peak_paged = tracemalloc.get_traced_memory()
+        view.file.close()
+        assert first
+        print(
+            f"{size / 2**20:,.0f} MiB, {total:,} lines | read_text {t_read * 1000:8.1f} ms, peak {peak_read / 2**20:6.1f} MiB | "
+            f"paged: first page {t_first * 1000:6.2f} ms, index {t_index * 1000:7.1f} ms, "
+            f"jump+render {t_jump * 1000:6.3f} ms, peak {peak_paged / 2**20:6.1f} MiB"
+        )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
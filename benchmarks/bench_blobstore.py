@@ -0,0 +1,90 @@
+"""Near-identical bundles: plain directory copies vs the content-addressed blob store.
+
+    python -m benchmarks.bench_blobstore --bundles 1000 --files 200
+"""
+from __future__ import annotations
+import argparse, os, shutil, tempfile, time
+from pathlib import Path
+
+from autoappbuilder.packager.export_bundle import export_bundle
+from autoappbuilder.storage.local import BlobStore
+
+
+def build_template(root: Path, files: int) -> None:
+    for i in range(files):
+        d = root / f"pkg{i % 10}"
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"mod{i}.py").write_bytes(os.urandom(2048).hex().encode())
+
+
+def disk_usage(root: Path) -> int:
+    # allocated blocks of distinct inodes, so hardlinks count once
+    seen, total = set(), 0
+    for dirpath, _, names in os.walk(root):
+        for n in names:
+            st = os.lstat(os.path.join(dirpath, n))
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_blocks * 512
+    return total
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bundles", type=int, default=1000)
+    ap.add_argument("--files", type=int, default=200)
+    ap.add_argument("--exports", type=int, default=50, help="bundles to export in each layout")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-blobstore-"))
+    try:
+        template = tmp / "template"
+        build_template(template, args.files)
+        work = tmp / "work"
+
+        def bundle(i: int) -> Path:
+            # every bundle is the template plus one file of its own
+            shutil.rmtree(work, ignore_errors=True)
+            shutil.copytree(template, work)
+            (work / "bundle.json").write_text(f'{{"id": {i}}}')
+            return work
+
+        copies = tmp / "copies"
+        t_copy = 0.0
+        for i in range(args.bundles):
+            src = bundle(i)
+            t, _ = timed(lambda: shutil.copytree(src, copies / str(i)))
+            t_copy += t
+        blobs = BlobStore(tmp / "blobs")
+        t_put = 0.0
+        for i in range(args.bundles):
+            src = bundle(i)
+            t, _ = timed(lambda: blobs.put_bundle(str(i), src))
+            t_put += t
+
+        n = min(args.exports, args.bundles)
+        t_dir, _ = timed(lambda: [export_bundle(copies / str(i), tmp / "x.tar.gz") for i in range(n)])
+        t_cold, _ = timed(lambda: [blobs.export(str(i)) for i in range(n)])
+        t_warm, _ = timed(lambda: [blobs.export(str(i)) for i in range(n)])
+        t_gc, gc = timed(lambda: blobs.gc(grace=0))
+
+        du_copies = disk_usage(copies)
+        du_blobs = disk_usage(blobs.objects) + disk_usage(blobs.manifests)
+        print(f"{args.bundles} bundles x {args.files + 1} files")
+        print(f"  directory copies | write {t_copy:6.2f}s | disk {du_copies / 2**20:8.1f} MiB")
+        print(f"  blob store       | write {t_put:6.2f}s | disk {du_blobs / 2**20:8.1f} MiB "
+              f"({du_copies / max(du_blobs, 1):.0f}x smaller)")
+        print(f"  export x{n}: from directory {t_dir:.2f}s | from store cold {t_cold:.2f}s | cached {t_warm * 1000:.1f} ms")
+        print(f"  gc over {gc.live} live blobs: {t_gc * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Tree hashing over a synthetic workspace: serial vs thread pool vs warm cache, per algorithm.
+
+    python -m benchmarks.bench_checksums --size 10G --files 20000
+"""
+from __future__ import annotations
+import argparse, os, shutil, tempfile, time
+from pathlib import Path
+
+from autoappbuilder.utils.checksums import ALGORITHMS, HashCache, hash_tree
+
+UNITS = {"K": 2**10, "M": 2**20, "G": 2**30}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().removesuffix("B")
+    return int(float(text[:-1]) * UNITS[text[-1]]) if text[-1] in UNITS else int(text)
+
+
+def build_tree(root: Path, total: int, files: int) -> None:
+    # a few large files carry most of the bytes, like a workspace with build artefacts
+    block = os.urandom(1 << 20)
+    big = max(1, files // 100)
+    big_size, small_size = int(total * 0.9) // big, max(1, int(total * 0.1) // max(1, files - big))
+    for i in range(files):
+        d = root / f"pkg{i % 50}" / f"mod{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        size = big_size if i < big else small_size
+        with open(d / f"f{i}.dat", "wb") as f:
+            while size > 0:
+                f.write(block[: min(size, len(block))])
+                size -= len(block)
+    now = time.time() - 60  # old enough for the cache's racy-mtime guard
+    for p in root.rglob("*.dat"):
+        os.utime(p, (now, now))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", default="10G")
+    ap.add_argument("--files", type=int, default=20000)
+    ap.add_argument("--workers", type=int, default=0, help="0 = default pool size")
+    args = ap.parse_args()
+
+    total = parse_size(args.size)
+    tmp = Path(tempfile.mkdtemp(prefix="bench-checksums-"))
+    try:
+        t_build, _ = timed(lambda: build_tree(tmp / "ws", total, args.files))
+        print(f"built {total / 2**30:.2f} GiB in {args.files:,} files ({t_build:.1f}s)")
+        for algo in ALGORITHMS:
+            t_serial, serial = timed(lambda: hash_tree(tmp / "ws", algo, workers=1))
+            t_pool, pooled = timed(lambda: hash_tree(tmp / "ws", algo, workers=args.workers or None))
+            assert pooled.root == serial.root
+            with HashCache(tmp / f"cache-{algo}.sqlite") as cache:
+                hash_tree(tmp / "ws", algo, cache=cache)
+            with HashCache(tmp / f"cache-{algo}.sqlite") as cache:
+                t_warm, warm = timed(lambda: hash_tree(tmp / "ws", algo, cache=cache))
+            assert warm.root == serial.root and warm.hashed == 0
+            gib = serial.bytes_hashed / 2**30
+            print(
+                f"{algo:>8} | serial {t_serial:7.2f}s ({gib / t_serial:5.2f} GiB/s) | pool {t_pool:7.2f}s "
+                f"({gib / t_pool:5.2f} GiB/s) | warm cache {t_warm * 1000:8.1f} ms"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
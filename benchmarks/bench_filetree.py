@@ -0,0 +1,50 @@
+"""Listing a large directory: the old iterdir()+is_file() sort vs the cached scandir listing.
+
+    python -m benchmarks.bench_filetree --entries 50000
+"""
+from __future__ import annotations
+import argparse, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import filetree  # noqa: E402
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=50_000)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-filetree-"))
+    try:
+        subprocess.run(["git", "init", "-q"], cwd=tmp, check=True)
+        (tmp / ".gitignore").write_text("*.log\nbuild/\n")
+        big = tmp / "data"
+        big.mkdir()
+        for i in range(args.entries):
+            if i % 10 == 0:
+                (big / f"d{i}").mkdir()
+            else:
+                (big / f"f{i}.{'log' if i % 7 == 0 else 'txt'}").touch()
+
+        t_old = timed(lambda: sorted(big.iterdir(), key=lambda x: (x.is_file(), x.name.lower())))
+        cache = filetree.DirCache()
+        t_cold = timed(lambda: cache.listdir(big))
+        t_warm = timed(lambda: cache.listdir(big))
+        shown = len(cache.listdir(big))
+        print(
+            f"{args.entries:,} entries | iterdir+is_file sort {t_old * 1000:8.1f} ms | "
+            f"scandir+gitignore {t_cold * 1000:8.1f} ms ({shown:,} shown) | cached {t_warm * 1e6:6.1f} µs"
+        )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
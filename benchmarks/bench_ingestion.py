@@ -0,0 +1,82 @@
+"""Intake pipeline over a synthetic batch of DOCX/PPTX specs: worker scaling and warm cache.
+
+    python -m benchmarks.bench_ingestion --docs 500 --pages 40
+"""
+from __future__ import annotations
+import argparse, os, random, shutil, tempfile, time, zipfile
+from pathlib import Path
+
+from autoappbuilder.ingestion.pipelines.intake_pipeline import IntakePipeline
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+P = 'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+WORDS = "the system shall provide secure – “reliable” storage for uploaded build artefacts".split()
+
+
+def para(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(40))
+
+
+def make_docx(path: Path, pages: int, rng: random.Random) -> None:
+    brk = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+    body = brk.join("".join(f"<w:p><w:r><w:t>{para(rng)}</w:t></w:r></w:p>" for _ in range(25)) for _ in range(pages))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>")
+
+
+def make_pptx(path: Path, slides: int, rng: random.Random) -> None:
+    rels = "".join(f'<Relationship Id="rId{i}" Target="slides/slide{i}.xml"/>' for i in range(slides))
+    order = "".join(f'<p:sldId r:id="rId{i}"/>' for i in range(slides))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("ppt/_rels/presentation.xml.rels",
+                    f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        zf.writestr("ppt/presentation.xml", f"<p:presentation {P} {R}><p:sldIdLst>{order}</p:sldIdLst></p:presentation>")
+        for i in range(slides):
+            text = "".join(f"<a:p><a:r><a:t>{para(rng)}</a:t></a:r></a:p>" for _ in range(8))
+            zf.writestr(f"ppt/slides/slide{i}.xml", f"<p:sld {P} {A}>{text}</p:sld>")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=500)
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-ingestion-"))
+    try:
+        rng = random.Random(0)
+        paths = []
+        for i in range(args.docs):
+            p = tmp / "docs" / (f"spec{i}.docx" if i % 2 else f"deck{i}.pptx")
+            p.parent.mkdir(exist_ok=True)
+            (make_docx if i % 2 else make_pptx)(p, args.pages, rng)
+            paths.append(p)
+
+        rows = []
+        for workers in sorted({1, 2, args.workers}):
+            cache = tmp / f"cache{workers}"
+            with IntakePipeline(cache, workers=workers) as pipe:
+                start = time.perf_counter()
+                pages = sum(1 for _ in pipe.run(paths))
+                cold = time.perf_counter() - start
+                stages = pipe.timings.snapshot()
+                start = time.perf_counter()
+                sum(1 for _ in pipe.run(paths))
+                warm = time.perf_counter() - start
+            rows.append((workers, pages, cold, warm, stages))
+
+        base = rows[0][2]
+        print(f"{args.docs} documents, {os.cpu_count()} CPUs")
+        for workers, pages, cold, warm, stages in rows:
+            busy = ", ".join(f"{k} {v['seconds']:.2f}s" for k, v in stages.items() if k in ("hash", "plan", "convert", "normalize"))
+            print(f"  workers {workers:>2} | {pages} pages in {cold:6.2f}s ({pages / cold:7.0f} pages/s, "
+                  f"x{base / cold:.2f}) | warm cache {warm:5.2f}s | {busy}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Ollama client against an in-process stand-in server: pooled keep-alive vs a connection per request.
+
+    python -m benchmarks.bench_ollama_client --requests 2000 --concurrency 16 --tokens 20
+"""
+from __future__ import annotations
+import argparse, asyncio, json, time
+
+from autoappbuilder.llm.local.backends.ollama.client import OllamaClient
+
+
+async def handle(reader, writer, tokens: int) -> None:
+    try:
+        while line := await reader.readline():
+            length = 0
+            while (h := await reader.readline()) not in (b"\r\n", b""):
+                if h.lower().startswith(b"content-length:"):
+                    length = int(h.split(b":")[1])
+            await reader.readexactly(length)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for i in range(tokens):
+                part = json.dumps({"response": f" tok{i}", "done": False}).encode() + b"\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(part), part))
+            part = json.dumps({"done": True, "eval_count": tokens}).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(part), part))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(url: str, requests: int, concurrency: int, max_idle: int) -> tuple:
+    async with OllamaClient(url, max_per_host=concurrency, max_idle=max_idle) as client:
+        queue = iter(range(requests))
+
+        async def worker():
+            for i in queue:
+                await client.generate("bench", f"prompt {i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, client.metrics.snapshot()
+
+
+async def main_async(args) -> None:
+    server = await asyncio.start_server(lambda r, w: handle(r, w, args.tokens), "127.0.0.1", 0)
+    url = "http://127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+    for label, max_idle in (("no reuse", 0), ("pooled", args.concurrency)):
+        seconds, m = await run(url, args.requests, args.concurrency, max_idle)
+        print(f"{label:9s} {seconds:6.2f}s  {args.requests / seconds:8.0f} req/s  reuse {m['reuse_rate']:.2%}  "
+              f"opened {m['connections_opened']:5d}  ttft p50 {m['ttft_ms']['p50']:6.2f} ms  p95 {m['ttft_ms']['p95']:6.2f} ms")
+    server.close()
+    await server.wait_closed()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--tokens", type=int, default=20)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Console flood through the output pipeline: lines/s, UI flushes and peak memory.
+
+    python -m benchmarks.bench_output --lines 1000000
+"""
+from __future__ import annotations
+import argparse, subprocess, sys, threading, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+import output_pipeline  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    ap.add_argument("--scrollback", type=int, default=output_pipeline.SCROLLBACK)
+    args = ap.parse_args()
+
+    buf = output_pipeline.OutputBuffer(max_lines=args.scrollback)
+    script = f"import sys\nfor i in range({args.lines}): sys.stdout.write(f'line {{i}} ' + 'x' * 60 + '\\n')"
+    proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    reader = threading.Thread(target=output_pipeline.read_stream, args=(proc.stdout, buf))
+    reader.start()
+    flushes = shown = skipped = 0
+    worst = 0.0
+    # stand-in for the UI timer: drain every FLUSH_MS and measure how long each flush takes
+    while reader.is_alive() or buf._pending:
+        time.sleep(output_pipeline.FLUSH_MS / 1000)
+        t0 = time.perf_counter()
+        text, dropped = buf.drain()
+        worst = max(worst, time.perf_counter() - t0)
+        flushes += 1
+        shown += text.count("\n")
+        skipped += dropped
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    proc.wait()
+    print(
+        f"{args.lines:,} lines in {elapsed:.2f}s ({args.lines / elapsed:,.0f} lines/s) | "
+        f"{flushes} flushes, worst drain {worst * 1000:.2f} ms | shown {shown:,} skipped {skipped:,} | "
+        f"peak traced memory {peak / 2**20:.1f} MiB (scrollback {args.scrollback:,})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Batched samplers and the streaming stop matcher, for vocabularies of 32k to 256k.
+
+    python -m benchmarks.bench_sampling --batch 8 --steps 20 --vocab 32000 64000 128000 256000
+
+The baseline samples row by row with a full sort, as a straightforward implementation does.
+"""
+from __future__ import annotations
+import argparse, time
+
+import numpy as np
+
+from autoappbuilder.llm.local.sampling.sampling import Sampler, SamplingParams
+from autoappbuilder.llm.local.sampling.stopping import StopMatcher
+
+CONFIGS = {
+    "k50+p0.9+min_p+penalty": SamplingParams(temperature=0.8, top_k=50, top_p=0.9, min_p=0.05, repetition_penalty=1.1),
+    "top_p 0.95": SamplingParams(temperature=0.7, top_p=0.95),
+    "temperature only": SamplingParams(temperature=0.9),
+}
+
+
+def peaked(batch: int, vocab: int, rng) -> np.ndarray:
+    ranks = np.stack([rng.permutation(vocab) + 1 for _ in range(batch)])
+    return (-1.5 * np.log(ranks) + rng.normal(0, 0.1, (batch, vocab))).astype(np.float32)
+
+
+def naive(logits: np.ndarray, history: np.ndarray, p: SamplingParams, rng) -> list:
+    out = []
+    for row, seen in zip(logits, history):
+        row = row.astype(np.float32).copy()
+        for t in set(seen.tolist()) - {-1}:
+            row[t] = row[t] / p.repetition_penalty if row[t] > 0 else row[t] * p.repetition_penalty
+        row /= p.temperature
+        order = np.argsort(-row)
+        probs = np.exp(row[order] - row[order[0]])
+        probs /= probs.sum()
+        keep = len(probs)
+        if p.top_k:
+            keep = min(keep, p.top_k)
+            probs = probs[:keep] / probs[:keep].sum()
+        if p.top_p < 1:
+            keep = int(((np.cumsum(probs) - probs) < p.top_p).sum())
+            probs = probs[:keep] / probs[:keep].sum()
+        if p.min_p:
+            probs = np.where(probs >= p.min_p * probs[0], probs, 0)
+            probs /= probs.sum()
+        out.append(int(order[rng.choice(len(probs), p=probs)]))
+    return out
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--steps", type=int, default=20)
+    ap.add_argument("--vocab", type=int, nargs="+", default=[32000, 64000, 128000, 256000])
+    ap.add_argument("--tokens", type=int, default=4096, help="generated tokens for the stop matcher")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vocab':>7s}  {'config':24s} {'naive ms':>9s} {'batched ms':>11s} {'speedup':>8s}")
+    for vocab in args.vocab:
+        logits = peaked(args.batch, vocab, rng)
+        history = rng.integers(0, vocab, (args.batch, 64))
+        for name, params in CONFIGS.items():
+            sampler = Sampler([params] * args.batch, np.random.default_rng(1))
+            base, _ = timed(lambda: [naive(logits, history, params, rng) for _ in range(max(1, args.steps // 4))])
+            fast, _ = timed(lambda: [sampler(logits, history) for _ in range(args.steps)])
+            base_ms, fast_ms = base / max(1, args.steps // 4) * 1000, fast / args.steps * 1000
+            print(f"{vocab:7d}  {name:24s} {base_ms:9.2f} {fast_ms:11.2f} {base_ms / fast_ms:7.1f}x")
+
+    words = [" the", " value", " of", " x", "\n", " is", " returned", ";", " end"]
+    pieces = [words[i] for i in rng.integers(0, len(words), args.tokens)]
+    stops = ["\n\n\n", "</answer>", "```\n\n", "<|im_end|>"]
+
+    def rescan():
+        text = ""
+        for piece in pieces:
+            text += piece
+            if any(s in text for s in stops):
+                break
+
+    def automaton():
+        stream = StopMatcher(stops).stream()
+        for piece in pieces:
+            if stream.feed(piece)[1]:
+                break
+
+    base, _ = timed(rescan)
+    fast, _ = timed(automaton)
+    print(f"stop strings over {args.tokens} tokens: rescan {base * 1000:.1f} ms, streaming matcher {fast * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Create/list/lookup throughput for the in-memory and SQLite stores.
+
+    python -m benchmarks.bench_store --sizes 10000,100000,1000000
+"""
+from __future__ import annotations
+import argparse, shutil, tempfile, time
+from pathlib import Path
+
+from autoappbuilder.storage.db import SQLiteStore
+from autoappbuilder.utils.store import InMemoryStore
+
+LOOKUPS = 1000
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench(label: str, store, rows: int) -> None:
+    ids = []
+    t_create = timed(lambda: ids.extend(store.create_bundle(f"b{i}")["id"] for i in range(rows)))
+    t_deploy = timed(lambda: [store.create_deployment(ids[i], "vercel" if i % 2 else "netlify") for i in range(rows)])
+    t_list = timed(lambda: (store.list_bundles(), store.list_deployments()))
+    mid = ids[rows // 2]
+    t_page = timed(lambda: [store.list_deployments(limit=100, after=None, target="vercel") for _ in range(100)])
+    t_page_mid = timed(lambda: [store.list_bundles(limit=100, after=mid, fields=["id", "name"]) for _ in range(100)])
+    probe = ids[:: max(1, rows // LOOKUPS)][:LOOKUPS]
+    t_get = timed(lambda: [store.get_bundle(i) for i in probe])
+    print(
+        f"{label:>7} {rows:>9,} rows | create {rows / t_create:>10,.0f} bundles/s "
+        f"{rows / t_deploy:>10,.0f} deployments/s | list all {t_list * 1000:>9.1f} ms "
+        f"| page of 100 {t_page * 10:>6.2f} ms (filtered) {t_page_mid * 10:>6.2f} ms (mid cursor) "
+        f"| get_bundle {len(probe) / t_get:>10,.0f}/s"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,100000,1000000")
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-store-"))
+    try:
+        for rows in (int(s) for s in args.sizes.split(",")):
+            bench("memory", InMemoryStore(), rows)
+            store = SQLiteStore(str(tmp / f"store-{rows}.db"))
+            bench("sqlite", store, rows)
+            store.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
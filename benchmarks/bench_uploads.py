@@ -0,0 +1,79 @@
+"""PATCH a large body through the ASGI upload route and report throughput and peak Python heap.
+
+    python -m benchmarks.bench_uploads --size 2G --chunk-kb 1024
+"""
+from __future__ import annotations
+import argparse, asyncio, os, shutil, tempfile, time, tracemalloc
+from pathlib import Path
+
+from autoappbuilder.api import uploads as uploads_api
+from autoappbuilder.api.app import app
+from autoappbuilder.project.uploads import UploadManager
+
+UNITS = {"K": 2**10, "M": 2**20, "G": 2**30}
+PIECE = 64 * 1024  # what an ASGI server typically hands over per receive()
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().removesuffix("B")
+    return int(float(text[:-1]) * UNITS[text[-1]]) if text[-1] in UNITS else int(text)
+
+
+async def patch(upload_id: str, size: int) -> int:
+    piece = os.urandom(PIECE)
+    sent = 0
+
+    async def receive():
+        nonlocal sent
+        n = min(PIECE, size - sent)
+        sent += n
+        return {"type": "http.request", "body": piece[:n], "more_body": sent < size}
+
+    status = 0
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    headers = [
+        (b"content-type", b"application/offset+octet-stream"), (b"upload-offset", b"0"),
+        (b"content-length", str(size).encode()), (b"tus-resumable", b"1.0.0"),
+    ]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "PATCH", "scheme": "http",
+        "path": f"/uploads/{upload_id}", "raw_path": f"/uploads/{upload_id}".encode(), "root_path": "",
+        "query_string": b"", "headers": headers, "server": ("bench", 80), "client": ("bench", 1),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", default="2G")
+    ap.add_argument("--chunk-kb", type=int, default=1024)
+    args = ap.parse_args()
+    size = parse_size(args.size)
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-uploads-"))
+    try:
+        manager = UploadManager(tmp, max_size=size, chunk_size=args.chunk_kb * 1024)
+        app.dependency_overrides[uploads_api.get_manager] = lambda: manager
+        up = manager.create(size)
+        tracemalloc.start()
+        start = time.perf_counter()
+        status = asyncio.run(patch(up.id, size))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        done = manager.get(up.id)
+        print(f"status {status}, {size / 2**20:,.0f} MiB in {elapsed:.2f}s ({size / 2**20 / elapsed:.0f} MiB/s), "
+              f"chunk {args.chunk_kb} KiB, peak heap {peak / 2**20:.1f} MiB, sha256 {done.digest[:16]}…")
+    finally:
+        app.dependency_overrides.clear()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
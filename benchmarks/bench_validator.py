@@ -0,0 +1,61 @@
+"""Batch validation of deployment records with the compiled deployments schema.
+
+    python -m benchmarks.bench_validator --records 100000
+"""
+from __future__ import annotations
+import argparse, random, time, uuid
+
+from autoappbuilder.hosting.utils.validators import validate_deployments
+from autoappbuilder.parser.validator import clear_cache, load_validator
+
+TARGETS = ["aws_amplify", "cloudflare", "heroku", "netlify", "vercel"]
+STATUSES = ["created", "queued", "building", "live", "failed"]
+
+
+def build_records(n: int, invalid_ratio: float, rng: random.Random) -> list:
+    out = []
+    for i in range(n):
+        rec = {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))), "bundle_id": f"bundle-{i % 977}",
+            "target": rng.choice(TARGETS), "status": rng.choice(STATUSES), "environment": "production",
+            "branch": "main", "url": f"https://app-{i}.example.com", "env": {"NODE_ENV": "production", "PORT": "8080"},
+            "created_at": "2024-05-01T12:00:00Z",
+        }
+        if rng.random() < invalid_ratio:
+            rec[rng.choice(["target", "status", "created_at"])] = "bogus"
+        out.append(rec)
+    return out
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=100_000)
+    ap.add_argument("--invalid", type=float, default=0.01, help="Fraction of records made invalid")
+    args = ap.parse_args()
+
+    records = build_records(args.records, args.invalid, random.Random(0))
+    clear_cache()
+    t_compile, _ = timed(lambda: load_validator("deployments"))
+    t_cached, _ = timed(lambda: load_validator("deployments"))
+    t_batch, failed = timed(lambda: validate_deployments(records))
+    print(f"compile {t_compile * 1000:.2f} ms, cached lookup {t_cached * 1e6:.0f} us")
+    print(f"compiled: {args.records:,} records in {t_batch:.2f} s ({args.records / t_batch:,.0f}/s), {len(failed)} invalid")
+
+    try:
+        import jsonschema
+    except ImportError:
+        return
+    sample = records[:10_000]
+    v = jsonschema.Draft202012Validator(load_validator("deployments").schema, format_checker=jsonschema.FormatChecker())
+    t_ref, _ = timed(lambda: [list(v.iter_errors(r)) for r in sample])
+    print(f"jsonschema: {len(sample):,} records in {t_ref:.2f} s, ~{t_ref * args.records / len(sample):.1f} s for all")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# tools/ holds standalone scripts rather than a package; make them importable for tests
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from autoappbuilder.api.app import app
 
@@ -7,3 +8,130 @@ def test_catalog():
     r = client.get("/catalog")
     assert r.status_code == 200
     assert "items" in r.json()
+
+def test_scaffold_job(tmp_path):
+    import time
+    r = client.post("/scaffold", json={"out": str(tmp_path / "out"), "name": "demo"})
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+    for _ in range(200):
+        job = client.get(f"/scaffold/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.01)
+    assert job["status"] == "done"
+    assert job["files_done"] == job["files_total"] > 0
+    assert (tmp_path / "out" / "README.md").exists()
+    assert client.get("/scaffold/nope").status_code == 404
+
+def test_scaffold_queue_full(monkeypatch, tmp_path):
+    from autoappbuilder.api import app as app_module
+    monkeypatch.setattr(app_module.scaffold_jobs, "max_pending", 0)
+    r = client.post("/scaffold", json={"out": str(tmp_path / "out"), "name": "demo"})
+    assert r.status_code == 429
+
+def test_bundles_cursor_pagination():
+    created = [client.post("/bundles", json={"name": f"page-{i}"}).json()["id"] for i in range(5)]
+    seen, after = [], created[0]
+    while True:
+        params = {"limit": 2, "after": after, "fields": "name"}
+        body = client.get("/bundles", params=params).json()
+        seen += [item["name"] for item in body["items"]]
+        if body["next"] is None:
+            break
+        after = body["next"]
+    assert seen == ["page-1", "page-2", "page-3", "page-4"]
+    assert client.get("/bundles", params={"after": "bogus"}).status_code == 400
+    assert client.get("/bundles", params={"fields": "secret"}).status_code == 400
+
+def test_catalog_etag():
+    from autoappbuilder.api import app as app_module
+    original = app_module.db.list_catalog()
+    r = client.get("/catalog")
+    etag = r.headers["etag"]
+    assert client.get("/catalog", headers={"If-None-Match": etag}).status_code == 304
+
+    app_module.db.set_catalog(app_module.db.list_catalog() + [{"id": "x", "name": "X", "kind": "template"}])
+    r2 = client.get("/catalog", headers={"If-None-Match": etag})
+    assert r2.status_code == 200 and r2.headers["etag"] != etag
+    assert len(r2.json()["items"]) == len(r.json()["items"]) + 1
+    app_module.db.set_catalog(original)
+
+def test_bundle_export_streams_reproducible_archive(tmp_path, monkeypatch):
+    import io, tarfile
+    from autoappbuilder.api import app as app_module
+    monkeypatch.setattr(app_module, "PROJECTS_ROOT", tmp_path.resolve())
+    (tmp_path / "src" / "app").mkdir(parents=True)
+    (tmp_path / "src" / "app" / "main.py").write_text("print('hi')\n")
+    bid = client.post("/bundles", json={"name": "demo", "meta": {"path": str(tmp_path / "src")}}).json()["id"]
+    r = client.get(f"/bundles/{bid}/export")
+    assert r.status_code == 200 and r.headers["content-type"] == "application/gzip"
+    with tarfile.open(fileobj=io.BytesIO(r.content)) as tar:
+        assert tar.getnames() == ["app", "app/main.py"]
+        assert tar.extractfile("app/main.py").read() == b"print('hi')\n"
+    (tmp_path / "src" / "app" / "main.py").touch()
+    assert client.get(f"/bundles/{bid}/export").content == r.content
+    assert client.get(f"/bundles/{bid}/export", params={"format": "rar"}).status_code == 400
+    nosrc = client.post("/bundles", json={"name": "empty"}).json()["id"]
+    assert client.get(f"/bundles/{nosrc}/export").status_code == 409
+
+def test_bundles_ingested_into_blob_store_export_from_manifest(tmp_path, monkeypatch):
+    from autoappbuilder.api import app as app_module
+    from autoappbuilder.storage.local import BlobStore
+    monkeypatch.setattr(app_module, "blobs", BlobStore(tmp_path / "blobs"))
+    monkeypatch.setattr(app_module, "PROJECTS_ROOT", tmp_path.resolve())
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hi')\n")
+    bid = client.post("/bundles", json={"name": "demo", "meta": {"path": str(tmp_path / "src")}}).json()["id"]
+    (tmp_path / "src" / "main.py").unlink()  # served from the store, not the source tree
+    r = client.get(f"/bundles/{bid}/export", params={"format": "zip"})
+    assert r.status_code == 200 and r.headers["content-type"] == "application/zip"
+    bad = client.post("/bundles", json={"name": "x", "meta": {"path": str(tmp_path / "nope")}})
+    assert bad.status_code == 400
+
+def test_failed_ingest_leaves_no_bundle_record(tmp_path, monkeypatch):
+    from autoappbuilder.api import app as app_module
+    from autoappbuilder.storage.local import BlobStore
+    blobs = BlobStore(tmp_path / "blobs")
+    monkeypatch.setattr(app_module, "blobs", blobs)
+    monkeypatch.setattr(app_module, "PROJECTS_ROOT", tmp_path.resolve())
+    (tmp_path / "src").mkdir()
+    before = len(app_module.db.list_bundles())
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(blobs, "put_bundle", broken)
+    with pytest.raises(OSError):
+        client.post("/bundles", json={"name": "x", "meta": {"path": str(tmp_path / "src")}})
+    assert len(app_module.db.list_bundles()) == before
+    monkeypatch.delattr(blobs, "put_bundle")  # back to the real ingest; now the insert fails
+    monkeypatch.setattr(app_module.db, "create_bundle", broken)
+    with pytest.raises(OSError):
+        client.post("/bundles", json={"name": "x", "meta": {"path": str(tmp_path / "src")}})
+    assert list(blobs.bundle_ids()) == []
+
+def test_bundle_paths_are_confined_to_the_projects_root(tmp_path, monkeypatch):
+    from autoappbuilder.api import app as app_module
+    (tmp_path / "root" / "src").mkdir(parents=True)
+    (tmp_path / "secret").mkdir()
+    monkeypatch.setattr(app_module, "PROJECTS_ROOT", (tmp_path / "root").resolve())
+    for path in (tmp_path / "secret", tmp_path / "root" / ".." / "secret", "/etc"):
+        assert client.post("/bundles", json={"name": "x", "meta": {"path": str(path)}}).status_code == 400
+    bid = client.post("/bundles", json={"name": "ok", "meta": {"path": str(tmp_path / "root" / "src")}}).json()["id"]
+    (tmp_path / "root" / "src").rmdir()
+    (tmp_path / "root" / "src").symlink_to(tmp_path / "secret")  # swapped after creation
+    assert client.get(f"/bundles/{bid}/export").status_code == 403
+
+def test_deployment_batch_is_validated_as_a_whole():
+    bundle = client.post("/bundles", json={"name": "batch"}).json()["id"]
+    good = {"bundle_id": bundle, "target": "vercel"}
+    r = client.post("/deployments/batch", json=[good, {"bundle_id": bundle, "target": "mars"}, {"target": 1}])
+    assert r.status_code == 422
+    assert [d["index"] for d in r.json()["detail"]] == [1, 2]
+    r = client.post("/deployments/batch", json=[good, {**good, "bundle_id": "missing"}])
+    assert r.status_code == 404
+    r = client.post("/deployments/batch", json=[good, {**good, "target": "netlify"}])
+    assert r.status_code == 200
+    assert [d["target"] for d in r.json()["items"]] == ["vercel", "netlify"]
+    assert client.post("/deployments", json={"bundle_id": bundle, "target": "mars"}).status_code == 422
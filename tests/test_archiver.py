@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from autoappbuilder.packager.export_bundle import export_bundle, stream_bundle
+from autoappbuilder.utils import archiver
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "bundle"
+    (root / "bin").mkdir(parents=True)
+    (root / "docs" / "empty").mkdir(parents=True)
+    (root / "bin" / "run.sh").write_text("#!/bin/sh\necho hi\n")
+    (root / "bin" / "run.sh").chmod(0o700)
+    (root / "data.bin").write_bytes(os.urandom(300_000))
+    (root / "README.md").write_text("readme\n" * 1000)
+    os.symlink("README.md", root / "LINK.md")
+    return root
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_parallel_gzip_round_trips(workers):
+    data = os.urandom(50_000) + b"abc" * 100_000 + os.urandom(10)
+    out = io.BytesIO()
+    with archiver.ParallelGzipWriter(out, workers=workers, block_size=8192) as gz:
+        for i in range(0, len(data), 7777):
+            gz.write(data[i:i + 7777])
+    assert gzip.decompress(out.getvalue()) == data
+
+
+def test_parallel_gzip_empty_input():
+    out = io.BytesIO()
+    archiver.ParallelGzipWriter(out, workers=2).close()
+    assert gzip.decompress(out.getvalue()) == b""
+
+
+def test_tar_is_sorted_normalised_and_reproducible(tree, tmp_path):
+    a = export_bundle(tree, tmp_path / "a.tar.gz", workers=3)
+    for p in tree.rglob("*"):
+        if not p.is_symlink():
+            os.utime(p, (1, 1))
+    b = export_bundle(tree, tmp_path / "b.tgz", workers=1)
+    assert a.sha256 == b.sha256 == hashlib.sha256((tmp_path / "a.tar.gz").read_bytes()).hexdigest()
+    assert a.size == (tmp_path / "a.tar.gz").stat().st_size and a.entries == 7
+
+    with tarfile.open(tmp_path / "a.tar.gz") as tar:
+        members = tar.getmembers()
+        assert [m.name for m in members] == ["LINK.md", "README.md", "bin", "bin/run.sh", "data.bin", "docs", "docs/empty"]
+        by_name = {m.name: m for m in members}
+        assert by_name["bin/run.sh"].mode == 0o755 and by_name["README.md"].mode == 0o644
+        assert by_name["LINK.md"].issym() and by_name["LINK.md"].linkname == "README.md"
+        assert {(m.mtime, m.uid, m.gid, m.uname) for m in members} == {(archiver.FIXED_MTIME, 0, 0, "")}
+        assert tar.extractfile("data.bin").read() == (tree / "data.bin").read_bytes()
+
+
+def test_zip_is_reproducible(tree, tmp_path):
+    a = export_bundle(tree, tmp_path / "a.zip")
+    (tree / "README.md").touch()
+    b = export_bundle(tree, tmp_path / "b.zip")
+    assert a.sha256 == b.sha256
+    with zipfile.ZipFile(tmp_path / "a.zip") as zf:
+        assert zf.read("bin/run.sh") == b"#!/bin/sh\necho hi\n"
+        assert (zf.getinfo("bin/run.sh").external_attr >> 16) & 0o777 == 0o755
+        assert "docs/empty/" in zf.namelist()
+
+
+@pytest.mark.parametrize("fmt", archiver.FORMATS)
+def test_stream_matches_file_export(tree, tmp_path, fmt):
+    exported = export_bundle(tree, tmp_path / f"x.{fmt}")
+    streamed = b"".join(stream_bundle(tree, fmt))
+    assert hashlib.sha256(streamed).hexdigest() == exported.sha256
+
+
+def test_closing_stream_early_stops_producer(tree):
+    it = stream_bundle(tree, "tar.gz", max_chunks=1, level=1)
+    next(it)
+    it.close()  # must not hang
+
+
+def test_bad_inputs(tree, tmp_path):
+    with pytest.raises(ValueError):
+        export_bundle(tree, tmp_path / "x.rar")
+    with pytest.raises(FileNotFoundError):
+        export_bundle(tmp_path / "missing", tmp_path / "x.zip")
+    assert not list(tmp_path.glob(".*.part"))
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import autobuild_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    autobuild_config.clear_cache()
+    yield
+    autobuild_config.clear_cache()
+
+
+def touch_later(path, text):
+    # bump mtime explicitly so the change is visible even on coarse-grained filesystems
+    st = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_include_globs_and_name_index(tmp_path):
+    (tmp_path / "projects").mkdir()
+    main = tmp_path / "autobuild.yml"
+    main.write_text("include: projects/*.yml\nprojects:\n  - {name: core, path: core}\n")
+    (tmp_path / "projects" / "a.yml").write_text("projects:\n  - {name: a, path: /srv/a, default_branch: dev}\n")
+    (tmp_path / "projects" / "b.yml").write_text("projects:\n  - {name: b, path: ~/b}\n")
+
+    cfg = autobuild_config.load(main)
+    assert [p.name for p in cfg.projects] == ["core", "a", "b"]
+    assert cfg.get("a").default_branch == "dev" and cfg.get("core").default_branch == "main"
+    assert str(cfg.get("b").path) == os.path.realpath(os.path.expanduser("~/b"))
+    assert cfg.get("a").source == (tmp_path / "projects" / "a.yml").resolve()
+    assert cfg.get("missing") is None
+    assert len(cfg.files) == 3
+
+
+def test_cache_reused_until_any_file_changes(tmp_path):
+    (tmp_path / "more").mkdir()
+    main = tmp_path / "autobuild.yml"
+    main.write_text("include: [more/*.yml]\nprojects:\n  - {name: core, path: /srv/core}\n")
+    inc = tmp_path / "more" / "x.yml"
+    inc.write_text("projects:\n  - {name: x, path: /srv/x}\n")
+
+    cfg = autobuild_config.load(main)
+    assert autobuild_config.load(main) is cfg
+
+    touch_later(inc, "projects:\n  - {name: x, path: /srv/x2}\n")
+    cfg2 = autobuild_config.load(main)
+    assert cfg2 is not cfg and str(cfg2.get("x").path).endswith("x2")
+
+    (tmp_path / "more" / "y.yml").write_text("projects:\n  - {name: y, path: /srv/y}\n")
+    os.utime(tmp_path / "more", ns=(0, (tmp_path / "more").stat().st_mtime_ns + 10**9))
+    assert autobuild_config.load(main).get("y") is not None
+
+
+@pytest.mark.parametrize("text, message", [
+    ("projects: {name: a}\n", "must be a list"),
+    ("projects:\n  - {name: a}\n", "missing 'path'"),
+    ("projects:\n  - {name: a, path: 3}\n", "'path' must be a str"),
+    ("projects:\n  - {name: a, path: /a}\n  - {name: a, path: /b}\n", "duplicate project 'a'"),
+    ("include: self.yml\n", "include cycle"),
+    ("projects: [\n", "invalid YAML"),
+])
+def test_validation_errors(tmp_path, text, message):
+    cfg = tmp_path / "self.yml"
+    cfg.write_text(text)
+    with pytest.raises(autobuild_config.ConfigError, match=message):
+        autobuild_config.load(cfg)
+
+
+def test_missing_file_is_empty(tmp_path):
+    assert autobuild_config.load(tmp_path / "nope.yml").projects == []
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+import bigfile
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(bigfile, "BLOCK", 64)
+
+
+def write_lines(path, n, trailing_newline=True):
+    text = "\n".join(f"line {i} " + "x" * (i % 13) for i in range(n))
+    path.write_text(text + ("\n" if trailing_newline else ""))
+    return text.split("\n")
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_line_index_offsets_match_a_full_scan(tmp_path, small_blocks, trailing_newline):
+    f = tmp_path / "big.log"
+    lines = write_lines(f, 500, trailing_newline)
+    paged = bigfile.PagedFile(f)
+    try:
+        assert paged.index.ready.wait(5)
+        assert paged.index.line_count == 500
+        assert paged.lines(0, 2) == lines[:2]
+        assert paged.lines(257, 3) == lines[257:260]
+        assert paged.lines(498, 10) == lines[498:]
+        assert paged.lines(600, 1) == []
+    finally:
+        paged.close()
+
+
+def test_offset_scans_past_a_partial_index(tmp_path, small_blocks):
+    f = tmp_path / "big.log"
+    lines = write_lines(f, 100)
+    data = f.read_bytes()
+    index = bigfile.LineIndex(data, len(data))  # not built yet: every lookup scans
+    assert data[index.offset(42):].split(b"\n", 1)[0].decode() == lines[42]
+    assert index.line_count is None
+
+
+
+def test_cancel_stops_a_slow_build(small_blocks):
+    class Slow(bytes):
+        def __getitem__(self, key):
+            time.sleep(0.01)
+            return bytes.__getitem__(self, key)
+
+    data = Slow(b"line\n" * 10_000)  # 782 blocks, several seconds to index
+    index = bigfile.LineIndex(data, len(data)).build_async()
+    time.sleep(0.05)
+    index.cancel()
+    assert index.ready.wait(1) and index.line_count is None
+
+def test_paged_view_clamps_and_reports_span(tmp_path):
+    f = tmp_path / "a.txt"
+    write_lines(f, 100)
+    view = bigfile.PagedView(bigfile.PagedFile(f), height=10)
+    view.file.index.ready.wait(5)
+    view.goto(95)
+    assert view.top == 90 and view.text().startswith("line 90 ")
+    view.scroll(-1000)
+    assert view.top == 0 and view.span() == (0.0, 0.1)
+    view.moveto(0.5)
+    assert view.top == 50
+    view.file.close()
+
+
+def test_binary_files_are_refused(tmp_path):
+    f = tmp_path / "blob.bin"
+    f.write_bytes(b"PK\x03\x04\0\0" + os.urandom(64))
+    assert bigfile.is_binary(f)
+    with pytest.raises(bigfile.BinaryFileError):
+        bigfile.PagedFile(f)
+
+
+def test_empty_file(tmp_path):
+    f = tmp_path / "empty.txt"
+    f.write_text("")
+    paged = bigfile.PagedFile(f)
+    paged.index.ready.wait(5)
+    assert paged.index.line_count == 0 and paged.lines(0, 5) == []
+    paged.close()
+
+
+def test_atomic_write_keeps_mode_and_cleans_up_on_error(tmp_path):
+    f = tmp_path / "script.sh"
+    f.write_text("old\n")
+    f.chmod(0o750)
+    assert bigfile.atomic_write(f, ["echo ", b"hi\n", "é"]) == len("echo hi\né".encode())
+    assert f.read_text() == "echo hi\né" and (f.stat().st_mode & 0o777) == 0o750
+
+    def broken():
+        yield "partial"
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        bigfile.atomic_write(f, broken())
+    assert f.read_text() == "echo hi\né"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["script.sh"]
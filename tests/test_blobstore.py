@@ -0,0 +1,118 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from autoappbuilder.automation.scheduler.cleanup_bundles import cleanup_bundles, main as cleanup_main
+from autoappbuilder.storage import local
+from autoappbuilder.storage.local import BlobStore
+from autoappbuilder.utils.checksums import hash_bytes
+from autoappbuilder.utils.store import InMemoryStore
+
+
+def make_tree(root, extra=b""):
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('hi')\n")
+    (root / "run.sh").write_text("#!/bin/sh\n")
+    (root / "run.sh").chmod(0o755)
+    (root / "data.bin").write_bytes(b"x" * 100_000 + extra)
+    os.symlink("src/main.py", root / "main.py")
+    return root
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(tmp_path / "blobs")
+
+
+def test_identical_files_are_stored_once(blobs, tmp_path):
+    _, first = blobs.put_bundle("a", make_tree(tmp_path / "a"))
+    assert (first.files, first.new_blobs) == (3, 3)
+    m, second = blobs.put_bundle("b", make_tree(tmp_path / "b", extra=b"!"))
+    assert (second.new_blobs, second.deduplicated) == (1, 2)
+    assert m.links == {"main.py": "src/main.py"} and m.files["run.sh"]["mode"] == 0o755
+    usage = blobs.usage()
+    assert usage["blobs"] == 4 and usage["bundles"] == 2 and usage["bytes"] < usage["logical_bytes"]
+    with blobs.open_blob(m.files["src/main.py"]["digest"]) as f:
+        assert f.read() == b"print('hi')\n"
+
+
+
+def test_file_edited_after_hashing_is_stored_under_its_own_digest(blobs, tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.txt").write_bytes(b"old content")
+    hash_tree = local.hash_tree
+
+    def hash_then_edit(*args, **kwargs):
+        tree = hash_tree(*args, **kwargs)
+        (src / "a.txt").write_bytes(b"NEW content, edited after hashing")
+        return tree
+
+    monkeypatch.setattr(local, "hash_tree", hash_then_edit)
+    manifest, _ = blobs.put_bundle("a", src)
+    rec = manifest.files["a.txt"]
+    assert rec == {"digest": hash_bytes(b"NEW content, edited after hashing"), "size": 33, "mode": 0o644}
+    assert not blobs.has_blob(hash_bytes(b"old content"))
+    with blobs.open_blob(rec["digest"]) as f:
+        assert f.read() == b"NEW content, edited after hashing"
+
+def test_checkout_round_trips(blobs, tmp_path):
+    blobs.put_bundle("a", make_tree(tmp_path / "a"))
+    for link in ("auto", "copy"):
+        out = tmp_path / f"out-{link}"
+        blobs.checkout("a", out, link=link)
+        assert (out / "src" / "main.py").read_text() == "print('hi')\n"
+        assert os.readlink(out / "main.py") == "src/main.py"
+        assert os.access(out / "run.sh", os.X_OK)
+    assert (tmp_path / "out-auto" / "data.bin").stat().st_nlink > 1  # hardlinked blob
+    with pytest.raises(KeyError):
+        blobs.checkout("missing", tmp_path / "x")
+
+
+def test_export_is_cached_per_manifest_and_matches_tree_export(blobs, tmp_path):
+    from autoappbuilder.packager.export_bundle import export_bundle
+
+    src = make_tree(tmp_path / "a")
+    blobs.put_bundle("a", src)
+    blobs.put_bundle("a-copy", src)
+    path = blobs.export("a")
+    assert blobs.export("a-copy") == path  # same content, same cached archive
+    assert path.read_bytes() == export_bundle(src, tmp_path / "direct.tar.gz").path.read_bytes()
+    with tarfile.open(fileobj=io.BytesIO(path.read_bytes())) as tar:
+        assert tar.getmember("main.py").linkname == "src/main.py"
+
+
+def test_gc_sweeps_only_unreferenced_blobs(blobs, tmp_path):
+    blobs.put_bundle("a", make_tree(tmp_path / "a"))
+    blobs.put_bundle("b", make_tree(tmp_path / "b", extra=b"!"))
+    blobs.export("b")
+    assert blobs.gc(grace=0).removed == 0
+
+    store = InMemoryStore()
+    store.bundles["a"] = {"id": "a", "name": "a", "meta": {}}  # "b" no longer exists
+    assert cleanup_bundles(blobs, store, grace=3600).gc.kept_young == 1  # too recent to sweep
+    report = cleanup_bundles(blobs, store, grace=0)
+    assert report.gc.removed == 1 and list(blobs.bundle_ids()) == ["a"]
+    assert not any(blobs.exports.iterdir())
+    out = tmp_path / "out"
+    blobs.checkout("a", out)
+    assert (out / "data.bin").read_bytes() == b"x" * 100_000
+
+
+def test_cleanup_refuses_a_missing_or_empty_database(blobs, tmp_path):
+    blobs.put_bundle("a", make_tree(tmp_path / "a"))
+    args = ["--root", str(blobs.root), "--grace", "0"]
+    missing = tmp_path / "typo.db"
+    assert cleanup_main(args + ["--db", f"sqlite:///{missing}"]) == 2
+    assert not missing.exists() and list(blobs.bundle_ids()) == ["a"]
+    assert cleanup_main(args + ["--db", "memory://"]) == 2 and list(blobs.bundle_ids()) == ["a"]
+    assert cleanup_main(args + ["--db", "memory://", "--force"]) == 0 and list(blobs.bundle_ids()) == []
+
+
+def test_rejects_unsafe_ids(blobs, tmp_path):
+    with pytest.raises(ValueError):
+        blobs.put_bundle("../evil", make_tree(tmp_path / "a"))
+    with pytest.raises(ValueError):
+        blobs.blob_path("../../etc/passwd")
@@ -0,0 +1,78 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from autoappbuilder.utils import checksums
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "ws"
+    for rel, data in {"a.txt": b"alpha", "src/main.py": b"print(1)\n", "src/pkg/x.bin": os.urandom(3 * 1024 + 7)}.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_bytes(data)
+    (root / "empty").mkdir()
+    return root
+
+
+def old(path, seconds=10):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10**9))
+
+
+@pytest.mark.parametrize("algorithm", checksums.ALGORITHMS)
+def test_streaming_matches_hashlib(algorithm):
+    data = os.urandom(checksums.BUF_SIZE * 2 + 123)
+    expected = hashlib.sha256(data).hexdigest() if algorithm == "sha256" else hashlib.blake2b(data, digest_size=32).hexdigest()
+    assert checksums.hash_stream(io.BytesIO(data), algorithm, buf_size=4096) == (expected, len(data))
+    assert checksums.hash_bytes(data, algorithm) == expected
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        checksums.new_hasher("md5")
+
+
+def test_tree_digest_is_stable_and_detects_changes(tree):
+    serial = checksums.hash_tree(tree, workers=1)
+    parallel = checksums.hash_tree(tree, workers=4)
+    assert serial.root == parallel.root and serial.files == parallel.files
+    assert list(serial.files) == ["a.txt", "src/main.py", "src/pkg/x.bin"]
+    assert serial.files["a.txt"] == hashlib.sha256(b"alpha").hexdigest()
+
+    (tree / "src" / "main.py").write_bytes(b"print(2)\n")
+    (tree / "new.txt").write_text("n")
+    (tree / "a.txt").unlink()
+    changed = checksums.hash_tree(tree)
+    assert changed.root != serial.root
+    assert changed.dirs["src/pkg"] == serial.dirs["src/pkg"]  # untouched subtree keeps its digest
+    assert changed.diff(serial) == {"added": ["new.txt"], "removed": ["a.txt"], "changed": ["src/main.py"]}
+
+
+def test_merkle_root_ignores_empty_dirs_and_ignored_paths(tree):
+    base = checksums.hash_tree(tree)
+    (tree / "node_modules" / "dep").mkdir(parents=True)
+    (tree / "node_modules" / "dep" / "index.js").write_text("x")
+    assert checksums.hash_tree(tree, ignore=lambda rel: rel.startswith("node_modules")).root == base.root
+    assert checksums.merkle_digests(base.files)[""] == base.root
+
+
+def test_cache_skips_unchanged_files(tree, tmp_path):
+    for p in tree.rglob("*"):
+        if p.is_file():
+            old(p)
+    db = tmp_path / "cache" / "digests.sqlite"
+    with checksums.HashCache(db) as cache:
+        first = checksums.hash_tree(tree, cache=cache)
+    assert first.hashed == 3 and first.cached == 0
+
+    with checksums.HashCache(db) as cache:
+        again = checksums.hash_tree(tree, cache=cache)
+        assert (again.hashed, again.cached, again.root) == (0, 3, first.root)
+
+        (tree / "a.txt").write_bytes(b"ALPHA")  # fresh mtime: re-hashed, and too recent to cache
+        third = checksums.hash_tree(tree, cache=cache)
+        assert (third.hashed, third.cached) == (1, 2)
+        assert checksums.hash_tree(tree, cache=cache).hashed == 1
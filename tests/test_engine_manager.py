@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from autoappbuilder.exceptions import ModelNotFoundError, QueueFullError
+from autoappbuilder.llm.local.engines.engine_manager import EngineManager
+from autoappbuilder.llm.local.engines.model_registry import ModelRegistry, ModelSpec
+from autoappbuilder.llm.local.engines.model_resolver import ModelResolver
+
+
+def make_manager(*specs, **kwargs):
+    registry = ModelRegistry(specs)
+    return EngineManager(ModelResolver(registry, roles={"coder": [s.name for s in specs]}), **kwargs)
+
+
+def fake(name="tiny", memory_mb=100, **options):
+    return ModelSpec(name, "fake", name, memory_mb=memory_mb, options=options)
+
+
+def test_generate_streams_and_finishes_on_length():
+    pieces = []
+    with make_manager(fake()) as manager:
+        done = manager.generate("coder", "alpha beta", {"max_tokens": 5}, on_token=pieces.append, timeout=5)
+    assert done.text == " alpha beta alpha beta alpha" == "".join(pieces)
+    assert done.tokens == 5 and done.finish_reason == "length" and done.model == "tiny"
+    assert done.ttft is not None and done.duration >= done.queue_wait >= 0
+
+
+def test_stop_strings_across_pieces_are_never_streamed():
+    pieces = []
+    with make_manager(fake()) as manager:
+        done = manager.generate("tiny", "a b c d", {"max_tokens": 20, "stop": ["b c"]}, on_token=pieces.append, timeout=5)
+        eos = manager.generate("tiny", "x", {"max_tokens": 20, "stop": "xy"}, timeout=5)
+    assert done.text == " a " == "".join(pieces) and done.finish_reason == "stop"
+    assert eos.text == " x" * 20 and eos.finish_reason == "length"  # held-back tail is flushed
+
+
+def test_callback_false_cancels_and_eos_ends():
+    with make_manager(fake(), fake("short", eos_after=3)) as manager:
+        seen = []
+        cancelled = manager.generate("tiny", "w", {"max_tokens": 50}, on_token=lambda p: seen.append(p) or len(seen) < 2, timeout=5)
+        ended = manager.generate("short", "w", {"max_tokens": 50}, timeout=5)
+    assert cancelled.finish_reason == "cancelled" and cancelled.tokens == 2
+    assert ended.finish_reason == "eos" and ended.tokens == 3
+
+
+def test_requests_share_decode_steps():
+    spec = fake(step_ms=5)
+    with make_manager(spec) as manager:
+        futures = [manager.submit("tiny", f"p{i}", {"max_tokens": 10 + i}) for i in range(16)]
+        results = [f.result(10) for f in futures]
+        stats = manager.metrics()["models"]["tiny"]
+    assert [r.tokens for r in results] == [10 + i for i in range(16)]
+    assert stats["completed"] == 16 and stats["tokens"] == sum(10 + i for i in range(16))
+    assert stats["steps"] < 60 and stats["avg_batch"] > 4  # serial decoding would take 280 steps
+    assert stats["tokens_per_s"] > 0 and stats["queue_wait_ms"]["p95"] >= stats["queue_wait_ms"]["p50"]
+
+
+def test_lru_eviction_under_memory_budget():
+    a, b, c = fake("a", 400), fake("b", 400), fake("c", 400)
+    with make_manager(a, b, c, memory_budget_mb=900) as manager:
+        manager.generate("a", "x", {"max_tokens": 1}, timeout=5)
+        manager.generate("b", "x", {"max_tokens": 1}, timeout=5)
+        manager.generate("a", "x", {"max_tokens": 1}, timeout=5)  # b is now least recently used
+        manager.generate("c", "x", {"max_tokens": 1}, timeout=5)
+        assert sorted(manager.loaded()) == ["a", "c"]
+        stats = manager.metrics()
+    assert stats["evictions"] == 1 and stats["resident_mb"] == 800
+    assert stats["models"]["b"]["loads"] == 1 and "state" not in stats["models"]["b"]
+
+
+def test_busy_model_is_not_evicted_until_idle():
+    slow, other = fake("slow", 600, step_ms=2), fake("other", 600)
+    with make_manager(slow, other, memory_budget_mb=1000) as manager:
+        started = threading.Event()
+        first = manager.submit("slow", "x", {"max_tokens": 100}, on_token=lambda _: started.set())
+        assert started.wait(5)  # slow is loaded and decoding before other needs its memory
+        second = manager.submit("other", "y", {"max_tokens": 1})
+        assert second.result(10).text == " y"
+        assert first.done() and first.result().tokens == 100
+        assert manager.loaded() == ["other"]
+
+
+def test_close_while_loading_does_not_hang():
+    manager = make_manager(fake(load_ms=100))
+    manager.submit("tiny", "x", {"max_tokens": 1})
+    waiter = manager.submit("tiny", "y", {"max_tokens": 1})
+    closer = threading.Thread(target=manager.close)
+    closer.start()
+    closer.join(5)
+    assert not closer.is_alive() and waiter.result(0).text == " y"  # queued work still finishes
+    assert manager.loaded() == []
+
+
+def test_request_queued_on_a_stopping_engine_moves_to_a_new_one():
+    with make_manager(fake(), idle_timeout=0.01) as manager:
+        late = []
+        shutdown = manager._shutdown
+
+        def racing(eng, *args, **kwargs):  # a submit lands after the serve loop gave up
+            if not late:
+                late.append(manager.submit("tiny", "late", {"max_tokens": 2}))
+            shutdown(eng, *args, **kwargs)
+
+        manager._shutdown = racing
+        manager.generate("tiny", "x", {"max_tokens": 1}, timeout=5)
+        deadline = time.monotonic() + 5
+        while not late and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert late[0].result(5).text == " late late"
+        assert manager.metrics()["models"]["tiny"]["loads"] == 2
+
+
+def test_idle_timeout_unloads():
+    with make_manager(fake(), idle_timeout=0.05) as manager:
+        manager.generate("tiny", "x", {"max_tokens": 1}, timeout=5)
+        deadline = time.monotonic() + 5
+        while manager.loaded() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert manager.loaded() == [] and manager.metrics()["resident_mb"] == 0
+        assert manager.generate("tiny", "x", {"max_tokens": 1}, timeout=5).text == " x"
+        assert manager.metrics()["models"]["tiny"]["loads"] == 2
+
+
+def test_queue_limit_and_unknown_model():
+    gate = threading.Event()
+    with make_manager(fake(step_ms=1), max_queue=2) as manager:
+        blocker = manager.submit("tiny", "x", {"max_tokens": 1}, on_token=lambda _: gate.wait(5) and None)
+        time.sleep(0.05)  # let the engine pick up the blocker
+        manager.submit("tiny", "x")
+        manager.submit("tiny", "x")
+        with pytest.raises(QueueFullError):
+            manager.submit("tiny", "x")
+        gate.set()
+        blocker.result(5)
+        with pytest.raises(ModelNotFoundError):
+            manager.submit("nope", "x")
+
+
+
+def test_roles_without_a_list_use_the_default():
+    registry = ModelRegistry([fake("tiny"), fake("big")])
+    resolver = ModelResolver(registry, roles={"coder": ["big"]}, default=["missing", "tiny"])
+    assert [resolver.resolve(n).name for n in ("coder", "reviewer", "big")] == ["big", "tiny", "big"]
+    with pytest.raises(ModelNotFoundError):
+        ModelResolver(registry, roles={"coder": ["big"]}).resolve("reviewer")
+
+def test_backend_errors_fail_only_their_requests():
+    class Broken(Exception):
+        pass
+
+    def boom(text):
+        raise Broken(text)
+
+    with make_manager(fake()) as manager:
+        bad = manager.submit("tiny", "x", {"max_tokens": 3}, on_token=boom)
+        good = manager.submit("tiny", "y", {"max_tokens": 3})
+        with pytest.raises(Broken):
+            bad.result(5)
+        assert good.result(5).text == " y y y"
+        assert manager.metrics()["models"]["tiny"]["failed"] == 1
+
+
+def test_async_stream():
+    async def run(manager):
+        pieces = [p async for p in manager.astream("tiny", "a b", {"max_tokens": 4})]
+        done = await manager.agenerate("tiny", "c", {"max_tokens": 2})
+        return pieces, done
+
+    with make_manager(fake()) as manager:
+        pieces, done = asyncio.run(run(manager))
+    assert pieces == [" a", " b", " a", " b"] and done.text == " c c"
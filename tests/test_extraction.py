@@ -0,0 +1,96 @@
+import pytest
+
+from autoappbuilder.ingestion.parsers import constraints_extractor, requirements_extractor
+from autoappbuilder.ingestion.parsers.incremental import SectionCache, extract_document, extract_text
+from autoappbuilder.parser.nl_parser import Section, parse_document, parse_pages, sentences
+
+SPEC = """Acme portal specification.
+
+1 Overview
+The portal serves partners, e.g. resellers. It replaces the old site.
+
+1.1 Performance
+- The system shall respond within 200 ms for 95% of requests.
+- REQ-7: The API must not store passwords in plain text.
+The service will support 10,000 concurrent users and 99.9% uptime.
+
+# Delivery
+Budget is $250k. Launch by March 1, 2026. It must comply with GDPR and SOC 2.
+The backend must be built with Python and deployed to AWS Lambda.
+
+SECURITY
+Uploads should be scanned; files up to 5 GB may be accepted.
+"""
+
+
+def test_sections_and_sentences():
+    doc = parse_document(SPEC)
+    assert [(s.id, s.title, s.level) for s in doc.sections] == [
+        ("_preamble", "", 0), ("1", "Overview", 1), ("1.1", "Performance", 2),
+        ("delivery", "Delivery", 1), ("security", "Security", 1),
+    ]
+    assert list(sentences(doc.by_id()["1"].text)) == ["The portal serves partners, e.g. resellers.", "It replaces the old site."]
+    paged = parse_pages(["Intro\n1 Overview\ntext", "2 Scope\nmore"])
+    assert [(s.id, s.page) for s in paged.sections] == [("_preamble", 1), ("1", 1), ("2", 2)]
+
+
+def test_requirements():
+    found = requirements_extractor.extract(parse_document(SPEC).by_id()["1.1"])
+    assert [(r["ref"], r["priority"], r["negated"], r["category"]) for r in found] == [
+        (None, "must", False, "performance"), ("REQ-7", "must", True, "security"), (None, "must", False, "availability"),
+    ]
+
+
+def test_constraints():
+    doc = parse_document(SPEC).by_id()
+    kinds = lambda sid: [(c["kind"], c["op"], c["value"]) for c in constraints_extractor.extract(doc[sid])]
+    assert kinds("1.1") == [
+        ("duration", "<=", 0.2), ("percentage", "=", 0.95), ("availability", ">=", 0.999), ("load", ">=", 10000.0),
+    ]
+    assert kinds("delivery") == [
+        ("budget", "=", 250000.0), ("deadline", "<=", "March 1, 2026"), ("compliance", "=", "GDPR"),
+        ("compliance", "=", "SOC 2"), ("technology", "=", "Python"), ("technology", "=", "AWS Lambda"),
+    ]
+    assert kinds("security") == [("size", "<=", 5e9)]
+
+
+def test_dates_and_counts_are_not_modals_or_deadlines():
+    section = lambda text: Section(id="s", title="", level=1, text=text)
+    assert requirements_extractor.extract(section("Kick-off is on May 4. The review is in May 2026.")) == []
+    assert [r["priority"] for r in requirements_extractor.extract(section("Admins may export reports."))] == ["may"]
+    deadlines = lambda text: [c["value"] for c in constraints_extractor.extract(section(text)) if c["kind"] == "deadline"]
+    assert deadlines("Traffic should grow by 2000 users. Storage grows by 1500 MB a year.") == []
+    assert deadlines("Ship by 2027. Migrate before 2026 and retire the old site by end of 2028.") == ["2027", "2026", "end of 2028"]
+
+
+def test_only_changed_sections_are_reprocessed(tmp_path):
+    with SectionCache(tmp_path / "sections.sqlite") as cache:
+        first = extract_text(SPEC, cache)
+        assert first.extracted == ["_preamble", "1", "1.1", "delivery", "security"]
+        ids = [r["id"] for r in first.results["requirements"]]
+        assert ids == ["1.1-R1", "REQ-7", "1.1-R3", "delivery-R1", "delivery-R2", "security-R1"]
+
+    edited = SPEC.replace("within 200 ms", "within 150 ms")
+    with SectionCache(tmp_path / "sections.sqlite") as cache:
+        again = extract_text(edited, cache)
+        assert again.extracted == ["1.1"] and again.reused == 4
+        assert again.results["constraints"][0]["value"] == 0.15
+        assert again.results["requirements"][3:] == first.results["requirements"][3:]
+
+
+def test_moved_section_reuses_results_with_new_placement(tmp_path):
+    doc = parse_document(SPEC)
+    with SectionCache(tmp_path / "sections.sqlite") as cache:
+        extract_document(doc, cache)
+        moved = type(doc)([doc.sections[0], doc.sections[4], *doc.sections[1:4]])
+        moved.sections[1] = Section("9", "Security", 1, doc.sections[4].text)
+        result = extract_document(moved, cache)
+    assert result.extracted == [] and result.results["requirements"][0]["section"] == "9"
+
+
+def test_cache_prunes_old_versions(tmp_path, monkeypatch):
+    with SectionCache(tmp_path / "sections.sqlite") as cache:
+        extract_text(SPEC, cache)
+        monkeypatch.setattr(requirements_extractor, "VERSION", requirements_extractor.VERSION + 1)
+        assert extract_text(SPEC, cache).reused == 0  # a new extractor version misses the cache
+        assert cache.prune() == 5
@@ -0,0 +1,77 @@
+import queue
+import subprocess
+import sys
+
+import pytest
+
+import filetree
+
+
+@pytest.mark.parametrize("pattern, path, is_dir, ignored", [
+    ("node_modules/", "node_modules", True, True),
+    ("node_modules/", "node_modules", False, False),
+    ("node_modules/", "web/node_modules", True, True),
+    ("/build", "build", True, True),
+    ("/build", "src/build", True, False),
+    ("*.log", "a/b/c.log", False, True),
+    ("docs/*.md", "docs/a.md", False, True),
+    ("docs/*.md", "docs/sub/a.md", False, False),
+    ("**/cache", "x/y/cache", True, True),
+    ("data/**", "data/a/b", False, True),
+    ("file[0-9].txt", "file7.txt", False, True),
+])
+def test_gitignore_patterns(pattern, path, is_dir, ignored):
+    chain = [("", filetree.parse_gitignore(pattern))]
+    assert filetree.GitIgnore.match(chain, path, is_dir) is ignored
+
+
+def test_negation_and_nested_gitignore(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("*.log\n!keep.log\nnode_modules/\n")
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / ".gitignore").write_text("dist/\n!debug.log\n")
+    for p in ("a.log", "keep.log", "main.py", "node_modules/x.js", "web/dist/app.js", "web/debug.log", "web/src/x.ts"):
+        (tmp_path / p).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / p).write_text("")
+
+    cache = filetree.DirCache()
+    assert [e.name for e in cache.listdir(tmp_path)] == ["web", ".gitignore", "keep.log", "main.py"]
+    assert [(e.name, e.is_dir) for e in cache.listdir(tmp_path / "web")] == [("src", True), (".gitignore", False), ("debug.log", False)]
+
+
+def test_listing_cached_until_invalidated(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "b.txt").write_text("")
+    cache = filetree.DirCache()
+    first = cache.listdir(tmp_path)
+    inner = cache.listdir(tmp_path / "sub")
+    (tmp_path / "a.txt").write_text("")
+    assert cache.listdir(tmp_path) is first
+    cache.invalidate(tmp_path)
+    assert [e.name for e in cache.listdir(tmp_path)] == ["sub", "a.txt", "b.txt"]
+    assert cache.cached(tmp_path / "sub") is inner
+    cache.invalidate(tmp_path, subtree=True)
+    assert cache.cached(tmp_path / "sub") is None
+
+
+def _watchers():
+    yield "poll"
+    if sys.platform.startswith("linux"):
+        yield "inotify"
+
+
+@pytest.mark.parametrize("kind", list(_watchers()))
+def test_watcher_reports_changes(tmp_path, kind):
+    events = queue.Queue()
+    on_change = lambda d, subtree: events.put((d, subtree))
+    w = filetree.PollingWatcher(on_change, interval=0.05) if kind == "poll" else filetree.InotifyWatcher(on_change)
+    try:
+        w.watch(tmp_path)
+        (tmp_path / "new.txt").write_text("x")
+        assert events.get(timeout=5) == (str(tmp_path), False)
+        while not events.empty():
+            events.get()
+        (tmp_path / ".gitignore").write_text("*.tmp\n")
+        assert events.get(timeout=5) == (str(tmp_path), True)
+    finally:
+        w.close()
@@ -7,3 +7,73 @@ def test_scaffold(tmp_path: Path):
     out_dir = tmp_path / "out"
     r.scaffold("python_basic", out_dir, {"project_name": "demo", "package_name": "demo"})
     assert (out_dir / "README.md").exists()
+
+def test_compiled_template_cache(tmp_path: Path):
+    src = tmp_path / "tpl" / "basic"
+    (src / "{{ package_name }}").mkdir(parents=True)
+    (src / "{{ package_name }}" / "mod.py.j2").write_text("NAME = '{{ project_name }}'\n")
+    r = TemplateRenderer(tmp_path / "tpl", cache_size=1)
+    first = r.compile("basic")
+    assert r.compile("basic") is first
+
+    (src / "extra.txt").write_text("x")
+    assert r.compile("basic") is not first
+
+    r.scaffold("basic", tmp_path / "out", {"project_name": "demo", "package_name": "pkg"}, workers=4)
+    assert (tmp_path / "out" / "pkg" / "mod.py").read_text() == "NAME = 'demo'\n"
+    assert (tmp_path / "out" / "extra.txt").exists()
+
+def test_incremental_scaffold(tmp_path: Path):
+    from autoappbuilder.generator.incremental import incremental_scaffold, MANIFEST_NAME
+    src = tmp_path / "tpl" / "basic"
+    src.mkdir(parents=True)
+    (src / "a.txt.j2").write_text("{{ project_name }}\n")
+    (src / "b.txt").write_text("static\n")
+    r = TemplateRenderer(tmp_path / "tpl")
+    out = tmp_path / "out"
+    ctx = {"project_name": "demo"}
+
+    first = incremental_scaffold(r, "basic", out, ctx)
+    assert first.added == ["a.txt", "b.txt"] and (out / MANIFEST_NAME).exists()
+    mtime = (out / "b.txt").stat().st_mtime_ns
+
+    again = incremental_scaffold(r, "basic", out, ctx)
+    assert again.skipped_render and not again.dirty
+
+    (src / "b.txt").unlink()
+    changed = incremental_scaffold(r, "basic", out, {"project_name": "other"})
+    assert changed.changed == ["a.txt"] and changed.removed == ["b.txt"]
+    assert (out / "b.txt").stat().st_mtime_ns == mtime
+
+    pruned = incremental_scaffold(r, "basic", out, {"project_name": "other"}, prune=True)
+    assert pruned.removed == ["b.txt"] and not (out / "b.txt").exists()
+
+def test_incremental_same_size_edit_and_pruned_dirs(tmp_path: Path):
+    import os
+    import pytest
+    from autoappbuilder.generator.cli import main
+    from autoappbuilder.generator.incremental import incremental_scaffold
+    src = tmp_path / "tpl" / "basic"
+    (src / "pkg" / "sub").mkdir(parents=True)
+    (src / "keep").mkdir()
+    (src / "a.txt").write_text("aaaa\n")
+    (src / "pkg" / "sub" / "mod.py").write_text("x = 1\n")
+    r = TemplateRenderer(tmp_path / "tpl")
+    out = tmp_path / "out"
+    incremental_scaffold(r, "basic", out, {})
+
+    (out / "a.txt").write_text("bbbb\n")  # same size
+    st = (out / "a.txt").stat()
+    os.utime(out / "a.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    again = incremental_scaffold(r, "basic", out, {})
+    assert not again.skipped_render and again.changed == ["a.txt"]
+    assert (out / "a.txt").read_text() == "aaaa\n"
+
+    (src / "pkg" / "sub" / "mod.py").unlink()
+    (src / "pkg" / "sub").rmdir()
+    (src / "pkg").rmdir()
+    pruned = incremental_scaffold(r, "basic", out, {}, prune=True)
+    assert pruned.removed == ["pkg/sub/mod.py"] and not (out / "pkg").exists() and (out / "keep").is_dir()
+
+    with pytest.raises(SystemExit):
+        main(["--name", "x", "--out", str(out), "--prune"])
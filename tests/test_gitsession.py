@@ -0,0 +1,54 @@
+import subprocess
+
+import pytest
+
+import gitsession
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "a.txt").write_text("one\n")
+    git(tmp_path, "add", "a.txt")
+    git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_head_cache_tracks_commits_and_checkout(repo):
+    s = gitsession.GitSession(repo)
+    branch, sha = s.head()
+    assert branch == "main" and len(sha) == 40
+    assert s.head() is s.head()  # served from cache while HEAD/refs are untouched
+
+    (repo / "a.txt").write_text("two\n")
+    git(repo, "commit", "-q", "-am", "two")
+    assert s.head()[1] != sha
+    git(repo, "checkout", "-q", "-b", "feature")
+    assert s.branch() == "feature"
+    git(repo, "pack-refs", "--all")
+    assert s.head()[1] == subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True).stdout.strip()
+
+
+def test_status_porcelain_v2(repo):
+    s = gitsession.GitSession(repo)
+    assert s.status().clean
+    git(repo, "mv", "a.txt", "b c.txt")
+    (repo / "new.txt").write_text("x")
+    st = s.status()
+    kinds = {(e.kind, e.path, e.orig_path) for e in st.entries}
+    assert ("renamed", "b c.txt", "a.txt") in kinds and ("untracked", "new.txt", None) in kinds
+    assert st.branch == "main" and not st.clean
+
+
+def test_current_project_cache(tmp_path):
+    marker = tmp_path / ".autobuild_current"
+    cur = gitsession.CurrentProject(marker, tmp_path)
+    assert cur.get() == tmp_path
+    cur.set(tmp_path / "sub" / ".." / "proj")
+    assert cur.get() == tmp_path / "proj" and marker.read_text() == str(tmp_path / "proj")
+    marker.write_text(str(tmp_path / "other-project"))
+    assert cur.get() == tmp_path / "other-project"
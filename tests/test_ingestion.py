@@ -0,0 +1,109 @@
+import zipfile
+
+import pytest
+
+from autoappbuilder.exceptions import ConverterUnavailableError
+from autoappbuilder.ingestion.converters import converter_for, pdf
+from autoappbuilder.ingestion.pipelines.intake_pipeline import IntakePipeline
+from autoappbuilder.ingestion.utils.normalizer import normalize
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+A = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+P = 'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+
+
+def make_docx(path, pages):
+    body = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'.join(
+        "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in page) for page in pages
+    )
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>")
+    return path
+
+
+def make_pptx(path, slides):
+    rels = "".join(
+        f'<Relationship Id="rId{i}" Target="slides/slide{i}.xml"/>' for i in range(1, len(slides) + 1)
+    )
+    # presentation order differs from part numbering, as after reordering slides in PowerPoint
+    order = "".join(f'<p:sldId r:id="rId{i}"/>' for i in reversed(range(1, len(slides) + 1)))
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("ppt/_rels/presentation.xml.rels",
+                    f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        zf.writestr("ppt/presentation.xml", f"<p:presentation {P} {R}><p:sldIdLst>{order}</p:sldIdLst></p:presentation>")
+        for i, text in enumerate(slides, 1):
+            zf.writestr(f"ppt/slides/slide{i}.xml", f"<p:sld {P} {A}><a:p><a:r><a:t>{text}</a:t></a:r></a:p></p:sld>")
+    return path
+
+
+@pytest.fixture
+def docs(tmp_path):
+    return [
+        make_docx(tmp_path / "spec.docx", [["Intro", "The system – shall"], ["Second page"]]),
+        make_pptx(tmp_path / "deck.pptx", [f"slide {i}" for i in range(1, 6)]),
+        tmp_path / "notes.md",
+    ]
+
+
+@pytest.fixture(autouse=True)
+def markdown(docs):
+    docs[2].write_text("# Title\n\nSome **bold** [link](http://x) text.\f## Next\n")
+
+
+def collect(pipeline, docs, **kw):
+    out = {}
+    for page in pipeline.run(docs, **kw):
+        out.setdefault(page.document.rsplit("/", 1)[-1], []).append((page.number, page.text, page.cached))
+    return out
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_pages_are_converted_normalized_and_cached(docs, tmp_path, workers):
+    with IntakePipeline(tmp_path / "cache", workers=workers, batch_pages=2) as p:
+        first = collect(p, docs)
+        assert first["spec.docx"] == [(1, "Intro\nThe system - shall", False), (2, "Second page", False)]
+        assert [t for _, t, _ in first["deck.pptx"]] == [f"slide {i}" for i in range(5, 0, -1)]
+        assert first["notes.md"] == [(1, "Title\n\nSome bold link text.", False), (2, "Next", False)]
+
+        again = collect(p, docs, ordered=False)
+        assert {k: [(n, t) for n, t, _ in v] for k, v in again.items()} == {
+            k: [(n, t) for n, t, _ in v] for k, v in first.items()
+        }
+        assert all(cached for pages in again.values() for _, _, cached in pages)
+        stats = p.timings.snapshot()
+        assert stats["convert"]["calls"] >= 3 and stats["cached_documents"]["calls"] == 3
+
+
+def test_cache_separates_plain_text_from_markdown(docs, tmp_path):
+    (tmp_path / "notes.txt").write_bytes(docs[2].read_bytes())  # same bytes, same checksum
+    with IntakePipeline(tmp_path / "cache", workers=0) as p:
+        md = collect(p, [docs[2]])["notes.md"]
+        txt = collect(p, [tmp_path / "notes.txt"])["notes.txt"]
+    assert not any(cached for _, _, cached in txt)
+    assert txt[0][1].startswith("# Title") and md[0][1].startswith("Title")
+
+
+def test_errors_raise_or_are_skipped(docs, tmp_path):
+    bad = tmp_path / "broken.docx"
+    bad.write_bytes(b"not a zip")
+    unknown = tmp_path / "image.bmp"
+    unknown.write_bytes(b"BM")
+    with IntakePipeline(workers=0) as p:
+        with pytest.raises(Exception):
+            list(p.run([bad]))
+        pages = collect(p, [bad, docs[0], unknown], on_error="skip")
+        assert list(pages) == ["spec.docx"]
+        assert [path.rsplit("/", 1)[-1] for path, _ in p.errors] == ["broken.docx", "image.bmp"]
+
+
+def test_converter_lookup():
+    with pytest.raises(ConverterUnavailableError):
+        converter_for("a.xyz")
+    if not pdf.available():
+        with pytest.raises(ConverterUnavailableError, match="optional dependency"):
+            converter_for("a.pdf")
+
+
+def test_normalize():
+    assert normalize("“Quoted” text —\r\nhyphen-\nated\n\n\n\nend\x00 ") == '"Quoted" text -\nhyphenated\n\nend'
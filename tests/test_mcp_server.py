@@ -0,0 +1,115 @@
+import asyncio
+import io
+import json
+
+import mcp_server
+
+
+def drive(lines, methods, monkeypatch):
+    monkeypatch.setattr(mcp_server, "METHODS", methods)
+    out = io.StringIO()
+    feed = iter(lines + [""])
+
+    async def readline():
+        await asyncio.sleep(0)
+        return next(feed)
+
+    asyncio.run(mcp_server.Server(out).serve(readline))
+    return [json.loads(l) for l in out.getvalue().splitlines()]
+
+
+async def slow(_params):
+    await asyncio.sleep(0.2)
+    return mcp_server.ok("slow")
+
+
+async def fast(_params):
+    return mcp_server.ok("fast")
+
+
+def test_out_of_order_responses(monkeypatch):
+    lines = [json.dumps({"jsonrpc": "2.0", "id": 1, "method": "slow"}),
+             json.dumps({"jsonrpc": "2.0", "id": 2, "method": "fast"})]
+    resps = drive(lines, {"slow": slow, "fast": fast}, monkeypatch)
+    assert [r["id"] for r in resps] == [2, 1]
+
+
+def test_batch_and_cancel(monkeypatch):
+    batch = [{"jsonrpc": "2.0", "id": "a", "method": "fast"},
+             {"jsonrpc": "2.0", "method": "fast"},
+             {"jsonrpc": "2.0", "id": "b", "method": "nope"}]
+    lines = [json.dumps(batch),
+             json.dumps({"jsonrpc": "2.0", "id": 7, "method": "slow"}),
+             json.dumps({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 7}}),
+             "{not json"]
+    resps = drive(lines, {"slow": slow, "fast": fast}, monkeypatch)
+    parse_error = next(r for r in resps if isinstance(r, dict) and r.get("error", {}).get("code") == -32700)
+    assert parse_error["id"] is None
+    batch_resp = next(r for r in resps if isinstance(r, list))
+    assert {r["id"] for r in batch_resp} == {"a", "b"}
+    cancelled = next(r for r in resps if isinstance(r, dict) and r.get("id") == 7)
+    assert cancelled["error"]["code"] == mcp_server.REQUEST_CANCELLED
+
+
+def test_git_lock_serializes_same_project(monkeypatch, tmp_path):
+    active = []
+    overlaps = []
+
+    async def fake_run(cmd, cwd=None):
+        active.append(cwd)
+        overlaps.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(cwd)
+        return mcp_server.RunResult(0, "", 0.01, 0, False)
+
+    monkeypatch.setattr(mcp_server, "run", fake_run)
+    monkeypatch.setattr(mcp_server, "read_current", lambda: tmp_path)
+    lines = [json.dumps({"jsonrpc": "2.0", "id": i, "method": "tools.commit"}) for i in range(4)]
+    resps = drive(lines, {"tools.commit": mcp_server.tools_commit}, monkeypatch)
+    assert len(resps) == 4 and max(overlaps) == 1
+
+
+def test_streaming_progress_and_bounded_tail(monkeypatch, tmp_path):
+    import sys
+
+    async def noisy(params):
+        cmd = [sys.executable, "-c", "import sys; [sys.stdout.write('x' * 1000 + chr(10)) for _ in range(200)]"]
+        res = await mcp_server.run(cmd, cwd=str(tmp_path))
+        return mcp_server.ok(res.result())
+
+    lines = [json.dumps({"jsonrpc": "2.0", "id": 1, "method": "noisy", "params": {"stream": True, "tailKB": 4}})]
+    resps = drive(lines, {"noisy": noisy}, monkeypatch)
+    progress = [r["params"]["value"] for r in resps if r.get("method") == "$/progress"]
+    final = resps[-1]["result"]
+    assert progress[0]["kind"] == "begin" and progress[-1] == {"kind": "end", "rc": 0, "elapsed": final["elapsed"]}
+    assert sum(len(p["chunk"]) for p in progress if p["kind"] == "output") == 200 * 1001
+    assert final["bytes"] == 200 * 1001 and final["truncated"] and len(final["stdout"]) == 4096
+
+
+def test_truncated_utf8_output_is_flushed_before_end(monkeypatch, tmp_path):
+    import sys
+
+    async def partial(params):
+        # "é" cut after its first byte: the decoder holds it back until told the stream ended
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'ok \\xc3')"]
+        return mcp_server.ok((await mcp_server.run(cmd, cwd=str(tmp_path))).result())
+
+    lines = [json.dumps({"jsonrpc": "2.0", "id": 1, "method": "partial", "params": {"stream": True}})]
+    progress = [r["params"]["value"] for r in drive(lines, {"partial": partial}, monkeypatch) if r.get("method") == "$/progress"]
+    assert "".join(p["chunk"] for p in progress if p["kind"] == "output") == "ok �"
+    assert progress[-1]["kind"] == "end"
+
+
+def test_non_object_params_are_invalid(monkeypatch):
+    lines = [json.dumps({"jsonrpc": "2.0", "id": i, "method": "fast", "params": p}) for i, p in enumerate([["x"], "x", 3])]
+    lines.append(json.dumps({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": [1]}))  # notification: no reply
+    lines.append(json.dumps({"jsonrpc": "2.0", "id": 9, "method": "fast"}))
+    resps = drive(lines, {"fast": fast}, monkeypatch)
+    assert sorted((r["id"], r.get("error", {}).get("code")) for r in resps) == [
+        (0, -32602), (1, -32602), (2, -32602), (9, None)]
+
+
+def test_non_numeric_tail_is_invalid(monkeypatch):
+    lines = [json.dumps({"jsonrpc": "2.0", "id": i, "method": "fast", "params": {"tailKB": t}}) for i, t in enumerate(["lots", None, 4])]
+    resps = drive(lines, {"fast": fast}, monkeypatch)
+    assert sorted((r["id"], r.get("error", {}).get("code")) for r in resps) == [(0, -32602), (1, -32602), (2, None)]
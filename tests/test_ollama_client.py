@@ -0,0 +1,230 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from autoappbuilder.exceptions import BackendRequestError, BackendUnavailableError
+from autoappbuilder.llm.local.backends.ollama.client import OllamaClient
+from autoappbuilder.llm.local.engines.engine_manager import EngineManager
+from autoappbuilder.llm.local.engines.model_registry import ModelRegistry, ModelSpec
+from autoappbuilder.llm.local.engines.model_resolver import ModelResolver
+
+
+class StandIn:
+    """A minimal Ollama lookalike: chunked NDJSON streams over keep-alive connections."""
+
+    def __init__(self, fail_first=0, close_idle=False, delay=0.0):
+        self.fail_first = fail_first
+        self.close_idle = close_idle
+        self.delay = delay
+        self.connections = 0
+        self.active = self.peak = 0
+        self.requests = []
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.url = "http://127.0.0.1:%d" % self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                method, path, _ = line.decode().split(" ", 2)
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b""):
+                    k, _, v = h.decode().partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((method, path))
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                try:
+                    await self.respond(writer, path, json.loads(body) if body else None)
+                finally:
+                    self.active -= 1
+                if self.close_idle:
+                    writer.close()
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+    @staticmethod
+    def send(writer, status, payload, extra=""):
+        data = json.dumps(payload).encode()
+        writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n{extra}"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+
+    async def respond(self, writer, path, body):
+        if path == "/api/tags":
+            self.send(writer, 200, {"models": [{"name": "coder"}]})
+        elif self.fail_first:
+            self.fail_first -= 1
+            self.send(writer, 503, {"error": "busy"}, "Retry-After: 0\r\n")
+        elif body.get("model") == "missing":
+            self.send(writer, 404, {"error": "model 'missing' not found"})
+        elif path == "/api/slow":
+            await asyncio.sleep(1)
+        elif "prompt" not in body and "messages" not in body:  # load or unload
+            self.send(writer, 200, {"model": body["model"], "done": True})
+        else:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+            key, words = ("message", body["messages"][-1]["content"].split()) if "messages" in body else ("response", body["prompt"].split())
+            lines = [json.dumps({"model": body["model"], key: {"role": "assistant", "content": w} if key == "message" else w, "done": False})
+                     if w != "boom" else json.dumps({"error": "out of memory"}) for w in words]
+            lines.append(json.dumps({"model": body["model"], "done": True, "eval_count": len(words)}))
+            data = ("\n".join(lines) + "\n").encode()
+            # cut chunks mid-line and several lines per chunk, as real servers do
+            for i in range(0, len(data), 37):
+                part = data[i:i + 37]
+                writer.write(b"%x\r\n%s\r\n" % (len(part), part))
+                await writer.drain()
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_stream_parses_ndjson_across_chunks():
+    async def main():
+        async with StandIn() as server, OllamaClient(server.url) as client:
+            pieces = []
+            done = await client.generate("coder", "one two three four five six", on_token=pieces.append)
+            objects = [obj async for obj in client.stream("/api/generate", {"model": "coder", "prompt": "a b"})]
+            chat = await client.chat("coder", [{"role": "user", "content": "hi there"}])
+            return pieces, done, objects, chat, client.metrics.snapshot()
+
+    pieces, done, objects, chat, metrics = run(main())
+    assert pieces == ["one", "two", "three", "four", "five", "six"]
+    assert done["response"] == "onetwothreefourfivesix" and done["done"] and done["eval_count"] == 6
+    assert [o.get("response") for o in objects] == ["a", "b", None]
+    assert chat["message"] == {"role": "assistant", "content": "hithere"}
+    assert metrics["ttft_ms"]["p50"] > 0 and metrics["requests"] == 3
+
+
+def test_keep_alive_reuses_connections():
+    async def main():
+        async with StandIn() as server, OllamaClient(server.url) as client:
+            for _ in range(10):
+                await client.generate("coder", "x y")
+            assert await client.tags() == [{"name": "coder"}]
+            return server.connections, client.metrics
+
+    connections, metrics = run(main())
+    assert connections == 1
+    assert metrics.connections_opened == 1 and metrics.connections_reused == 10
+    assert metrics.reuse_rate == pytest.approx(10 / 11)
+
+
+def test_concurrency_is_bounded_per_host():
+    async def main():
+        async with StandIn(delay=0.005) as server, OllamaClient(server.url, max_per_host=2) as client:
+            results = await asyncio.gather(*(client.generate("coder", f"w{i} x y z") for i in range(8)))
+            return server, client.metrics, results
+
+    server, metrics, results = run(main())
+    assert [r["response"] for r in results] == [f"w{i}xyz" for i in range(8)]
+    assert server.peak == 2 and server.connections == 2 and metrics.connections_opened == 2
+
+
+def test_retries_transient_errors_with_backoff():
+    async def main():
+        async with StandIn(fail_first=2) as server, OllamaClient(server.url, retries=2, backoff=0.001) as client:
+            done = await client.generate("coder", "ok")
+            server.fail_first = 3
+            with pytest.raises(BackendRequestError) as exc:
+                await client.generate("coder", "ok")
+            return done, exc.value, client.metrics
+
+    done, error, metrics = run(main())
+    assert done["response"] == "ok" and error.status == 503 and error.detail == "busy"
+    assert metrics.retries == 4 and metrics.failures == 1
+
+
+def test_client_errors_are_not_retried_and_timeouts_raise():
+    async def main():
+        async with StandIn() as server, OllamaClient(server.url, read_timeout=0.05, retries=1, backoff=0.001) as client:
+            with pytest.raises(BackendRequestError) as exc:
+                await client.generate("missing", "x")
+            assert exc.value.status == 404 and "not found" in exc.value.detail and client.metrics.retries == 0
+            with pytest.raises(asyncio.TimeoutError):
+                await client.request_json("POST", "/api/slow", {"model": "coder"})
+            assert client.metrics.timeouts == 2 and client.metrics.retries == 1
+            with pytest.raises(asyncio.TimeoutError):
+                await client.generate("coder", "x", timeout=0.0001)
+
+    run(main())
+
+
+def test_dropped_idle_connections_and_unreachable_host():
+    async def main():
+        async with StandIn(close_idle=True) as server, OllamaClient(server.url) as client:
+            for _ in range(3):
+                assert (await client.generate("coder", "a"))["response"] == "a"
+                await asyncio.sleep(0.01)
+            assert server.connections == 3 and client.metrics.failures == 0
+            url = server.url
+        async with OllamaClient(url, retries=1, backoff=0.001) as client:
+            with pytest.raises(BackendUnavailableError):
+                await client.tags()
+
+    run(main())
+
+
+def test_engine_runtime_streams_through_the_client():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(StandIn(delay=0.001).__aenter__(), loop).result()
+    spec = ModelSpec("coder", "ollama", "coder", options={"host": server.url})
+    try:
+        with EngineManager(ModelResolver(ModelRegistry([spec]))) as manager:
+            futures = [manager.submit("coder", f"w{i} x y", {"max_tokens": 10}) for i in range(6)]
+            broken = manager.submit("coder", "a boom b", {"max_tokens": 10})  # an error chunk mid-stream
+            chat = manager.generate("coder", [{"role": "user", "content": "hi there"}], timeout=5)
+            results = [f.result(5) for f in futures]
+            with pytest.raises(BackendRequestError, match="out of memory"):
+                broken.result(5)
+            assert manager.metrics()["models"]["coder"]["failed"] == 1
+        assert [r.text for r in results] == [f"w{i}xy" for i in range(6)]
+        assert all(r.finish_reason == "eos" for r in results) and chat.text == "hithere"
+        assert server.requests[0] == ("POST", "/api/generate") and server.requests[-1] == ("POST", "/api/generate")
+    finally:
+        asyncio.run_coroutine_threadsafe(server.__aexit__(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def test_engine_runtime_reuses_one_connection_for_sequential_generations():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(StandIn().__aenter__(), loop).result()
+    spec = ModelSpec("coder", "ollama", "coder", options={"host": server.url})
+    try:
+        with EngineManager(ModelResolver(ModelRegistry([spec]))) as manager:
+            texts = [manager.generate("coder", f"w{i} x y", timeout=5).text for i in range(10)]
+            capped = manager.generate("coder", "a b c d", {"max_tokens": 2}, timeout=5)
+            time.sleep(0.2)  # a capped stream is read to its end after release
+            last = manager.generate("coder", "z", timeout=5)
+        assert texts == [f"w{i}xy" for i in range(10)] and capped.finish_reason == "length" and last.text == "z"
+        assert len(server.requests) == 14 and server.connections <= 2  # load, 12 generations, unload
+    finally:
+        asyncio.run_coroutine_threadsafe(server.__aexit__(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
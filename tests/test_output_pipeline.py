@@ -0,0 +1,45 @@
+import asyncio
+import io
+
+import output_pipeline
+
+
+def test_partial_lines_join_across_feeds():
+    buf = output_pipeline.OutputBuffer(max_lines=10)
+    buf.feed("hel")
+    buf.feed("lo\nwor")
+    assert buf.drain() == ("hello\nwor", 0)
+    buf.feed("ld\n")
+    assert buf.drain() == ("ld\n", 0)
+    assert buf.drain() == ("", 0)
+
+
+def test_flood_keeps_only_newest_lines_and_counts_the_rest(tmp_path):
+    log = tmp_path / "logs" / "session.log"
+    buf = output_pipeline.OutputBuffer(max_lines=100, spill=log)
+    data = "".join(f"line {i}\n" for i in range(1_000_000)).encode()
+    output_pipeline.read_stream(io.BufferedReader(io.BytesIO(data)), buf)
+    assert len(buf._pending) == 100
+    text, dropped = buf.drain()
+    assert dropped == 1_000_000 - 100
+    assert text.splitlines() == [f"line {i}" for i in range(999_900, 1_000_000)]
+    buf.close()
+    assert log.read_bytes() == data
+
+
+def test_read_stream_decodes_utf8_split_across_chunks(monkeypatch):
+    monkeypatch.setattr(output_pipeline, "READ_CHUNK", 1)
+    buf = output_pipeline.OutputBuffer()
+    output_pipeline.read_stream(io.BytesIO("naïve → ok\r\n".encode()), buf)
+    assert buf.drain() == ("naïve → ok\n", 0)
+
+
+def test_read_stream_async():
+    async def go():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"a\nb\nc")
+        reader.feed_eof()
+        buf = output_pipeline.OutputBuffer(max_lines=2)
+        await output_pipeline.read_stream_async(reader, buf)
+        return buf.drain()
+    assert asyncio.run(go()) == ("b\nc", 1)
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from autoappbuilder.llm.local.cache.disk_cache import DiskCache
+from autoappbuilder.llm.local.cache.prompt_cache import PromptCache, prompt_key
+from autoappbuilder.llm.local.scripts import warm_cache
+
+MESSAGES = [{"role": "system", "content": "You write code."}, {"role": "user", "content": "hello"}]
+
+
+def test_prompt_key_is_canonical():
+    base = prompt_key("m", MESSAGES, {"temperature": 0, "top_p": 0.9})
+    assert prompt_key("m", MESSAGES, {"top_p": 0.9, "temperature": 0.0, "stream": True, "seed": None}) == base
+    assert prompt_key("m", MESSAGES, {"temperature": 0.2, "top_p": 0.9}) != base
+    assert prompt_key("other", MESSAGES, {"temperature": 0, "top_p": 0.9}) != base
+    assert prompt_key("m", "hi") == prompt_key("m", [{"role": "user", "content": "hi", "name": None}])
+
+
+def test_memory_lru_evicts_by_size_and_expires():
+    cache = PromptCache(max_bytes=100)
+    cache.put("a", "x" * 40)
+    cache.put("b", "y" * 40)
+    assert cache.get("a") is not None  # a becomes most recent
+    cache.put("c", "z" * 40)
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats().evictions == 1 and cache.stats().bytes <= 100
+    cache.put("short", "v", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats().expirations == 1
+
+
+def test_disk_tier_persists_and_promotes(tmp_path):
+    with DiskCache(tmp_path / "c.db") as disk:
+        PromptCache(disk=disk).get_or_generate("m", "hi", None, lambda: {"text": "hello"})
+    with DiskCache(tmp_path / "c.db") as disk:
+        cache = PromptCache(disk=disk)
+        assert cache.get_or_generate("m", "hi", None, lambda: pytest.fail("should be cached")) == {"text": "hello"}
+        cache.get(prompt_key("m", "hi"))
+        stats = cache.stats()
+        assert (stats.disk_hits, stats.hits, stats.misses) == (1, 1, 0)
+
+
+def test_disk_cache_ttl_and_size_budget(tmp_path):
+    with DiskCache(tmp_path / "c.db", max_bytes=250) as disk:
+        disk.put("old", "x" * 100, ttl=0.01)
+        time.sleep(0.02)
+        assert disk.get("old") is None
+        assert disk.purge() == 1
+        for i in range(5):
+            disk.put(f"k{i}", "y" * 100)
+        assert disk.size_bytes <= 250 and len(disk) == 2
+        assert disk.get("k4") is not None and disk.get("k0") is None
+
+
+def test_concurrent_identical_requests_generate_once():
+    cache = PromptCache()
+    calls = []
+    gate = threading.Event()
+
+    def generate():
+        calls.append(1)
+        gate.wait(5)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate("m", MESSAGES, None, generate)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == ["answer"] * 8 and len(calls) == 1
+    assert cache.stats().misses == 1
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = PromptCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate("m", "q", None, lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert cache.get_or_generate("m", "q", None, lambda: "ok") == "ok"
+
+
+def test_async_single_flight():
+    cache = PromptCache()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "async answer"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_generate("m", "q", {"seed": 1}, generate) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["async answer"] * 5
+    assert len(calls) == 1 and cache.stats().coalesced == 4
+
+
+
+def test_async_waiters_take_over_a_cancelled_generation(tmp_path):
+    cache = PromptCache(disk=DiskCache(tmp_path / "c.sqlite"))
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(cache.aget_or_generate("m", "q", None, generate))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.aget_or_generate("m", "q", None, generate)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()  # the client went away
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["answer"] * 3
+    assert len(calls) == 2 and cache.stats().coalesced == 2 and cache.disk.get(prompt_key("m", "q")) is not None
+
+def test_warm_cache_script(tmp_path, monkeypatch, capsys):
+    corpus = tmp_path / "corpus.jsonl"
+    lines = [
+        {"model": "m", "prompt": "recorded", "response": "stored answer"},
+        {"model": "m", "messages": MESSAGES, "params": {"temperature": 0}},
+        {"model": "m", "messages": MESSAGES, "params": {"temperature": 0.0}},
+    ]
+    corpus.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    calls = []
+    monkeypatch.setattr(warm_cache, "load_generator", lambda spec: lambda model, messages, params: calls.append(1) or "gen")
+    db = tmp_path / "cache.db"
+    assert warm_cache.main([str(corpus), "--cache", str(db), "--generator", "x:y"]) == 0
+    assert "stored 1, generated 1, already cached 1" in capsys.readouterr().out
+    assert len(calls) == 1
+    with DiskCache(db) as disk:
+        assert disk.get(prompt_key("m", MESSAGES, {"temperature": 0}))[0] == "gen"
+    warm_cache.main([str(corpus), "--cache", str(db)])
+    assert "already cached 3" in capsys.readouterr().out
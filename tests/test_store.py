@@ -0,0 +1,79 @@
+import threading
+import pytest
+from autoappbuilder.exceptions import InvalidCursorError
+from autoappbuilder.utils.store import InMemoryStore, make_store
+from autoappbuilder.storage.db import SQLiteStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    s = InMemoryStore() if request.param == "memory" else SQLiteStore(str(tmp_path / "db.sqlite"))
+    yield s
+    s.close()
+
+
+def test_bundles_and_deployments(store):
+    b = store.create_bundle("demo", {"k": 1})
+    assert store.get_bundle(b["id"]) == b
+    assert store.get_bundle("missing") is None
+    d = store.create_deployment(b["id"], "vercel")
+    assert store.list_bundles() == [b]
+    assert store.list_deployments() == [d]
+    given = store.create_bundle("given", bundle_id="b-1")
+    assert given["id"] == "b-1" and store.get_bundle("b-1") == given
+
+
+def test_sqlite_shared_across_threads(tmp_path):
+    store = make_store(f"sqlite:///{tmp_path}/db.sqlite")
+    ids = []
+    threads = [threading.Thread(target=lambda: ids.append(store.create_bundle("t")["id"])) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert sorted(b["id"] for b in store.list_bundles()) == sorted(ids)
+    reopened = SQLiteStore(str(tmp_path / "db.sqlite"))
+    assert len(reopened.list_bundles()) == 8
+    store.close(); reopened.close()
+
+
+def test_memory_store_concurrent_writes_keep_indexes_consistent():
+    store = InMemoryStore()
+    b = store.create_bundle("demo")
+
+    def write(target):
+        for _ in range(500):
+            store.create_deployment(b["id"], target)
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in ("vercel", "netlify") * 4]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    rows = store.list_deployments()
+    assert len(rows) == len({d["id"] for d in rows}) == 4000
+    assert store.list_deployments(target="netlify") == [d for d in rows if d["target"] == "netlify"]
+
+
+def test_sqlite_in_memory_url():
+    store = make_store("sqlite://")
+    b = store.create_bundle("demo")
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(store.get_bundle(b["id"])))
+    t.start(); t.join()
+    assert seen == [b]
+    store.close()
+
+
+def test_keyset_pagination_and_filters(store):
+    b = store.create_bundle("demo")
+    deps = [store.create_deployment(b["id"], "vercel" if i % 3 else "netlify") for i in range(10)]
+    netlify = [d for d in deps if d["target"] == "netlify"]
+
+    page = store.list_deployments(limit=2, target="netlify")
+    assert page == netlify[:2]
+    rest = store.list_deployments(limit=10, after=page[-1]["id"], target="netlify")
+    assert rest == netlify[2:]
+    assert store.list_deployments(limit=3, after=deps[4]["id"]) == deps[5:8]
+    assert store.list_deployments(target="netlify", status="failed") == []
+    assert store.list_bundles(fields=["name"]) == [{"name": "demo"}]
+    with pytest.raises(InvalidCursorError):
+        store.list_bundles(after="nope")
+    with pytest.raises(ValueError):
+        store.list_bundles(fields=["password"])
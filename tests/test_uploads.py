@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from autoappbuilder.api import uploads as uploads_api
+from autoappbuilder.api.app import app
+from autoappbuilder.exceptions import ChecksumMismatchError, DuplicateUploadError, UploadConflictError
+from autoappbuilder.project.uploads import UploadManager
+
+TUS = {"Tus-Resumable": "1.0.0"}
+PATCH = {**TUS, "Content-Type": "application/offset+octet-stream"}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return UploadManager(tmp_path / "uploads", max_size=1 << 20, chunk_size=1024)
+
+
+@pytest.fixture
+def client(manager):
+    app.dependency_overrides[uploads_api.get_manager] = lambda: manager
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def meta(**kv):
+    return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in kv.items())
+
+
+def test_resumable_upload_round_trip(client, manager):
+    data = os.urandom(5000)
+    r = client.post("/uploads", headers={**TUS, "Upload-Length": "5000", "Upload-Metadata": meta(filename="src.tgz")})
+    assert r.status_code == 201 and r.headers["upload-offset"] == "0"
+    url = r.headers["location"]
+
+    r = client.patch(url, content=data[:3000], headers={**PATCH, "Upload-Offset": "0"})
+    assert r.status_code == 204 and r.headers["upload-offset"] == "3000"
+    assert client.patch(url, content=data[3000:], headers={**PATCH, "Upload-Offset": "2000"}).status_code == 409
+    assert client.head(url).headers["upload-offset"] == "3000"
+
+    r = client.patch(url, content=data[3000:], headers={**PATCH, "Upload-Offset": "3000"})
+    assert r.status_code == 204 and r.headers["upload-offset"] == "5000"
+    status = client.get(url).json()
+    assert status["complete"] and status["sha256"] == hashlib.sha256(data).hexdigest()
+    assert manager.path(status["id"]).read_bytes() == data
+    assert client.patch(url, content=b"x", headers={**PATCH, "Upload-Offset": "5000"}).status_code == 409
+
+
+def test_size_limits(client):
+    r = client.post("/uploads", headers={**TUS, "Upload-Length": str(2 << 20)})
+    assert r.status_code == 413
+    url = client.post("/uploads", headers={**TUS, "Upload-Length": "10"}).headers["location"]
+    assert client.patch(url, content=b"x" * 11, headers={**PATCH, "Upload-Offset": "0"}).status_code == 413
+    assert client.head(url).headers["upload-offset"] == "0"
+    assert client.patch(url, content=b"x", headers={**TUS, "Upload-Offset": "0"}).status_code == 415
+
+
+def test_duplicates_rejected_before_and_after_transfer(client):
+    data = b"same bytes"
+    digest = hashlib.sha256(data).hexdigest()
+    first = client.post("/uploads", headers={**TUS, "Upload-Length": "10", "Upload-Metadata": meta(checksum=digest)})
+    # declared checksum already in flight: point the client at the existing upload
+    dup = client.post("/uploads", headers={**TUS, "Upload-Length": "10", "Upload-Metadata": meta(checksum=digest)})
+    assert dup.status_code == 409 and dup.headers["location"] == first.headers["location"]
+    client.patch(first.headers["location"], content=data, headers={**PATCH, "Upload-Offset": "0"})
+
+    blind = client.post("/uploads", headers={**TUS, "Upload-Length": "10"}).headers["location"]
+    r = client.patch(blind, content=data, headers={**PATCH, "Upload-Offset": "0"})
+    assert r.status_code == 409 and r.headers["location"] == first.headers["location"]
+    assert client.head(blind).status_code == 404
+
+
+def test_chunk_checksum_mismatch_rolls_back(client):
+    url = client.post("/uploads", headers={**TUS, "Upload-Length": "8"}).headers["location"]
+    good = base64.b64encode(hashlib.sha1(b"abcd").digest()).decode()
+    r = client.patch(url, content=b"abcd", headers={**PATCH, "Upload-Offset": "0", "Upload-Checksum": f"sha1 {good}"})
+    assert r.status_code == 204
+    r = client.patch(url, content=b"efgh", headers={**PATCH, "Upload-Offset": "4", "Upload-Checksum": f"sha1 {good}"})
+    assert r.status_code == 460 and client.head(url).headers["upload-offset"] == "4"
+    assert client.patch(url, content=b"efgh", headers={**PATCH, "Upload-Offset": "4"}).status_code == 204
+    assert client.get(url).json()["sha256"] == hashlib.sha256(b"abcdefgh").hexdigest()
+
+
+def test_manager_resumes_after_restart(manager, tmp_path):
+    up = manager.create(6, checksum=hashlib.sha256(b"abcdef").hexdigest())
+    w = manager.open(up.id, 0)
+    w.write(b"abc")
+    with pytest.raises(UploadConflictError):
+        manager.open(up.id, 3)  # locked while the first writer is open
+    w.abort()
+
+    again = UploadManager(manager.root)
+    assert again.get(up.id).offset == 3
+    with pytest.raises(DuplicateUploadError):
+        again.create(6, checksum=up.checksum)
+    w = again.open(up.id, 3)
+    w.write(b"xyz")
+    with pytest.raises(ChecksumMismatchError):
+        w.commit()
+    assert again.get(up.id) is None and not any(again.root.iterdir())
+
+
+def test_stale_uploads_expire_and_free_their_checksum(manager):
+    from autoappbuilder.automation.scheduler.cleanup_uploads import main as cleanup_main
+    checksum = hashlib.sha256(b"abcdef").hexdigest()
+    abandoned = manager.create(6, checksum=checksum)
+    manager.open(abandoned.id, 0).abort()
+    old = os.path.getmtime(manager.root / f"{abandoned.id}.part") - 7200
+    abandoned.created_at = old
+    os.utime(manager.root / f"{abandoned.id}.part", (old, old))
+    manager.expiry = 3600
+    fresh = manager.create(6, checksum=checksum)  # the idle claim no longer blocks a new upload
+    assert fresh.id != abandoned.id and manager.get(abandoned.id) is None
+    with pytest.raises(DuplicateUploadError):
+        manager.create(6, checksum=checksum)
+
+    idle = manager.create(3)
+    idle.created_at = old
+    os.utime(manager.root / f"{idle.id}.part", (old, old))
+    manager._save(idle)  # the job runs in its own process and reads this from disk
+    assert cleanup_main(["--root", str(manager.root), "--max-age-hours", "1"]) == 0
+    assert sorted(p.stem for p in manager.root.glob("*.json")) == [fresh.id]
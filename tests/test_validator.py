@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+
+from autoappbuilder.automation.scheduler.hosting_jobs import audit_deployments
+from autoappbuilder.desktop.pywebview_app import settings as desktop_settings
+from autoappbuilder.exceptions import SchemaError, SchemaValidationError
+from autoappbuilder.hosting.utils.validators import check_hosting_settings, validate_deployments
+from autoappbuilder.ingestion.utils.validators import parse_intake_request, validate_intake_requests
+from autoappbuilder.parser.validator import clear_cache, compile_schema, load_validator
+from autoappbuilder.utils.store import InMemoryStore
+
+
+def test_keywords_and_error_paths():
+    v = compile_schema({
+        "type": "object",
+        "required": ["name", "tags"],
+        "additionalProperties": False,
+        "properties": {
+            "name": {"type": "string", "minLength": 2, "pattern": "^[a-z]+$"},
+            "count": {"type": "integer", "minimum": 0, "exclusiveMaximum": 10},
+            "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}, "uniqueItems": True},
+            "kind": {"anyOf": [{"const": "a"}, {"type": "null"}]},
+        },
+        "$defs": {"tag": {"enum": ["x", "y"]}},
+    })
+    assert v.is_valid({"name": "ok", "count": 3, "tags": ["x"], "kind": None})
+    assert v.errors({"name": "A", "count": 10, "tags": ["x", "z", "x"], "extra": 1, "kind": "b"}) == [
+        "$.name: 'A' is shorter than 2 character(s)",
+        "$.name: 'A' does not match '^[a-z]+$'",
+        "$.count: 10 is greater than or equal to the exclusive maximum of 10",
+        "$.tags[1]: 'z' is not one of ['x', 'y']",
+        "$.tags: has non-unique item 'x'",
+        "$: additional property 'extra' is not allowed",
+        "$.kind: 'b' is not valid under any of the given schemas",
+    ]
+    assert v.errors({"tags": []}) == ["$: 'name' is a required property"]
+
+
+def test_json_types_keep_booleans_apart():
+    assert not compile_schema({"type": "integer"}).is_valid(True)
+    assert compile_schema({"type": "integer"}).is_valid(2.0)
+    assert not compile_schema({"enum": [1]}).is_valid(True)
+    assert compile_schema({"const": [1, {"a": False}]}).is_valid([1, {"a": False}])
+    assert compile_schema({"type": "string", "minimum": 1}).errors(5) == ["$: 5 is not of type 'string'"]
+    assert compile_schema({"type": "array", "minItems": 1}).errors({}) == ["$: {} is not of type 'array'"]
+
+
+def test_recursive_ref_and_formats():
+    v = compile_schema({
+        "$defs": {"node": {"type": "object", "properties": {
+            "id": {"type": "string", "format": "uuid"},
+            "children": {"type": "array", "items": {"$ref": "#/$defs/node"}},
+        }}},
+        "$ref": "#/$defs/node",
+    })
+    good = {"id": "0" * 8 + "-0000-0000-0000-" + "0" * 12, "children": [{"children": []}]}
+    assert v.is_valid(good)
+    assert v.errors({"children": [{"id": "nope"}]}) == ["$.children[0].id: 'nope' is not a valid 'uuid'"]
+
+
+def test_bad_schemas_are_rejected():
+    with pytest.raises(SchemaError):
+        compile_schema({"type": "text"})
+    with pytest.raises(SchemaError):
+        compile_schema({"if": {"type": "string"}})
+    with pytest.raises(SchemaError):
+        compile_schema({"$ref": "#/$defs/missing"})
+
+
+def test_validate_many_reports_by_index():
+    records = [{"bundle_id": "b", "target": "vercel"}] * 3 + [{"bundle_id": "", "target": "mars"}]
+    assert validate_deployments(records) == {3: [
+        "$.bundle_id: '' is shorter than 1 character(s)",
+        "$.target: 'mars' is not one of ['aws_amplify', 'azure_webapps', 'cloudflare', 'digitalocean', "
+        "'gcp_cloudrun', 'heroku', 'netlify', 'vercel']",
+    ]}
+
+
+def test_load_validator_compiles_once_until_the_file_changes(tmp_path):
+    clear_cache()
+    assert load_validator("deployments") is load_validator("deployments")
+    path = tmp_path / "thing.schema.json"
+    path.write_text(json.dumps({"type": "string"}))
+    first = load_validator(path)
+    assert load_validator(path) is first
+    path.write_text(json.dumps({"type": "integer"}))
+    os.utime(path, ns=(0, 1))
+    assert load_validator(path).is_valid(3)
+    with pytest.raises(SchemaError):
+        load_validator("no-such-schema")
+
+
+def test_bundled_schemas_and_helpers():
+    settings = check_hosting_settings({"providers": {"netlify": {"token_env": "NETLIFY_TOKEN"}}})
+    assert settings["max_concurrent_deploys"] == 4
+    with pytest.raises(SchemaValidationError) as e:
+        check_hosting_settings({"providers": {"geocities": {}}})
+    assert "geocities" in e.value.errors[0]
+    req = parse_intake_request({"paths": ["a.pdf"], "on_error": "skip"})
+    assert (req.paths, req.on_error, req.ordered) == (["a.pdf"], "skip", True)
+    assert list(validate_intake_requests([{"paths": []}, {"paths": ["x"]}])) == [0]
+
+
+def test_desktop_settings_round_trip(tmp_path):
+    path = tmp_path / "settings.json"
+    settings = desktop_settings.load_settings(path)
+    assert settings["api_port"] == 8080
+    settings["theme"] = "dark"
+    desktop_settings.save_settings(settings, path)
+    assert json.loads(path.read_text()) == {"theme": "dark"}
+    assert desktop_settings.load_settings(path)["theme"] == "dark"
+    path.write_text(json.dumps({"api_port": 0}))
+    with pytest.raises(SchemaValidationError):
+        desktop_settings.load_settings(path)
+
+
+def test_audit_deployments_pages_through_the_store():
+    store = InMemoryStore()
+    b = store.create_bundle("b")
+    ids = [store.create_deployment(b["id"], "vercel")["id"] for _ in range(7)]
+    store.deployments[ids[5]]["status"] = "exploded"
+    report = audit_deployments(store, page_size=3)
+    assert report.checked == 7
+    assert list(report.invalid) == [ids[5]]
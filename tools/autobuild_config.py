@@ -0,0 +1,156 @@
+from __future__ import annotations
+import glob, threading
+from dataclasses import dataclass, field
+from pathlib import Path
+import yaml
+
+# Shared loader for config/autobuild.yml used by the MCP server, the terminal and the desktop UIs.
+# The parsed result is cached per file and reused until the file (or any file it includes)
+# changes on disk. Large setups can split projects across files with `include:`:
+#
+#   include:
+#     - projects/*.yml        # relative to the including file; globs allowed
+#   projects:
+#     - name: Autobuilder
+#       path: ~/Autobuilder
+#       default_branch: main
+
+class ConfigError(ValueError):
+    """The config (or an included file) is not valid YAML or does not match the schema."""
+
+@dataclass(frozen=True)
+class Project:
+    name: str
+    path: Path
+    default_branch: str = "main"
+    source: Path | None = None
+    raw: dict = field(default_factory=dict, compare=False, repr=False)
+
+@dataclass
+class Config:
+    projects: list[Project] = field(default_factory=list)
+    files: list[Path] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.by_name: dict[str, Project] = {p.name: p for p in self.projects}
+
+    def get(self, name: str) -> Project | None:
+        return self.by_name.get(name)
+
+    def paths(self) -> dict[str, Path]:
+        return {p.name: p.path for p in self.projects}
+
+PROJECT_KEYS = {"name": str, "path": str, "default_branch": str}
+
+def _validate_project(item, where: str) -> None:
+    if not isinstance(item, dict):
+        raise ConfigError(f"{where}: project entries must be mappings")
+    for key in ("name", "path"):
+        if not item.get(key):
+            raise ConfigError(f"{where}: project is missing '{key}'")
+    for key, typ in PROJECT_KEYS.items():
+        if key in item and not isinstance(item[key], typ):
+            raise ConfigError(f"{where}: '{key}' must be a {typ.__name__}")
+
+def _validate(data, where: str) -> tuple[list[dict], list[str]]:
+    if data is None:
+        return [], []
+    if not isinstance(data, dict):
+        raise ConfigError(f"{where}: top level must be a mapping")
+    projects = data.get("projects") or []
+    if not isinstance(projects, list):
+        raise ConfigError(f"{where}: 'projects' must be a list")
+    for i, item in enumerate(projects):
+        _validate_project(item, f"{where}: projects[{i}]")
+    includes = data.get("include") or []
+    if isinstance(includes, str):
+        includes = [includes]
+    if not isinstance(includes, list) or not all(isinstance(i, str) for i in includes):
+        raise ConfigError(f"{where}: 'include' must be a path or a list of paths")
+    return projects, includes
+
+def _stat_sig(p: Path):
+    try:
+        st = p.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def _parse(path: Path) -> tuple[Config, tuple]:
+    """Parse path and its includes; also returns the stat signatures they were read at."""
+    projects: list[Project] = []
+    files: list[Path] = []
+    seen: dict[str, Path] = {}
+    # (path, signature) of every file read and every directory globbed, taken before reading
+    watched: list[tuple[Path, tuple | None]] = []
+
+    def visit(p: Path, stack: tuple[Path, ...]):
+        p = p.resolve()
+        if p in stack:
+            raise ConfigError(f"include cycle: {' -> '.join(str(s) for s in (*stack, p))}")
+        if p in files:
+            return
+        files.append(p)
+        watched.append((p, _stat_sig(p)))
+        try:
+            data = yaml.safe_load(p.read_text(encoding="utf-8"))
+        except OSError as e:
+            raise ConfigError(f"{p}: {e.strerror}") from e
+        except yaml.YAMLError as e:
+            raise ConfigError(f"{p}: invalid YAML: {e}") from e
+        items, includes = _validate(data, str(p))
+        for item in items:
+            name = item["name"]
+            if name in seen:
+                raise ConfigError(f"{p}: duplicate project '{name}' (first defined in {seen[name]})")
+            seen[name] = p
+            projects.append(Project(
+                name=name,
+                path=Path(item["path"]).expanduser().resolve(),
+                default_branch=item.get("default_branch", "main"),
+                source=p,
+                raw=dict(item),
+            ))
+        for inc in includes:
+            pattern = str(Path(inc).expanduser() if Path(inc).expanduser().is_absolute() else p.parent / inc)
+            if glob.has_magic(pattern):
+                # new files matching the glob change the directory's mtime
+                base = Path(pattern).parent
+                while glob.has_magic(str(base)):
+                    base = base.parent
+                watched.append((base, _stat_sig(base)))
+                matches = sorted(glob.glob(pattern))
+            else:
+                matches = [pattern]
+            for m in matches:
+                visit(Path(m), (*stack, p))
+
+    visit(path, ())
+    return Config(projects, files), tuple(watched)
+
+_cache: dict[Path, tuple[tuple, Config]] = {}
+_lock = threading.Lock()
+
+def load(path: Path) -> Config:
+    """Parsed and validated config for path; an empty Config if the file does not exist.
+
+    Re-parses only when the stat signature (inode, mtime, size) of the file or one of its
+    includes changes. Raises ConfigError for invalid files.
+    """
+    path = Path(path).resolve()
+    with _lock:
+        hit = _cache.get(path)
+        if hit is not None:
+            watched, cfg = hit
+            if all(_stat_sig(p) == sig for p, sig in watched):
+                return cfg
+    if not path.exists():
+        return Config()
+    cfg, watched = _parse(path)
+    with _lock:
+        _cache[path] = (watched, cfg)
+    return cfg
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
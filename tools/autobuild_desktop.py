@@ -2,30 +2,24 @@ from __future__ import annotations
 import subprocess, sys, threading
 from pathlib import Path
 import PySimpleGUI as sg
-import yaml
+import autobuild_config
+import gitsession
 
 ROOT = Path.cwd()
 CONFIG = ROOT / "config" / "autobuild.yml"
-CURRENT_FILE = ROOT / ".autobuild_current"
+_current = gitsession.CurrentProject(ROOT / ".autobuild_current", ROOT)
 
-def read_cfg():
-    if CONFIG.exists():
-        try:
-            return yaml.safe_load(CONFIG.read_text()) or {}
-        except Exception:
-            return {"projects":[]}
-    return {"projects":[]}
+def read_cfg() -> autobuild_config.Config:
+    try:
+        return autobuild_config.load(CONFIG)
+    except autobuild_config.ConfigError:
+        return autobuild_config.Config()
 
 def write_current(p: Path):
-    CURRENT_FILE.write_text(str(p), encoding="utf-8")
+    _current.set(p)
 
 def read_current() -> Path:
-    if CURRENT_FILE.exists():
-        try:
-            return Path(CURRENT_FILE.read_text().strip()).expanduser().resolve()
-        except Exception:
-            pass
-    return ROOT
+    return _current.get()
 
 def run_cmd(cmd, cwd=None):
     return subprocess.Popen(
@@ -33,8 +27,7 @@ def run_cmd(cmd, cwd=None):
     )
 
 def list_projects():
-    cfg = read_cfg()
-    return [(p.get("name"), Path(p["path"]).expanduser().resolve()) for p in cfg.get("projects",[])]
+    return [(p.name, p.path) for p in read_cfg().projects]
 
 def gui():
     sg.theme("SystemDefault")
@@ -1,82 +1,150 @@
 from __future__ import annotations
 import os, sys, subprocess, threading, queue
 from pathlib import Path
-import yaml
+import gitsession, autobuild_config, output_pipeline, bigfile
 
 from PySide6.QtCore import Qt, QUrl, QTimer, QDir
-from PySide6.QtGui import QAction, QFont, QTextOption, QTextCursor
+from PySide6.QtGui import QAction, QFont, QTextOption, QTextCursor, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QSplitter, QFileSystemModel, QTreeView,
     QPlainTextEdit, QLineEdit, QToolBar, QLabel, QPushButton, QHBoxLayout,
-    QVBoxLayout, QFileDialog, QMessageBox, QTabWidget, QWidget
+    QVBoxLayout, QFileDialog, QMessageBox, QTabWidget, QWidget, QInputDialog
 )
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
 ROOT = Path.cwd()
 CONFIG = ROOT / "config" / "autobuild.yml"
 CUR = ROOT / ".autobuild_current"
-
-def cfg():
-    try:
-        return yaml.safe_load(CONFIG.read_text(encoding="utf-8")) or {}
-    except Exception:
-        return {"projects":[]}
+_current = gitsession.CurrentProject(CUR, ROOT)
 
 def projects():
-    out = []
-    for p in cfg().get("projects", []):
-        name = p.get("name") or "Autobuilder"
-        path = Path(p.get("path",".")).expanduser().resolve()
-        out.append((name, path))
+    try:
+        out = [(p.name, p.path) for p in autobuild_config.load(CONFIG).projects]
+    except autobuild_config.ConfigError:
+        out = []
     return out or [("Autobuilder", ROOT)]
 
-def write_cur(p: Path): CUR.write_text(str(p), encoding="utf-8")
-def read_cur() -> Path:
-    try: return Path(CUR.read_text(encoding="utf-8").strip()).expanduser().resolve()
-    except Exception: return ROOT
+def write_cur(p: Path): _current.set(p)
+def read_cur() -> Path: return _current.get()
+
+def active_text(p: Path) -> str:
+    try: return f"{p}  [{gitsession.session(p).branch('detached')}]"
+    except (FileNotFoundError, OSError): return str(p)
 
 class Editor(QPlainTextEdit):
+    """Editable text for normal files; files over bigfile.LARGE_FILE_BYTES open in a read-only paged view."""
+    SAVE_CHUNK_LINES = 5000
+    PAGED_KEYS = {Qt.Key_Up: -1, Qt.Key_Down: 1, Qt.Key_PageUp: "page-", Qt.Key_PageDown: "page+"}
+
     def __init__(self):
         super().__init__()
         self.setFont(QFont("Menlo", 12))
         self.setWordWrapMode(QTextOption.NoWrap)
         self._path: Path|None = None
+        self._paged: bigfile.PagedView | None = None
+        QShortcut(QKeySequence("Ctrl+G"), self, activated=self.goto_line)
 
     def load(self, p: Path):
         try:
-            txt = p.read_text(encoding="utf-8")
-            self.setPlainText(txt)
-            self._path = p
+            if bigfile.is_binary(p):
+                QMessageBox.information(self, "Binary file", f"{p.name} looks like a binary file; not opening it."); return
+            paged = bigfile.PagedView(bigfile.PagedFile(p)) if bigfile.is_large(p) else None
+            txt = None if paged else p.read_text(encoding="utf-8")
         except Exception as e:
-            QMessageBox.critical(self, "Open failed", str(e))
+            QMessageBox.critical(self, "Open failed", str(e)); return
+        self._close_paged()
+        self._path = p
+        if paged:
+            self._paged = paged
+            self.setReadOnly(True)
+            self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            self._render_page()
+        else:
+            self.setPlainText(txt)
+
+    def _close_paged(self):
+        if self._paged:
+            self._paged.file.close(); self._paged = None
+            self.setReadOnly(False)
+            self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+    # ---- paged (large file) view ----
+    def _render_page(self):
+        pv = self._paged
+        pv.height = max(10, self.viewport().height() // self.fontMetrics().lineSpacing())
+        self.setPlainText(pv.text())
+
+    def _paged_scroll(self, delta):
+        if isinstance(delta, str):
+            delta = self._paged.height if delta == "page+" else -self._paged.height
+        self._paged.scroll(delta); self._render_page()
+
+    def wheelEvent(self, e):
+        if self._paged: self._paged_scroll(-3 if e.angleDelta().y() > 0 else 3); return
+        super().wheelEvent(e)
+
+    def keyPressEvent(self, e):
+        if self._paged and e.key() in self.PAGED_KEYS: self._paged_scroll(self.PAGED_KEYS[e.key()]); return
+        super().keyPressEvent(e)
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        if self._paged: self._render_page()
+
+    def goto_line(self):
+        n, ok = QInputDialog.getInt(self, "Go to line", "Line number:", 1, 1)
+        if not ok: return
+        if self._paged:
+            self._paged.goto(n); self._render_page(); return
+        n = min(n, self.document().blockCount())
+        cur = self.textCursor(); cur.setPosition(self.document().findBlockByNumber(n - 1).position())
+        self.setTextCursor(cur); self.centerCursor()
+
+    def _chunks(self):
+        block, lines = self.document().firstBlock(), []
+        while block.isValid():
+            lines.append(block.text()); block = block.next()
+            if len(lines) >= self.SAVE_CHUNK_LINES or not block.isValid():
+                yield "\n".join(lines) + ("\n" if block.isValid() else ""); lines = []
 
     def save(self):
+        if self._paged:
+            QMessageBox.information(self, "Read-only", "Large files open read-only."); return
         if not self._path:
             f, _ = QFileDialog.getSaveFileName(self, "Save file as")
             if not f: return
             self._path = Path(f)
-        self._path.write_text(self.toPlainText(), encoding="utf-8")
+        bigfile.atomic_write(self._path, self._chunks())
 
 class Console(QPlainTextEdit):
+    """write() is safe from any thread; pending output is inserted on the GUI thread every FLUSH_MS."""
     def __init__(self):
         super().__init__()
         self.setReadOnly(True)
         self.setFont(QFont("Menlo", 11))
         self.setMaximumHeight(220)
         self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.buf = output_pipeline.OutputBuffer(spill=output_pipeline.session_log("qt"))
+        self.setMaximumBlockCount(self.buf.max_lines)
+        self._timer = QTimer(self); self._timer.timeout.connect(self._flush)
+        self._timer.start(output_pipeline.FLUSH_MS)
 
     def write(self, s: str):
-        self.moveCursor(QTextCursor.End)
-        self.insertPlainText(s)
-        self.moveCursor(QTextCursor.End)
+        self.buf.feed(s)
+
+    def _flush(self):
+        chunk, dropped = self.buf.drain()
+        if chunk or dropped:
+            self.moveCursor(QTextCursor.End)
+            self.insertPlainText(output_pipeline.skipped_notice(dropped) + chunk)
+            self.moveCursor(QTextCursor.End)
 
 def run_stream(cmd: str, cwd: Path, out: Console):
     def worker():
         out.write(f"> {cmd}\n(in {cwd})\n")
-        proc = subprocess.Popen(["bash","-lc", cmd], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        proc = subprocess.Popen(["bash","-lc", cmd], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         assert proc.stdout
-        for line in proc.stdout:
-            out.write(line)
+        output_pipeline.read_stream(proc.stdout, out.buf)
         rc = proc.wait()
         out.write(f"[exit {rc}]\n\n")
     threading.Thread(target=worker, daemon=True).start()
@@ -98,7 +166,7 @@ class Main(QMainWindow):
         tb.setMovable(False)
 
         tb.addWidget(QLabel("Active: "))
-        self.active_lbl = QLabel(str(self.active)); tb.addWidget(self.active_lbl)
+        self.active_lbl = QLabel(active_text(self.active)); tb.addWidget(self.active_lbl)
 
         tb.addSeparator(); tb.addWidget(QLabel(" Commit msg "))
         self.cmsg = QLineEdit("assistant update"); self.cmsg.setFixedWidth(320); tb.addWidget(self.cmsg)
@@ -148,7 +216,7 @@ class Main(QMainWindow):
         btn.clicked.connect(self.send_api)
 
         # Final wiring
-        self._api_proc: subprocess.Popen[str] | None = None
+        self._api_proc: subprocess.Popen[bytes] | None = None
         self.console.write("Qt Trae-like UI loaded.\n")
 
     # Slots
@@ -174,12 +242,9 @@ class Main(QMainWindow):
         port = self.api.text().strip() or "8080"
         self._api_proc = subprocess.Popen(
             ["bash","-lc", f"python -m http.server {port}"],
-            cwd=str(self.active), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            cwd=str(self.active), stdout=subprocess.PIPE, stderr=subprocess.STDOUT
         )
-        def pump():
-            for line in self._api_proc.stdout:  # type: ignore
-                self.console.write(line)
-        threading.Thread(target=pump, daemon=True).start()
+        threading.Thread(target=output_pipeline.read_stream, args=(self._api_proc.stdout, self.console.buf), daemon=True).start()
         self.console.write(f"API started at http://localhost:{port}\n")
 
     # --- OpenAI API chat (optional) ---
@@ -243,7 +308,9 @@ class Main(QMainWindow):
 def main():
     app = QApplication(sys.argv)
     win = Main(); win.show()
-    sys.exit(app.exec())
+    rc = app.exec()
+    win.console.buf.close()
+    sys.exit(rc)
 
 if __name__ == "__main__":
     main()
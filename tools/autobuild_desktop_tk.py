@@ -1,11 +1,14 @@
 from __future__ import annotations
 import os, sys, subprocess, threading, queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import tkinter.font as tkfont
 import webbrowser
-import yaml
+import gitsession, autobuild_config, output_pipeline, filetree, bigfile
 
 # Optional imports (handled at runtime)
 try:
@@ -19,122 +22,301 @@ except Exception:
 ROOT = Path.cwd()
 CONFIG = ROOT / "config" / "autobuild.yml"
 CUR = ROOT / ".autobuild_current"
-
-def cfg():
-    try:
-        return yaml.safe_load(CONFIG.read_text(encoding="utf-8")) or {}
-    except Exception:
-        return {"projects": []}
+_current = gitsession.CurrentProject(CUR, ROOT)
 
 def projects():
-    projs = []
-    for p in cfg().get("projects", []):
-        name = p.get("name"); path = p.get("path")
-        if name and path:
-            projs.append((name, Path(path).expanduser().resolve()))
+    try:
+        projs = [(p.name, p.path) for p in autobuild_config.load(CONFIG).projects]
+    except autobuild_config.ConfigError:
+        projs = []
     return projs or [("Autobuilder", ROOT)]
 
-def write_cur(p: Path): CUR.write_text(str(p), encoding="utf-8")
-def read_cur() -> Path:
-    try: return Path(CUR.read_text(encoding="utf-8").strip()).expanduser().resolve()
-    except Exception: return ROOT
+def write_cur(p: Path): _current.set(p)
+def read_cur() -> Path: return _current.get()
+
+def active_text(p: Path) -> str:
+    try: return f"{p}  [{gitsession.session(p).branch('detached')}]"
+    except (FileNotFoundError, OSError): return str(p)
 
-def run_stream(cmd: str, cwd: Path, out: tk.Text):
+class Console:
+    """Bottom console: write() from any thread; the Text widget is updated from the Tk loop every FLUSH_MS."""
+    def __init__(self, text: tk.Text, buf: output_pipeline.OutputBuffer):
+        self.text, self.buf = text, buf
+        text.after(output_pipeline.FLUSH_MS, self._flush)
+
+    def write(self, s: str): self.buf.feed(s)
+
+    def _flush(self):
+        chunk, dropped = self.buf.drain()
+        if chunk or dropped:
+            t = self.text
+            t.insert("end", output_pipeline.skipped_notice(dropped) + chunk)
+            extra = int(t.index("end-1c").split(".")[0]) - self.buf.max_lines
+            if extra > 0: t.delete("1.0", f"{extra + 1}.0")
+            t.see("end")
+        self.text.after(output_pipeline.FLUSH_MS, self._flush)
+
+def run_stream(cmd: str, cwd: Path, out: Console):
     """Stream a bash command into the bottom console."""
     def worker():
-        out.insert("end", f"> {cmd}\n(in {cwd})\n"); out.see("end")
+        out.write(f"> {cmd}\n(in {cwd})\n")
         proc = subprocess.Popen(["bash","-lc", cmd], cwd=cwd,
-                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         assert proc.stdout
-        for line in proc.stdout:
-            out.insert("end", line); out.see("end")
+        output_pipeline.read_stream(proc.stdout, out.buf)
         proc.wait()
-        out.insert("end", f"[exit {proc.returncode}]\n\n"); out.see("end")
+        out.write(f"[exit {proc.returncode}]\n\n")
     threading.Thread(target=worker, daemon=True).start()
 
 # ---------------- Editor ----------------
 class CodeEditor(ttk.Frame):
+    """Editable text for normal files; files over bigfile.LARGE_FILE_BYTES open in a read-only paged view."""
+    SAVE_CHUNK_LINES = 5000
+
     def __init__(self, master):
         super().__init__(master)
         self.path: Path | None = None
         self._dirty = tk.BooleanVar(value=False)
+        self._paged: bigfile.PagedView | None = None
 
         top = ttk.Frame(self); top.pack(fill="x")
         self.title = ttk.Label(top, text="(no file)", font=("Menlo", 11, "bold"))
         self.title.pack(side="left", padx=6, pady=6)
         ttk.Button(top, text="Open…", command=self.open_file).pack(side="right", padx=3)
         ttk.Button(top, text="Save", command=self.save_file).pack(side="right", padx=3)
+        ttk.Button(top, text="Go to line…", command=self.goto_line).pack(side="right", padx=3)
 
         wrap = ttk.Frame(self); wrap.pack(fill="both", expand=True)
         self.text = tk.Text(wrap, undo=True, wrap="none", font=("Menlo", 12))
         self.text.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(wrap, orient="vertical", command=self.text.yview)
-        sb.pack(side="right", fill="y")
-        self.text.configure(yscrollcommand=sb.set)
+        self.sb = ttk.Scrollbar(wrap, orient="vertical", command=self._yview)
+        self.sb.pack(side="right", fill="y")
+        self.text.configure(yscrollcommand=self.sb.set)
         self.text.bind("<<Modified>>", self._on_modified)
+        for seq, delta in (("<Button-4>", -3), ("<Button-5>", 3), ("<Prior>", "page-"), ("<Next>", "page+")):
+            self.text.bind(seq, lambda e, d=delta: self._paged_scroll(d))
+        self.text.bind("<MouseWheel>", lambda e: self._paged_scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Configure>", lambda e: self._paged and self._render_page())
 
     def _on_modified(self, _):
         self.text.edit_modified(False)
+        if self._paged: return
         self._dirty.set(True)
         self._update_title()
 
     def _update_title(self):
         name = self.path.name if self.path else "(no file)"
+        if self._paged:
+            total = self._paged.total
+            name += f"  (read-only, {f'{total:,} lines' if total is not None else 'indexing…'})"
         self.title.configure(text=f"{name}{' *' if self._dirty.get() else ''}")
 
+    def _close_paged(self):
+        if self._paged:
+            self._paged.file.close(); self._paged = None
+        self.text.configure(state="normal", yscrollcommand=self.sb.set)
+
     def load(self, p: Path):
+        try:
+            if bigfile.is_binary(p):
+                messagebox.showinfo("Binary file", f"{p.name} looks like a binary file; not opening it."); return
+            large = bigfile.is_large(p)
+            paged = bigfile.PagedView(bigfile.PagedFile(p)) if large else None
+        except OSError as e:
+            messagebox.showerror("Open failed", str(e)); return
+        self._close_paged()
         self.path = p
-        txt = p.read_text(encoding="utf-8")
         self.text.delete("1.0", "end")
-        self.text.insert("1.0", txt)
+        if paged:
+            self._paged = paged
+            self.text.configure(yscrollcommand="")  # the scrollbar tracks the file, not the widget
+            self._render_page(); self._wait_for_index()
+        else:
+            self.text.insert("1.0", p.read_text(encoding="utf-8"))
+            self.text.edit_reset()
         self._dirty.set(False)
         self._update_title()
 
+    # ---- paged (large file) view ----
+    def _render_page(self):
+        pv = self._paged
+        line_px = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        pv.height = max(10, self.text.winfo_height() // line_px)
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end"); self.text.insert("1.0", pv.text())
+        self.text.configure(state="disabled")
+        self.sb.set(*pv.span())
+
+    def _wait_for_index(self):
+        if not self._paged: return
+        if self._paged.total is None:
+            self.after(100, self._wait_for_index); return
+        self.sb.set(*self._paged.span()); self._update_title()
+
+    def _paged_scroll(self, delta):
+        if not self._paged: return None
+        if isinstance(delta, str):
+            delta = self._paged.height if delta == "page+" else -self._paged.height
+        self._paged.scroll(delta); self._render_page()
+        return "break"
+
+    def _yview(self, *args):
+        if not self._paged:
+            return self.text.yview(*args)
+        if args[0] == "moveto":
+            self._paged.moveto(float(args[1]))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self._paged.scroll(n * (self._paged.height if args[2] == "pages" else 1))
+        self._render_page()
+
+    def goto_line(self):
+        n = simpledialog.askinteger("Go to line", "Line number:", parent=self, minvalue=1)
+        if not n: return
+        if self._paged:
+            self._paged.goto(n); self._render_page()
+        else:
+            self.text.see(f"{n}.0"); self.text.mark_set("insert", f"{n}.0")
+
     def open_file(self):
         p = filedialog.askopenfilename(title="Open file", initialdir=str(self.path.parent if self.path else "."))
         if p: self.load(Path(p))
 
+    def _chunks(self):
+        last = int(self.text.index("end-1c").split(".")[0])
+        for start in range(1, last + 1, self.SAVE_CHUNK_LINES):
+            end = start + self.SAVE_CHUNK_LINES
+            yield self.text.get(f"{start}.0", f"{end}.0" if end <= last else "end-1c")
+
     def save_file(self):
+        if self._paged:
+            messagebox.showinfo("Read-only", "Large files open read-only."); return
         if not self.path:
             p = filedialog.asksaveasfilename(title="Save file as")
             if not p: return
             self.path = Path(p)
-        self.path.write_text(self.text.get("1.0","end-1c"), encoding="utf-8")
+        bigfile.atomic_write(self.path, self._chunks())
         self._dirty.set(False); self._update_title()
 
 # ---------------- Folder tree ----------------
 class FolderTree(ttk.Frame):
+    """Lazy file tree: listings run on a worker thread, rows are inserted in batches from the Tk loop,
+    and watched directories are refreshed in place when they change on disk."""
+    BATCH = 500    # rows inserted per tick
+    PAGE = 5000    # rows shown per directory before a "… more" row
+
     def __init__(self, master, on_open):
         super().__init__(master); self.on_open = on_open
         self.tree = ttk.Treeview(self, columns=("fullpath",), displaycolumns=()); self.tree.pack(fill="both", expand=True)
         self.tree.bind("<<TreeviewOpen>>", self._expand); self.tree.bind("<Double-1>", self._open)
+        self.cache = filetree.DirCache()
+        self.watcher = filetree.make_watcher(self._changed)
+        self._pool = ThreadPoolExecutor(2, thread_name_prefix="filetree")
+        self._events: queue.Queue = queue.Queue()   # ("listed", node, path, entries) | ("changed", path, subtree)
+        self._nodes: dict[str, str] = {}            # loaded directory -> node id
+        self._shown: dict[str, int] = {}            # loaded directory -> rows shown
+        self._inserts: deque = deque()              # (parent node, Entry | remaining count for the "more" row)
+        self.bind("<Destroy>", lambda e: e.widget is self and self.watcher.close())
+        self.after(output_pipeline.FLUSH_MS, self._pump)
 
     def populate(self, root: Path):
         self.tree.delete(*self.tree.get_children())
+        self._nodes.clear(); self._shown.clear(); self._inserts.clear()
         root_id = self.tree.insert("", "end", text=str(root), values=(str(root),), open=True)
-        self._add_children(root_id, root)
-
-    def _add_children(self, parent_id, parent_path: Path):
+        self._load(root_id, str(root))
+
+    def _load(self, node: str, path: str):
+        self._nodes[path] = node; self._shown.pop(path, None)
+        self.watcher.watch(path)
+        cached = self.cache.cached(path)
+        if cached is not None:
+            self._apply(node, path, cached); return
+        self.tree.insert(node, "end", text="loading…", values=("",), tags=("placeholder",))
+        self._pool.submit(lambda: self._events.put(("listed", node, path, self.cache.listdir(path))))
+
+    def _changed(self, path: str, subtree: bool):
+        # watcher thread
+        self.cache.invalidate(path, subtree)
+        self._events.put(("changed", path, subtree))
+
+    def _pump(self):
         try:
-            for p in sorted(parent_path.iterdir(), key=lambda x: (x.is_file(), x.name.lower())):
-                if p.name.startswith(".git"): continue
-                node = self.tree.insert(parent_id, "end", text=p.name, values=(str(p),))
-                if p.is_dir():
-                    self.tree.insert(node, "end", text="…", values=(str(p/'__placeholder__'),))
-        except Exception:
+            while True:
+                ev = self._events.get_nowait()
+                if ev[0] == "listed":
+                    _, node, path, entries = ev
+                    if self._nodes.get(path) != node: continue
+                    if self.tree.exists(node): self._apply(node, path, entries)
+                    else: del self._nodes[path]; self._shown.pop(path, None); self.watcher.unwatch(path)
+                else:
+                    _, path, subtree = ev
+                    paths = [p for p in self._nodes if p == path or (subtree and p.startswith(path + os.sep))]
+                    for p in paths:
+                        node = self._nodes[p]
+                        self._pool.submit(lambda n=node, p=p: self._events.put(("listed", n, p, self.cache.listdir(p))))
+        except queue.Empty:
             pass
+        for _ in range(min(self.BATCH, len(self._inserts))):
+            parent, item = self._inserts.popleft()
+            if not self.tree.exists(parent): continue
+            if isinstance(item, int):
+                self.tree.insert(parent, "end", text=f"… {item:,} more", values=("",), tags=("more",))
+            else:
+                self._insert_row(parent, "end", item)
+        self.after(output_pipeline.FLUSH_MS if not self._inserts else 1, self._pump)
+
+    def _insert_row(self, parent: str, index, e: filetree.Entry):
+        node = self.tree.insert(parent, index, text=e.name, values=(e.path,), tags=(("dir",) if e.is_dir else ()))
+        if e.is_dir:
+            self.tree.insert(node, "end", text="…", values=("",), tags=("placeholder",))
+
+    def _apply(self, node: str, path: str, entries: list[filetree.Entry]):
+        children = self.tree.get_children(node)
+        stale = [c for c in children if self.tree.tag_has("placeholder", c) or self.tree.tag_has("more", c)]
+        if stale: self.tree.delete(*stale)
+        shown = self._shown.get(path)
+        if shown is None:
+            # first listing: queue the rows so a huge directory is inserted over several ticks
+            shown = self._shown[path] = min(len(entries), self.PAGE)
+            self._inserts.extend((node, e) for e in entries[:shown])
+        else:
+            # refresh: drop rows that vanished, insert new ones in sorted position
+            self._inserts = deque(x for x in self._inserts if x[0] != node)
+            visible = entries[:max(shown, self.PAGE)]
+            want = {e.path for e in visible}
+            have = {self.tree.set(c, "fullpath"): c for c in self.tree.get_children(node)}
+            gone = [c for p, c in have.items() if p not in want]
+            if gone: self.tree.delete(*gone)
+            for i, e in enumerate(visible):
+                if e.path not in have: self._insert_row(node, i, e)
+            shown = self._shown[path] = len(visible)
+        if len(entries) > shown:
+            self._inserts.append((node, len(entries) - shown))
+
+    def _more(self, more_node: str):
+        parent = self.tree.parent(more_node); path = self.tree.set(parent, "fullpath")
+        entries = self.cache.cached(path)
+        self.tree.delete(more_node)
+        if entries is None: return
+        start = self._shown.get(path, 0); end = min(len(entries), start + self.PAGE)
+        self._inserts.extend((parent, e) for e in entries[start:end])
+        self._shown[path] = end
+        if len(entries) > end: self._inserts.append((parent, len(entries) - end))
 
     def _expand(self, _):
         node = self.tree.focus()
-        for c in self.tree.get_children(node):
-            if self.tree.item(c, "text") == "…": self.tree.delete(c)
-        full = Path(self.tree.set(node, "fullpath")); self._add_children(node, full)
+        path = self.tree.set(node, "fullpath")
+        if path and self._nodes.get(path) != node:
+            for c in self.tree.get_children(node):
+                if self.tree.tag_has("placeholder", c): self.tree.delete(c)
+            self._load(node, path)
 
     def _open(self, _):
         node = self.tree.focus()
         if not node: return
-        full = Path(self.tree.set(node, "fullpath"))
-        if full.is_file(): self.on_open(full)
+        if self.tree.tag_has("more", node): self._more(node); return
+        full = self.tree.set(node, "fullpath")
+        if full and not self.tree.tag_has("dir", node) and Path(full).is_file(): self.on_open(Path(full))
 
 # ---------------- Chat pane ----------------
 class ChatPane(ttk.Frame):
@@ -237,7 +419,7 @@ class App(tk.Tk):
                      state="readonly", width=28).pack(side="left", padx=6)
         ttk.Button(top, text="Use", command=self.use_project).pack(side="left")
         ttk.Label(top, text="Active:", padding=(12,0)).pack(side="left")
-        self.active_lbl = ttk.Label(top, text=str(self.active), foreground="green"); self.active_lbl.pack(side="left", padx=4)
+        self.active_lbl = ttk.Label(top, text=active_text(self.active), foreground="green"); self.active_lbl.pack(side="left", padx=4)
 
         ttk.Label(top, text="Commit msg").pack(side="left", padx=(18,4))
         self.commit_msg = ttk.Entry(top, width=40); self.commit_msg.insert(0,"assistant update"); self.commit_msg.pack(side="left")
@@ -275,7 +457,8 @@ class App(tk.Tk):
         self.out = tk.Text(console, height=12); self.out.pack(side="left", fill="both", expand=True)
         sb = ttk.Scrollbar(console, orient="vertical", command=self.out.yview); sb.pack(side="right", fill="y")
         self.out.configure(yscrollcommand=sb.set)
-        self.out.insert("end", "Trae-like UI loaded.\n")
+        self.console = Console(self.out, output_pipeline.OutputBuffer(spill=output_pipeline.session_log("tk")))
+        self.console.write("Trae-like UI loaded.\n")
 
         self.tree.populate(self.active)
         self._api_proc = None
@@ -284,8 +467,8 @@ class App(tk.Tk):
         name = self.choice.get(); path = self.projs.get(name)
         if not path or not path.exists():
             messagebox.showerror("Path not found", str(path)); return
-        self.active = path; write_cur(path); self.active_lbl.configure(text=str(path))
-        self.tree.populate(path); self.out.insert("end", f"Active project: {name} → {path}\n"); self.out.see("end")
+        self.active = path; write_cur(path); self.active_lbl.configure(text=active_text(path))
+        self.tree.populate(path); self.console.write(f"Active project: {name} → {path}\n")
 
     def on_open_file(self, p: Path): self.editor.load(p)
 
@@ -307,19 +490,17 @@ class App(tk.Tk):
     def toggle_api(self):
         if getattr(self, "_api_proc", None) and self._api_proc.poll() is None:
             self._api_proc.terminate(); self._api_proc=None
-            self.out.insert("end","API stopped\n"); self.out.see("end"); return
+            self.console.write("API stopped\n"); return
         port = (self.api_port.get().strip() or "8080")
         self._api_proc = subprocess.Popen(
             ["bash","-lc", f'python -m http.server {port}'],
-            cwd=str(self.active), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            cwd=str(self.active), stdout=subprocess.PIPE, stderr=subprocess.STDOUT
         )
-        def pump():
-            for line in self._api_proc.stdout:  # type: ignore
-                self.out.insert("end", line); self.out.see("end")
-        threading.Thread(target=pump, daemon=True).start()
-        self.out.insert("end", f"API started at http://localhost:{port}\n"); self.out.see("end")
+        threading.Thread(target=output_pipeline.read_stream, args=(self._api_proc.stdout, self.console.buf), daemon=True).start()
+        self.console.write(f"API started at http://localhost:{port}\n")
 
-    def run(self, bash_cmd: str): run_stream(bash_cmd, self.active, self.out)
+    def run(self, bash_cmd: str): run_stream(bash_cmd, self.active, self.console)
 
-def main(): App().mainloop()
+def main():
+    app = App(); app.mainloop(); app.console.buf.close()
 if __name__ == "__main__": main()
@@ -3,30 +3,39 @@ import sys, subprocess, shutil
 from pathlib import Path
 import typer
 from rich import print
-import yaml
+import gitsession, autobuild_config
 
 app = typer.Typer(add_completion=False, help="Autobuild terminal")
 CONFIG_FILE = Path("config/autobuild.yml")
+_current = gitsession.CurrentProject(Path(".autobuild_current"), Path.cwd())
 
 def sh(cmd, check=True, cwd=None):
     print(f"[bold]→[/] {' '.join(cmd)}" + (f"  [dim]in {cwd}[/]" if cwd else ""))
     return subprocess.run(cmd, check=check, cwd=cwd)
 
-def load_cfg():
-    if CONFIG_FILE.exists():
-        return yaml.safe_load(CONFIG_FILE.read_text()) or {}
-    return {"projects": []}
+def load_cfg() -> autobuild_config.Config:
+    try:
+        return autobuild_config.load(CONFIG_FILE)
+    except autobuild_config.ConfigError as e:
+        print(f"[red]Invalid config:[/] {e}"); raise SystemExit(2)
 
 def save_current(path: Path):
-    Path(".autobuild_current").write_text(str(path), encoding="utf-8")
+    _current.set(path)
 
 def read_current() -> Path:
-    f = Path(".autobuild_current")
-    return Path(f.read_text().strip()).expanduser().resolve() if f.exists() else Path.cwd()
+    return _current.get()
 
 @app.command("status")
 def status():
-    sh(["git","status"], check=False, cwd=str(read_current()))
+    cwd = read_current()
+    try:
+        st = gitsession.session(cwd).status()
+    except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        print(f"[red]git status failed:[/] {e}"); raise SystemExit(1)
+    print(f"[bold]{st.summary()}[/]  [dim]in {cwd}[/]")
+    for e in st.entries:
+        label = e.xy or {"untracked": "??", "ignored": "!!"}.get(e.kind, "")
+        print(f"  {label:3} {e.path}" + (f"  [dim]<- {e.orig_path}[/]" if e.orig_path else ""))
 
 @app.command("patch")
 def patch(action: str, path: Path):
@@ -36,7 +45,7 @@ def patch(action: str, path: Path):
         print(f"[red]Patch not found:[/] {path}"); raise SystemExit(2)
     cwd = read_current()
     sh([sys.executable,"tools/patcher.py",str(path)], check=False, cwd=str(cwd))
-    sh(["git","status"], check=False, cwd=str(cwd))
+    status()
 
 @app.command("commit")
 def commit(message: str = typer.Option(..., "-m")):
@@ -48,8 +57,10 @@ def commit(message: str = typer.Option(..., "-m")):
 def push(remote: str = "origin", branch: str | None = None):
     cwd = read_current()
     if not branch:
-        r = subprocess.run(["git","rev-parse","--abbrev-ref","HEAD"], capture_output=True, text=True, cwd=str(cwd))
-        branch = r.stdout.strip() or "main"
+        try:
+            branch = gitsession.session(cwd).branch()
+        except FileNotFoundError:
+            branch = "main"
     sh(["git","push",remote,branch], check=False, cwd=str(cwd))
 
 @app.command("pr")
@@ -88,24 +99,20 @@ app.add_typer(mpc, name="mpc")
 @mpc.command("list")
 def mpc_list():
     cfg = load_cfg()
-    cur = (Path(".")/".autobuild_current").read_text().strip() if Path(".autobuild_current").exists() else None
-    for p in cfg.get("projects", []):
-        path = str(Path(p["path"]).expanduser().resolve())
-        mark = "→" if cur and cur == path else " "
-        print(f"{mark} {p['name']:20} {path}")
+    cur = str(read_current()) if Path(".autobuild_current").exists() else None
+    for p in cfg.projects:
+        mark = "→" if cur and cur == str(p.path) else " "
+        print(f"{mark} {p.name:20} {p.path}")
 
 @mpc.command("use")
 def mpc_use(name: str):
-    cfg = load_cfg()
-    for p in cfg.get("projects", []):
-        if p["name"] == name:
-            path = Path(p["path"]).expanduser().resolve()
-            if not path.exists():
-                print(f"[red]Path not found:[/] {path}"); raise SystemExit(2)
-            save_current(path)
-            print(f"[green]Active project:[/] {name} -> {path}")
-            return
-    print(f"[red]Project not found:[/] {name}")
+    p = load_cfg().get(name)
+    if p is None:
+        print(f"[red]Project not found:[/] {name}"); return
+    if not p.path.exists():
+        print(f"[red]Path not found:[/] {p.path}"); raise SystemExit(2)
+    save_current(p.path)
+    print(f"[green]Active project:[/] {name} -> {p.path}")
 
 if __name__ == "__main__":
     app()
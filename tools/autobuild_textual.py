@@ -1,7 +1,7 @@
 from __future__ import annotations
 import asyncio, os, sys, shlex, threading
 from pathlib import Path
-import yaml
+import gitsession, autobuild_config, output_pipeline
 
 # NEW: real ChatGPT window
 try:
@@ -18,27 +18,20 @@ from textual.containers import Horizontal
 ROOT = Path.cwd()
 CFG = ROOT / "config" / "autobuild.yml"
 CUR = ROOT / ".autobuild_current"
+_current = gitsession.CurrentProject(CUR, ROOT)
 
 def load_projects() -> list[tuple[str, Path]]:
     try:
-        cfg = yaml.safe_load(CFG.read_text()) or {}
-        items = []
-        for p in cfg.get("projects", []):
-            name = p.get("name") or "Unnamed"
-            path = Path(p["path"]).expanduser().resolve()
-            items.append((name, path))
+        items = [(p.name, p.path) for p in autobuild_config.load(CFG).projects]
         return items or [("Autobuilder", ROOT)]
-    except Exception:
+    except autobuild_config.ConfigError:
         return [("Autobuilder", ROOT)]
 
 def write_current(p: Path) -> None:
-    CUR.write_text(str(p), encoding="utf-8")
+    _current.set(p)
 
 def read_current() -> Path:
-    try:
-        return Path(CUR.read_text().strip()).expanduser().resolve()
-    except Exception:
-        return ROOT
+    return _current.get()
 
 class Toolbar(Horizontal):
     def compose(self) -> ComposeResult:
@@ -79,16 +72,25 @@ class AutobuildApp(App):
 
     active_path: reactive[Path] = reactive(read_current())
 
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.buf = output_pipeline.OutputBuffer(spill=output_pipeline.session_log("textual"))
+
     def compose(self) -> ComposeResult:
         yield Header(name="Autobuild Terminal")
         yield Toolbar()
         yield GitBar()
         yield ApiBar()
-        yield TextLog(id="log", highlight=True, wrap=False)
+        yield TextLog(id="log", highlight=True, wrap=False, max_lines=self.buf.max_lines)
         yield Footer()
 
     def log(self, msg: str) -> None:
-        self.query_one(TextLog).write(msg.rstrip("\n"))
+        self.buf.feed(msg)
+
+    def _flush_log(self) -> None:
+        chunk, dropped = self.buf.drain()
+        if chunk or dropped:
+            self.query_one(TextLog).write((output_pipeline.skipped_notice(dropped) + chunk).rstrip("\n"))
 
     async def run_stream(self, cmd: list[str], cwd: Path) -> int:
         self.log(f"> {' '.join(shlex.quote(c) for c in cmd)}   (in {cwd})\n")
@@ -98,11 +100,7 @@ class AutobuildApp(App):
             env={**os.environ, "PYTHONIOENCODING":"utf-8"},
         )
         assert proc.stdout
-        async for line in proc.stdout:
-            try:
-                self.log(line.decode() if isinstance(line, (bytes, bytearray)) else line)
-            except Exception:
-                self.log(str(line))
+        await output_pipeline.read_stream_async(proc.stdout, self.buf)
         rc = await proc.wait()
         self.log(f"[exit {rc}]\n\n")
         return rc
@@ -116,6 +114,7 @@ class AutobuildApp(App):
         sel.set_options([(n, n) for n in projs.keys()])
         sel.value = next(iter(projs.keys()))
         self.query_one("#active", Static).update(str(self.active_path))
+        self.set_interval(output_pipeline.FLUSH_MS / 1000, self._flush_log)
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         bid = event.button.id
@@ -151,7 +150,14 @@ class AutobuildApp(App):
             await self.run_stream([sys.executable,"tools/autobuild_term.py","pr"], self.active_path); return
 
         if bid == "status":
-            await self.run_stream(["git","status"], self.active_path); return
+            try:
+                st = await asyncio.to_thread(gitsession.session(self.active_path).status)
+            except Exception as e:
+                self.log(f"[ERROR] git status failed: {e}\n"); return
+            self.log(f"{st.summary()}   (in {self.active_path})\n")
+            for e in st.entries:
+                self.log(f"  {e.xy or ('??' if e.kind == 'untracked' else '!!'):3} {e.path}\n")
+            return
 
         if bid == "api-start":
             port = (self.query_one("#port", Input).value or "8080").strip()
@@ -182,4 +188,6 @@ class AutobuildApp(App):
             return
 
 if __name__ == "__main__":
-    AutobuildApp().run()
+    app = AutobuildApp()
+    app.run()
+    app.buf.close()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+import mmap, os, tempfile, threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable
+
+# Large-file support for the desktop editors. Files above LARGE_FILE_BYTES are opened through
+# mmap in a read-only paged view that decodes only the visible window of lines. Line positions
+# come from a sparse index (newline counts per 64 KiB block) built on a background thread, so a
+# jump to line N scans at most one block. Saves stream chunks into a temp file and rename it
+# over the original.
+
+LARGE_FILE_BYTES = int(float(os.environ.get("AUTOBUILD_LARGE_FILE_MB") or 8) * 2**20)
+SNIFF_BYTES = 8192
+BLOCK = 1 << 16
+
+class BinaryFileError(ValueError):
+    """Refused to open a file that looks binary."""
+
+def is_binary(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return b"\0" in f.read(SNIFF_BYTES)
+
+def is_large(path: Path) -> bool:
+    return Path(path).stat().st_size > LARGE_FILE_BYTES
+
+class LineIndex:
+    """Cumulative newline counts per BLOCK of a buffer; `offset(n)` finds where line n starts."""
+
+    def __init__(self, buf, size: int):
+        self.buf = buf
+        self.size = size
+        self.counts = array("Q")  # newlines in buf[:(i + 1) * BLOCK]
+        self.ready = threading.Event()
+        self._error: BaseException | None = None
+        self._stop = threading.Event()
+
+    def build(self) -> "LineIndex":
+        total = 0
+        try:
+            for start in range(0, self.size, BLOCK):
+                if self._stop.is_set():
+                    break
+                total += self.buf[start:start + BLOCK].count(b"\n")
+                self.counts.append(total)
+        except (ValueError, OSError) as e:  # buffer closed while indexing
+            self._error = e
+        self.ready.set()
+        return self
+
+    def build_async(self) -> "LineIndex":
+        threading.Thread(target=self.build, name="line-index", daemon=True).start()
+        return self
+
+    def cancel(self) -> None:
+        """Stop building after the current block; the index stays incomplete."""
+        self._stop.set()
+
+    @property
+    def line_count(self) -> int | None:
+        """Number of lines once the index is complete (a trailing partial line counts), else None."""
+        if not self.ready.is_set() or self._error is not None or self._stop.is_set():
+            return None
+        n = self.counts[-1] if self.counts else 0
+        if self.size and self.buf[self.size - 1:self.size] != b"\n":
+            n += 1
+        return n
+
+    def offset(self, line: int) -> int:
+        """Byte offset where 0-based `line` starts (clamped to the end of the buffer)."""
+        if line <= 0:
+            return 0
+        counts = self.counts
+        i = bisect_left(counts, line, 0, len(counts))
+        if i < len(counts):
+            pos, need = i * BLOCK, line - (counts[i - 1] if i else 0)
+        else:
+            # past the indexed part (still building): scan on from the last indexed block
+            pos, need = len(counts) * BLOCK, line - (counts[-1] if counts else 0)
+        while pos < self.size:
+            chunk = self.buf[pos:pos + BLOCK]
+            rest = chunk.split(b"\n", need)
+            if len(rest) > need:
+                # everything before the last piece is exactly `need` lines
+                return pos + len(chunk) - len(rest[-1])
+            need -= len(rest) - 1
+            pos += len(chunk)
+        return self.size
+
+class PagedFile:
+    """Read-only mmap of a text file with a background LineIndex."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        if is_binary(self.path):
+            raise BinaryFileError(f"{self.path.name} looks like a binary file")
+        self._f = open(self.path, "rb")
+        self.size = os.fstat(self._f.fileno()).st_size
+        # mmap cannot map an empty file
+        self.buf = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.index = LineIndex(self.buf, self.size).build_async()
+
+    def lines(self, start: int, count: int) -> list[str]:
+        pos = self.index.offset(start)
+        out = []
+        while count > 0 and pos < self.size:
+            j = self.buf.find(b"\n", pos)
+            end = self.size if j < 0 else j
+            out.append(self.buf[pos:end].decode("utf-8", "replace").rstrip("\r"))
+            pos = end + 1; count -= 1
+        return out
+
+    def close(self) -> None:
+        # don't wait for the whole file to be indexed: the builder stops within a block, and
+        # one that is still reading when the map closes ends with an error instead
+        self.index.cancel()
+        self.index.ready.wait(0.1)
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._f.close()
+
+class PagedView:
+    """Window of `height` lines over a PagedFile, shared by the Tk and Qt viewers."""
+
+    def __init__(self, paged: PagedFile, height: int = 200):
+        self.file = paged
+        self.height = height
+        self.top = 0
+
+    @property
+    def total(self) -> int | None:
+        return self.file.index.line_count
+
+    def _clamp(self, top: int) -> int:
+        total = self.total
+        if total is not None:
+            top = min(top, max(0, total - self.height))
+        return max(0, top)
+
+    def scroll(self, delta: int) -> None:
+        self.top = self._clamp(self.top + delta)
+
+    def goto(self, line: int) -> None:
+        """Put 1-based `line` at the top of the window."""
+        self.top = self._clamp(line - 1)
+
+    def moveto(self, fraction: float) -> None:
+        self.top = self._clamp(int(fraction * (self.total or 0)))
+
+    def text(self) -> str:
+        return "\n".join(self.file.lines(self.top, self.height))
+
+    def span(self) -> tuple[float, float]:
+        """(first, last) visible fractions for a scrollbar."""
+        total = self.total
+        if not total:
+            return 0.0, 1.0
+        return self.top / total, min(1.0, (self.top + self.height) / total)
+
+def atomic_write(path: Path, chunks: Iterable[str | bytes], encoding: str = "utf-8") -> int:
+    """Stream chunks into a temp file next to path, fsync it and rename it over path; returns bytes written."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                data = chunk.encode(encoding) if isinstance(chunk, str) else chunk
+                f.write(data)
+                written += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)  # new file; mkstemp created it 0600
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return written
@@ -0,0 +1,344 @@
+from __future__ import annotations
+import ctypes, ctypes.util, os, re, select, struct, sys, threading
+from dataclasses import dataclass
+from pathlib import Path
+import gitsession
+
+# Directory listings for the desktop file tree. Listings come from os.scandir (no per-entry
+# stat), skip .gitignore'd entries and are cached per directory until a watcher reports a
+# change: inotify on Linux, mtime polling everywhere else (or when inotify runs out of watches).
+
+ALWAYS_HIDDEN = {".git"}
+
+@dataclass(frozen=True)
+class Entry:
+    name: str
+    path: str
+    is_dir: bool
+
+# ---- .gitignore ----
+def _translate(pat: str) -> str:
+    """gitignore glob -> regex body over a "/"-separated relative path."""
+    out, i = [], 0
+    while i < len(pat):
+        c = pat[i]
+        if c == "*":
+            if pat[i:i + 2] == "**":
+                i += 2
+                if pat[i:i + 1] == "/":
+                    out.append("(?:.*/)?"); i += 1
+                else:
+                    out.append(".*")
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and (j := pat.find("]", i + 2)) != -1:
+            body = pat[i + 1:j]
+            out.append("[" + ("^" + body[1:] if body[0] in "!^" else body).replace("\\", "\\\\") + "]")
+            i = j + 1
+            continue
+        elif c == "\\" and i + 1 < len(pat):
+            out.append(re.escape(pat[i + 1])); i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+@dataclass(frozen=True)
+class Rule:
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+
+def parse_gitignore(text: str) -> list[Rule]:
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # a slash anywhere but the end anchors the pattern to the .gitignore's directory
+        prefix = "^" if "/" in line else "^(?:.*/)?"
+        rules.append(Rule(re.compile(prefix + _translate(line.lstrip("/")) + "$"), negate, dir_only))
+    return rules
+
+def _rel(p: Path, root: Path) -> str:
+    return "" if p == root else p.relative_to(root).as_posix()
+
+def _sig(p: Path):
+    try:
+        st = p.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+class GitIgnore:
+    """.gitignore files (plus .git/info/exclude) of one worktree, re-read when they change."""
+
+    def __init__(self, root: Path, git_dir: Path | None = None):
+        self.root = Path(root)
+        self.git_dir = git_dir
+        self._files: dict[Path, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, f: Path) -> list[Rule]:
+        sig = _sig(f)
+        with self._lock:
+            hit = self._files.get(f)
+            if hit and hit[0] == sig:
+                return hit[1]
+        rules = []
+        if sig is not None:
+            try:
+                rules = parse_gitignore(f.read_text(encoding="utf-8", errors="replace"))
+            except OSError:
+                pass
+        with self._lock:
+            self._files[f] = (sig, rules)
+        return rules
+
+    def chain(self, directory: Path) -> list[tuple[str, list[Rule]]]:
+        """(directory relative to root, rules) for the root and every directory down to `directory`."""
+        rel = Path(directory).relative_to(self.root)
+        chain = []
+        if self.git_dir is not None:
+            chain.append(("", self._load(self.git_dir / "info" / "exclude")))
+        base = self.root
+        for part in ("", *rel.parts):
+            base = base / part if part else base
+            rules = self._load(base / ".gitignore")
+            if rules:
+                chain.append((_rel(base, self.root), rules))
+        return chain
+
+    @staticmethod
+    def match(chain, rel_path: str, is_dir: bool) -> bool:
+        """Whether rel_path (relative to the root) is ignored; the last matching rule wins."""
+        ignored = False
+        for base, rules in chain:
+            sub = rel_path[len(base) + 1:] if base else rel_path
+            for r in rules:
+                if (is_dir or not r.dir_only) and r.regex.match(sub):
+                    ignored = not r.negate
+        return ignored
+
+# ---- listing cache ----
+class DirCache:
+    """Filtered, sorted (directories first) listings cached per directory."""
+
+    def __init__(self):
+        self._lists: dict[str, list[Entry]] = {}
+        self._ignores: dict[str, GitIgnore | None] = {}
+        self._gen = 0  # bumped by invalidate() so a listing that raced with a change is not cached
+        self._lock = threading.Lock()
+
+    def _ignore_for(self, directory: Path) -> GitIgnore | None:
+        key = str(directory)
+        with self._lock:
+            if key in self._ignores:
+                return self._ignores[key]
+        found = gitsession.find_git_dir(directory)
+        ign = None
+        if found is not None:
+            root = str(found[0])
+            with self._lock:
+                ign = self._ignores.get("repo:" + root)
+                if ign is None:
+                    ign = self._ignores["repo:" + root] = GitIgnore(found[0], found[1])
+        with self._lock:
+            self._ignores[key] = ign
+        return ign
+
+    def listdir(self, path) -> list[Entry]:
+        key = str(path)
+        with self._lock:
+            hit = self._lists.get(key)
+            gen = self._gen
+        if hit is not None:
+            return hit
+        directory = Path(os.path.realpath(key))
+        ign = self._ignore_for(directory)
+        chain, rel_dir = [], ""
+        if ign is not None and directory.is_relative_to(ign.root):
+            chain, rel_dir = ign.chain(directory), _rel(directory, ign.root)
+        entries = []
+        try:
+            with os.scandir(key) as it:
+                for e in it:
+                    if e.name in ALWAYS_HIDDEN:
+                        continue
+                    try:
+                        is_dir = e.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if chain and GitIgnore.match(chain, f"{rel_dir}/{e.name}" if rel_dir else e.name, is_dir):
+                        continue
+                    entries.append(Entry(e.name, e.path, is_dir))
+        except OSError:
+            pass
+        entries.sort(key=lambda x: (not x.is_dir, x.name.lower()))
+        with self._lock:
+            if gen == self._gen:
+                self._lists[key] = entries
+        return entries
+
+    def cached(self, path) -> list[Entry] | None:
+        with self._lock:
+            return self._lists.get(str(path))
+
+    def invalidate(self, path, subtree: bool = False) -> None:
+        key = str(path)
+        with self._lock:
+            self._gen += 1
+            self._lists.pop(key, None)
+            if subtree:
+                prefix = key.rstrip(os.sep) + os.sep
+                for k in [k for k in self._lists if k.startswith(prefix)]:
+                    del self._lists[k]
+
+# ---- watchers ----
+# on_change(directory, subtree) is called from the watcher thread; subtree is True when a
+# .gitignore changed and listings below the directory may be affected as well.
+
+class PollingWatcher:
+    """Stat the watched directories (and their .gitignore) every `interval` seconds."""
+
+    def __init__(self, on_change, interval: float = 1.0):
+        self.on_change = on_change
+        self.interval = interval
+        self._dirs: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="filetree-poll", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _state(d: str):
+        return _sig(Path(d)), _sig(Path(d) / ".gitignore")
+
+    def watch(self, path) -> None:
+        with self._lock:
+            self._dirs.setdefault(str(path), self._state(str(path)))
+
+    def unwatch(self, path) -> None:
+        with self._lock:
+            self._dirs.pop(str(path), None)
+
+    def poll(self) -> None:
+        with self._lock:
+            items = list(self._dirs.items())
+        for d, old in items:
+            new = self._state(d)
+            if new != old:
+                with self._lock:
+                    if d in self._dirs:
+                        self._dirs[d] = new
+                self.on_change(d, new[1] != old[1])
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def close(self) -> None:
+        self._stop.set()
+
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF, IN_IGNORED, IN_ONLYDIR = 0x400, 0x800, 0x8000, 0x01000000
+_EVENT = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """inotify(7) through ctypes; directories it cannot watch (ENOSPC) are polled instead."""
+    MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE
+            | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+    def __init__(self, on_change):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add, self._rm = libc.inotify_add_watch, libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.on_change = on_change
+        self._wds: dict[int, str] = {}
+        self._paths: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._fallback: PollingWatcher | None = None
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._loop, name="filetree-inotify", daemon=True)
+        self._thread.start()
+
+    def watch(self, path) -> None:
+        key = str(path)
+        with self._lock:
+            if key in self._paths:
+                return
+            wd = self._add(self.fd, os.fsencode(key), self.MASK)
+            if wd >= 0:
+                self._wds[wd], self._paths[key] = key, wd
+                return
+            if self._fallback is None:
+                self._fallback = PollingWatcher(self.on_change)
+        self._fallback.watch(key)
+
+    def unwatch(self, path) -> None:
+        key = str(path)
+        with self._lock:
+            wd = self._paths.pop(key, None)
+            if wd is not None:
+                self._wds.pop(wd, None)
+                self._rm(self.fd, wd)
+        if self._fallback is not None:
+            self._fallback.unwatch(key)
+
+    def _loop(self):
+        while True:
+            r, _, _ = select.select([self.fd, self._wake_r], [], [])
+            if self._wake_r in r:
+                break
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            changed: dict[str, bool] = {}
+            off = 0
+            while off < len(data):
+                wd, mask, _cookie, n = _EVENT.unpack_from(data, off)
+                name = data[off + _EVENT.size: off + _EVENT.size + n].rstrip(b"\0")
+                off += _EVENT.size + n
+                with self._lock:
+                    d = self._wds.get(wd)
+                    if mask & IN_IGNORED and d is not None:
+                        del self._wds[wd]
+                        self._paths.pop(d, None)
+                if d is None:
+                    continue
+                is_ignore_file = name == b".gitignore"
+                if mask & IN_CLOSE_WRITE and not is_ignore_file:
+                    continue  # file contents changed; the listing did not
+                changed[d] = changed.get(d, False) or is_ignore_file
+            for d, subtree in changed.items():
+                self.on_change(d, subtree)
+        os.close(self.fd)
+        os.close(self._wake_r)
+
+    def close(self) -> None:
+        os.write(self._wake_w, b"x")
+        os.close(self._wake_w)
+        if self._fallback is not None:
+            self._fallback.close()
+
+def make_watcher(on_change):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(on_change)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(on_change)
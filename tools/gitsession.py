@@ -0,0 +1,205 @@
+from __future__ import annotations
+import subprocess, threading
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+# Shared git access for the MCP server, the terminal and the desktop UIs.
+# HEAD/branch lookups read .git directly and are cached until HEAD or the refs change on disk;
+# status uses porcelain v2.
+
+def _stat_sig(p: Path):
+    try:
+        st = p.stat()
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+def find_git_dir(path: Path) -> tuple[Path, Path] | None:
+    """Return (worktree root, git dir) for path or its nearest parent repo."""
+    path = Path(path).resolve()
+    for d in (path, *path.parents):
+        dot = d / ".git"
+        if dot.is_dir():
+            return d, dot
+        if dot.is_file():
+            # linked worktree / submodule: ".git" is a file pointing at the real git dir
+            text = dot.read_text(encoding="utf-8").strip()
+            if text.startswith("gitdir:"):
+                gd = Path(text[len("gitdir:"):].strip())
+                return d, (gd if gd.is_absolute() else (d / gd)).resolve()
+    return None
+
+@dataclass
+class StatusEntry:
+    kind: str                 # changed | renamed | unmerged | untracked | ignored
+    path: str
+    xy: str = ""
+    orig_path: str | None = None
+
+@dataclass
+class Status:
+    branch: str | None = None
+    oid: str | None = None
+    upstream: str | None = None
+    ahead: int = 0
+    behind: int = 0
+    entries: list[StatusEntry] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not any(e.kind != "ignored" for e in self.entries)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "clean": self.clean}
+
+    def summary(self) -> str:
+        head = self.branch or "(detached)"
+        if self.upstream:
+            head += f" ...{self.upstream} [+{self.ahead}/-{self.behind}]"
+        if self.clean:
+            return f"{head}: clean"
+        counts: dict[str, int] = {}
+        for e in self.entries:
+            counts[e.kind] = counts.get(e.kind, 0) + 1
+        return f"{head}: " + ", ".join(f"{n} {k}" for k, n in sorted(counts.items()))
+
+def parse_porcelain_v2(data: str) -> Status:
+    """Parse `git status --porcelain=v2 --branch -z` output."""
+    st = Status()
+    records = data.split("\0")
+    i = 0
+    while i < len(records):
+        rec = records[i]; i += 1
+        if not rec:
+            continue
+        if rec.startswith("# "):
+            key, _, val = rec[2:].partition(" ")
+            if key == "branch.oid":
+                st.oid = None if val == "(initial)" else val
+            elif key == "branch.head":
+                st.branch = None if val == "(detached)" else val
+            elif key == "branch.upstream":
+                st.upstream = val
+            elif key == "branch.ab":
+                a, b = val.split()
+                st.ahead, st.behind = int(a), abs(int(b))
+        elif rec[0] == "1":
+            f = rec.split(" ", 8)
+            st.entries.append(StatusEntry("changed", f[8], f[1]))
+        elif rec[0] == "2":
+            f = rec.split(" ", 9)
+            # with -z the original path is the next NUL-separated record
+            st.entries.append(StatusEntry("renamed", f[9], f[1], records[i]))
+            i += 1
+        elif rec[0] == "u":
+            f = rec.split(" ", 10)
+            st.entries.append(StatusEntry("unmerged", f[10], f[1]))
+        elif rec[0] == "?":
+            st.entries.append(StatusEntry("untracked", rec[2:]))
+        elif rec[0] == "!":
+            st.entries.append(StatusEntry("ignored", rec[2:]))
+    return st
+
+class GitSession:
+    """Per-repository git state with a cached HEAD."""
+
+    def __init__(self, path: Path):
+        found = find_git_dir(path)
+        if found is None:
+            raise FileNotFoundError(f"not a git repository: {path}")
+        self.root, self.git_dir = found
+        common = self.git_dir / "commondir"
+        self.common_dir = (self.git_dir / common.read_text().strip()).resolve() if common.exists() else self.git_dir
+        self._head_sig = None
+        self._head_ref: str | None = None
+        self._head: tuple[str | None, str | None] = (None, None)
+        self._lock = threading.Lock()
+
+    # ---- HEAD / branch ----
+    def _read_ref(self, ref: str) -> str | None:
+        loose = self.common_dir / ref
+        try:
+            return loose.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            pass
+        try:
+            for line in (self.common_dir / "packed-refs").read_text(encoding="utf-8").splitlines():
+                if line and line[0] not in "#^":
+                    sha, _, name = line.partition(" ")
+                    if name == ref:
+                        return sha
+        except OSError:
+            pass
+        return None
+
+    def _head_signature(self, branch_ref: str | None):
+        sig = [_stat_sig(self.git_dir / "HEAD"), _stat_sig(self.common_dir / "packed-refs")]
+        if branch_ref:
+            sig.append(_stat_sig(self.common_dir / branch_ref))
+        return tuple(sig)
+
+    def head(self) -> tuple[str | None, str | None]:
+        """Return (branch, sha); branch is None when detached, sha None before the first commit."""
+        with self._lock:
+            if self._head_sig is not None and self._head_signature(self._head_ref) == self._head_sig:
+                return self._head
+            text = (self.git_dir / "HEAD").read_text(encoding="utf-8").strip()
+            if text.startswith("ref:"):
+                ref = text[4:].strip()
+                branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+                head = (branch, self._read_ref(ref))
+            else:
+                ref, head = None, (None, text or None)
+            self._head, self._head_ref = head, ref
+            self._head_sig = self._head_signature(ref)
+            return head
+
+    def branch(self, default: str = "main") -> str:
+        return self.head()[0] or default
+
+    # ---- status ----
+    def status(self, untracked: bool = True) -> Status:
+        cmd = ["git", "status", "--porcelain=v2", "--branch", "-z",
+               "--untracked-files=" + ("normal" if untracked else "no")]
+        r = subprocess.run(cmd, cwd=str(self.root), capture_output=True, text=True, check=True)
+        return parse_porcelain_v2(r.stdout)
+
+_sessions: dict[str, GitSession] = {}
+_sessions_lock = threading.Lock()
+
+def session(path: Path) -> GitSession:
+    """Shared GitSession for the repo containing path (raises FileNotFoundError if none)."""
+    key = str(Path(path).resolve())
+    with _sessions_lock:
+        s = _sessions.get(key)
+        if s is None:
+            s = _sessions[key] = GitSession(Path(key))
+        return s
+
+class CurrentProject:
+    """The active project from `.autobuild_current`, re-read only when that file changes."""
+
+    def __init__(self, marker: Path, default: Path):
+        self.marker = Path(marker)
+        self.default = Path(default)
+        self._sig = None
+        self._path = self.default
+        self._lock = threading.Lock()
+
+    def get(self) -> Path:
+        with self._lock:
+            sig = _stat_sig(self.marker)
+            if sig != self._sig:
+                try:
+                    self._path = Path(self.marker.read_text(encoding="utf-8").strip()).expanduser().resolve()
+                except Exception:
+                    self._path = self.default
+                self._sig = sig
+            return self._path
+
+    def set(self, path: Path) -> None:
+        path = Path(path).expanduser().resolve()  # as get() would read it back
+        with self._lock:
+            self.marker.write_text(str(path), encoding="utf-8")
+            self._path = path
+            self._sig = _stat_sig(self.marker)
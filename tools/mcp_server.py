@@ -1,30 +1,131 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import sys, os, json, subprocess, shutil
+import sys, os, json, asyncio, codecs, contextvars, subprocess, shutil, time
+from collections import deque
 from pathlib import Path
 import traceback
+import gitsession, autobuild_config
 
-# This is a minimal JSON-RPC 2.0 over stdio server. Each request is a single JSON line.
-# Methods exposed mirror Autobuild Terminal functionality.
+# This is a minimal JSON-RPC 2.0 over stdio server. Each request (or batch array) is a single JSON line.
+# Methods exposed mirror Autobuild Terminal functionality. Requests run concurrently and responses
+# are written as they complete, so clients must match them by id.
 
 ROOT = Path.cwd()
+CONFIG = ROOT / "config" / "autobuild.yml"
 CURRENT = ROOT / ".autobuild_current"  # selected project path written by CLI/UI
+_current = gitsession.CurrentProject(CURRENT, ROOT)
+
+# Max in-flight calls per method; anything not listed gets DEFAULT_LIMIT
+METHOD_LIMITS = {
+    "tools.push": 2,
+    "tools.openPR": 2,
+    "tools.scaffold": 2,
+    "tools.devApi": 1,
+}
+DEFAULT_LIMIT = 8
+
+REQUEST_CANCELLED = -32800
+
+# Subprocess output kept for the final result; older output is dropped (and counted)
+TAIL_BYTES = 256 * 1024
+READ_CHUNK = 16 * 1024
 
 def log(*a):
     print("[mcp]", *a, file=sys.stderr)
 
 def read_current() -> Path:
-    if CURRENT.exists():
-        try:
-            return Path(CURRENT.read_text().strip()).expanduser().resolve()
-        except Exception:
-            pass
-    return ROOT
+    return _current.get()
+
+_git_locks: dict[str, asyncio.Lock] = {}
+
+def git_lock(cwd: Path) -> asyncio.Lock:
+    """One lock per project so git commands on the same repo never race for index.lock."""
+    key = str(Path(cwd).resolve())
+    lock = _git_locks.get(key)
+    if lock is None:
+        lock = _git_locks[key] = asyncio.Lock()
+    return lock
+
+class RunResult:
+    """Exit code, tail of output and timing of one subprocess; unpacks as (rc, stdout)."""
+    __slots__ = ("rc", "stdout", "elapsed", "total_bytes", "truncated")
+
+    def __init__(self, rc, stdout, elapsed, total_bytes, truncated):
+        self.rc, self.stdout, self.elapsed = rc, stdout, elapsed
+        self.total_bytes, self.truncated = total_bytes, truncated
+
+    def __iter__(self):
+        yield self.rc
+        yield self.stdout
 
-def run(cmd, cwd=None):
-    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-    out, _ = p.communicate()
-    return p.returncode, out
+    def result(self, **extra):
+        return {"stdout": self.stdout, "rc": self.rc, "elapsed": round(self.elapsed, 3),
+                "bytes": self.total_bytes, "truncated": self.truncated, **extra}
+
+class Tail:
+    """Ring buffer holding the last ``limit`` bytes written to it."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.chunks: deque[bytes] = deque()
+        self.size = 0
+        self.total = 0
+
+    def append(self, data: bytes) -> None:
+        self.chunks.append(data)
+        self.size += len(data)
+        self.total += len(data)
+        while self.chunks and self.size - len(self.chunks[0]) >= self.limit:
+            self.size -= len(self.chunks.popleft())
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.chunks)[-self.limit:] if self.limit else b""
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.limit
+
+# Per-request streaming settings, set by Server.call for the task handling that request
+_progress: contextvars.ContextVar = contextvars.ContextVar("progress", default=None)
+_tail_bytes: contextvars.ContextVar = contextvars.ContextVar("tail_bytes", default=TAIL_BYTES)
+
+async def run(cmd, cwd=None) -> RunResult:
+    """Run cmd, forwarding output chunks to the request's $/progress stream when one is active."""
+    notify = _progress.get()
+    tail = Tail(_tail_bytes.get())
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    start = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+    )
+    if notify:
+        notify({"kind": "begin", "cmd": list(cmd), "cwd": cwd})
+    try:
+        while True:
+            chunk = await proc.stdout.read(READ_CHUNK)
+            if not chunk:
+                break
+            tail.append(chunk)
+            if notify:
+                text = decoder.decode(chunk)
+                if text:
+                    notify({"kind": "output", "chunk": text})
+        rc = await proc.wait()
+    except asyncio.CancelledError:
+        # $/cancelRequest: don't leave the child running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    elapsed = time.monotonic() - start
+    if notify:
+        # output that ended mid-character still reaches the client, as U+FFFD
+        text = decoder.decode(b"", final=True)
+        if text:
+            notify({"kind": "output", "chunk": text})
+        notify({"kind": "end", "rc": rc, "elapsed": round(elapsed, 3)})
+    out = tail.getvalue().decode("utf-8", errors="replace")
+    return RunResult(rc, out, elapsed, tail.total, tail.truncated)
 
 def ok(result):
     return {"jsonrpc":"2.0","result":result}
@@ -35,7 +136,7 @@ def err(code, message, data=None):
         e["data"]=data
     return {"jsonrpc":"2.0","error":e}
 
-def method_list(_params):
+async def method_list(_params):
     return ok({
         "tools":[
             "tools.applyPatch","tools.commit","tools.push","tools.openPR",
@@ -43,101 +144,112 @@ def method_list(_params):
         ]
     })
 
-def tools_apply_patch(params):
+async def tools_apply_patch(params):
     path = params.get("patchPath")
     if not path: return err(-32602, "patchPath required")
     cwd = read_current()
-    # prefer git apply
-    rc, out = run(["git","apply","--whitespace=fix", path], cwd=str(cwd))
-    if rc != 0:
-        rc, out2 = run(["patch","-p0","-N","-r","patch.rej","-i", path], cwd=str(cwd))
-        out += "\n[FALLBACK patch(1)]\n" + out2
-        if rc != 0:
-            return err(1, "apply failed", {"stdout": out})
-    return ok({"stdout": out, "cwd": str(cwd)})
-
-def tools_commit(params):
+    async with git_lock(cwd):
+        # prefer git apply
+        res = await run(["git","apply","--whitespace=fix", path], cwd=str(cwd))
+        out = res.stdout
+        if res.rc != 0:
+            res = await run(["patch","-p0","-N","-r","patch.rej","-i", path], cwd=str(cwd))
+            out += "\n[FALLBACK patch(1)]\n" + res.stdout
+            if res.rc != 0:
+                return err(1, "apply failed", res.result(stdout=out))
+    return ok(res.result(stdout=out, cwd=str(cwd)))
+
+async def tools_commit(params):
     msg = params.get("message") or "assistant update"
     cwd = read_current()
-    run(["git","add","-A"], cwd=str(cwd))
-    rc, out = run(["git","commit","-m", msg], cwd=str(cwd))
-    return ok({"stdout": out, "cwd": str(cwd), "rc": rc})
+    async with git_lock(cwd):
+        await run(["git","add","-A"], cwd=str(cwd))
+        res = await run(["git","commit","-m", msg], cwd=str(cwd))
+    return ok(res.result(cwd=str(cwd)))
 
-def tools_push(params):
+async def tools_push(params):
     remote = params.get("remote","origin")
     branch = params.get("branch")
     cwd = read_current()
-    if not branch:
-        rc, out = run(["git","rev-parse","--abbrev-ref","HEAD"], cwd=str(cwd))
-        branch = out.strip() or "main"
-    rc, out = run(["git","push", remote, branch], cwd=str(cwd))
-    return ok({"stdout": out, "cwd": str(cwd), "rc": rc})
+    async with git_lock(cwd):
+        if not branch:
+            try:
+                branch = gitsession.session(cwd).branch()
+            except FileNotFoundError:
+                branch = "main"
+        res = await run(["git","push", remote, branch], cwd=str(cwd))
+    return ok(res.result(cwd=str(cwd)))
 
-def tools_open_pr(params):
+async def tools_open_pr(params):
     base = params.get("base","main")
     title = params.get("title","Assistant update")
     body = params.get("body","")
     cwd = read_current()
     if shutil.which("gh") is None:
         return err(2,"gh CLI not found")
-    rc, out = run(["gh","pr","create","--fill","--base",base,"--title",title,"--body",body], cwd=str(cwd))
-    return ok({"stdout": out, "cwd": str(cwd), "rc": rc})
+    # gh may push the branch first, so it shares the project's git lock
+    async with git_lock(cwd):
+        res = await run(["gh","pr","create","--fill","--base",base,"--title",title,"--body",body], cwd=str(cwd))
+    return ok(res.result(cwd=str(cwd)))
 
-def tools_scaffold(params):
+async def tools_scaffold(params):
     name = params.get("name")
     outdir = params.get("out","./out_cli")
     if not name: return err(-32602,"name required")
     if shutil.which("autobuilder") is None:
         return err(3,"autobuilder CLI not found")
     cwd = read_current()
-    rc, out = run(["autobuilder","--name",name,"--out",outdir], cwd=str(cwd))
-    return ok({"stdout": out, "cwd": str(cwd), "rc": rc})
+    res = await run(["autobuilder","--name",name,"--out",outdir], cwd=str(cwd))
+    return ok(res.result(cwd=str(cwd)))
 
-def tools_dev_api(params):
+async def tools_dev_api(params):
     port = str(params.get("port", 8080))
     cwd = read_current()
     # free the port first if script exists
     script = Path(cwd) / "scripts" / "free-port-8080.sh"
     if script.exists():
-        run([str(script)], cwd=str(cwd))
+        await run([str(script)], cwd=str(cwd))
     if shutil.which("uvicorn") is None:
         return err(4,"uvicorn not found")
     # start uvicorn (non-blocking) and return immediately
     subprocess.Popen(["uvicorn","autoappbuilder.api.app:app","--reload","--port",port], cwd=str(cwd))
     return ok({"message": f"Started API on {port}", "cwd": str(cwd)})
 
-def mpc_list(_params):
-    cfg = (ROOT / "config" / "autobuild.yml")
-    if not cfg.exists():
-        return ok({"projects":[]})
+async def mpc_list(_params):
     try:
-        import yaml
-        data = yaml.safe_load(cfg.read_text()) or {}
-    except Exception as e:
-        return err(5,"invalid YAML",{"detail":str(e)})
-    return ok({"projects": data.get("projects",[])})
+        cfg = autobuild_config.load(CONFIG)
+    except autobuild_config.ConfigError as e:
+        return err(5,"invalid config",{"detail":str(e)})
+    return ok({"projects": [p.raw for p in cfg.projects]})
 
-def mpc_use(params):
+async def mpc_use(params):
     name = params.get("name")
     if not name: return err(-32602,"name required")
-    cfg = (ROOT / "config" / "autobuild.yml")
-    if not cfg.exists():
+    if not CONFIG.exists():
         return err(6,"config/autobuild.yml not found")
-    import yaml
-    data = yaml.safe_load(cfg.read_text()) or {}
-    for p in data.get("projects", []):
-        if p.get("name")==name:
-            path = Path(p["path"]).expanduser().resolve()
-            if not path.exists():
-                return err(7,"path not found",{"path":str(path)})
-            CURRENT.write_text(str(path), encoding="utf-8")
-            return ok({"active": name, "path": str(path)})
-    return err(8,"project not found",{"name":name})
-
-def git_status(_params):
+    try:
+        p = autobuild_config.load(CONFIG).get(name)
+    except autobuild_config.ConfigError as e:
+        return err(5,"invalid config",{"detail":str(e)})
+    if p is None:
+        return err(8,"project not found",{"name":name})
+    if not p.path.exists():
+        return err(7,"path not found",{"path":str(p.path)})
+    _current.set(p.path)
+    return ok({"active": name, "path": str(p.path)})
+
+async def git_status(params):
     cwd = read_current()
-    rc, out = run(["git","status"], cwd=str(cwd))
-    return ok({"stdout": out, "cwd": str(cwd), "rc": rc})
+    try:
+        sess = gitsession.session(cwd)
+    except FileNotFoundError:
+        return err(9, "not a git repository", {"cwd": str(cwd)})
+    async with git_lock(cwd):
+        try:
+            st = await asyncio.to_thread(sess.status, params.get("untracked", True))
+        except subprocess.CalledProcessError as e:
+            return err(10, "git status failed", {"stdout": e.stdout, "stderr": e.stderr, "rc": e.returncode})
+    return ok({"stdout": st.summary(), "status": st.to_dict(), "cwd": str(cwd), "rc": 0})
 
 METHODS = {
     "mcp/listTools": method_list,
@@ -152,30 +264,134 @@ METHODS = {
     "git.status": git_status,
 }
 
-def handle(line: str):
-    try:
-        req = json.loads(line)
-        method = req.get("method")
+class Server:
+    """Dispatches JSON-RPC requests concurrently and writes each response as soon as it is ready."""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.inflight: dict = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+
+    def write(self, msg) -> None:
+        # A single write() of one line per message keeps concurrent responses from interleaving
+        self.out.write(json.dumps(msg) + "\n")
+        self.out.flush()
+
+    def _limit(self, method: str) -> asyncio.Semaphore:
+        sem = self._limits.get(method)
+        if sem is None:
+            sem = self._limits[method] = asyncio.Semaphore(METHOD_LIMITS.get(method, DEFAULT_LIMIT))
+        return sem
+
+    async def call(self, req):
+        """Run one request object and return its response (None for notifications)."""
+        if (not isinstance(req, dict) or not isinstance(req.get("method"), str)
+                or not isinstance(req.get("id"), (str, int, float, type(None)))):
+            return {"jsonrpc":"2.0","id":None,"error":{"code":-32600,"message":"Invalid Request"}}
+        method = req["method"]
         _id = req.get("id")
-        params = req.get("params") or {}
+        params = req.get("params")
+        params = {} if params is None else params
+        is_notification = "id" not in req
+        if not isinstance(params, dict):
+            # every method takes named parameters; positional (array) params are not supported
+            resp = {"jsonrpc":"2.0","id":_id,"error":{"code":-32602,"message":"Invalid params"}}
+            return None if is_notification else resp
+        if "tailKB" in params:
+            try:
+                int(params["tailKB"])
+            except (TypeError, ValueError, OverflowError):
+                resp = {"jsonrpc":"2.0","id":_id,"error":{"code":-32602,"message":"Invalid params","data":"tailKB must be a number"}}
+                return None if is_notification else resp
+
+        if method == "$/cancelRequest":
+            task = self.inflight.get(params.get("id"))
+            if task is not None:
+                task.cancel()
+            return None if is_notification else {"jsonrpc":"2.0","id":_id,"result":None}
+
         if method not in METHODS:
             resp = {"jsonrpc":"2.0","id":_id,"error":{"code":-32601,"message":"Method not found"}}
-        else:
-            res = METHODS[method](params)
-            res["id"] = _id
-            resp = res
-    except Exception as e:
-        resp = {"jsonrpc":"2.0","error":{"code":-32603,"message":"Internal error","data":traceback.format_exc()}}
-    sys.stdout.write(json.dumps(resp) + "\n")
-    sys.stdout.flush()
+            return None if is_notification else resp
+
+        task = asyncio.current_task()
+        if not is_notification:
+            self.inflight[_id] = task
+        try:
+            self._setup_stream(_id, params)
+            async with self._limit(method):
+                resp = await METHODS[method](params)
+            resp["id"] = _id
+        except asyncio.CancelledError:
+            resp = {"jsonrpc":"2.0","id":_id,"error":{"code":REQUEST_CANCELLED,"message":"Request cancelled"}}
+        except Exception:
+            resp = {"jsonrpc":"2.0","id":_id,"error":{"code":-32603,"message":"Internal error","data":traceback.format_exc()}}
+        finally:
+            if not is_notification and self.inflight.get(_id) is task:
+                del self.inflight[_id]
+        return None if is_notification else resp
+
+    def _setup_stream(self, _id, params) -> None:
+        """Enable $/progress output streaming for this request if the client asked for it.
+
+        Clients opt in with an MCP-style ``_meta.progressToken`` or ``"stream": true``
+        (which uses the request id as token); ``tailKB`` sizes the output kept for the result.
+        """
+        meta = params.get("_meta") or {}
+        token = meta.get("progressToken")
+        if token is None and params.get("stream"):
+            token = _id
+        if token is not None:
+            _progress.set(lambda value: self.write(
+                {"jsonrpc":"2.0","method":"$/progress","params":{"token":token,"value":value}}))
+        if "tailKB" in params:
+            _tail_bytes.set(max(0, int(params["tailKB"])) * 1024)
+
+    async def _single(self, req):
+        resp = await self.call(req)
+        if resp is not None:
+            self.write(resp)
+
+    async def _batch(self, reqs):
+        if not reqs:
+            self.write({"jsonrpc":"2.0","id":None,"error":{"code":-32600,"message":"Invalid Request"}})
+            return
+        results = await asyncio.gather(*(asyncio.create_task(self.call(r)) for r in reqs))
+        responses = [r for r in results if r is not None]
+        if responses:
+            self.write(responses)
+
+    def handle(self, line: str):
+        """Schedule one input line; returns the task, or None if the line was answered inline."""
+        try:
+            req = json.loads(line)
+        except ValueError:
+            self.write({"jsonrpc":"2.0","id":None,"error":{"code":-32700,"message":"Parse error"}})
+            return None
+        coro = self._batch(req) if isinstance(req, list) else self._single(req)
+        return asyncio.create_task(coro)
+
+    async def serve(self, readline=None):
+        readline = readline or (lambda: asyncio.to_thread(sys.stdin.readline))
+        pending: set[asyncio.Task] = set()
+        while True:
+            line = await readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            task = self.handle(line)
+            if task is not None:
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        # stdin closed: let in-flight requests finish and flush their responses
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
 def main():
     log("MCP server started; waiting for JSON-RPC lines on stdin")
-    for line in sys.stdin:
-        line = line.strip()
-        if not line: 
-            continue
-        handle(line)
+    asyncio.run(Server().serve())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import codecs, io, os, threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# Shared console output path for the desktop and textual UIs. Worker threads feed subprocess
+# output in chunks; the UI thread drains the buffer on a timer (every FLUSH_MS) and inserts
+# everything pending in one widget update. Only the newest `max_lines` lines are kept, so a
+# flood costs one redraw per tick and memory stays flat. The full output can optionally be
+# spilled to a log file under autoappbuilder/desktop/runtime/logs.
+#
+#   AUTOBUILD_SCROLLBACK=5000   lines kept in the console
+#   AUTOBUILD_LOG_SPILL=1       also write everything to a per-session log file
+
+FLUSH_MS = 50
+READ_CHUNK = 64 * 1024
+SCROLLBACK = int(os.environ.get("AUTOBUILD_SCROLLBACK") or 5000)
+LOG_DIR = Path(__file__).resolve().parents[1] / "autoappbuilder" / "desktop" / "runtime" / "logs"
+
+def session_log(ui: str) -> Path | None:
+    """Log file for this UI session if spilling is enabled, else None."""
+    if os.environ.get("AUTOBUILD_LOG_SPILL", "") in ("", "0"):
+        return None
+    return LOG_DIR / f"{ui}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.log"
+
+class OutputBuffer:
+    """Thread-safe ring of pending console lines; `feed` from any thread, `drain` from the UI thread."""
+
+    def __init__(self, max_lines: int = SCROLLBACK, spill: Path | None = None):
+        self.max_lines = max(1, max_lines)
+        self._pending: deque[str] = deque()  # lines with their "\n"; the last one may be partial
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._spill = None
+        if spill is not None:
+            spill.parent.mkdir(parents=True, exist_ok=True)
+            self._spill = open(spill, "a", encoding="utf-8")
+        self.spill_path = spill
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        parts = text.split("\n")
+        pieces = [p + "\n" for p in parts[:-1]]
+        if parts[-1]:
+            pieces.append(parts[-1])
+        with self._lock:
+            if self._spill is not None:
+                self._spill.write(text)
+            q = self._pending
+            if q and not q[-1].endswith("\n"):
+                pieces[0] = q.pop() + pieces[0]
+            if len(pieces) >= self.max_lines:
+                self._dropped += len(q) + len(pieces) - self.max_lines
+                q.clear()
+                q.extend(pieces[-self.max_lines:])
+                return
+            q.extend(pieces)
+            while len(q) > self.max_lines:
+                q.popleft()
+                self._dropped += 1
+
+    def drain(self) -> tuple[str, int]:
+        """Everything pending as one string, plus the number of lines dropped since the last drain."""
+        with self._lock:
+            if not self._pending and not self._dropped:
+                return "", 0
+            text = "".join(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+        return text, dropped
+
+    def close(self) -> None:
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+def skipped_notice(dropped: int) -> str:
+    return f"[… {dropped:,} lines skipped …]\n" if dropped else ""
+
+def _decoder() -> io.IncrementalNewlineDecoder:
+    # UTF-8 and CRLF sequences may be split across chunks; both decoders carry the tail over
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")("replace"), translate=True)
+
+def read_stream(stream, buf: OutputBuffer) -> None:
+    """Copy a binary pipe into buf in chunks (blocking; run it on a worker thread)."""
+    dec = _decoder()
+    read = getattr(stream, "read1", stream.read)
+    while chunk := read(READ_CHUNK):
+        buf.feed(dec.decode(chunk))
+    buf.feed(dec.decode(b"", final=True))
+
+async def read_stream_async(reader, buf: OutputBuffer) -> None:
+    """Same as read_stream for an asyncio.StreamReader."""
+    dec = _decoder()
+    while chunk := await reader.read(READ_CHUNK):
+        buf.feed(dec.decode(chunk))
+    buf.feed(dec.decode(b"", final=True))